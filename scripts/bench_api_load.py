@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Load test GET /api/v1/tasks/{id} with sync (blocking) vs async persistence.
+
+By default the PostgREST round-trip is simulated with a fixed latency so the
+comparison isolates event-loop blocking:
+
+* sync   -- the handler calls `supabase_persistence.get_task`, whose client
+            sleeps with `time.sleep` (what a blocking HTTP call does to uvicorn)
+* async  -- the handler awaits `async_supabase_persistence.get_task`, whose
+            client sleeps with `asyncio.sleep`
+
+Requests go through the real FastAPI app in-process (httpx ASGI transport).
+The row cache is disabled so every request measures a PostgREST round-trip.
+Pass `--url` to load test a running server instead.
+
+Usage:
+    python scripts/bench_api_load.py [--requests 500] [--concurrency 50] [--latency-ms 20]
+    python scripts/bench_api_load.py --url http://localhost:8000 --task-id <uuid>
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.models.core_models import TaskStatus  # noqa: E402
+from src.api.persistence import async_supabase_persistence, supabase_persistence  # noqa: E402
+from src.api.persistence.record_cache import record_cache  # noqa: E402
+from src.api.routers import task_router  # noqa: E402
+from src.main import app  # noqa: E402
+
+TASK_ROW = {
+    "task_id": str(uuid.uuid4()),
+    "name": "bench",
+    "description": "load test",
+    "agent_id": None,
+    "input_data": {},
+    "output_data": None,
+    "status": TaskStatus.PENDING.value,
+    "priority": 0,
+    "created_at": datetime.now(timezone.utc).isoformat(),
+    "updated_at": datetime.now(timezone.utc).isoformat(),
+    "started_at": None,
+    "completed_at": None,
+    "dependencies": [],
+}
+
+
+class _Response:
+    data = TASK_ROW
+
+
+class _Query:
+    """Stands in for a postgrest builder chain; every method returns itself."""
+
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.blocking:
+            time.sleep(self.latency)
+            return _Response()
+
+        async def _execute():
+            await asyncio.sleep(self.latency)
+            return _Response()
+        return _execute()
+
+
+class _Client:
+    def __init__(self, latency: float, blocking: bool):
+        self.query = _Query(latency, blocking)
+
+    def table(self, name):
+        return self.query
+
+
+class _SyncAdapter:
+    """The pre-async router behaviour: `async def` handler calling blocking persistence."""
+
+    async def get_task(self, task_id):
+        return supabase_persistence.get_task(task_id)
+
+
+async def hammer(base_url: str, task_id: str, n: int, concurrency: int, transport=None) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits) as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(f"/api/v1/tasks/{task_id}")
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        return n / (time.perf_counter() - start)
+
+
+async def run_simulated(args):
+    latency = args.latency_ms / 1000
+    record_cache.ttl = 0
+    record_cache.clear()
+    transport = httpx.ASGITransport(app=app)
+
+    sync_client = _Client(latency, blocking=True)
+    with patch.object(supabase_persistence, "supabase_client", sync_client), \
+            patch.object(task_router, "db", _SyncAdapter()):
+        sync_rps = await hammer("http://bench", TASK_ROW["task_id"], args.requests, args.concurrency, transport)
+
+    async def get_client():
+        return _Client(latency, blocking=False)
+    with patch.object(async_supabase_persistence, "get_async_supabase_client", get_client):
+        async_rps = await hammer("http://bench", TASK_ROW["task_id"], args.requests, args.concurrency, transport)
+
+    print(f"simulated PostgREST latency {args.latency_ms}ms, concurrency {args.concurrency}, {args.requests} requests")
+    print(f"sync   {sync_rps:8.1f} req/s")
+    print(f"async  {async_rps:8.1f} req/s  ({async_rps / sync_rps:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--url", help="Load test a running server instead of the in-process simulation")
+    parser.add_argument("--task-id", help="Existing task id to fetch when using --url")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.task_id:
+            parser.error("--task-id is required with --url")
+        rps = asyncio.run(hammer(args.url, args.task_id, args.requests, args.concurrency))
+        print(f"{args.url}: {rps:.1f} req/s at concurrency {args.concurrency}")
+    else:
+        asyncio.run(run_simulated(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark edge creation throughput against a running SurrealDB.
+
+Compares three ways of writing the same edges:
+
+* legacy    -- the old f-string `RELATE a->T->b CONTENT {dict};`, one query per edge
+* bound     -- `create_edge`-style bound variables, one query per edge
+* batched   -- `create_edges`-style multi-RELATE, `--batch` edges per query
+
+All three reuse a single connection so the numbers reflect query handling,
+not connection setup.  Every node and edge the script writes carries
+`metadata.bench = true` and is deleted afterwards; nothing else is touched.
+Connection settings come from the same SURREALDB_* environment variables as
+the application.
+
+Usage:
+    python scripts/bench_create_edge.py [--edges 2000] [--batch 200]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.models.memory_models import EdgeType, MemoryEdge  # noqa: E402
+from src.api.persistence.surrealdb_persistence import (  # noqa: E402
+    RELATE_TEMPLATES,
+    _batch_relate_query,
+    _relate_vars,
+)
+from src.clients.surrealdb_client import get_surrealdb_client  # noqa: E402
+
+
+def make_edges(n: int, node_ids):
+    edge_types = [EdgeType.RELATES_TO, EdgeType.DEPENDS_ON, EdgeType.CLARIFIES]
+    return [
+        MemoryEdge(
+            source_node_id=node_ids[i % len(node_ids)],
+            target_node_id=node_ids[(i * 7 + 1) % len(node_ids)],
+            edge_type=edge_types[i % len(edge_types)],
+            metadata={"bench": True, "i": i},
+        )
+        for i in range(n)
+    ]
+
+
+async def legacy(db, edges, _batch):
+    for edge in edges:
+        content = {"edge_type": edge.edge_type.value, "weight": edge.weight, "metadata": {"bench": True, "i": edge.metadata["i"]}}
+        await db.query(f"RELATE {edge.source_node_id}->{edge.edge_type.value}->{edge.target_node_id} CONTENT {content};")
+
+
+async def bound(db, edges, _batch):
+    for edge in edges:
+        await db.query(RELATE_TEMPLATES[edge.edge_type], _relate_vars(edge.source_node_id, edge.target_node_id, edge))
+
+
+async def batched(db, edges, batch):
+    for start in range(0, len(edges), batch):
+        chunk = edges[start:start + batch]
+        variables = {}
+        for i, edge in enumerate(chunk):
+            variables.update(_relate_vars(edge.source_node_id, edge.target_node_id, edge, f"_{i}"))
+        await db.query(_batch_relate_query(tuple(edge.edge_type for edge in chunk)), variables)
+
+
+async def cleanup(db, nodes: bool):
+    """Delete only what this script created."""
+    for edge_type in EdgeType:
+        await db.query(f"DELETE {edge_type.value} WHERE metadata.bench = true;")
+    if nodes:
+        await db.query("DELETE memory_node WHERE metadata.bench = true;")
+
+
+async def run(args):
+    db = await get_surrealdb_client()
+    if not db:
+        print("SurrealDB is not reachable; set SURREALDB_URL and friends.")
+        return
+    try:
+        node_ids = []
+        for i in range(100):
+            created = await db.create("memory_node", {"node_type": "CONCEPT", "content": f"bench node {i}", "metadata": {"bench": True}})
+            node_ids.append(created[0]["id"] if isinstance(created, list) else created["id"])
+        edges = make_edges(args.edges, node_ids)
+
+        for name, fn in (("legacy", legacy), ("bound", bound), ("batched", batched)):
+            await cleanup(db, nodes=False)
+            start = time.perf_counter()
+            await fn(db, edges, args.batch)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8} {len(edges) / elapsed:9.0f} edges/s  ({elapsed:.2f}s)")
+    finally:
+        await cleanup(db, nodes=True)
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark LocalVectorIndex query latency and IVF recall.
+
+Builds a synthetic clustered corpus, then reports p50/p99 query latency for
+brute-force and IVF search plus IVF recall@k against the exact result.
+
+Usage:
+    python scripts/bench_local_vector_index.py [--n 100000] [--dim 384] [--dtype float32]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.persistence.local_vector_index import LocalVectorIndex  # noqa: E402
+
+
+def make_corpus(n: int, dim: int, n_topics: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, n_topics, n)
+    return centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def time_queries(index: LocalVectorIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(index.search(q, top_k=k))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"Building corpus: {args.n} x {args.dim} ({args.dtype})")
+    vectors = make_corpus(args.n, args.dim, n_topics=max(1, args.n // 500))
+    index = LocalVectorIndex(dim=args.dim, dtype=getattr(np, args.dtype), n_probe=args.n_probe)
+    index.add([str(i) for i in range(args.n)], vectors)
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(args.n, args.queries, replace=False)] + 0.1
+
+    brute_ms, exact = time_queries(index, queries, args.k)
+    print(f"brute-force   p50={np.percentile(brute_ms, 50):.3f}ms  p99={np.percentile(brute_ms, 99):.3f}ms")
+
+    start = time.perf_counter()
+    index.train_ivf()
+    print(f"IVF trained in {time.perf_counter() - start:.1f}s ({len(index._centroids)} lists, n_probe={args.n_probe})")
+
+    ivf_ms, approx = time_queries(index, queries, args.k)
+    recall = np.mean([
+        len({i for i, _ in e} & {i for i, _ in a}) / args.k for e, a in zip(exact, approx)
+    ])
+    print(f"IVF           p50={np.percentile(ivf_ms, 50):.3f}ms  p99={np.percentile(ivf_ms, 99):.3f}ms  recall@{args.k}={recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Uploading a 500-file Next.js scaffold into a sandbox (src/sentient_core/tools/file_transfer.py).
+
+Remote: a simulated E2B sandbox charges every request a round trip plus
+transfer time at a fixed bandwidth.  Compares the previous one-file-at-a-time
+loop, bounded concurrent writes, and a single tar.gz bundle unpacked in the
+sandbox (bundling time is real; the unpack is charged one round trip).
+
+Local: writes the same tree to a temp directory as `WebContainerTool` does,
+with blocking writes on the event loop versus `write_local_files`, and reports
+the longest event-loop stall seen by a 1ms ticker during each.
+
+Usage:
+    python scripts/bench_sandbox_file_upload.py [--files 500] [--rtt-ms 30] [--mbps 80]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sentient_core.tools.file_transfer import bundle_files, write_concurrently, write_local_files  # noqa: E402
+from src.sentient_core.tools.webcontainer_tool import FileModel  # noqa: E402
+
+
+def nextjs_scaffold(count: int):
+    rng = random.Random(0)
+    dirs = ["app", "app/(marketing)", "app/dashboard", "components/ui", "components/forms", "lib", "hooks",
+            "styles", "public/icons", "types", "tests/unit"]
+    files = [FileModel(path="package.json", content='{"name": "scaffold", "scripts": {"dev": "next dev"}}\n'),
+             FileModel(path="next.config.js", content="module.exports = { reactStrictMode: true };\n")]
+    while len(files) < count:
+        directory = rng.choice(dirs)
+        name = f"{directory}/file{len(files)}.tsx"
+        body = "".join(f"export const value{i} = {rng.randint(0, 10**6)};\n" for i in range(rng.randint(10, 120)))
+        files.append(FileModel(path=name, content=body))
+    return files
+
+
+class SimulatedSandbox:
+    """Charges each request one round trip plus transfer time."""
+
+    def __init__(self, rtt: float, bytes_per_second: float):
+        self.rtt = rtt
+        self.bytes_per_second = bytes_per_second
+        self.requests = 0
+
+    async def write(self, path, content):
+        self.requests += 1
+        await asyncio.sleep(self.rtt + len(content) / self.bytes_per_second)
+
+    async def run(self, command):
+        self.requests += 1
+        await asyncio.sleep(self.rtt)
+
+
+async def upload_sequential(sandbox, files):
+    for file in files:
+        await sandbox.write(file.path, file.content)
+
+
+async def upload_concurrent(sandbox, files):
+    await write_concurrently(sandbox.write, files)
+
+
+async def upload_bundle(sandbox, files):
+    bundle = await asyncio.to_thread(bundle_files, files, "/home/user")
+    await sandbox.write("/tmp/upload.tar.gz", bundle)
+    await sandbox.run("tar -xzf /tmp/upload.tar.gz -C /")
+
+
+async def max_loop_stall(work) -> float:
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.005)
+    await work()
+    done = True
+    await task
+    return stall
+
+
+def write_blocking(files, root):
+    for file in files:
+        path = os.path.join(root, file.path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(file.content)
+
+
+async def main_async(args):
+    files = nextjs_scaffold(args.files)
+    total = sum(len(f.content) for f in files)
+    print(f"{len(files)} files, {total / 1024:.0f} KiB; simulated rtt {args.rtt_ms}ms, {args.mbps} Mbit/s")
+
+    for label, upload in (("sequential", upload_sequential), ("concurrent", upload_concurrent), ("bundled", upload_bundle)):
+        sandbox = SimulatedSandbox(args.rtt_ms / 1000, args.mbps * 1e6 / 8)
+        start = time.perf_counter()
+        await upload(sandbox, files)
+        print(f"remote {label:10s}  {time.perf_counter() - start:7.3f}s  {sandbox.requests:4d} requests")
+
+    for label in ("blocking", "threaded"):
+        with tempfile.TemporaryDirectory() as root:
+            async def work():
+                if label == "blocking":
+                    write_blocking(files, root)
+                else:
+                    await write_local_files(files, root=root)
+            start = time.perf_counter()
+            stall = await max_loop_stall(work)
+            print(f"local  {label:10s}  {time.perf_counter() - start:7.3f}s  max loop stall {stall * 1000:6.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=30)
+    parser.add_argument("--mbps", type=float, default=80)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Throughput of the in-process task queue (src/sentient_core/orchestrator/task_queue.py).
+
+Each job simulates an I/O-bound agent task (a Supabase status write, an LLM or
+sandbox call, a final write) with a fixed latency.  Jobs are spread over a
+number of agents, and the queue is run at increasing worker counts with the
+configured per-agent limit.  The first row, one worker, is equivalent to
+executing tasks one after another.
+
+Usage:
+    python scripts/bench_task_queue.py [--jobs 400] [--agents 20] [--latency-ms 25] [--per-agent-limit 2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sentient_core.orchestrator.task_queue import TaskQueue  # noqa: E402
+
+
+async def run(jobs: int, agents: int, latency: float, concurrency: int, per_agent_limit: int) -> float:
+    async def runner(job):
+        await asyncio.sleep(latency)
+
+    queue = TaskQueue(runner, concurrency=concurrency, per_agent_limit=per_agent_limit)
+    agent_ids = [uuid.uuid4() for _ in range(agents)]
+    for i in range(jobs):
+        await queue.enqueue(uuid.uuid4(), agent_id=agent_ids[i % agents])
+
+    start = time.perf_counter()
+    queue.start()
+    await queue.join()
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    assert queue.processed == jobs
+    return jobs / elapsed
+
+
+async def main_async(args):
+    latency = args.latency_ms / 1000
+    print(f"{args.jobs} jobs over {args.agents} agents, {args.latency_ms}ms per job, per-agent limit {args.per_agent_limit}")
+    baseline = None
+    for concurrency in (1, 4, 16, 64):
+        rate = await run(args.jobs, args.agents, latency, concurrency, args.per_agent_limit)
+        baseline = baseline or rate
+        ceiling = min(concurrency, args.agents * args.per_agent_limit) / latency
+        print(f"workers {concurrency:3d}  {rate:8.1f} jobs/s  ({rate / baseline:5.1f}x, ceiling {ceiling:.0f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=25)
+    parser.add_argument("--per-agent-limit", type=int, default=2)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
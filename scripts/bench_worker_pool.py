@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Throughput of the multi-process worker pool (src/sentient_core/orchestrator/worker_pool.py).
+
+Each workflow simulates the CPU-bound part of an orchestration (plan parsing,
+validation, aggregation) as a fixed amount of pure-Python work.  In one
+process these run one after another under the GIL; the pool is run at
+increasing worker counts to show throughput following the number of cores.
+
+Usage:
+    python scripts/bench_worker_pool.py [--workflows 32] [--work 300000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.sentient_core.orchestrator.shared_state import OrchestratorState  # noqa: E402
+from src.sentient_core.orchestrator.worker_pool import WorkerPool  # noqa: E402
+
+
+class CpuBoundOrchestrator:
+    def __init__(self, command: str):
+        self.iterations = int(command)
+
+    async def run(self):
+        total = 0
+        for i in range(self.iterations):
+            total += i * i % 7
+        return OrchestratorState(workflow_status="completed", final_result=str(total))
+
+
+def run(workflows: int, work: int, workers: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Spawned workers import this script as their __main__.
+        pool = WorkerPool(os.path.join(tmp, "leases.db"), workers=workers,
+                          orchestrator_factory="__main__:CpuBoundOrchestrator", poll_interval=0.01)
+        pool.start()
+        try:
+            time.sleep(1.0)  # let the workers finish importing before timing
+            start = time.perf_counter()
+            ids = [pool.submit(str(work)) for _ in range(workflows)]
+            pool.wait(ids)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.stop()
+            pool.store.close()
+    return workflows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=32)
+    parser.add_argument("--work", type=int, default=300_000)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{args.workflows} workflows of {args.work} iterations, {cores} cores")
+    baseline = None
+    for workers in sorted({1, 2, 4, cores}):
+        rate = run(args.workflows, args.work, workers)
+        baseline = baseline or rate
+        print(f"workers {workers:3d}  {rate:8.1f} workflows/s  ({rate / baseline:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
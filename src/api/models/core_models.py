@@ -78,3 +78,45 @@ class TaskRead(TaskBase):
     completed_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+# --- Batch Models ---
+class AgentBatchUpdate(AgentUpdate):
+    agent_id: UUID
+
+class TaskBatchUpdate(TaskUpdate):
+    task_id: UUID
+
+class BatchItemError(BaseModel):
+    index: int # Position of the item in the request body
+    error: str
+
+class AgentBatchResult(BaseModel):
+    items: List[AgentRead] = Field(default_factory=list)
+    errors: List[BatchItemError] = Field(default_factory=list)
+
+class TaskBatchResult(BaseModel):
+    items: List[TaskRead] = Field(default_factory=list)
+    errors: List[BatchItemError] = Field(default_factory=list)
+
+# --- Workflow Models ---
+class WorkflowRunStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class WorkflowCreate(BaseModel):
+    command: str
+
+class WorkflowRead(BaseModel):
+    workflow_id: UUID
+    command: str
+    status: WorkflowRunStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    event_count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
@@ -58,3 +58,38 @@ class KnowledgeGraph(BaseModel):
     """Represents a subgraph of related memories."""
     nodes: List[MemoryNode]
     edges: List[MemoryEdge]
+
+# --- Semantic Search Models ---
+
+class DocumentMatch(BaseModel):
+    """A single hit from a similarity search over `document_embeddings`."""
+    id: str
+    content: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    similarity: float
+
+class MemorySearchRequest(BaseModel):
+    """Query for the hybrid (BM25 + vector) memory retriever."""
+    query: str
+    top_k: int = Field(10, ge=1, le=100)
+    expand: bool = Field(False, description="Add one-hop RELATES_TO / CLARIFIES neighbours of the hits")
+    node_types: Optional[List[NodeType]] = None
+
+class MemorySearchHit(BaseModel):
+    """A memory node ranked by reciprocal-rank fusion of lexical and vector search."""
+    node: MemoryNode
+    score: float
+    lexical_rank: Optional[int] = None
+    vector_rank: Optional[int] = None
+    expanded_from: Optional[SurrealID] = None
+
+# --- Consolidation Models ---
+
+class ConsolidationReport(BaseModel):
+    """Outcome of one memory consolidation pass."""
+    scanned: int = 0
+    archived: int = 0
+    kept: int = 0
+    edges_rewired: int = 0
+    summaries: List[SurrealID] = Field(default_factory=list)
+    archive_file: Optional[str] = None
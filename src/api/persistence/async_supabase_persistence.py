@@ -0,0 +1,359 @@
+"""Async counterpart of `supabase_persistence` used by the API routers.
+
+Same function names, arguments and return values, but every call awaits the
+shared `AsyncClient` instead of blocking the event loop for the PostgREST
+round-trip.  Requests and row payloads come from `supabase_queries`, so both
+implementations send identical queries and write identical data.
+
+Batch writes and streaming exports exist only here; the API is their only caller.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Type, Union
+import uuid
+
+from pydantic import BaseModel
+
+from ..models.core_models import (
+    AgentRead, AgentCreate, AgentUpdate, TaskRead, TaskCreate, TaskUpdate,
+    AgentBatchResult, AgentBatchUpdate, BatchItemError, TaskBatchResult, TaskBatchUpdate,
+)
+from ..models.memory_models import DocumentMatch
+from .record_cache import record_cache
+from .supabase_queries import (
+    EXPORT_PAGE_SIZE,
+    agent_update_payload,
+    batch_failure,
+    batch_update_rows,
+    cache_batch_result,
+    decode_cursor,
+    delete_row,
+    insert_rows,
+    list_rows,
+    match_document_embeddings_rpc,
+    match_updated_rows,
+    new_agent_payload,
+    new_task_payload,
+    next_page_after,
+    parse_rows,
+    retry_update_row,
+    select_columns,
+    select_row,
+    task_update_payload,
+    update_row,
+)
+from src.clients.supabase_client import get_async_supabase_client
+
+# --- Agent Persistence Functions (Supabase, async) ---
+async def get_agent(agent_id: uuid.UUID) -> Optional[AgentRead]:
+    cached = record_cache.get('agents', agent_id)
+    if cached:
+        return cached
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in get_agent")
+        return None
+    generation = record_cache.generation()
+    try:
+        response = await select_row(client, 'agents', 'agent_id', agent_id).execute()
+        if response.data:
+            agent = AgentRead(**response.data)
+            record_cache.put('agents', agent_id, agent, generation=generation)
+            return agent
+    except Exception as e:
+        print(f"Error fetching agent {agent_id} from Supabase: {e}")
+    return None
+
+async def get_agents(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Union[AgentRead, Dict[str, Any]]]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in get_agents")
+        return []
+    columns = select_columns(fields, AgentRead, 'agent_id')
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        response = await list_rows(client, 'agents', 'agent_id', columns, {}, skip, limit, after).execute()
+        if response.data:
+            return parse_rows(response.data, AgentRead, fields)
+    except Exception as e:
+        print(f"Error fetching agents from Supabase: {e}")
+    return []
+
+async def create_agent(agent_create: AgentCreate) -> Optional[AgentRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in create_agent")
+        return None
+    try:
+        response = await insert_rows(client, 'agents', new_agent_payload(agent_create)).execute()
+        if response.data:
+            agent = AgentRead(**response.data[0])
+            record_cache.put('agents', agent.agent_id, agent)
+            return agent
+    except Exception as e:
+        print(f"Error creating agent in Supabase: {e}")
+    return None
+
+async def update_agent(agent_id: uuid.UUID, agent_update: AgentUpdate) -> Optional[AgentRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in update_agent")
+        return None
+    update_data_dict = agent_update_payload(agent_update)
+    if not update_data_dict:
+        # An empty PATCH matches no row; nothing to change, so return the row as is.
+        return await get_agent(agent_id)
+    try:
+        response = await update_row(client, 'agents', 'agent_id', agent_id, update_data_dict).execute()
+        if response.data:
+            agent = AgentRead(**response.data[0])
+            record_cache.put('agents', agent.agent_id, agent)
+            return agent
+    except Exception as e:
+        print(f"Error updating agent {agent_id} in Supabase: {e}")
+    record_cache.invalidate('agents', agent_id)
+    return None
+
+async def delete_agent(agent_id: uuid.UUID) -> Optional[AgentRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in delete_agent")
+        return None
+    try:
+        response = await delete_row(client, 'agents', 'agent_id', agent_id).execute()
+        if response.data:
+            return AgentRead(**response.data[0])
+    except Exception as e:
+        print(f"Error deleting agent {agent_id} from Supabase: {e}")
+    finally:
+        record_cache.invalidate('agents', agent_id)
+    return None
+
+# --- Task Persistence Functions (Supabase, async) ---
+async def get_task(task_id: uuid.UUID) -> Optional[TaskRead]:
+    cached = record_cache.get('tasks', task_id)
+    if cached:
+        return cached
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in get_task")
+        return None
+    generation = record_cache.generation()
+    try:
+        response = await select_row(client, 'tasks', 'task_id', task_id).execute()
+        if response.data:
+            task = TaskRead(**response.data)
+            record_cache.put('tasks', task_id, task, generation=generation)
+            return task
+    except Exception as e:
+        print(f"Error fetching task {task_id} from Supabase: {e}")
+    return None
+
+async def get_tasks(
+    agent_id: Optional[uuid.UUID] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Union[TaskRead, Dict[str, Any]]]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in get_tasks")
+        return []
+    columns = select_columns(fields, TaskRead, 'task_id')
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        filters = {'agent_id': str(agent_id)} if agent_id else {}
+        response = await list_rows(client, 'tasks', 'task_id', columns, filters, skip, limit, after).execute()
+        if response.data:
+            return parse_rows(response.data, TaskRead, fields)
+    except Exception as e:
+        print(f"Error fetching tasks from Supabase: {e}")
+    return []
+
+async def create_task(task_create: TaskCreate) -> Optional[TaskRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in create_task")
+        return None
+    try:
+        response = await insert_rows(client, 'tasks', new_task_payload(task_create)).execute()
+        if response.data:
+            task = TaskRead(**response.data[0])
+            record_cache.put('tasks', task.task_id, task)
+            return task
+    except Exception as e:
+        print(f"Error creating task in Supabase: {e}")
+    return None
+
+async def update_task(task_id: uuid.UUID, task_update: TaskUpdate) -> Optional[TaskRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in update_task")
+        return None
+    update_data_dict = task_update_payload(task_update)
+    if not update_data_dict:
+        # An empty PATCH matches no row; nothing to change, so return the row as is.
+        return await get_task(task_id)
+    try:
+        response = await update_row(client, 'tasks', 'task_id', task_id, update_data_dict).execute()
+        if response.data:
+            task = TaskRead(**response.data[0])
+            record_cache.put('tasks', task.task_id, task)
+            return task
+    except Exception as e:
+        print(f"Error updating task {task_id} in Supabase: {e}")
+    record_cache.invalidate('tasks', task_id)
+    return None
+
+async def delete_task(task_id: uuid.UUID) -> Optional[TaskRead]:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in delete_task")
+        return None
+    try:
+        response = await delete_row(client, 'tasks', 'task_id', task_id).execute()
+        if response.data:
+            return TaskRead(**response.data[0])
+    except Exception as e:
+        print(f"Error deleting task {task_id} from Supabase: {e}")
+    finally:
+        record_cache.invalidate('tasks', task_id)
+    return None
+
+# --- Batch Persistence Functions (Supabase, async) ---
+async def _insert_rows(client, table: str, payloads: List[Dict[str, Any]], model: Type[BaseModel], result):
+    if not payloads:
+        return result
+    try:
+        response = await insert_rows(client, table, payloads).execute()
+        result.items = [model(**row) for row in response.data or []]
+        return result
+    except Exception as e:
+        print(f"Batch insert of {len(payloads)} rows into {table} failed, retrying per row: {e}")
+    for index, payload in enumerate(payloads):
+        try:
+            response = await insert_rows(client, table, payload).execute()
+            result.items.append(model(**response.data[0]))
+        except Exception as e:
+            result.errors.append(BatchItemError(index=index, error=str(e)))
+    return result
+
+async def _update_rows(client, table: str, id_column: str, updates: Sequence[BaseModel], model: Type[BaseModel], not_found: str, result):
+    if not updates:
+        return result
+    try:
+        response = await batch_update_rows(client, table, updates).execute()
+        result.items, result.errors = match_updated_rows(response.data or [], updates, model, id_column, not_found)
+        return result
+    except Exception as e:
+        print(f"Batch update of {len(updates)} rows in {table} failed, retrying per row: {e}")
+    for index, update in enumerate(updates):
+        try:
+            response = await retry_update_row(client, table, id_column, update).execute()
+            if response.data:
+                result.items.append(model(**response.data[0]))
+            else:
+                result.errors.append(BatchItemError(index=index, error=not_found))
+        except Exception as e:
+            result.errors.append(BatchItemError(index=index, error=str(e)))
+    return result
+
+async def create_agents(agent_creates: Sequence[AgentCreate]) -> AgentBatchResult:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in create_agents")
+        return AgentBatchResult(errors=batch_failure(len(agent_creates), "Supabase client not initialized"))
+    result = await _insert_rows(client, 'agents', [new_agent_payload(a) for a in agent_creates], AgentRead, AgentBatchResult())
+    return cache_batch_result('agents', 'agent_id', result)
+
+async def update_agents(agent_updates: Sequence[AgentBatchUpdate]) -> AgentBatchResult:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in update_agents")
+        return AgentBatchResult(errors=batch_failure(len(agent_updates), "Supabase client not initialized"))
+    result = await _update_rows(client, 'agents', 'agent_id', agent_updates, AgentRead, "Agent not found", AgentBatchResult())
+    return cache_batch_result('agents', 'agent_id', result, written=agent_updates)
+
+async def create_tasks(task_creates: Sequence[TaskCreate]) -> TaskBatchResult:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in create_tasks")
+        return TaskBatchResult(errors=batch_failure(len(task_creates), "Supabase client not initialized"))
+    result = await _insert_rows(client, 'tasks', [new_task_payload(t) for t in task_creates], TaskRead, TaskBatchResult())
+    return cache_batch_result('tasks', 'task_id', result)
+
+async def update_tasks(task_updates: Sequence[TaskBatchUpdate]) -> TaskBatchResult:
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in update_tasks")
+        return TaskBatchResult(errors=batch_failure(len(task_updates), "Supabase client not initialized"))
+    result = await _update_rows(client, 'tasks', 'task_id', task_updates, TaskRead, "Task not found", TaskBatchResult())
+    return cache_batch_result('tasks', 'task_id', result, written=task_updates)
+
+# --- Streaming Export (Supabase, async) ---
+async def _iter_rows(table: str, id_column: str, columns: str, filters: Dict[str, str], page_size: int) -> AsyncIterator[Dict[str, Any]]:
+    client = await get_async_supabase_client()
+    if not client:
+        print(f"ERROR: Supabase client not initialized in export of {table}")
+        return
+    after = None
+    while True:
+        try:
+            response = await list_rows(client, table, id_column, columns, filters, 0, page_size, after).execute()
+        except Exception as e:
+            print(f"Error exporting {table} from Supabase: {e}")
+            raise
+        rows = response.data or []
+        for row in rows:
+            yield row
+        after = next_page_after(rows, id_column, page_size)
+        if after is None:
+            return
+
+def iter_tasks(
+    agent_id: Optional[uuid.UUID] = None,
+    fields: Optional[Sequence[str]] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream tasks in keyset order, one page per request.
+
+    Not a coroutine, so bad `fields` raise ValueError before a response
+    starts; errors while paging are re-raised so a truncated export is never
+    mistaken for a complete one.
+    """
+    columns = select_columns(fields, TaskRead, 'task_id')
+    filters = {'agent_id': str(agent_id)} if agent_id else {}
+    return _iter_rows('tasks', 'task_id', columns, filters, page_size)
+
+def iter_agent_events(
+    workflow_id: uuid.UUID,
+    event_type: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    filters = {'workflow_id': str(workflow_id)}
+    if event_type:
+        filters['event_type'] = event_type
+    return _iter_rows('agent_events', 'id', "*", filters, page_size)
+
+# --- Document Embedding Search (Supabase / pgvector, async) ---
+async def match_document_embeddings(
+    query_embedding: Sequence[float],
+    match_count: int = 10,
+    filter: Optional[Dict[str, Any]] = None,
+) -> List[DocumentMatch]:
+    """Async version of `supabase_persistence.match_document_embeddings`."""
+    client = await get_async_supabase_client()
+    if not client:
+        print("ERROR: Supabase client not initialized in match_document_embeddings")
+        return []
+    try:
+        response = await match_document_embeddings_rpc(client, query_embedding, match_count, filter).execute()
+        if response.data:
+            return [DocumentMatch(**{**row, "id": str(row["id"])}) for row in response.data]
+    except Exception as e:
+        print(f"Error searching document embeddings in Supabase: {e}")
+    return []
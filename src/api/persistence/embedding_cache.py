@@ -0,0 +1,252 @@
+# Content-addressed embedding cache
+
+"""On-disk cache of embeddings keyed by a hash of the embedded text.
+
+Repeated content (plan task descriptions, identical code snippets, unchanged
+documents on re-ingest) is embedded once.  `EmbeddingCache.embed()` hashes
+every input, de-duplicates within the batch, serves hits from a memory-mapped
+vector file and sends only the misses to `embed_fn`, in chunks of
+`batch_size`.  A sync `embed_fn` and the memory-map reads and writes run in
+worker threads, off the event loop.
+
+Layout of the cache directory:
+
+* `meta.json`    -- dim, dtype and model name; checked when reopening.
+* `vectors.bin`  -- raw row-major matrix, grown geometrically and memory-mapped.
+* `index.jsonl`  -- append-only `{"key": ..., "row": ...}` lines.
+
+Vectors are written before their index lines, so a crash can leave unused
+rows at the end of `vectors.bin` but never an index entry without a vector.
+"""
+
+import asyncio
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+_META_FILE = "meta.json"
+_VECTORS_FILE = "vectors.bin"
+_INDEX_FILE = "index.jsonl"
+_INITIAL_CAPACITY = 1024
+
+EmbedFn = Callable[[List[str]], Union[Sequence[Sequence[float]], Awaitable[Sequence[Sequence[float]]]]]
+
+
+def content_hash(text: str, model: str = "") -> str:
+    """Cache key for `text` embedded by `model`."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-hash keyed, memory-mapped embedding store with batched miss handling."""
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        embed_fn: EmbedFn,
+        model: str = "default",
+        batch_size: int = 64,
+        dtype: Any = np.float32,
+    ):
+        """
+        Args:
+            directory: Where the cache files live; created if missing.
+            dim: Embedding dimension produced by `embed_fn`.
+            embed_fn: Sync or async callable mapping a list of texts to their vectors.
+            model: Embedding model name; part of every key so switching models
+                never returns stale vectors.
+            batch_size: Maximum number of texts sent to `embed_fn` per call.
+            dtype: On-disk dtype (`np.float32` or `np.float16`).
+        """
+        self.directory = directory
+        self.dim = dim
+        self.embed_fn = embed_fn
+        self.model = model
+        self.batch_size = batch_size
+        self.dtype = np.dtype(dtype)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._rows: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._vectors: Optional[np.memmap] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        meta = {"dim": self.dim, "dtype": self.dtype.name, "model": self.model}
+        if os.path.exists(self._path(_META_FILE)):
+            with open(self._path(_META_FILE), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(
+                    f"Embedding cache at {self.directory} was built with {stored}, not {meta}"
+                )
+        else:
+            with open(self._path(_META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        if os.path.exists(self._path(_INDEX_FILE)):
+            with open(self._path(_INDEX_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._rows[entry["key"]] = entry["row"]
+
+        row_bytes = self.dim * self.dtype.itemsize
+        existing = os.path.getsize(self._path(_VECTORS_FILE)) // row_bytes if os.path.exists(self._path(_VECTORS_FILE)) else 0
+        self._open_vectors(max(existing, _INITIAL_CAPACITY))
+
+    def _open_vectors(self, capacity: int) -> None:
+        path = self._path(_VECTORS_FILE)
+        size = capacity * self.dim * self.dtype.itemsize
+        # The old map stays assigned until the new one is open: readers may be
+        # in a worker thread.
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+
+    def _append(self, keys: List[str], vectors: np.ndarray) -> None:
+        start = len(self._rows)
+        needed = start + len(keys)
+        capacity = self._vectors.shape[0]
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            self._open_vectors(capacity)
+
+        self._vectors[start:needed] = vectors.astype(self.dtype)
+        self._vectors.flush()
+        with open(self._path(_INDEX_FILE), "a", encoding="utf-8") as f:
+            for offset, key in enumerate(keys):
+                f.write(json.dumps({"key": key, "row": start + offset}) + "\n")
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return content_hash(text, self.model) in self._rows
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Cached vector for `text`, or None; never calls `embed_fn`."""
+        row = self._rows.get(content_hash(text, self.model))
+        return None if row is None else np.array(self._vectors[row], dtype=np.float32)
+
+    async def _compute(self, texts: List[str]) -> np.ndarray:
+        if inspect.iscoroutinefunction(self.embed_fn) or inspect.iscoroutinefunction(getattr(self.embed_fn, "__call__", None)):
+            result = self.embed_fn(texts)
+        else:
+            result = await asyncio.to_thread(self.embed_fn, texts)
+        if inspect.isawaitable(result):
+            result = await result
+        vectors = np.asarray(result, dtype=np.float32)
+        if vectors.shape != (len(texts), self.dim):
+            raise ValueError(
+                f"embed_fn returned shape {vectors.shape}, expected ({len(texts)}, {self.dim})"
+            )
+        return vectors
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a `(len(texts), dim)` float32 matrix, embedding only unseen content."""
+        keys = [content_hash(text, self.model) for text in texts]
+
+        # Unique misses not already being computed by a concurrent call.
+        pending: Dict[str, str] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for key, text in zip(keys, texts):
+            if key in self._rows or key in pending or key in waiting:
+                continue
+            if key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                pending[key] = text
+
+        # Content another call is still embedding was not cached yet: a miss.
+        self.misses += len(pending) + len(waiting)
+        self.hits += len(keys) - len(pending) - len(waiting)
+
+        loop = asyncio.get_running_loop()
+        for key in pending:
+            self._inflight[key] = loop.create_future()
+        try:
+            items = list(pending.items())
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                vectors = await self._compute([text for _, text in chunk])
+                async with self._write_lock:
+                    await asyncio.to_thread(self._append, [key for key, _ in chunk], vectors)
+                for key, _ in chunk:
+                    self._inflight.pop(key).set_result(None)
+        except BaseException as exc:
+            for key in pending:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+                    # Mark retrieved so an unobserved failure is not logged.
+                    future.exception()
+            raise
+
+        if waiting:
+            await asyncio.gather(*waiting.values())
+
+        rows = [self._rows[key] for key in keys]
+        if not rows:
+            return np.empty((0, self.dim), np.float32)
+        # A later append may swap in a larger map; this one still holds every row read here.
+        vectors = self._vectors
+        return await asyncio.to_thread(lambda: np.array(vectors[rows], dtype=np.float32))
+
+    def close(self) -> None:
+        """Flush and release the memory map."""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+
+# --- Process-wide cache for memory node embeddings ---
+
+_memory_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_memory_embedding_cache() -> Optional[EmbeddingCache]:
+    """Shared cache the memory graph embeds through, or None when no embedder is configured.
+
+    `MEMORY_EMBED_FN` names the embedding function as ``"package.module:attr"``
+    and `MEMORY_EMBED_DIM` its dimension; `MEMORY_EMBED_MODEL` and
+    `MEMORY_EMBEDDING_CACHE_DIR` set the model name and cache location.
+    """
+    global _memory_embedding_cache
+    path = os.getenv("MEMORY_EMBED_FN")
+    if _memory_embedding_cache is None and path:
+        module_name, _, attr = path.partition(":")
+        _memory_embedding_cache = EmbeddingCache(
+            os.getenv("MEMORY_EMBEDDING_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "sentient-embedding-cache"),
+            dim=int(os.environ["MEMORY_EMBED_DIM"]),
+            embed_fn=getattr(importlib.import_module(module_name), attr),
+            model=os.getenv("MEMORY_EMBED_MODEL", "default"),
+        )
+    return _memory_embedding_cache
@@ -0,0 +1,244 @@
+# Hybrid lexical + vector retrieval over the memory graph
+
+"""Content search for `MemoryNode`s, which are otherwise only addressable by id.
+
+`HybridRetriever` keeps two in-process indexes that are updated as
+`create_node` / `create_edge` run:
+
+* a BM25 inverted index over node content, and
+* optionally, a `LocalVectorIndex` fed through an `EmbeddingCache`.
+
+Queries run against both, the rankings are merged with reciprocal-rank fusion
+(RRF), and the fused hits can be expanded one hop through `RELATES_TO` /
+`CLARIFIES` edges.  Without an embedding cache the retriever is lexical-only.
+
+The indexes are per-process and start empty; `rebuild_memory_index()` in
+`surrealdb_persistence` reloads them from the database when the API starts.
+The API configures the vector side at startup from `MEMORY_EMBED_FN` (see
+`get_memory_embedding_cache`); when it is unset, search is BM25-only.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from ..models.memory_models import EdgeType, MemoryEdge, MemoryNode, MemorySearchHit, NodeType, SurrealID
+from .embedding_cache import EmbeddingCache
+from .local_vector_index import LocalVectorIndex
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+EXPANSION_EDGE_TYPES = (EdgeType.RELATES_TO, EdgeType.CLARIFIES)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Incrementally maintained Okapi BM25 inverted index."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index `text` under `doc_id`, replacing any previous version."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            self._postings[term][doc_id] = tf
+        self._doc_terms[doc_id] = terms
+        self._doc_len[doc_id] = sum(terms.values())
+        self._total_len += self._doc_len[doc_id]
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        n_docs = len(self._doc_len)
+        if n_docs == 0:
+            return []
+        avg_len = self._total_len / n_docs
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+
+class HybridRetriever:
+    """BM25 + vector search over memory nodes, fused with reciprocal-rank fusion."""
+
+    def __init__(
+        self,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        vector_index: Optional[LocalVectorIndex] = None,
+        rrf_k: int = 60,
+        candidate_multiplier: int = 4,
+        expansion_weight: float = 0.5,
+    ):
+        """
+        Args:
+            embedding_cache: Source of node/query embeddings. Lexical-only when None.
+            vector_index: Index for node embeddings; created from the cache dim if omitted.
+            rrf_k: RRF damping constant; higher values flatten rank differences.
+            candidate_multiplier: Each ranker returns `top_k * candidate_multiplier` candidates.
+            expansion_weight: Fraction of a hit's score given to its one-hop neighbours.
+        """
+        self.embedding_cache = embedding_cache
+        if vector_index is None and embedding_cache is not None:
+            vector_index = LocalVectorIndex(dim=embedding_cache.dim)
+        self.vector_index = vector_index
+        self.rrf_k = rrf_k
+        self.candidate_multiplier = candidate_multiplier
+        self.expansion_weight = expansion_weight
+
+        self.lexical = BM25Index()
+        self._nodes: Dict[str, MemoryNode] = {}
+        self._neighbours: Dict[str, Dict[str, EdgeType]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # ------------------------------------------------------------------
+    # Incremental indexing
+    # ------------------------------------------------------------------
+    async def index_nodes(self, nodes: Sequence[MemoryNode]) -> None:
+        nodes = [node for node in nodes if node.id]
+        for node in nodes:
+            self._nodes[node.id] = node
+            self.lexical.add(node.id, node.content)
+        if self.embedding_cache is not None and nodes:
+            vectors = await self.embedding_cache.embed([node.content for node in nodes])
+            self.vector_index.add(
+                [node.id for node in nodes],
+                vectors,
+                contents=[node.content for node in nodes],
+                metadata=[{"node_type": node.node_type.value} for node in nodes],
+            )
+
+    async def index_node(self, node: MemoryNode) -> None:
+        await self.index_nodes([node])
+
+    def remove_node(self, node_id: str) -> None:
+        """Drop a node, its vector row and its adjacency."""
+        self._nodes.pop(node_id, None)
+        self.lexical.remove(node_id)
+        if self.vector_index is not None:
+            self.vector_index.remove([node_id])
+        for other in self._neighbours.pop(node_id, {}):
+            self._neighbours.get(other, {}).pop(node_id, None)
+
+    def index_edge(self, edge: MemoryEdge) -> None:
+        # Expansion is undirected: a CLARIFIES edge helps in both directions.
+        self._neighbours[edge.source_node_id][edge.target_node_id] = edge.edge_type
+        self._neighbours[edge.target_node_id][edge.source_node_id] = edge.edge_type
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    async def _vector_ranking(self, query: str, n_candidates: int) -> List[Tuple[str, float]]:
+        if self.embedding_cache is None or self.vector_index is None or len(self.vector_index) == 0:
+            return []
+        query_vector = (await self.embedding_cache.embed([query]))[0]
+        return self.vector_index.search(query_vector, top_k=n_candidates)
+
+    def _neighbours_of(self, node_id: str, edge_types: Iterable[EdgeType]) -> List[str]:
+        allowed = set(edge_types)
+        return [other for other, edge_type in self._neighbours.get(node_id, {}).items() if edge_type in allowed]
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        expand: bool = False,
+        node_types: Optional[Sequence[NodeType]] = None,
+        expansion_edge_types: Sequence[EdgeType] = EXPANSION_EDGE_TYPES,
+    ) -> List[MemorySearchHit]:
+        n_candidates = top_k * self.candidate_multiplier
+        lexical = self.lexical.search(query, n_candidates)
+        vector = await self._vector_ranking(query, n_candidates)
+
+        scores: Dict[str, float] = defaultdict(float)
+        lexical_rank: Dict[str, int] = {}
+        vector_rank: Dict[str, int] = {}
+        for rank, (node_id, _) in enumerate(lexical, start=1):
+            lexical_rank[node_id] = rank
+            scores[node_id] += 1.0 / (self.rrf_k + rank)
+        for rank, (node_id, _) in enumerate(vector, start=1):
+            vector_rank[node_id] = rank
+            scores[node_id] += 1.0 / (self.rrf_k + rank)
+
+        expanded_from: Dict[str, str] = {}
+        if expand:
+            seeds = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            direct: Set[str] = set(scores)
+            for seed_id, seed_score in seeds:
+                for neighbour in self._neighbours_of(seed_id, expansion_edge_types):
+                    if neighbour in direct or neighbour not in self._nodes:
+                        continue
+                    bonus = seed_score * self.expansion_weight
+                    if bonus > scores.get(neighbour, 0.0):
+                        scores[neighbour] = bonus
+                        expanded_from[neighbour] = seed_id
+
+        allowed_types = set(node_types) if node_types else None
+        hits = []
+        for node_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            node = self._nodes.get(node_id)
+            if node is None or (allowed_types and node.node_type not in allowed_types):
+                continue
+            hits.append(
+                MemorySearchHit(
+                    node=node,
+                    score=score,
+                    lexical_rank=lexical_rank.get(node_id),
+                    vector_rank=vector_rank.get(node_id),
+                    expanded_from=SurrealID(expanded_from[node_id]) if node_id in expanded_from else None,
+                )
+            )
+            if len(hits) == top_k:
+                break
+        return hits
+
+
+# --- Process-wide retriever used by the persistence hooks ---
+
+_memory_retriever: Optional[HybridRetriever] = None
+
+
+def get_memory_retriever() -> HybridRetriever:
+    """Return the shared retriever, creating a lexical-only one on first use."""
+    global _memory_retriever
+    if _memory_retriever is None:
+        _memory_retriever = HybridRetriever()
+    return _memory_retriever
+
+
+def configure_memory_retriever(retriever: HybridRetriever) -> None:
+    """Install a configured retriever (e.g. one with an embedding cache)."""
+    global _memory_retriever
+    _memory_retriever = retriever
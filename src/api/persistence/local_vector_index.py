@@ -0,0 +1,311 @@
+# In-process vector index for document embeddings
+
+"""NumPy-backed stand-in for the pgvector search over `document_embeddings`.
+
+`LocalVectorIndex.match_document_embeddings` has the same signature and return
+type as `supabase_persistence.match_document_embeddings`, so retrieval code
+(e.g. `ResearchAgent`) can run against Postgres or entirely in-process.
+
+Vectors are L2-normalised on insert, which turns cosine similarity into a
+single matrix-vector product.  Top-k selection uses `np.argpartition` and only
+sorts the k winners.  For larger corpora `train_ivf()` builds a coarse
+quantizer (spherical k-means) and reorders the matrix so every inverted list
+is a contiguous slice; queries then score only the `n_probe` closest lists.
+Rows added after training live in an unindexed tail that is always scanned.
+
+Indexes can be persisted with `save()` and re-opened memory-mapped with
+`load()`, so a large matrix is paged in on demand rather than read up front.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.memory_models import DocumentMatch
+
+_VECTORS_FILE = "embeddings.npy"
+_INDEX_FILE = "index.json"
+_SUPPORTED_DTYPES = (np.float32, np.float16)
+# float16 matrices are scored in float32 blocks so BLAS can be used.
+_SCORE_BLOCK_ROWS = 16384
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Top-level containment, the same semantics as JSONB `@>` for flat filters."""
+    return all(metadata.get(key) == value for key, value in filter.items())
+
+
+class LocalVectorIndex:
+    """Brute-force / IVF cosine index over an in-memory or memory-mapped matrix."""
+
+    def __init__(self, dim: int = 1536, dtype: Any = np.float32, n_probe: int = 8):
+        """
+        Args:
+            dim: Embedding dimension; must match the vectors that are added.
+            dtype: Storage dtype, `np.float32` or `np.float16` (half the memory).
+            n_probe: Number of inverted lists scanned per query once IVF is trained.
+        """
+        dtype = np.dtype(dtype).type
+        if dtype not in _SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}. Use float32 or float16.")
+        self.dim = dim
+        self.dtype = dtype
+        self.n_probe = n_probe
+
+        self._vectors: np.ndarray = np.empty((0, dim), dtype=dtype)
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._row_by_id: Dict[str, int] = {}
+
+        # IVF state: centroids and [start, end) row offsets of each list.
+        self._centroids: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+        self._n_indexed = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Any,
+        contents: Optional[Sequence[str]] = None,
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> None:
+        """Insert or replace rows.
+
+        Existing ids are overwritten in place; new ids are appended to the
+        unindexed tail until the next `train_ivf()`.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.shape != (len(ids), self.dim):
+            raise ValueError(
+                f"Expected embeddings of shape ({len(ids)}, {self.dim}), got {matrix.shape}"
+            )
+        contents = list(contents) if contents is not None else [""] * len(ids)
+        metadata = list(metadata) if metadata is not None else [{} for _ in ids]
+        if len(contents) != len(ids) or len(metadata) != len(ids):
+            raise ValueError("ids, contents and metadata must have the same length")
+
+        matrix = _normalize(matrix).astype(self.dtype)
+        if not self._vectors.flags.writeable:
+            # Memory-mapped read-only matrix: materialise before mutating.
+            self._vectors = np.array(self._vectors)
+
+        new_rows = []
+        for i, doc_id in enumerate(ids):
+            doc_id = str(doc_id)
+            row = self._row_by_id.get(doc_id)
+            if row is None:
+                new_rows.append(i)
+                continue
+            self._vectors[row] = matrix[i]
+            self._contents[row] = contents[i]
+            self._metadata[row] = metadata[i]
+
+        if new_rows:
+            start = len(self._ids)
+            self._vectors = np.concatenate([self._vectors, matrix[new_rows]])
+            for offset, i in enumerate(new_rows):
+                doc_id = str(ids[i])
+                self._ids.append(doc_id)
+                self._contents.append(contents[i])
+                self._metadata.append(metadata[i])
+                self._row_by_id[doc_id] = start + offset
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Delete rows by id; unknown ids are ignored.
+
+        Inverted lists stay contiguous, so a trained index needs no retraining.
+        """
+        rows = sorted({self._row_by_id[str(doc_id)] for doc_id in ids if str(doc_id) in self._row_by_id})
+        if not rows:
+            return
+        removed = np.asarray(rows)
+        self._vectors = np.delete(self._vectors, removed, axis=0)
+        dropped = set(rows)
+        self._ids = [doc_id for row, doc_id in enumerate(self._ids) if row not in dropped]
+        self._contents = [content for row, content in enumerate(self._contents) if row not in dropped]
+        self._metadata = [meta for row, meta in enumerate(self._metadata) if row not in dropped]
+        self._row_by_id = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        # Every boundary moves up by the number of removed rows before it.
+        if self.is_trained:
+            self._list_offsets = self._list_offsets - np.searchsorted(removed, self._list_offsets)
+        self._n_indexed -= int(np.searchsorted(removed, self._n_indexed))
+
+    # ------------------------------------------------------------------
+    # IVF coarse quantizer
+    # ------------------------------------------------------------------
+    def train_ivf(self, n_lists: Optional[int] = None, n_iter: int = 10, seed: int = 0) -> None:
+        """Cluster the current rows into `n_lists` inverted lists.
+
+        Rows are reordered so each list is contiguous; ids stay stable.
+        """
+        n = len(self)
+        if n == 0:
+            raise ValueError("Cannot train IVF on an empty index")
+        n_lists = max(1, min(n_lists or int(np.sqrt(n)), n))
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(n, n_lists * 64)
+        sample = self._vectors[rng.choice(n, sample_size, replace=False)].astype(np.float32)
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]  # keep empty lists where they were
+            centroids = _normalize(sums)
+
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, _SCORE_BLOCK_ROWS):
+            block = self._vectors[start:start + _SCORE_BLOCK_ROWS].astype(np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assign, kind="stable")
+        self._vectors = np.ascontiguousarray(self._vectors[order])
+        self._ids = [self._ids[i] for i in order]
+        self._contents = [self._contents[i] for i in order]
+        self._metadata = [self._metadata[i] for i in order]
+        self._row_by_id = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+        counts = np.bincount(assign, minlength=n_lists)
+        self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._centroids = centroids.astype(np.float32)
+        self._n_indexed = n
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _score(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        if self.dtype is np.float32:
+            return self._vectors[start:end] @ query
+        scores = np.empty(end - start, dtype=np.float32)
+        for block in range(start, end, _SCORE_BLOCK_ROWS):
+            stop = min(block + _SCORE_BLOCK_ROWS, end)
+            scores[block - start:stop - start] = self._vectors[block:stop].astype(np.float32) @ query
+        return scores
+
+    def _candidate_ranges(self, query: np.ndarray, n_probe: int) -> List[Tuple[int, int]]:
+        if not self.is_trained:
+            return [(0, len(self))]
+        n_lists = len(self._centroids)
+        n_probe = min(n_probe, n_lists)
+        centroid_scores = self._centroids @ query
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        ranges = [(int(self._list_offsets[p]), int(self._list_offsets[p + 1])) for p in probes]
+        if self._n_indexed < len(self):
+            ranges.append((self._n_indexed, len(self)))
+        return [(s, e) for s, e in ranges if e > s]
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        n_probe: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return `(id, cosine_similarity)` pairs, best first."""
+        if top_k <= 0 or len(self) == 0:
+            return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        if query.shape != (self.dim,):
+            raise ValueError(f"Expected query of shape ({self.dim},), got {query.shape}")
+
+        ranges = self._candidate_ranges(query, n_probe or self.n_probe)
+        rows = np.concatenate([np.arange(s, e) for s, e in ranges])
+        scores = np.concatenate([self._score(s, e, query) for s, e in ranges])
+
+        if filter:
+            keep = np.fromiter(
+                (_matches_filter(self._metadata[r], filter) for r in rows),
+                dtype=bool,
+                count=len(rows),
+            )
+            rows, scores = rows[keep], scores[keep]
+
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+    def match_document_embeddings(
+        self,
+        query_embedding: Sequence[float],
+        match_count: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[DocumentMatch]:
+        """Drop-in local equivalent of `supabase_persistence.match_document_embeddings`."""
+        matches = []
+        for doc_id, similarity in self.search(query_embedding, top_k=match_count, filter=filter):
+            row = self._row_by_id[doc_id]
+            matches.append(
+                DocumentMatch(
+                    id=doc_id,
+                    content=self._contents[row],
+                    metadata=self._metadata[row],
+                    similarity=similarity,
+                )
+            )
+        return matches
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory: str) -> None:
+        """Write the matrix as `.npy` plus a JSON sidecar with ids and metadata."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, _VECTORS_FILE), self._vectors)
+        index_data = {
+            "dim": self.dim,
+            "dtype": np.dtype(self.dtype).name,
+            "n_probe": self.n_probe,
+            "ids": self._ids,
+            "contents": self._contents,
+            "metadata": self._metadata,
+            "n_indexed": self._n_indexed,
+            "centroids": self._centroids.tolist() if self.is_trained else None,
+            "list_offsets": self._list_offsets.tolist() if self.is_trained else None,
+        }
+        with open(os.path.join(directory, _INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index_data, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "LocalVectorIndex":
+        """Open an index written by `save()`, memory-mapping the matrix by default."""
+        with open(os.path.join(directory, _INDEX_FILE), "r", encoding="utf-8") as f:
+            index_data = json.load(f)
+        index = cls(dim=index_data["dim"], dtype=index_data["dtype"], n_probe=index_data["n_probe"])
+        index._vectors = np.load(
+            os.path.join(directory, _VECTORS_FILE), mmap_mode="r" if mmap else None
+        )
+        index._ids = index_data["ids"]
+        index._contents = index_data["contents"]
+        index._metadata = index_data["metadata"]
+        index._row_by_id = {doc_id: row for row, doc_id in enumerate(index._ids)}
+        index._n_indexed = index_data["n_indexed"]
+        if index_data["centroids"] is not None:
+            index._centroids = np.asarray(index_data["centroids"], dtype=np.float32)
+            index._list_offsets = np.asarray(index_data["list_offsets"], dtype=np.int64)
+        return index
@@ -0,0 +1,341 @@
+# Time-windowed consolidation of the memory graph
+
+"""Keeps the hot `memory_node` graph small as workflow history accumulates.
+
+Every workflow leaves `AGENT_ACTION`, `ERROR` and `PLAN_STEP` nodes behind.
+`MemoryConsolidator.run_once()` takes those older than a time window and:
+
+1. clusters them per node type, by content similarity (embedding cosine when
+   an `EmbeddingCache` is configured, token Jaccard otherwise), raised by the
+   Jaccard overlap of their graph neighbours;
+2. replaces every cluster of near-duplicates with one summary `CONCEPT` node
+   and rewires the cluster's external edges onto it (`create_edges`);
+3. writes the originals and their edges to a gzip JSONL file in the archive
+   directory, then deletes them from SurrealDB.
+
+Nodes that do not cluster stay in place and are considered again by later
+runs, so a duplicate arriving later can still merge with them; each run
+takes the newest `batch_limit` nodes past the window.  If fewer edges are
+rewired than requested, the summaries are removed again and nothing is
+deleted.  `start()` / `stop()` run the job periodically on the current event
+loop; clustering and archive writes happen in worker threads.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..models.memory_models import ConsolidationReport, EdgeType, MemoryEdge, MemoryNode, NodeType, SurrealID
+from .embedding_cache import EmbeddingCache
+from .hybrid_retriever import get_memory_retriever, tokenize
+from .surrealdb_persistence import create_edges, create_node
+from src.clients.surrealdb_client import get_surrealdb_client
+
+DEFAULT_NODE_TYPES = (NodeType.AGENT_ACTION, NodeType.ERROR, NodeType.PLAN_STEP)
+_EDGE_TABLES = [edge_type.value for edge_type in EdgeType]
+
+
+def _jaccard(a: Set[Any], b: Set[Any]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _cosine_matrix(vectors: np.ndarray) -> np.ndarray:
+    vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+    return vectors @ vectors.T
+
+
+def _jaccard_matrix(token_sets: List[Set[str]]) -> np.ndarray:
+    """Pairwise Jaccard similarity, counting intersections through a token -> nodes index."""
+    n = len(token_sets)
+    postings: Dict[str, List[int]] = {}
+    for i, tokens in enumerate(token_sets):
+        for token in tokens:
+            postings.setdefault(token, []).append(i)
+    inter = np.zeros((n, n), dtype=np.float32)
+    for docs in postings.values():
+        idx = np.asarray(docs)
+        inter[np.ix_(idx, idx)] += 1
+    sizes = np.array([len(tokens) for tokens in token_sets], dtype=np.float32)
+    union = sizes[:, None] + sizes[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+class MemoryConsolidator:
+    """Merges old near-duplicate memory nodes into summaries and archives the originals."""
+
+    def __init__(
+        self,
+        archive_dir: str = os.getenv("MEMORY_ARCHIVE_DIR", "data/memory_archive"),
+        window: timedelta = timedelta(days=7),
+        node_types: Sequence[NodeType] = DEFAULT_NODE_TYPES,
+        similarity_threshold: float = 0.8,
+        edge_weight: float = 0.3,
+        min_cluster_size: int = 2,
+        batch_limit: int = 5000,
+        embedding_cache: Optional[EmbeddingCache] = None,
+    ):
+        """
+        Args:
+            archive_dir: Directory receiving one `.jsonl.gz` file per run.
+            window: Only nodes older than `now - window` are considered.
+            node_types: Node types eligible for consolidation.
+            similarity_threshold: Minimum similarity to join a cluster.
+            edge_weight: How far neighbour overlap raises content similarity
+                towards 1; it never lowers it.
+            min_cluster_size: Smallest cluster that is merged into a summary.
+            batch_limit: Maximum nodes fetched per run; the rest wait for the next run.
+            embedding_cache: Optional embeddings for content similarity.
+        """
+        self.archive_dir = archive_dir
+        self.window = window
+        self.node_types = list(node_types)
+        self.similarity_threshold = similarity_threshold
+        self.edge_weight = edge_weight
+        self.min_cluster_size = min_cluster_size
+        self.batch_limit = batch_limit
+        self.embedding_cache = embedding_cache
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Clustering
+    # ------------------------------------------------------------------
+    async def _content_similarity(self, nodes: List[MemoryNode]) -> np.ndarray:
+        if self.embedding_cache is not None:
+            vectors = await self.embedding_cache.embed([node.content for node in nodes])
+            return await asyncio.to_thread(_cosine_matrix, vectors)
+        return await asyncio.to_thread(_jaccard_matrix, [set(tokenize(node.content)) for node in nodes])
+
+    async def cluster(self, nodes: List[MemoryNode], neighbours: Dict[str, Set[str]]) -> List[List[MemoryNode]]:
+        """Leader clustering per node type: each node joins the first cluster whose
+        leader is similar enough, otherwise it starts a new cluster.
+
+        The O(n²) work runs in a worker thread, off the event loop."""
+        clusters: List[List[MemoryNode]] = []
+        by_type: Dict[NodeType, List[MemoryNode]] = {}
+        for node in nodes:
+            by_type.setdefault(node.node_type, []).append(node)
+
+        for group in by_type.values():
+            content_sim = await self._content_similarity(group)
+            clusters.extend(await asyncio.to_thread(self._leader_clusters, group, content_sim, neighbours))
+        return clusters
+
+    def _leader_clusters(self, group: List[MemoryNode], content_sim: np.ndarray,
+                         neighbours: Dict[str, Set[str]]) -> List[List[MemoryNode]]:
+        leaders: List[int] = []
+        members: Dict[int, List[MemoryNode]] = {}
+        for i, node in enumerate(group):
+            best, best_score = None, self.similarity_threshold
+            own = neighbours.get(node.id, set())
+            for leader in leaders:
+                score = float(content_sim[i, leader])
+                other = neighbours.get(group[leader].id, set())
+                if own and other:
+                    # A bonus only: duplicates attached to different nodes still merge on content.
+                    score += self.edge_weight * (1 - score) * _jaccard(own, other)
+                if score >= best_score:
+                    best, best_score = leader, score
+            if best is None:
+                leaders.append(i)
+                members[i] = [node]
+            else:
+                members[best].append(node)
+        return [members[leader] for leader in leaders]
+
+    # ------------------------------------------------------------------
+    # Summaries and edge rewiring
+    # ------------------------------------------------------------------
+    @staticmethod
+    def summarize(cluster: List[MemoryNode], archive_file: str) -> MemoryNode:
+        counts = Counter(node.content for node in cluster)
+        lines = [f"{cluster[0].node_type.value} x{len(cluster)}: {counts.most_common(1)[0][0]}"]
+        lines += [f"- ({n}) {content}" for content, n in counts.most_common(6)[1:]]
+        created = sorted(node.created_at for node in cluster)
+        return MemoryNode(
+            node_type=NodeType.CONCEPT,
+            content="\n".join(lines),
+            metadata={
+                "summary_of": cluster[0].node_type.value,
+                "consolidated_from": [node.id for node in cluster],
+                "count": len(cluster),
+                "first_seen": created[0].isoformat(),
+                "last_seen": created[-1].isoformat(),
+                "archive": archive_file,
+            },
+        )
+
+    @staticmethod
+    def rewire(edges: List[MemoryEdge], summary_for: Dict[str, SurrealID]) -> List[MemoryEdge]:
+        """Edges pointing into clusters, moved onto their summaries and de-duplicated."""
+        rewired: Dict[Tuple[str, str, EdgeType], MemoryEdge] = {}
+        for edge in edges:
+            source = summary_for.get(edge.source_node_id, edge.source_node_id)
+            target = summary_for.get(edge.target_node_id, edge.target_node_id)
+            if source == target:
+                continue  # internal to a cluster
+            key = (source, target, edge.edge_type)
+            if key in rewired:
+                rewired[key].weight += edge.weight
+                continue
+            rewired[key] = MemoryEdge(
+                source_node_id=source,
+                target_node_id=target,
+                edge_type=edge.edge_type,
+                weight=edge.weight,
+                metadata={**edge.metadata, "rewired_from": edge.id},
+            )
+        return list(rewired.values())
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _archive(self, nodes: List[MemoryNode], edges: List[MemoryEdge]) -> str:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(self.archive_dir, f"memory-{stamp}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for node in nodes:
+                f.write(json.dumps({"kind": "node", **node.model_dump(mode="json")}) + "\n")
+            for edge in edges:
+                f.write(json.dumps({"kind": "edge", **edge.model_dump(mode="json", by_alias=True)}) + "\n")
+        return path
+
+    async def _fetch(self, db, cutoff: datetime) -> Tuple[List[MemoryNode], List[MemoryEdge]]:
+        result = await db.query(
+            "SELECT * FROM memory_node WHERE created_at < $cutoff AND node_type INSIDE $types "
+            "ORDER BY created_at DESC LIMIT $limit;",
+            {"cutoff": cutoff.isoformat(), "types": [t.value for t in self.node_types], "limit": self.batch_limit},
+        )
+        nodes = [MemoryNode(**record) for record in (result[0]['result'] if result else None) or []]
+        ids = [node.id for node in nodes]
+        edges: List[MemoryEdge] = []
+        if ids:
+            result = await db.query(
+                " ".join(
+                    f"SELECT * FROM {table} WHERE <string> in INSIDE $ids OR <string> out INSIDE $ids;"
+                    for table in _EDGE_TABLES
+                ),
+                {"ids": ids},
+            )
+            for table, statement in zip(_EDGE_TABLES, result or []):
+                for record in statement.get('result') or []:
+                    edges.append(MemoryEdge(**{"edge_type": table, **record}))
+        return nodes, edges
+
+    # ------------------------------------------------------------------
+    # Job
+    # ------------------------------------------------------------------
+    async def run_once(self, now: Optional[datetime] = None) -> Optional[ConsolidationReport]:
+        """Runs one consolidation pass; returns None if SurrealDB is unavailable."""
+        db = await get_surrealdb_client()
+        if not db:
+            return None
+        try:
+            cutoff = (now or datetime.utcnow()) - self.window
+            nodes, edges = await self._fetch(db, cutoff)
+            report = ConsolidationReport(scanned=len(nodes))
+            if not nodes:
+                return report
+
+            neighbours: Dict[str, Set[str]] = {}
+            for edge in edges:
+                neighbours.setdefault(edge.source_node_id, set()).add(edge.target_node_id)
+                neighbours.setdefault(edge.target_node_id, set()).add(edge.source_node_id)
+
+            clusters = await self.cluster(nodes, neighbours)
+            merged = [c for c in clusters if len(c) >= self.min_cluster_size]
+            kept = [node.id for c in clusters if len(c) < self.min_cluster_size for node in c]
+            archived_nodes = [node for c in merged for node in c]
+            archived_ids = {node.id for node in archived_nodes}
+            touched_edges = [e for e in edges if e.source_node_id in archived_ids or e.target_node_id in archived_ids]
+
+            if merged:
+                # Archive before anything is deleted, so a crash never loses data.
+                report.archive_file = await asyncio.to_thread(self._archive, archived_nodes, touched_edges)
+                summary_for: Dict[str, SurrealID] = {}
+                for cluster in merged:
+                    summary = await create_node(self.summarize(cluster, report.archive_file))
+                    if summary is None:
+                        raise RuntimeError("Failed to create summary node")
+                    report.summaries.append(summary.id)
+                    for node in cluster:
+                        summary_for[node.id] = summary.id
+
+                rewired = self.rewire(touched_edges, summary_for)
+                created = await create_edges(rewired)
+                if len(created) < len(rewired):
+                    # Deleting now would drop the edges that were not recreated.
+                    await self._discard_summaries(db, report.summaries)
+                    await asyncio.to_thread(os.remove, report.archive_file)
+                    raise RuntimeError(
+                        f"Only {len(created)} of {len(rewired)} edges were rewired; originals kept"
+                    )
+                report.edges_rewired = len(created)
+
+                ids = sorted(archived_ids)
+                await db.query(
+                    " ".join(
+                        f"DELETE {table} WHERE <string> in INSIDE $ids OR <string> out INSIDE $ids;"
+                        for table in _EDGE_TABLES
+                    ) + " DELETE memory_node WHERE <string> id INSIDE $ids;",
+                    {"ids": ids},
+                )
+                retriever = get_memory_retriever()
+                for node_id in ids:
+                    retriever.remove_node(node_id)
+                report.archived = len(ids)
+
+            report.kept = len(kept)
+            return report
+        except Exception as e:
+            print(f"Error consolidating memory: {e}")
+            return None
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def _discard_summaries(db, summary_ids: List[SurrealID]) -> None:
+        """Undo a partial merge: delete its summary nodes and the edges already moved onto them."""
+        await db.query(
+            " ".join(
+                f"DELETE {table} WHERE <string> in INSIDE $ids OR <string> out INSIDE $ids;"
+                for table in _EDGE_TABLES
+            ) + " DELETE memory_node WHERE <string> id INSIDE $ids;",
+            {"ids": list(summary_ids)},
+        )
+        retriever = get_memory_retriever()
+        for node_id in summary_ids:
+            retriever.remove_node(node_id)
+
+    async def _loop(self, interval_seconds: float) -> None:
+        while True:
+            report = await self.run_once()
+            if report and report.archived:
+                print(
+                    f"Memory consolidation: {report.archived} nodes archived into "
+                    f"{len(report.summaries)} summaries ({report.archive_file})"
+                )
+            await asyncio.sleep(interval_seconds)
+
+    def start(self, interval_seconds: float = 3600) -> None:
+        """Runs `run_once` every `interval_seconds` in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(interval_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
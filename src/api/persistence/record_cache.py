@@ -0,0 +1,135 @@
+"""In-process read-through cache for single agent and task rows.
+
+`get_agent` / `get_task` in both Supabase persistence modules serve from here
+while an entry is younger than `ttl`.  Every write path puts the row it got
+back from PostgREST (or drops the id on delete and on failed writes).  Reads
+take a `generation()` before querying and pass it to `put`; an invalidation
+in between leaves a tombstone that makes the late `put` a no-op, so a read
+racing a delete or failed update cannot re-cache the old row.  Writes made by other processes or
+directly in the database are picked up when the entry expires, which bounds
+cross-process staleness by `ttl`.
+
+ETags are derived from the row id and `updated_at` (kept current by the
+triggers in migration 0003) rather than from the cache, so an unchanged row
+has the same ETag in every worker and after evictions.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional, Tuple, TypeVar, Union
+import uuid
+
+from pydantic import BaseModel
+
+Record = TypeVar("Record", bound=BaseModel)
+RecordId = Union[uuid.UUID, str]
+
+
+def record_etag(record_id: RecordId, updated_at: datetime) -> str:
+    """Strong ETag for one version of a row."""
+    digest = hashlib.sha1(f"{record_id}:{updated_at.isoformat()}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header value matches `etag` (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+class RecordCache:
+    """LRU of model instances keyed by (table, id), each entry expiring after `ttl` seconds."""
+
+    def __init__(self, ttl: float = 10.0, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl: Seconds an entry is served before the row is re-read; 0 disables caching.
+            max_entries: Least recently used entries beyond this are evicted.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, BaseModel]]" = OrderedDict()
+        # Generation of the last invalidation per key, kept for as many keys as
+        # entries; reads from at or before `_floor` (evicted tombstones, clear())
+        # are not cached at all.
+        self._generation = 0
+        self._floor = -1
+        self._tombstones: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        # The sync persistence module may be called from worker threads.
+        self._lock = threading.Lock()
+
+    def get(self, table: str, record_id: RecordId) -> Optional[BaseModel]:
+        key = (table, str(record_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].model_copy()
+
+    def generation(self) -> int:
+        """Token to take before reading a row from the database and pass to `put`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, table: str, record_id: RecordId, record: Record, generation: Optional[int] = None) -> None:
+        """Cache `record`; with `generation`, only if the id was not invalidated since it was taken."""
+        if self.ttl <= 0:
+            return
+        key = (table, str(record_id))
+        with self._lock:
+            if generation is not None and max(self._floor, self._tombstones.get(key, -1)) >= generation:
+                return
+            current = self._entries.get(key)
+            # A slow read must not overwrite a newer row written through meanwhile.
+            updated_at = getattr(record, "updated_at", None)
+            if current is not None and updated_at is not None and getattr(current[1], "updated_at", updated_at) > updated_at:
+                return
+            self._entries[key] = (self.clock() + self.ttl, record.model_copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str, record_id: RecordId) -> None:
+        key = (table, str(record_id))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._tombstones[key] = self._generation
+            self._tombstones.move_to_end(key)
+            self._generation += 1
+            while len(self._tombstones) > self.max_entries:
+                _, evicted = self._tombstones.popitem(last=False)
+                self._floor = max(self._floor, evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tombstones.clear()
+            # Reads started before the clear must not repopulate it.
+            self._floor = self._generation
+            self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by supabase_persistence and async_supabase_persistence.
+record_cache = RecordCache(ttl=float(os.getenv("RECORD_CACHE_TTL_SECONDS", "10")))
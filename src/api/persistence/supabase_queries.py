@@ -0,0 +1,195 @@
+"""PostgREST query building shared by `supabase_persistence` and `async_supabase_persistence`.
+
+The sync and async Supabase clients expose the same builder API and differ
+only in whether `.execute()` must be awaited, so every request is built here
+and each module just executes it.  Payload builders live here too, so both
+implementations write identical rows.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+
+from ..models.core_models import (
+    AgentCreate, AgentUpdate, TaskCreate, TaskUpdate, AgentStatus, TaskStatus, BatchItemError,
+)
+from .record_cache import record_cache
+
+# --- Payload Builders ---
+
+def new_agent_payload(agent_create: AgentCreate) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    agent_data_dict = agent_create.model_dump()
+    agent_data_dict['agent_id'] = str(uuid.uuid4()) # Ensure UUID is string for Supabase
+    agent_data_dict['status'] = AgentStatus.INACTIVE.value # Default status
+    agent_data_dict['created_at'] = now.isoformat()
+    agent_data_dict['updated_at'] = now.isoformat()
+    return agent_data_dict
+
+def agent_update_payload(agent_update: AgentUpdate) -> Dict[str, Any]:
+    # updated_at is maintained by the agents_set_updated_at trigger.
+    return agent_update.model_dump(mode='json', exclude_unset=True)
+
+def new_task_payload(task_create: TaskCreate) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    task_data_dict = task_create.model_dump()
+    task_data_dict['task_id'] = str(uuid.uuid4())
+    task_data_dict['status'] = TaskStatus.PENDING.value # Default status
+    task_data_dict['created_at'] = now.isoformat()
+    task_data_dict['updated_at'] = now.isoformat()
+    if task_data_dict.get('agent_id') is not None:
+        task_data_dict['agent_id'] = str(task_data_dict['agent_id'])
+    # Ensure started_at and completed_at are not sent if None, or handle as per DB schema
+    task_data_dict.pop('started_at', None) # Remove if None, Supabase handles default/NULL
+    task_data_dict.pop('completed_at', None) # Remove if None, Supabase handles default/NULL
+    return task_data_dict
+
+def task_update_payload(task_update: TaskUpdate) -> Dict[str, Any]:
+    # updated_at, and started_at / completed_at on status transitions, are set by
+    # the tasks triggers (migration 0003), so no read of the current row is needed.
+    return task_update.model_dump(mode='json', exclude_unset=True)
+
+# --- Single Row Requests ---
+
+def select_row(client, table: str, id_column: str, row_id: uuid.UUID):
+    return client.table(table).select("*").eq(id_column, str(row_id)).single()
+
+def insert_rows(client, table: str, payload: Union[Dict[str, Any], List[Dict[str, Any]]]):
+    return client.table(table).insert(payload)
+
+def update_row(client, table: str, id_column: str, row_id: uuid.UUID, payload: Dict[str, Any]):
+    """UPDATE ... RETURNING the row; an empty payload selects it instead."""
+    query = client.table(table).update(payload) if payload else client.table(table).select("*")
+    return query.eq(id_column, str(row_id))
+
+def delete_row(client, table: str, id_column: str, row_id: uuid.UUID):
+    # DELETE ... RETURNING: the removed row comes back in the same request.
+    return client.table(table).delete().eq(id_column, str(row_id))
+
+# --- List Queries: keyset pagination and projection ---
+# Lists are ordered by (created_at, <id>) and paged with a cursor holding the
+# last row's pair, so page N costs the same as page 1 (the composite indexes in
+# migration 0004 serve the filter + order).  `skip` offset paging is kept for
+# existing callers but should not be combined with a cursor.
+
+def encode_cursor(row: Union[BaseModel, Dict[str, Any]], id_column: str) -> str:
+    """Opaque cursor pointing just after `row`."""
+    data = row.model_dump(mode='json') if isinstance(row, BaseModel) else row
+    raw = json.dumps([str(data['created_at']), str(data[id_column])]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> List[str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        datetime.fromisoformat(created_at)
+        uuid.UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return [created_at, row_id]
+
+def select_columns(fields: Optional[Sequence[str]], model: Type[BaseModel], id_column: str) -> str:
+    """PostgREST select list for `fields`; the cursor columns are always included."""
+    if not fields:
+        return "*"
+    unknown = [f for f in fields if f not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns = [id_column, 'created_at'] + [f for f in fields if f not in (id_column, 'created_at')]
+    return ",".join(columns)
+
+def apply_list_query(query, id_column: str, skip: int, limit: int, after: Optional[List[str]]):
+    """Adds keyset filter, ordering and page bounds to a sync or async select builder.
+
+    `after` is a decoded cursor; it is decoded by the caller so that an invalid
+    cursor raises ValueError instead of being swallowed as a fetch error.
+    """
+    if after:
+        created_at, row_id = after
+        query = query.or_(
+            f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",{id_column}.gt.{row_id})'
+        )
+        skip = 0
+    return query.order('created_at').order(id_column).range(skip, skip + limit - 1)
+
+def list_rows(client, table: str, id_column: str, columns: str, filters: Dict[str, str],
+              skip: int, limit: int, after: Optional[List[str]]):
+    query = client.table(table).select(columns)
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    return apply_list_query(query, id_column, skip, limit, after)
+
+# Rows per request when streaming an export; memory stays at one page.
+EXPORT_PAGE_SIZE = 1000
+
+def next_page_after(rows: List[Dict[str, Any]], id_column: str, page_size: int) -> Optional[List[str]]:
+    """Keyset position after a full page, or None when this was the last page."""
+    if len(rows) < page_size:
+        return None
+    return [str(rows[-1]['created_at']), str(rows[-1][id_column])]
+
+def parse_rows(rows: List[Dict[str, Any]], model: Type[BaseModel], fields: Optional[Sequence[str]]) -> List[Any]:
+    """Full rows become models; projected rows are returned as plain dicts."""
+    return list(rows) if fields else [model(**row) for row in rows]
+
+# --- Batch Writes ---
+# A batch is one multi-row INSERT, or one call to the batch_update_* functions
+# from migration 0005.  One bad row fails the whole statement, so when that
+# request errors the rows are retried one at a time and each failure is
+# reported against its own index.
+
+def batch_failure(count: int, message: str) -> List[BatchItemError]:
+    return [BatchItemError(index=index, error=message) for index in range(count)]
+
+def batch_update_rows(client, table: str, updates: Sequence[BaseModel]):
+    params = {'updates': [update.model_dump(mode='json', exclude_unset=True) for update in updates]}
+    return client.rpc(f'batch_update_{table}', params)
+
+def retry_update_row(client, table: str, id_column: str, update: BaseModel):
+    """Single-row UPDATE for retrying one item of a failed batch."""
+    payload = update.model_dump(mode='json', exclude_unset=True, exclude={id_column})
+    return update_row(client, table, id_column, getattr(update, id_column), payload)
+
+def cache_batch_result(table: str, id_column: str, result, written: Sequence[BaseModel] = ()):
+    """Write batch results through to `record_cache`; ids in `written` are dropped first."""
+    for item in written:
+        record_cache.invalidate(table, getattr(item, id_column))
+    for item in result.items:
+        record_cache.put(table, getattr(item, id_column), item)
+    return result
+
+def match_updated_rows(
+    rows: List[Dict[str, Any]],
+    updates: Sequence[BaseModel],
+    model: Type[BaseModel],
+    id_column: str,
+    not_found: str,
+) -> Tuple[List[Any], List[BatchItemError]]:
+    """Pair returned rows with the requested updates; ids with no row are errors."""
+    by_id = {str(row[id_column]): row for row in rows}
+    items, errors = [], []
+    for index, update in enumerate(updates):
+        row = by_id.get(str(getattr(update, id_column)))
+        if row:
+            items.append(model(**row))
+        else:
+            errors.append(BatchItemError(index=index, error=not_found))
+    return items, errors
+
+# --- Document Embedding Search (pgvector) ---
+
+def match_document_embeddings_rpc(
+    client,
+    query_embedding: Sequence[float],
+    match_count: int = 10,
+    filter: Optional[Dict[str, Any]] = None,
+):
+    params = {
+        "query_embedding": [float(x) for x in query_embedding],
+        "match_count": match_count,
+        "filter": filter or {},
+    }
+    return client.rpc('match_document_embeddings', params)
@@ -1,9 +1,27 @@
 # SurrealDB Persistence Layer for Memory and Knowledge Graphs
 
-from typing import List, Optional, Dict, Any
-from ..models.memory_models import MemoryNode, MemoryEdge, SurrealID
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+from ..models.memory_models import MemoryNode, MemoryEdge, EdgeType, SurrealID
+from .hybrid_retriever import get_memory_retriever
 from src.clients.surrealdb_client import get_surrealdb_client
 
+# --- Search Index Hooks ---
+# Indexing failures are logged and swallowed: search is derived data and must
+# never fail a write that SurrealDB already accepted.
+
+async def _index_node(node: MemoryNode) -> None:
+    try:
+        await get_memory_retriever().index_node(node)
+    except Exception as e:
+        print(f"Error indexing memory node {node.id}: {e}")
+
+def _index_edge(edge: MemoryEdge) -> None:
+    try:
+        get_memory_retriever().index_edge(edge)
+    except Exception as e:
+        print(f"Error indexing edge {edge.id}: {e}")
+
 # --- MemoryNode Persistence ---
 
 async def create_node(node: MemoryNode) -> Optional[MemoryNode]:
@@ -18,7 +36,9 @@ async def create_node(node: MemoryNode) -> Optional[MemoryNode]:
         if created_records:
             # The driver returns a list of created records
             created_data = created_records[0]
-            return MemoryNode(**created_data)
+            created_node = MemoryNode(**created_data)
+            await _index_node(created_node)
+            return created_node
         return None
     except Exception as e:
         print(f"Error creating memory node: {e}")
@@ -41,6 +61,54 @@ async def get_node(node_id: SurrealID) -> Optional[MemoryNode]:
         await db.close()
 
 # --- MemoryEdge Persistence ---
+# Edge creation never interpolates values into query text: record ids and
+# CONTENT are sent as bound variables, and the only text that varies is the
+# edge table, which comes from the EdgeType enum.  Query strings are built once
+# per EdgeType (or per EdgeType sequence for batches) so SurrealDB always sees
+# the same statement shape.
+
+_EDGE_CONTENT_EXCLUDE = {'id', 'source_node_id', 'target_node_id'}
+_EDGE_BATCH_SIZE = 500
+
+def _split_record_id(record_id: SurrealID) -> Tuple[str, str]:
+    """Splits 'table:key' into its parts, dropping SurrealDB's ⟨⟩ key quoting."""
+    table, _, key = str(record_id).partition(':')
+    if not table or not key:
+        raise ValueError(f"Invalid SurrealDB record id: {record_id!r}")
+    return table, key.strip('⟨⟩`')
+
+def _relate_statement(edge_type: EdgeType, suffix: str = "") -> str:
+    return (
+        f"LET $src{suffix} = type::thing($src_tb{suffix}, $src_id{suffix}); "
+        f"LET $dst{suffix} = type::thing($dst_tb{suffix}, $dst_id{suffix}); "
+        f"RELATE $src{suffix}->{edge_type.value}->$dst{suffix} CONTENT $content{suffix};"
+    )
+
+# One reusable template per edge type.
+RELATE_TEMPLATES: Dict[EdgeType, str] = {edge_type: _relate_statement(edge_type) for edge_type in EdgeType}
+
+@lru_cache(maxsize=256)
+def _batch_relate_query(edge_types: Tuple[EdgeType, ...]) -> str:
+    return "\n".join(_relate_statement(edge_type, f"_{i}") for i, edge_type in enumerate(edge_types))
+
+def _relate_vars(source_node_id: SurrealID, target_node_id: SurrealID, edge_data: MemoryEdge, suffix: str = "") -> Dict[str, Any]:
+    src_tb, src_id = _split_record_id(source_node_id)
+    dst_tb, dst_id = _split_record_id(target_node_id)
+    return {
+        f"src_tb{suffix}": src_tb,
+        f"src_id{suffix}": src_id,
+        f"dst_tb{suffix}": dst_tb,
+        f"dst_id{suffix}": dst_id,
+        f"content{suffix}": edge_data.model_dump(mode='json', exclude=_EDGE_CONTENT_EXCLUDE, exclude_none=True),
+    }
+
+def _relate_results(result: Any) -> List[Dict[str, Any]]:
+    """Created edge records from a query response, skipping the LET statements' results."""
+    return [
+        statement['result'][0]
+        for statement in result or []
+        if isinstance(statement, dict) and isinstance(statement.get('result'), list) and statement['result']
+    ]
 
 async def create_edge(source_node_id: SurrealID, target_node_id: SurrealID, edge_data: MemoryEdge) -> Optional[MemoryEdge]:
     """Creates a directed edge between two memory nodes."""
@@ -48,15 +116,13 @@ async def create_edge(source_node_id: SurrealID, target_node_id: SurrealID, edge
     if not db:
         return None
     try:
-        # The RELATE query is the standard way to create edges in SurrealDB
-        # Example: RELATE person:1->likes->person:2 CONTENT { created_at: time::now() };
-        edge_content = edge_data.model_dump(exclude={'id', 'source_node_id', 'target_node_id'}, exclude_none=True)
-        query = f"RELATE {source_node_id}->{edge_data.edge_type.value}->{target_node_id} CONTENT {edge_content};"
-        result = await db.query(query)
-        # The result of a RELATE query is often a list containing the created edge
-        if result and result[0] and result[0]['result']:
-            created_edge = result[0]['result'][0]
-            return MemoryEdge(**created_edge)
+        query = RELATE_TEMPLATES[edge_data.edge_type]
+        result = await db.query(query, _relate_vars(source_node_id, target_node_id, edge_data))
+        created = _relate_results(result)
+        if created:
+            created_edge = MemoryEdge(**created[-1])
+            _index_edge(created_edge)
+            return created_edge
         return None
     except Exception as e:
         print(f"Error creating edge: {e}")
@@ -64,6 +130,32 @@ async def create_edge(source_node_id: SurrealID, target_node_id: SurrealID, edge
     finally:
         await db.close()
 
+async def create_edges(edges: List[MemoryEdge]) -> List[MemoryEdge]:
+    """Creates many edges over one connection, several RELATE statements per round trip."""
+    if not edges:
+        return []
+    db = await get_surrealdb_client()
+    if not db:
+        return []
+    created_edges: List[MemoryEdge] = []
+    try:
+        for start in range(0, len(edges), _EDGE_BATCH_SIZE):
+            chunk = edges[start:start + _EDGE_BATCH_SIZE]
+            query = _batch_relate_query(tuple(edge.edge_type for edge in chunk))
+            variables: Dict[str, Any] = {}
+            for i, edge in enumerate(chunk):
+                variables.update(_relate_vars(edge.source_node_id, edge.target_node_id, edge, f"_{i}"))
+            for record in _relate_results(await db.query(query, variables)):
+                created_edge = MemoryEdge(**record)
+                _index_edge(created_edge)
+                created_edges.append(created_edge)
+        return created_edges
+    except Exception as e:
+        print(f"Error creating edges: {e}")
+        return created_edges
+    finally:
+        await db.close()
+
 # --- KnowledgeGraph Retrieval ---
 
 async def get_graph_from_node(start_node_id: SurrealID, depth: int = 1) -> Optional[Dict[str, Any]]:
@@ -86,3 +178,24 @@ async def get_graph_from_node(start_node_id: SurrealID, depth: int = 1) -> Optio
         return None
     finally:
         await db.close()
+
+# --- Search Index Rebuild ---
+
+async def rebuild_memory_index() -> int:
+    """Loads every memory node and edge into the hybrid retriever; returns the node count."""
+    db = await get_surrealdb_client()
+    if not db:
+        return 0
+    try:
+        retriever = get_memory_retriever()
+        nodes = [MemoryNode(**record) for record in await db.select("memory_node") or []]
+        await retriever.index_nodes(nodes)
+        for edge_type in EdgeType:
+            for record in await db.select(edge_type.value) or []:
+                retriever.index_edge(MemoryEdge(**{"edge_type": edge_type, **record}))
+        return len(nodes)
+    except Exception as e:
+        print(f"Error rebuilding memory index: {e}")
+        return 0
+    finally:
+        await db.close()
@@ -0,0 +1,327 @@
+"""Request rate limiting and admission control for expensive API routes.
+
+`RateLimitMiddleware` applies a `RoutePolicy` to every request matching one
+of its routes (method plus path template, e.g. ``POST /api/v1/sandbox/run``):
+
+- Rate: a token bucket per route policy and client.  The client is the
+  ``X-API-Key`` header, or the peer address when there is none.  An empty
+  bucket answers 429 with ``Retry-After`` set to when the next token is due.
+  Batch routes (`batch_routes`) cost one token per item of their JSON array
+  body; a batch larger than the burst may overdraw a full bucket, and the
+  client then waits for it to refill.
+- Admission: at most `max_concurrent` requests of the policy run at once,
+  whoever sent them, so a burst from many clients still cannot exhaust E2B
+  sandboxes or Supabase connections.  Up to `max_queue` more wait, for at most
+  `queue_timeout` seconds; anything beyond that is shed with 503 and
+  ``Retry-After`` instead of piling up and dragging every request's latency.
+
+Requests that match no policy pass straight through.  State is per process.
+`RateLimiter.stats()` reports the counters per policy.
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+API_KEY_HEADER = b"x-api-key"
+
+# Buckets kept per policy before the least recently seen clients are dropped.
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def try_acquire(self, cost: float = 1) -> float:
+        """Take `cost` tokens; returns 0 on success, else seconds until enough are available.
+
+        A cost above `burst` needs a full bucket and leaves it in debt.
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(cost, self.burst)
+        if self.tokens >= needed:
+            self.tokens -= cost
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 0.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        # One future per waiter, created on the caller's running loop.
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False if shed."""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+@dataclass
+class RoutePolicy:
+    """Limits shared by a group of routes.
+
+    Args:
+        name: Label used in stats.
+        routes: ``"METHOD /path/{param}"`` templates this policy applies to.
+        batch_routes: Templates, also applied to, whose requests cost one
+            rate token per item of their JSON array body.
+        rate: Sustained requests per second per client; None for no rate limit.
+        burst: Requests a client may make at once before the rate applies.
+        max_concurrent: Requests of this policy running at once; None for no limit.
+        max_queue: Requests allowed to wait for a slot.
+        queue_timeout: Seconds a request may wait before being shed.
+    """
+
+    name: str
+    routes: Sequence[str]
+    batch_routes: Sequence[str] = ()
+    rate: Optional[float] = None
+    burst: int = 1
+    max_concurrent: Optional[int] = None
+    max_queue: int = 0
+    queue_timeout: float = 0.0
+    _patterns: List[Tuple[str, "re.Pattern"]] = field(init=False, repr=False)
+    _batch_patterns: List[Tuple[str, "re.Pattern"]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._patterns = [self._compile(route) for route in self.routes]
+        self._batch_patterns = [self._compile(route) for route in self.batch_routes]
+
+    @staticmethod
+    def _compile(route: str) -> Tuple[str, "re.Pattern"]:
+        method, _, template = route.partition(" ")
+        regex = re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(template.rstrip("/")))
+        return method.upper(), re.compile(f"^{regex}/?$")
+
+    def matches(self, method: str, path: str) -> bool:
+        return self.is_batch(method, path) or any(method == m and pattern.match(path) for m, pattern in self._patterns)
+
+    def is_batch(self, method: str, path: str) -> bool:
+        return any(method == m and pattern.match(path) for m, pattern in self._batch_patterns)
+
+
+class RateLimiter:
+    """Buckets, admission controllers and counters for a set of `RoutePolicy`s."""
+
+    def __init__(self, policies: Sequence[RoutePolicy], clock: Callable[[], float] = time.monotonic):
+        self.policies = list(policies)
+        self.clock = clock
+        self._buckets: Dict[str, "OrderedDict[str, TokenBucket]"] = {p.name: OrderedDict() for p in self.policies}
+        self.admission_controllers: Dict[str, AdmissionController] = {
+            p.name: AdmissionController(p.max_concurrent, p.max_queue, p.queue_timeout)
+            for p in self.policies if p.max_concurrent is not None
+        }
+        self.counters: Dict[str, Dict[str, float]] = {
+            p.name: {"allowed": 0, "rate_limited": 0, "shed": 0, "queue_wait_seconds": 0.0} for p in self.policies
+        }
+
+    def policy_for(self, method: str, path: str) -> Optional[RoutePolicy]:
+        return next((p for p in self.policies if p.matches(method, path)), None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Counters per policy, plus current in-flight and queued requests."""
+        stats = {}
+        for policy in self.policies:
+            entry = dict(self.counters[policy.name])
+            admission = self.admission_controllers.get(policy.name)
+            entry["in_flight"] = admission.in_flight if admission else 0
+            entry["queued"] = admission.queued if admission else 0
+            stats[policy.name] = entry
+        return stats
+
+    def bucket(self, policy: RoutePolicy, client: str) -> TokenBucket:
+        buckets = self._buckets[policy.name]
+        bucket = buckets.get(client)
+        if bucket is None:
+            bucket = buckets[client] = TokenBucket(policy.rate, policy.burst, self.clock)
+            if len(buckets) > MAX_TRACKED_CLIENTS:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(client)
+        return bucket
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing a `RateLimiter`'s policies."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limiter = self.limiter
+        policy = limiter.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        counters = limiter.counters[policy.name]
+        if policy.rate is not None:
+            cost = 1
+            if policy.is_batch(scope["method"], scope["path"]):
+                messages = await self._read_body(receive)
+                cost = self._item_count(b"".join(m.get("body", b"") for m in messages))
+                receive = self._replay(messages, receive)
+            retry_after = limiter.bucket(policy, self._client_key(scope)).try_acquire(cost)
+            if retry_after:
+                counters["rate_limited"] += 1
+                await self._reject(429, "Rate limit exceeded", retry_after, scope, receive, send)
+                return
+
+        admission = limiter.admission_controllers.get(policy.name)
+        if admission is not None:
+            started = limiter.clock()
+            admitted = await admission.acquire()
+            counters["queue_wait_seconds"] += limiter.clock() - started
+            if not admitted:
+                counters["shed"] += 1
+                await self._reject(503, "Server busy, try again later", policy.queue_timeout, scope, receive, send)
+                return
+
+        counters["allowed"] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if admission is not None:
+                admission.release()
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> List[dict]:
+        """Receive the whole request body, as the ASGI messages that carried it."""
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                return messages
+
+    @staticmethod
+    def _replay(messages: List[dict], receive: Receive) -> Receive:
+        """A `receive` that hands the app the already-read messages first."""
+        pending = deque(messages)
+
+        async def replay() -> dict:
+            if pending:
+                return pending.popleft()
+            return await receive()
+
+        return replay
+
+    @staticmethod
+    def _item_count(body: bytes) -> int:
+        """Items in a JSON array body; 1 for anything else (the route rejects it)."""
+        try:
+            items = json.loads(body)
+        except ValueError:
+            return 1
+        return max(len(items), 1) if isinstance(items, list) else 1
+
+    @staticmethod
+    def _client_key(scope: Scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == API_KEY_HEADER:
+                return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    async def _reject(status_code: int, detail: str, retry_after: float, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+
+def default_policies() -> List[RoutePolicy]:
+    """Policies for the API's expensive routes, tunable from the environment."""
+    return [
+        RoutePolicy(
+            name="sandbox_run",
+            routes=["POST /api/v1/sandbox/run", "POST /api/v1/sandbox/jobs"],
+            rate=float(os.getenv("RATE_LIMIT_SANDBOX_PER_MINUTE", "30")) / 60,
+            burst=int(os.getenv("RATE_LIMIT_SANDBOX_BURST", "5")),
+            max_concurrent=int(os.getenv("SANDBOX_RUN_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("SANDBOX_RUN_MAX_QUEUE", "16")),
+            queue_timeout=float(os.getenv("SANDBOX_RUN_QUEUE_TIMEOUT_SECONDS", "10")),
+        ),
+        RoutePolicy(
+            name="create",
+            routes=[
+                "POST /api/v1/tasks",
+                "POST /api/v1/agents",
+                "POST /api/v1/agents/{agent_id}/tasks",
+                "POST /api/v1/workflows",
+            ],
+            batch_routes=[
+                "POST /api/v1/tasks:batch",
+                "PATCH /api/v1/tasks:batch",
+                "POST /api/v1/agents:batch",
+                "PATCH /api/v1/agents:batch",
+            ],
+            rate=float(os.getenv("RATE_LIMIT_CREATE_PER_MINUTE", "600")) / 60,
+            burst=int(os.getenv("RATE_LIMIT_CREATE_BURST", "100")),
+            max_concurrent=int(os.getenv("CREATE_MAX_CONCURRENCY", "32")),
+            max_queue=int(os.getenv("CREATE_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv("CREATE_QUEUE_TIMEOUT_SECONDS", "5")),
+        ),
+    ]
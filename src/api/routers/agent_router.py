@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
+from fastapi import APIRouter, Body, Header, HTTPException, Depends, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Any, Dict, List, Optional
 import uuid
 
-from ..models.core_models import AgentCreate, AgentRead, AgentUpdate
-from ..persistence import supabase_persistence as db # Using an alias for brevity
+from ..models.core_models import AgentBatchResult, AgentBatchUpdate, AgentCreate, AgentRead, AgentUpdate, TaskCreate, TaskRead
+from ..persistence import async_supabase_persistence as db # Using an alias for brevity
+from ..persistence.record_cache import etag_matches, record_etag
+from ..persistence.supabase_queries import encode_cursor
+from .batch_utils import MAX_BATCH_SIZE, merge_errors, validate_items
+from src.sentient_core.orchestrator.task_queue import get_task_queue
 
 router = APIRouter(
     prefix="/agents",
@@ -16,34 +22,77 @@ async def create_new_agent(agent: AgentCreate):
     """
     Create a new agent.
     """
-    return db.create_agent(agent_create=agent)
+    return await db.create_agent(agent_create=agent)
 
 @router.get("/", response_model=List[AgentRead])
-async def list_all_agents(skip: int = 0, limit: int = 100):
+async def list_all_agents(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Retrieve a list of all agents.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next
+    page; `fields` is a comma-separated list of columns to return.
     """
-    agents = db.get_agents(skip=skip, limit=limit)
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        agents = await db.get_agents(skip=skip, limit=limit, cursor=cursor, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"X-Next-Cursor": encode_cursor(agents[-1], "agent_id")} if agents and len(agents) == limit else {}
+    if field_list:
+        return JSONResponse(content=jsonable_encoder(agents), headers=headers)
+    response.headers.update(headers)
     return agents
 
-@router.get("/{agent_id}", response_model=AgentRead)
-async def get_specific_agent(agent_id: uuid.UUID):
+@router.post(":batch", response_model=AgentBatchResult)
+async def create_agents_batch(items: List[Dict[str, Any]] = Body(..., max_length=MAX_BATCH_SIZE)):
+    """
+    Create many agents in one request; invalid or rejected items are listed in `errors`.
+    """
+    valid, positions, errors = validate_items(items, AgentCreate)
+    result = await db.create_agents(valid)
+    return merge_errors(result, positions, errors)
+
+@router.patch(":batch", response_model=AgentBatchResult)
+async def update_agents_batch(items: List[Dict[str, Any]] = Body(..., max_length=MAX_BATCH_SIZE)):
+    """
+    Apply partial updates to many agents; each item carries its `agent_id`.
+    """
+    valid, positions, errors = validate_items(items, AgentBatchUpdate, id_field="agent_id")
+    result = await db.update_agents(valid)
+    return merge_errors(result, positions, errors)
+
+@router.get("/{agent_id}", response_model=AgentRead, responses={304: {"description": "Not modified"}})
+async def get_specific_agent(agent_id: uuid.UUID, response: Response, if_none_match: Optional[str] = Header(None)):
     """
     Retrieve a specific agent by its ID.
+
+    The response carries an `ETag`; send it back in `If-None-Match` to get an
+    empty 304 while the agent is unchanged.
     """
-    agent = db.get_agent(agent_id=agent_id)
+    agent = await db.get_agent(agent_id=agent_id)
     if not agent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
+    etag = record_etag(agent.agent_id, agent.updated_at)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return agent
 
 @router.put("/{agent_id}", response_model=AgentRead)
-async def update_existing_agent(agent_id: uuid.UUID, agent_update: AgentUpdate):
+async def update_existing_agent(agent_id: uuid.UUID, agent_update: AgentUpdate, response: Response):
     """
     Update an existing agent.
     """
-    updated_agent = db.update_agent(agent_id=agent_id, agent_update=agent_update)
+    updated_agent = await db.update_agent(agent_id=agent_id, agent_update=agent_update)
     if not updated_agent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
+    response.headers["ETag"] = record_etag(updated_agent.agent_id, updated_agent.updated_at)
     return updated_agent
 
 @router.delete("/{agent_id}", response_model=AgentRead) # Or just status_code=204 if no body
@@ -51,7 +100,24 @@ async def delete_specific_agent(agent_id: uuid.UUID):
     """
     Delete a specific agent by its ID.
     """
-    deleted_agent = db.delete_agent(agent_id=agent_id)
+    deleted_agent = await db.delete_agent(agent_id=agent_id)
     if not deleted_agent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
     return deleted_agent # Or return a confirmation message/status
+
+@router.post("/{agent_id}/tasks", response_model=TaskRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_task_for_agent(agent_id: uuid.UUID, task: TaskCreate):
+    """
+    Create a task for an agent and queue it for execution.
+
+    Returns immediately with the PENDING task; poll `GET /tasks/{task_id}` for
+    RUNNING / COMPLETED / FAILED and the output.
+    """
+    agent = await db.get_agent(agent_id=agent_id)
+    if not agent:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
+    created = await db.create_task(task_create=task.model_copy(update={"agent_id": agent_id}))
+    if not created:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Task could not be created")
+    await get_task_queue().enqueue(created.task_id, agent_id=agent_id, priority=created.priority)
+    return created
@@ -0,0 +1,47 @@
+"""Shared request handling for the `:batch` endpoints.
+
+Items are validated one by one instead of as a typed list body, so a single
+malformed item is reported in `errors` rather than rejecting the whole request
+with a 422.  Valid items go to persistence in one call; error indices coming
+back from persistence are mapped to positions in the original request body.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..models.core_models import BatchItemError
+
+MAX_BATCH_SIZE = 1000
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors())
+
+def validate_items(
+    items: List[Dict[str, Any]],
+    model: Type[BaseModel],
+    id_field: Optional[str] = None,
+) -> Tuple[List[BaseModel], List[int], List[BatchItemError]]:
+    """Return (valid items, their request positions, errors for the rest)."""
+    valid, positions, errors, seen = [], [], [], set()
+    for index, item in enumerate(items):
+        try:
+            parsed = model.model_validate(item)
+        except ValidationError as e:
+            errors.append(BatchItemError(index=index, error=_describe(e)))
+            continue
+        if id_field:
+            # Two updates for one row in a single UPDATE ... FROM would race.
+            key = getattr(parsed, id_field)
+            if key in seen:
+                errors.append(BatchItemError(index=index, error=f"Duplicate {id_field} {key} in batch"))
+                continue
+            seen.add(key)
+        valid.append(parsed)
+        positions.append(index)
+    return valid, positions, errors
+
+def merge_errors(result, positions: List[int], errors: List[BatchItemError]):
+    """Re-index persistence errors to request positions and fold in validation errors."""
+    remapped = [e.model_copy(update={'index': positions[e.index]}) for e in result.errors]
+    result.errors = sorted(errors + remapped, key=lambda e: e.index)
+    return result
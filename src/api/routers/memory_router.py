@@ -0,0 +1,28 @@
+"""API router exposing search over the memory graph."""
+from typing import List
+
+from fastapi import APIRouter
+
+from ..models.memory_models import MemorySearchHit, MemorySearchRequest
+from ..persistence.hybrid_retriever import get_memory_retriever
+
+router = APIRouter(
+    prefix="/memory",
+    tags=["Memory"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.post("/search", response_model=List[MemorySearchHit])
+async def search_memory(request: MemorySearchRequest) -> List[MemorySearchHit]:
+    """
+    Hybrid BM25 + vector search over memory node content, fused with
+    reciprocal-rank fusion and optionally expanded one hop through
+    RELATES_TO / CLARIFIES edges.
+    """
+    return await get_memory_retriever().search(
+        request.query,
+        top_k=request.top_k,
+        expand=request.expand,
+        node_types=request.node_types,
+    )
@@ -1,8 +1,14 @@
 """API router exposing E2B sandbox execution endpoints."""
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Optional, TypeVar
+import uuid
+
+from fastapi import APIRouter, HTTPException, Request, status
 from pydantic import BaseModel, Field
 
-from src.clients.e2b_sandbox_tool import run_in_e2b_sandbox, E2BSandboxToolInput
+from src.clients.e2b_sandbox_tool import run_in_e2b_sandbox_async, E2BSandboxToolInput
+from ..sandbox_jobs import SandboxJob, SandboxJobStatus, get_sandbox_jobs
 
 router = APIRouter(
     prefix="/sandbox",
@@ -10,6 +16,14 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# How often a synchronous run checks whether its client has gone away.
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Non-standard status (as used by nginx) for requests abandoned by the client.
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
 
 class SandboxRunRequest(BaseModel):
     """Request body for running code inside an E2B sandbox."""
@@ -24,18 +38,91 @@ class SandboxRunResponse(BaseModel):
     output: str
 
 
+class SandboxJobResponse(BaseModel):
+    """Status of a background sandbox job, with its output once completed."""
+
+    job_id: uuid.UUID
+    status: SandboxJobStatus
+    language: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _job_response(job: SandboxJob) -> SandboxJobResponse:
+    return SandboxJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        language=job.language,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        output=job.output,
+        error=job.error,
+    )
+
+
+async def run_until_disconnected(request: Request, work: Awaitable[T], poll_interval: float = DISCONNECT_POLL_SECONDS) -> T:
+    """Await `work`, cancelling it if the client disconnects first."""
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
 @router.post("/run", response_model=SandboxRunResponse, status_code=status.HTTP_200_OK)
-def run_script_in_sandbox(request: SandboxRunRequest) -> SandboxRunResponse:
-    """Runs the provided script inside an E2B sandbox and returns its output."""
+async def run_script_in_sandbox(request: SandboxRunRequest, http_request: Request) -> SandboxRunResponse:
+    """Runs the provided script inside an E2B sandbox and returns its output.
+
+    The sandbox is torn down if the client disconnects before it finishes.
+    For long scripts, use `POST /sandbox/jobs` instead.
+    """
 
     try:
-        output = run_in_e2b_sandbox(
-            E2BSandboxToolInput(script=request.script, language=request.language)
+        output = await run_until_disconnected(
+            http_request,
+            run_in_e2b_sandbox_async(E2BSandboxToolInput(script=request.script, language=request.language)),
         )
         return SandboxRunResponse(output=output)
+    except HTTPException:
+        raise
     except ValueError as ve:
         # Typically raised when E2B_API_KEY is missing
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve)) from ve
     except Exception as exc:
         # Generic catch-all to avoid leaking internal errors
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+
+@router.post("/jobs", response_model=SandboxJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_sandbox_job(request: SandboxRunRequest) -> SandboxJobResponse:
+    """Starts the script in a sandbox in the background and returns the job id at once."""
+    return _job_response(get_sandbox_jobs().submit(request.script, request.language))
+
+
+@router.get("/jobs/{job_id}", response_model=SandboxJobResponse)
+async def get_sandbox_job(job_id: uuid.UUID) -> SandboxJobResponse:
+    """Returns a sandbox job's status, and its output or error once finished."""
+    job = get_sandbox_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sandbox job not found")
+    return _job_response(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=SandboxJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_sandbox_job(job_id: uuid.UUID) -> SandboxJobResponse:
+    """Cancels a queued or running sandbox job; finished jobs are left as they are."""
+    job = get_sandbox_jobs().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sandbox job not found")
+    return _job_response(job)
@@ -0,0 +1,45 @@
+"""Helpers for endpoints that stream their response body."""
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Lines are coalesced into chunks of about this many bytes before being sent,
+# instead of one socket write per row.
+_CHUNK_BYTES = 64 * 1024
+
+async def _ndjson_chunks(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for row in rows:
+        buffer += json.dumps(row, default=str, separators=(",", ":")).encode()
+        buffer += b"\n"
+        if len(buffer) >= _CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def ndjson_response(rows: AsyncIterator[Dict[str, Any]], filename: Optional[str] = None) -> StreamingResponse:
+    """Stream `rows` as newline-delimited JSON, one object per line."""
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(_ndjson_chunks(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+async def _sse_frames(events: AsyncIterator[Optional[Any]]) -> AsyncIterator[bytes]:
+    async for event in events:
+        if event is None:
+            # Comment line: keeps proxies from closing an idle connection.
+            yield b": keep-alive\n\n"
+            continue
+        data = json.dumps(event.data, default=str, separators=(",", ":"))
+        yield f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n".encode()
+
+def sse_response(events: AsyncIterator[Optional[Any]]) -> StreamingResponse:
+    """Stream `events` (objects with `seq`, `type` and `data`) as Server-Sent Events.
+
+    A None item is sent as a keep-alive comment.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_sse_frames(events), media_type=SSE_MEDIA_TYPE, headers=headers)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
+from fastapi import APIRouter, Body, Header, HTTPException, Depends, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
 import uuid
 
-from ..models.core_models import TaskCreate, TaskRead, TaskUpdate
-from ..persistence import supabase_persistence as db
+from ..models.core_models import TaskBatchResult, TaskBatchUpdate, TaskCreate, TaskRead, TaskUpdate
+from ..persistence import async_supabase_persistence as db
+from ..persistence.record_cache import etag_matches, record_etag
+from ..persistence.supabase_queries import encode_cursor
+from .batch_utils import MAX_BATCH_SIZE, merge_errors, validate_items
+from .stream_utils import NDJSON_MEDIA_TYPE, ndjson_response
 
 router = APIRouter(
     prefix="/tasks",
@@ -11,39 +17,99 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    return [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
 async def create_new_task(task: TaskCreate):
     """
     Create a new task.
     """
-    return db.create_task(task_create=task)
+    return await db.create_task(task_create=task)
 
 @router.get("/", response_model=List[TaskRead])
-async def list_all_tasks(agent_id: Optional[uuid.UUID] = None, skip: int = 0, limit: int = 100):
+async def list_all_tasks(
+    response: Response,
+    agent_id: Optional[uuid.UUID] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Retrieve a list of all tasks, optionally filtered by agent_id.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next
+    page; `fields` is a comma-separated list of columns to return.
     """
-    tasks = db.get_tasks(agent_id=agent_id, skip=skip, limit=limit)
+    field_list = _parse_fields(fields)
+    try:
+        tasks = await db.get_tasks(agent_id=agent_id, skip=skip, limit=limit, cursor=cursor, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"X-Next-Cursor": encode_cursor(tasks[-1], "task_id")} if tasks and len(tasks) == limit else {}
+    if field_list:
+        return JSONResponse(content=jsonable_encoder(tasks), headers=headers)
+    response.headers.update(headers)
     return tasks
 
-@router.get("/{task_id}", response_model=TaskRead)
-async def get_specific_task(task_id: uuid.UUID):
+# Declared before /{task_id} so "export" is not parsed as a task id.
+@router.get("/export", response_class=StreamingResponse, responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}})
+async def export_tasks(agent_id: Optional[uuid.UUID] = None, fields: Optional[str] = None):
+    """
+    Stream every task (optionally for one agent) as NDJSON, one row per line,
+    in (created_at, task_id) order. Supabase is read a page at a time.
+    """
+    try:
+        rows = db.iter_tasks(agent_id=agent_id, fields=_parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ndjson_response(rows, filename="tasks.ndjson")
+
+@router.post(":batch", response_model=TaskBatchResult)
+async def create_tasks_batch(items: List[Dict[str, Any]] = Body(..., max_length=MAX_BATCH_SIZE)):
+    """
+    Create many tasks in one request; invalid or rejected items are listed in `errors`.
+    """
+    valid, positions, errors = validate_items(items, TaskCreate)
+    result = await db.create_tasks(valid)
+    return merge_errors(result, positions, errors)
+
+@router.patch(":batch", response_model=TaskBatchResult)
+async def update_tasks_batch(items: List[Dict[str, Any]] = Body(..., max_length=MAX_BATCH_SIZE)):
+    """
+    Apply partial updates to many tasks; each item carries its `task_id`.
+    """
+    valid, positions, errors = validate_items(items, TaskBatchUpdate, id_field="task_id")
+    result = await db.update_tasks(valid)
+    return merge_errors(result, positions, errors)
+
+@router.get("/{task_id}", response_model=TaskRead, responses={304: {"description": "Not modified"}})
+async def get_specific_task(task_id: uuid.UUID, response: Response, if_none_match: Optional[str] = Header(None)):
     """
     Retrieve a specific task by its ID.
+
+    The response carries an `ETag`; send it back in `If-None-Match` to get an
+    empty 304 while the task is unchanged.
     """
-    task = db.get_task(task_id=task_id)
+    task = await db.get_task(task_id=task_id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    etag = record_etag(task.task_id, task.updated_at)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return task
 
 @router.put("/{task_id}", response_model=TaskRead)
-async def update_existing_task(task_id: uuid.UUID, task_update: TaskUpdate):
+async def update_existing_task(task_id: uuid.UUID, task_update: TaskUpdate, response: Response):
     """
     Update an existing task.
     """
-    updated_task = db.update_task(task_id=task_id, task_update=task_update)
+    updated_task = await db.update_task(task_id=task_id, task_update=task_update)
     if not updated_task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    response.headers["ETag"] = record_etag(updated_task.task_id, updated_task.updated_at)
     return updated_task
 
 @router.delete("/{task_id}", response_model=TaskRead)
@@ -51,7 +117,7 @@ async def delete_specific_task(task_id: uuid.UUID):
     """
     Delete a specific task by its ID.
     """
-    deleted_task = db.delete_task(task_id=task_id)
+    deleted_task = await db.delete_task(task_id=task_id)
     if not deleted_task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
     return deleted_task
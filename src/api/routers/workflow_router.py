@@ -0,0 +1,86 @@
+"""API router for orchestrator workflows and workflow-level data."""
+from typing import Optional
+import uuid
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from ..models.core_models import WorkflowCreate, WorkflowRead
+from ..persistence import async_supabase_persistence as db
+from .stream_utils import NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, ndjson_response, sse_response
+from src.sentient_core.orchestrator.workflow_runner import get_workflow_runner
+
+# Seconds without progress before a keep-alive comment is sent on the event stream.
+SSE_HEARTBEAT_SECONDS = 15.0
+
+router = APIRouter(
+    prefix="/workflows",
+    tags=["Workflows"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def _workflow_read(run) -> WorkflowRead:
+    return WorkflowRead(
+        workflow_id=run.workflow_id,
+        command=run.command,
+        status=run.status,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+        result=run.result,
+        error=run.error,
+        event_count=run.event_count,
+    )
+
+
+@router.post("/", response_model=WorkflowRead, status_code=status.HTTP_202_ACCEPTED)
+async def start_workflow(workflow: WorkflowCreate):
+    """
+    Start orchestrating a command in the background.
+
+    Returns at once with the workflow id; follow progress on `GET /workflows/{workflow_id}/events`.
+    """
+    run = get_workflow_runner().submit(workflow.command)
+    return _workflow_read(run)
+
+
+@router.get("/{workflow_id}", response_model=WorkflowRead)
+async def get_workflow(workflow_id: uuid.UUID):
+    """
+    Retrieve the status of a workflow started by this server.
+    """
+    run = get_workflow_runner().get(workflow_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
+    return _workflow_read(run)
+
+
+@router.get(
+    "/{workflow_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {SSE_MEDIA_TYPE: {}}}},
+)
+async def stream_workflow_events(workflow_id: uuid.UUID, last_event_id: Optional[int] = Header(None)):
+    """
+    Stream a workflow's progress as Server-Sent Events, from the first event
+    (or after `Last-Event-ID` on reconnect) until the workflow finishes.
+    """
+    runner = get_workflow_runner()
+    if runner.get(workflow_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
+    events = runner.events(str(workflow_id), after=last_event_id or 0, heartbeat=SSE_HEARTBEAT_SECONDS)
+    return sse_response(events)
+
+
+@router.get(
+    "/{workflow_id}/events/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def export_workflow_events(workflow_id: uuid.UUID, event_type: Optional[str] = None):
+    """
+    Stream a workflow's `agent_events` history, oldest first, as NDJSON.
+    """
+    rows = db.iter_agent_events(workflow_id=workflow_id, event_type=event_type)
+    return ndjson_response(rows, filename=f"workflow-{workflow_id}-events.ndjson")
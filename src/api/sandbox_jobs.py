@@ -0,0 +1,123 @@
+"""Background sandbox executions for `POST /api/v1/sandbox/jobs`.
+
+Long scripts should not hold an HTTP request open.  A job is started as an
+asyncio task on the server loop and returns an id at once; clients poll
+`GET /sandbox/jobs/{job_id}` for the output and may cancel with `DELETE`.
+At most `max_concurrent` jobs run at a time and the rest wait QUEUED.
+
+State is in memory and per process.  The newest `max_finished` finished
+jobs are kept for polling.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.clients.e2b_sandbox_tool import E2BSandboxToolInput, run_in_e2b_sandbox_async
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxJobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class SandboxJob:
+    """Status and result of one background sandbox execution."""
+
+    def __init__(self, script: str, language: str):
+        self.job_id = str(uuid.uuid4())
+        self.script = script
+        self.language = language
+        self.status = SandboxJobStatus.QUEUED
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.output: Optional[str] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SandboxJobStatus.COMPLETED, SandboxJobStatus.FAILED, SandboxJobStatus.CANCELLED)
+
+    def finish(self, status: SandboxJobStatus, output: Optional[str] = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.output = output
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+
+
+SandboxRunner = Callable[[E2BSandboxToolInput], Awaitable[str]]
+
+
+class SandboxJobs:
+    """Runs sandbox jobs with bounded concurrency and keeps their results."""
+
+    def __init__(self, runner: SandboxRunner = run_in_e2b_sandbox_async, max_concurrent: int = 16,
+                 max_finished: int = 1000):
+        self.runner = runner
+        self.max_finished = max_finished
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._jobs: "OrderedDict[str, SandboxJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, script: str, language: str) -> SandboxJob:
+        job = SandboxJob(script, language)
+        self._jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._execute(job), name=f"sandbox-job-{job.job_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[SandboxJob]:
+        return self._jobs.get(str(job_id))
+
+    def cancel(self, job_id: str) -> Optional[SandboxJob]:
+        """Cancel a queued or running job; the sandbox is killed by the runner."""
+        job = self.get(job_id)
+        task = self._tasks.get(str(job_id))
+        if task is not None:
+            task.cancel()
+        return job
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, job: SandboxJob) -> None:
+        try:
+            async with self._semaphore:
+                job.status = SandboxJobStatus.RUNNING
+                job.started_at = datetime.now(timezone.utc)
+                output = await self.runner(E2BSandboxToolInput(script=job.script, language=job.language))
+                job.finish(SandboxJobStatus.COMPLETED, output=output)
+        except asyncio.CancelledError:
+            job.finish(SandboxJobStatus.CANCELLED)
+        except Exception as e:
+            logger.warning(f"Sandbox job {job.job_id} failed: {e}")
+            job.finish(SandboxJobStatus.FAILED, error=str(e))
+        finally:
+            self._tasks.pop(job.job_id, None)
+            finished = [job_id for job_id, j in self._jobs.items() if j.done]
+            for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[job_id]
+
+
+_sandbox_jobs: Optional[SandboxJobs] = None
+
+
+def get_sandbox_jobs() -> SandboxJobs:
+    """Process-wide job manager used by the API, sized from the environment."""
+    global _sandbox_jobs
+    if _sandbox_jobs is None:
+        _sandbox_jobs = SandboxJobs(max_concurrent=int(os.getenv("SANDBOX_JOB_MAX_CONCURRENCY", "16")))
+    return _sandbox_jobs
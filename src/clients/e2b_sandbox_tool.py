@@ -1,6 +1,7 @@
+import asyncio
 import os
 try:
-    from e2b_code_interpreter import Sandbox  # type: ignore
+    from e2b_code_interpreter import AsyncSandbox, Sandbox  # type: ignore
 except ImportError:  # pragma: no cover
     class _StubResult:
         def __init__(self, logs=None, error=None):
@@ -22,6 +23,18 @@ except ImportError:  # pragma: no cover
             # Always succeed and return stub logs
             return _StubResult()
 
+    class AsyncSandbox:  # type: ignore
+        """Async counterpart of the stub above."""
+        @classmethod
+        async def create(cls, *args, **kwargs):
+            return cls()
+
+        async def run_code(self, script, language=None, **kwargs):
+            return _StubResult()
+
+        async def kill(self):
+            return True
+
 from typing import List, Optional, Callable
 
 
@@ -61,13 +74,62 @@ def run_in_e2b_sandbox(input_data: E2BSandboxToolInput) -> str:
 
             # The `run_...` methods in the Python SDK are blocking and return a result object.
             # The result object contains stdout, stderr, and any errors.
-            if result.error:
-                raise Exception(f"E2B execution failed: {result.error.name}: {result.error.value}")
-
-            return "\n".join(log.line for log in result.logs)
+            return _result_output(result)
 
     except Exception as e:
         # Broad exception to catch sandbox creation failures, timeouts, etc.
         if input_data.on_output:
             input_data.on_output(f"E2B Sandbox Error: {e}")
         raise
+
+
+_LANGUAGES = {"python": None, "node": "javascript"}
+
+
+def _result_output(result) -> str:
+    """Join an execution's stdout lines, raising if the code failed."""
+    if result.error:
+        raise Exception(f"E2B execution failed: {result.error.name}: {result.error.value}")
+    # Current SDKs return a Logs object with stdout/stderr lists; older ones a list of lines.
+    stdout = getattr(result.logs, "stdout", None)
+    if stdout is not None:
+        return "".join(stdout).rstrip("\n")
+    return "\n".join(log.line for log in result.logs)
+
+
+async def run_in_e2b_sandbox_async(input_data: E2BSandboxToolInput, timeout: Optional[float] = None) -> str:
+    """Async version of `run_in_e2b_sandbox`.
+
+    Uses the async SDK, so no thread is held while the sandbox runs.  If the
+    calling task is cancelled the sandbox is still killed.
+    """
+    api_key = os.getenv("E2B_API_KEY")
+    if not api_key:
+        raise ValueError("E2B_API_KEY environment variable not set.")
+    if input_data.language not in _LANGUAGES:
+        raise ValueError(f"Unsupported language: {input_data.language}")
+
+    on_output = None
+    if input_data.on_output:
+        on_output = lambda message: input_data.on_output(getattr(message, "line", str(message)))
+
+    try:
+        sandbox = await AsyncSandbox.create(api_key=api_key)
+        try:
+            result = await sandbox.run_code(
+                input_data.script,
+                language=_LANGUAGES[input_data.language],
+                on_stdout=on_output,
+                on_stderr=on_output,
+                timeout=timeout,
+            )
+            return _result_output(result)
+        finally:
+            # Shielded so a cancelled request still tears the sandbox down.
+            await asyncio.shield(sandbox.kill())
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        if input_data.on_output:
+            input_data.on_output(f"E2B Sandbox Error: {e}")
+        raise
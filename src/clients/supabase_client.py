@@ -1,12 +1,50 @@
 from supabase import create_client, Client
+from supabase._async.client import AsyncClient, create_client as create_async_client
+from typing import Optional
+import asyncio
 import os
 
 def get_supabase_client() -> Client:
     """Initializes and returns a Supabase client instance."""
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_ANON_KEY")
-    
+
     if not url or not key:
         raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set.")
-        
+
     return create_client(url, key)
+
+def _init_supabase_client() -> Optional[Client]:
+    try:
+        return get_supabase_client()
+    except Exception as e:
+        print(f"Supabase client not initialized: {e}")
+        return None
+
+# Shared synchronous client used by `supabase_persistence`; None when unconfigured.
+supabase_client: Optional[Client] = _init_supabase_client()
+
+# --- Async client ---
+# One AsyncClient per process: its PostgREST session keeps an httpx connection
+# pool with keep-alive, so requests reuse TCP/TLS connections instead of
+# reconnecting per call.
+
+_ASYNC_CLIENT_LOCK = asyncio.Lock()
+_async_client: Optional[AsyncClient] = None
+
+async def get_async_supabase_client() -> Optional[AsyncClient]:
+    """Return the shared async Supabase client, creating it on first use; None when unconfigured."""
+    global _async_client
+
+    if _async_client is not None:
+        return _async_client
+
+    async with _ASYNC_CLIENT_LOCK:
+        if _async_client is None:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_ANON_KEY")
+            if not url or not key:
+                print("ERROR: SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set.")
+                return None
+            _async_client = await create_async_client(url, key)
+        return _async_client
@@ -1,6 +1,17 @@
+import os
+
 from fastapi import FastAPI
 # Updated imports for the new router structure
-from src.api.routers import agent_router, task_router, sandbox_router
+from src.api.routers import agent_router, task_router, sandbox_router, memory_router, workflow_router
+from src.api.persistence.embedding_cache import get_memory_embedding_cache
+from src.api.persistence.hybrid_retriever import HybridRetriever, configure_memory_retriever
+from src.api.persistence.memory_consolidation import MemoryConsolidator
+from src.api.persistence.surrealdb_persistence import rebuild_memory_index
+from src.api.rate_limit import RateLimiter, RateLimitMiddleware, default_policies
+from src.api.sandbox_jobs import get_sandbox_jobs
+from src.sentient_core.orchestrator.task_queue import get_task_queue
+from src.sentient_core.orchestrator.workflow_runner import get_workflow_runner
+from src.sentient_core.tools.e2b_sandbox_tool import close_sandbox_pools
 
 app = FastAPI(
     title="Sentient Core API",
@@ -11,10 +22,64 @@ app = FastAPI(
     redoc_url="/api/v1/redoc"           # Standard practice for ReDoc
 )
 
+# Rate limits and admission control for sandbox runs and resource creation
+rate_limiter = RateLimiter(default_policies())
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false":
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Include the new routers
 app.include_router(agent_router.router, prefix="/api/v1") # agent_router already has /agents prefix
 app.include_router(task_router.router, prefix="/api/v1")  # task_router already has /tasks prefix
 app.include_router(sandbox_router.router, prefix="/api/v1")  # new sandbox routes
+app.include_router(memory_router.router, prefix="/api/v1")  # memory search
+app.include_router(workflow_router.router, prefix="/api/v1")  # workflow runs and event export
+
+# Hybrid memory search indexes are per-process; load them from the database,
+# with vector search when an embedding function is configured
+@app.on_event("startup")
+async def load_memory_index():
+    embedding_cache = get_memory_embedding_cache()
+    if embedding_cache is not None:
+        configure_memory_retriever(HybridRetriever(embedding_cache=embedding_cache))
+    await rebuild_memory_index()
+
+# Background memory consolidation, enabled by setting an interval in seconds
+memory_consolidator = MemoryConsolidator()
+
+@app.on_event("startup")
+async def start_memory_consolidation():
+    interval = os.getenv("MEMORY_CONSOLIDATION_INTERVAL_SECONDS")
+    if interval:
+        memory_consolidator.embedding_cache = get_memory_embedding_cache()
+        memory_consolidator.start(float(interval))
+
+@app.on_event("shutdown")
+async def stop_memory_consolidation():
+    await memory_consolidator.stop()
+
+# Workers executing tasks queued by POST /agents/{agent_id}/tasks
+@app.on_event("startup")
+async def start_task_queue():
+    get_task_queue().start()
+
+@app.on_event("shutdown")
+async def stop_task_queue():
+    await get_task_queue().stop()
+
+# Orchestrator workflows started by POST /workflows
+@app.on_event("shutdown")
+async def stop_workflow_runner():
+    await get_workflow_runner().shutdown()
+
+# Background sandbox runs started by POST /sandbox/jobs
+@app.on_event("shutdown")
+async def stop_sandbox_jobs():
+    await get_sandbox_jobs().shutdown()
+
+# Warm E2B sandboxes and sessions; last, once nothing above can still use them
+@app.on_event("shutdown")
+async def stop_sandbox_pools():
+    await close_sandbox_pools()
 
 @app.get("/", tags=["Health Check"])
 async def read_root():
@@ -30,3 +95,11 @@ async def read_api_v1_root():
     API v1 root endpoint for health check.
     """
     return {"status": "ok", "message": "Welcome to the Sentient Core API v1!"}
+
+
+@app.get("/api/v1/metrics/rate-limits", tags=["Health Check"])
+async def read_rate_limit_metrics():
+    """
+    Allowed, rate-limited, shed, in-flight and queued requests per rate-limit policy.
+    """
+    return rate_limiter.stats()
@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional
 from src.sentient_core.state.event_bus import EventBus
 from src.sentient_core.state.state_manager import StateManager
 from src.sentient_core.state.state_models import AgentEvent, EventType, TaskState, TaskStatus
+from src.sentient_core.tools.output_stream import ProgressForwarder
 
 
 class BaseAgent(ABC):
@@ -75,6 +76,7 @@ class BaseAgent(ABC):
             )
             await self._publish_event(workflow_id, task_id, EventType.AGENT_COMPLETED)
             await self.log(workflow_id, task_id, "Task completed successfully.")
+            return output_data
 
         except Exception as e:
             await self.log(workflow_id, task_id, f"Error executing task: {e}", level="error")
@@ -84,6 +86,7 @@ class BaseAgent(ABC):
                 status=TaskStatus.FAILED,
                 output_data={"error": str(e)},
             )
+            return {"status": "failed", "message": str(e)}
 
     async def log(self, workflow_id: str, task_id: str, message: str, level: str = "info") -> None:
         """Logs a message by publishing a TASK_PROGRESS event."""
@@ -95,6 +98,18 @@ class BaseAgent(ABC):
             payload={"level": level, "message": message},
         )
 
+    async def run_sandbox_tool(self, workflow_id: str, task_id: str, tool_input: Any) -> Dict[str, Any]:
+        """Runs `sandbox_tool`, publishing its command output as rate-limited TASK_PROGRESS events."""
+
+        async def publish(payload: Dict[str, str]) -> None:
+            await self._publish_event(workflow_id, task_id, EventType.TASK_PROGRESS, payload=payload)
+
+        forwarder = ProgressForwarder(publish)
+        try:
+            return await self.sandbox_tool.run(tool_input, on_output=forwarder)
+        finally:
+            await forwarder.flush()
+
     async def _publish_event(
         self, workflow_id: str, task_id: str, event_type: EventType, payload: Optional[Dict] = None
     ) -> None:
@@ -1,9 +1,11 @@
+import os
 from dataclasses import dataclass
 from typing import Literal, Optional
 
 # Define constants for sandbox types for clarity and to avoid magic strings
 SANDBOX_TYPE_E2B = "e2b"
 SANDBOX_TYPE_WEB_CONTAINER = "webcontainer"  # normalized without hyphen
+SANDBOX_TYPE_LOCAL = "local"
 
 
 @dataclass
@@ -22,6 +24,9 @@ class SandboxTaskRequirements:
     # True if the task handles sensitive data that requires network restrictions.
     is_data_sensitive: bool = False
 
+    # True if the code is trusted to run as local processes (tests, benchmarks, on-prem).
+    is_trusted: bool = False
+
 
 def choose_sandbox(requirements: SandboxTaskRequirements) -> str:
     """
@@ -34,8 +39,13 @@ def choose_sandbox(requirements: SandboxTaskRequirements) -> str:
         requirements: An object specifying the needs of the task.
 
     Returns:
-        The recommended sandbox type, either 'e2b' or 'webcontainer'.
+        The recommended sandbox type: 'e2b', 'webcontainer' or 'local'.
     """
+    # 0. Trusted code without UI or data-protection needs? -> local processes
+    # No remote service to reach, so the lowest latency.
+    if requirements.is_trusted and not (requirements.is_data_sensitive or requirements.requires_ui_feedback):
+        return SANDBOX_TYPE_LOCAL
+
     # 1. Does the task need Python or other shell binaries? -> E2B
     if requirements.language in ["python", "bash"]:
         return SANDBOX_TYPE_E2B
@@ -72,11 +82,19 @@ class Chooser:
         "html", "css", "frontend", "ui", "react", "next.js", "javascript"
     ]
 
+    def __init__(self, trusted: Optional[bool] = None):
+        """
+        Args:
+            trusted: Treat tasks as trusted, so non-UI ones run in the local
+                sandbox. Defaults to SANDBOX_BACKEND=local in the environment.
+        """
+        self.trusted = os.getenv("SANDBOX_BACKEND") == SANDBOX_TYPE_LOCAL if trusted is None else trusted
+
     def choose_sandbox(self, task_description: str) -> str:
         """Infer sandbox type from a raw task description string."""
         lowered = task_description.lower()
         if any(kw in lowered for kw in self._KEYWORDS_FRONTEND):
-            req = SandboxTaskRequirements(language="javascript", requires_ui_feedback=True)
+            req = SandboxTaskRequirements(language="javascript", requires_ui_feedback=True, is_trusted=self.trusted)
         else:
-            req = SandboxTaskRequirements(language="python")
+            req = SandboxTaskRequirements(language="python", is_trusted=self.trusted)
         return choose_sandbox(req)
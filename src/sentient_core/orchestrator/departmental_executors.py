@@ -1,10 +1,13 @@
 # Departmental Executor Agents using LangGraph
 
 import asyncio
-from typing import Dict, Any, List, TypedDict
+import inspect
+import os
+from typing import Callable, Dict, Any, List, Optional, TypedDict
+from uuid import uuid4
 from langgraph.graph import StateGraph, END
 from .shared_state import Task
-from ..tools import E2BSandboxTool, WebContainerTool
+from ..tools import E2BSandboxTool, LocalSandboxTool, WebContainerTool
 from ..specialized_agents import (
     ResearchAgent,
     DataAgent,
@@ -19,17 +22,63 @@ import logging
 logger = logging.getLogger(__name__)
 
 class ExecutorGraphState(TypedDict):
+    workflow_id: str
     tasks_to_process: List[Task]
     current_task_index: int
     current_task_result: Any
     completed_task_outputs: List[Any]
     error_message: str
 
-class DepartmentalExecutor:
+class SandboxTools:
+    """The sandbox tools agents run on, picked per task by its `sandbox_type`.
+
+    Shared by `DepartmentalExecutor` and the API task queue so both hand
+    agents the same tools.
+    """
+
     def __init__(self):
-        self.workflow = StateGraph(ExecutorGraphState)
-        self.e2b_tool = E2BSandboxTool()
+        self.local_tool = LocalSandboxTool()
+        # SANDBOX_BACKEND=local runs E2B tasks locally too, e.g. to benchmark without an API key.
+        # They stand in for remote sandboxes, so they get no network on the host; on hosts
+        # without unprivileged network namespaces this fails here rather than per command.
+        if os.getenv("SANDBOX_BACKEND") == "local":
+            self.e2b_tool = LocalSandboxTool(network=False)
+        else:
+            self.e2b_tool = E2BSandboxTool()
         self.webcontainer_tool = WebContainerTool()
+
+    def sandbox_tool_for(self, sandbox_type: Optional[str]) -> Optional[Any]:
+        """'webcontainer' and 'local' name their tools; any other type runs on E2B, none on no tool."""
+        if not sandbox_type:
+            return None
+        sandbox_type = sandbox_type.lower()
+        if sandbox_type == 'webcontainer':
+            return self.webcontainer_tool
+        if sandbox_type == 'local':
+            return self.local_tool
+        return self.e2b_tool
+
+    async def end_sessions(self, workflow_id: str) -> None:
+        """Release the sandbox sessions the agents opened under `workflow_id`.
+
+        Tools without sessions (no `end_session`) are skipped.
+        """
+        tools = {id(tool): tool for tool in (self.e2b_tool, self.local_tool, self.webcontainer_tool)}
+        for tool in tools.values():
+            if not hasattr(tool, "end_session"):
+                continue
+            try:
+                ended = tool.end_session(workflow_id)
+                if inspect.isawaitable(ended):
+                    await ended
+            except Exception:
+                logger.exception(f"Ending sandbox session {workflow_id} failed")
+
+
+class DepartmentalExecutor(SandboxTools):
+    def __init__(self):
+        super().__init__()
+        self.workflow = StateGraph(ExecutorGraphState)
         self._setup_graph()
         self.app = self.workflow.compile()
 
@@ -42,16 +91,26 @@ class DepartmentalExecutor:
             "Integration": IntegrationAgent,
             "Deployment": DeploymentAgent
         }
+        # Optional progress callback, called as on_event(event_type, data).
+        self.on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
         logger.info("DepartmentalExecutor initialized with LangGraph workflow.")
 
+    def _emit(self, event_type: str, data: Dict[str, Any]) -> None:
+        if self.on_event:
+            try:
+                self.on_event(event_type, data)
+            except Exception:
+                logger.exception(f"Progress callback failed for {event_type}")
+
     def _setup_graph(self):
         self.workflow.add_node("get_next_task", self._get_next_task)
         self.workflow.add_node("execute_single_task", self._execute_single_task)
         self.workflow.add_node("handle_error", self._handle_error)
         self.workflow.set_entry_point("get_next_task")
+        # get_next_task has already advanced the index past the task to run.
         self.workflow.add_conditional_edges(
             "get_next_task",
-            lambda s: "execute_single_task" if s.get('current_task_index', 0) < len(s.get('tasks_to_process', [])) else END
+            lambda s: "execute_single_task" if s.get('current_task_index', 0) <= len(s.get('tasks_to_process', [])) else END
         )
         self.workflow.add_conditional_edges(
             "execute_single_task",
@@ -68,6 +127,7 @@ class DepartmentalExecutor:
         current_index = state['current_task_index'] - 1
         task = state['tasks_to_process'][current_index]
         logger.info(f"Executing task: {task.task}")
+        self._emit("task_started", {"task_id": str(task.task_id), "department": task.department, "task": task.task})
 
         try:
             if task.depends_on:
@@ -88,43 +148,43 @@ class DepartmentalExecutor:
             if not agent_class:
                 raise ValueError(f"No agent for department: {task.department}")
 
-            # Get the appropriate sandbox tool based on task requirements
-            sandbox_tool = None
-            if hasattr(task, 'sandbox_type') and task.sandbox_type:
-                sandbox_tool = (
-                    self.webcontainer_tool 
-                    if task.sandbox_type.lower() == 'webcontainer' 
-                    else self.e2b_tool
-                )
-            
-            # Initialize agent with sandbox tool
-            agent = agent_class(sandbox_tool=sandbox_tool)
+            # Initialize agent with the sandbox tool the task asks for
+            agent = agent_class(sandbox_tool=self.sandbox_tool_for(task.sandbox_type))
             
             # Execute the task with proper async handling
-            result = await agent.execute_task(task=task)
+            result = await agent.execute_task(workflow_id=state['workflow_id'], task=task)
 
             result_with_id = {**result, "task_id": task.task_id}
             completed_outputs = state['completed_task_outputs'] + [result_with_id]
+            failed = result.get("status") == "failed"
+            self._emit("task_failed" if failed else "task_completed", {"task_id": str(task.task_id), "result": result})
 
-            if result.get("status") == "failed":
+            if failed:
                 return {**state, "error_message": result.get('message'), "completed_task_outputs": completed_outputs}
 
             return {**state, "current_task_result": result_with_id, "completed_task_outputs": completed_outputs}
 
         except Exception as e:
             logger.exception(f"Critical error executing task '{task.task}': {e}")
+            self._emit("task_failed", {"task_id": str(task.task_id), "error": str(e)})
             return {**state, "error_message": str(e)}
 
     def _handle_error(self, state: ExecutorGraphState) -> ExecutorGraphState:
         logger.error(f"Handling error: {state.get('error_message')}")
         return {**state}
 
-    async def execute_plan(self, tasks: List[Task]) -> Dict[str, Any]:
-        logger.info(f"Executing plan with {len(tasks)} tasks.")
+    async def execute_plan(self, tasks: List[Task], workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run `tasks` as one workflow; agents share sandbox sessions keyed by `workflow_id`,
+        which are released when the plan finishes."""
+        workflow_id = workflow_id or str(uuid4())
+        logger.info(f"Executing plan with {len(tasks)} tasks as workflow {workflow_id}.")
         initial_state = ExecutorGraphState(
-            tasks_to_process=tasks, current_task_index=0, completed_task_outputs=[], error_message=''
+            workflow_id=workflow_id, tasks_to_process=tasks, current_task_index=0, completed_task_outputs=[], error_message=''
         )
-        final_state = await self.app.ainvoke(initial_state)
+        try:
+            final_state = await self.app.ainvoke(initial_state)
+        finally:
+            await self.end_sessions(workflow_id)
 
         if final_state.get('error_message'):
             return {"status": "failed", "results": final_state.get('completed_task_outputs', []), "error": final_state.get('error_message')}
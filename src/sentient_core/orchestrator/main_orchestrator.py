@@ -1,5 +1,6 @@
 import asyncio
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
 from .c_suite_planner import CSuitePlanner
 from .departmental_executors import DepartmentalExecutor
 from .shared_state import Plan, Task, OrchestratorState
@@ -9,38 +10,62 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 class MainOrchestrator:
-    def __init__(self, command: str):
+    def __init__(self, command: str, workflow_id: Optional[str] = None):
+        """
+        Args:
+            command: What to plan and execute.
+            workflow_id: Id the agents run and publish events under; a new one by default.
+        """
         self.command = command
         self.planner = CSuitePlanner()
         self.executor = DepartmentalExecutor()
-        self.state = OrchestratorState(plan=None, completed_tasks=[], final_result=None)
+        self.workflow_id = workflow_id or str(uuid4())
+        self.state = OrchestratorState(plan=None, metadata={"workflow_id": self.workflow_id})
         logger.info("MainOrchestrator initialized.")
 
-    async def run(self):
+    async def run(self, on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> OrchestratorState:
+        """Plan and execute the command.
+
+        Args:
+            on_event: Optional progress callback, called as on_event(event_type, data)
+                for the plan and for every task the executor starts and finishes.
+        """
         logger.info(f"Received command: '{self.command}'. Starting orchestration.")
-        
-        # 1. Create a plan
+        self.executor.on_event = on_event
+
+        # 1. Create a plan (in a thread: planning may block on an LLM call)
         logger.info("Creating a plan...")
-        plan_dict = self.planner.create_plan(self.command)
+        self.state.workflow_status = "planning"
+        plan_dict = await asyncio.to_thread(self.planner.create_plan, self.command)
         tasks = [Task(**task_data) for task_data in plan_dict['tasks']]
         self.state.plan = Plan(project_name=plan_dict['project_name'], tasks=tasks)
         logger.info(f"Plan created for project: '{self.state.plan.project_name}' with {len(tasks)} tasks.")
+        if on_event:
+            on_event("plan_created", {
+                "project_name": self.state.plan.project_name,
+                "tasks": [{"task_id": str(t.task_id), "department": t.department, "task": t.task} for t in tasks],
+            })
 
         # 2. Execute the plan
         logger.info("Executing the plan...")
-        execution_result = await self.executor.execute_plan(self.state.plan.tasks)
+        self.state.workflow_status = "executing"
+        execution_result = await self.executor.execute_plan(self.state.plan.tasks, workflow_id=self.workflow_id)
         
         # 3. Process results
         if execution_result["status"] == "success":
             logger.info("Plan execution completed successfully.")
             self.state.completed_tasks = execution_result["results"]
             self.state.final_result = "Orchestration successful."
+            self.state.workflow_status = "completed"
         else:
             logger.error(f"Plan execution failed: {execution_result.get('error')}")
             self.state.completed_tasks = execution_result.get("results", [])
             self.state.final_result = f"Orchestration failed: {execution_result.get('error')}"
+            self.state.workflow_status = "failed"
+            self.state.error = execution_result.get("error")
 
         logger.info("Orchestration finished.")
+        return self.state
 
     @staticmethod
     def main(command: str):
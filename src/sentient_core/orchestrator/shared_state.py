@@ -29,6 +29,8 @@ class OrchestratorState(BaseModel):
     current_plan: Optional[Plan] = None  # Alias for backwards compatibility
     active_tasks: Dict[UUID, Task] = Field(default_factory=dict)
     task_results: Dict[UUID, Dict] = Field(default_factory=dict)
+    completed_tasks: List[Dict] = Field(default_factory=list)  # Executor outputs, in execution order
+    final_result: Optional[str] = None
     workflow_status: str = "idle"  # idle, planning, executing, completed, failed
     error: Optional[str] = None
     metadata: Dict = Field(default_factory=dict, description="Additional metadata for the workflow")
@@ -0,0 +1,305 @@
+"""In-process job queue that runs API tasks on a pool of asyncio workers.
+
+`POST /api/v1/agents/{agent_id}/tasks` stores the task as PENDING and
+enqueues it here.  A worker hands the job to the runner, by default
+`AgentTaskRunner`, which marks the task RUNNING, executes it with the
+specialized agent for the owning agent's department and writes COMPLETED /
+FAILED plus the output back to Supabase, so `GET /api/v1/tasks/{task_id}`
+reports progress.  Tasks still running when the queue stops are marked
+FAILED rather than left RUNNING.
+
+Concurrency is bounded twice: `concurrency` workers in total, and at most
+`per_agent_limit` running jobs per agent.  A job whose agent is at its limit
+is parked and put back on the queue when one of that agent's jobs finishes,
+so a busy agent never holds workers that could serve other agents.
+
+Jobs flow through a `QueueBackend`.  `LocalQueueBackend` keeps them in
+memory, so no broker is needed; jobs still queued when the process exits are
+lost, but their tasks stay PENDING in Supabase and can be enqueued again.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Protocol, Tuple, Type
+
+from src.api.models.core_models import AgentRead, TaskStatus, TaskUpdate
+from src.api.persistence import async_supabase_persistence
+from ..state.state_models import TaskState
+
+logger = logging.getLogger(__name__)
+
+_SEQUENCE = itertools.count()
+
+
+@dataclass(order=True)
+class QueueJob:
+    """A task waiting for a worker; higher `priority` runs first, then FIFO."""
+
+    sort_key: Tuple[int, int] = field(init=False, repr=False)
+    task_id: uuid.UUID = field(compare=False)
+    agent_id: Optional[uuid.UUID] = field(default=None, compare=False)
+    priority: int = field(default=0, compare=False)
+    enqueued_at: float = field(default_factory=time.monotonic, compare=False)
+    seq: int = field(default_factory=lambda: next(_SEQUENCE), compare=False)
+
+    def __post_init__(self):
+        self.sort_key = (-self.priority, self.seq)
+
+
+class QueueBackend(Protocol):
+    """Where queued jobs wait between `enqueue` and a worker picking them up."""
+
+    async def put(self, job: QueueJob) -> None: ...
+
+    async def get(self) -> QueueJob: ...
+
+    def qsize(self) -> int: ...
+
+
+class LocalQueueBackend:
+    """Priority queue held in this process's memory."""
+
+    def __init__(self):
+        self._queue: "asyncio.PriorityQueue[QueueJob]" = asyncio.PriorityQueue()
+
+    async def put(self, job: QueueJob) -> None:
+        self._queue.put_nowait(job)
+
+    async def get(self) -> QueueJob:
+        return await self._queue.get()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+Runner = Callable[[QueueJob], Awaitable[Any]]
+
+
+class TaskQueue:
+    """Worker pool draining a `QueueBackend` with global and per-agent concurrency limits."""
+
+    def __init__(
+        self,
+        runner: Runner,
+        concurrency: int = 8,
+        per_agent_limit: int = 2,
+        backend: Optional[QueueBackend] = None,
+    ):
+        """
+        Args:
+            runner: Awaited once per job; exceptions are logged and counted in `failed`.
+            concurrency: Number of worker coroutines.
+            per_agent_limit: Maximum jobs running at once for one agent id.
+            backend: Job storage; defaults to `LocalQueueBackend`.
+        """
+        self.runner = runner
+        self.concurrency = concurrency
+        self.per_agent_limit = per_agent_limit
+        self.backend = backend or LocalQueueBackend()
+
+        self.processed = 0
+        self.failed = 0
+
+        self._running: Dict[Optional[uuid.UUID], int] = defaultdict(int)
+        self._parked: Dict[Optional[uuid.UUID], Deque[QueueJob]] = defaultdict(deque)
+        self._unfinished = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._workers: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    async def enqueue(self, task_id: uuid.UUID, agent_id: Optional[uuid.UUID] = None, priority: int = 0) -> QueueJob:
+        job = QueueJob(task_id=task_id, agent_id=agent_id, priority=priority)
+        self._unfinished += 1
+        self._drained.clear()
+        await self.backend.put(job)
+        return job
+
+    async def join(self) -> None:
+        """Wait until every enqueued job has been run."""
+        await self._drained.wait()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.backend.qsize(),
+            "parked": sum(len(jobs) for jobs in self._parked.values()),
+            "running": sum(self._running.values()),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-queue-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info("Task queue started with %d workers (per-agent limit %d).", self.concurrency, self.per_agent_limit)
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs that were running are cancelled and not retried."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.backend.get()
+            key = job.agent_id
+            if key is not None and self._running[key] >= self.per_agent_limit:
+                self._parked[key].append(job)
+                continue
+            self._running[key] += 1
+            try:
+                await self.runner(job)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+                logger.exception("Task queue job for task %s failed.", job.task_id)
+            finally:
+                self._running[key] -= 1
+                if not self._running[key]:
+                    del self._running[key]
+                parked = self._parked.get(key)
+                if parked:
+                    await self.backend.put(parked.popleft())
+                    if not parked:
+                        del self._parked[key]
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._drained.set()
+
+
+# Sandbox a department's agent needs when the task's input_data names none.
+DEFAULT_SANDBOX_TYPES = {
+    "BackendDevelopment": "e2b",
+    "FrontendDevelopment": "webcontainer",
+    "Bridge": "webcontainer",
+}
+
+
+class AgentTaskRunner:
+    """Runs a queued Supabase task with the specialized agent for its agent's department.
+
+    The department is the agent's `config["department"]`, or else the first of
+    its `capabilities` that names a department in `AGENTS_BY_DEPARTMENT`.
+
+    The agent gets the sandbox tool for `input_data["sandbox_type"]`, or else
+    its department's entry in `DEFAULT_SANDBOX_TYPES`, and runs under
+    `input_data["workflow_id"]` when the task belongs to a workflow; a
+    standalone task is its own workflow, under a fresh id.
+    """
+
+    def __init__(
+        self,
+        persistence: Any = async_supabase_persistence,
+        agent_classes: Optional[Dict[str, Type]] = None,
+        sandbox_tools: Optional[Any] = None,
+    ):
+        """
+        Args:
+            persistence: Module or object with the async Supabase task/agent functions.
+            agent_classes: Agent class per department; defaults to `AGENTS_BY_DEPARTMENT`.
+            sandbox_tools: `SandboxTools` to pick agents' tools from; built on the
+                first task that needs a sandbox.
+        """
+        if agent_classes is None:
+            # Imported here so the API does not load every agent (and its sandbox
+            # tools) just to mount the router.
+            from ..specialized_agents import AGENTS_BY_DEPARTMENT
+            agent_classes = AGENTS_BY_DEPARTMENT
+        self.db = persistence
+        self.agent_classes = agent_classes
+        self._sandbox_tools = sandbox_tools
+
+    @property
+    def sandbox_tools(self) -> Any:
+        if self._sandbox_tools is None:
+            from .departmental_executors import SandboxTools
+            self._sandbox_tools = SandboxTools()
+        return self._sandbox_tools
+
+    def department_for(self, agent: Optional[AgentRead]) -> Optional[str]:
+        if agent is None:
+            return None
+        department = (agent.config or {}).get("department")
+        if department in self.agent_classes:
+            return department
+        return next((c for c in agent.capabilities if c in self.agent_classes), None)
+
+    async def __call__(self, job: QueueJob) -> None:
+        task = await self.db.update_task(job.task_id, TaskUpdate(status=TaskStatus.RUNNING))
+        if task is None:
+            logger.warning("Queued task %s no longer exists; skipping.", job.task_id)
+            return
+
+        input_data = task.input_data or {}
+        workflow_id = str(input_data.get("workflow_id") or uuid.uuid4())
+        sandbox_type = None
+        try:
+            agent = await self.db.get_agent(task.agent_id) if task.agent_id else None
+            department = self.department_for(agent)
+            if department is None:
+                raise ValueError(f"No specialized agent for agent {task.agent_id}")
+            task_state = TaskState(
+                task_id=str(task.task_id),
+                department=department,
+                description=task.description or task.name,
+                # TaskState carries string values only.
+                input_data={k: v if isinstance(v, str) else json.dumps(v) for k, v in input_data.items()},
+            )
+            sandbox_type = input_data.get("sandbox_type") or DEFAULT_SANDBOX_TYPES.get(department)
+            sandbox_tool = self.sandbox_tools.sandbox_tool_for(sandbox_type) if sandbox_type else None
+            agent = self.agent_classes[department](sandbox_tool=sandbox_tool)
+            result = await agent.execute_task(workflow_id=workflow_id, task=task_state) or {}
+            failed = result.get("status") == "failed"
+        except asyncio.CancelledError:
+            await self.db.update_task(
+                job.task_id,
+                TaskUpdate(status=TaskStatus.FAILED, output_data={"status": "failed", "message": "Task queue stopped before the task finished."}),
+            )
+            raise
+        except Exception as e:
+            logger.exception("Error executing queued task %s.", job.task_id)
+            result, failed = {"status": "failed", "message": str(e)}, True
+        finally:
+            if sandbox_type and self._sandbox_tools is not None:
+                await self._sandbox_tools.end_sessions(workflow_id)
+
+        status = TaskStatus.FAILED if failed else TaskStatus.COMPLETED
+        await self.db.update_task(job.task_id, TaskUpdate(status=status, output_data=result))
+
+
+_task_queue: Optional[TaskQueue] = None
+
+
+def get_task_queue() -> TaskQueue:
+    """Process-wide queue used by the API, sized from the environment."""
+    global _task_queue
+    if _task_queue is None:
+        _task_queue = TaskQueue(
+            AgentTaskRunner(),
+            concurrency=int(os.getenv("TASK_QUEUE_CONCURRENCY", "8")),
+            per_agent_limit=int(os.getenv("TASK_QUEUE_PER_AGENT_LIMIT", "2")),
+        )
+    return _task_queue
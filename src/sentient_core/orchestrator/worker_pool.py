@@ -0,0 +1,388 @@
+"""Multi-process deployment mode for the orchestrator.
+
+`WorkflowRunner` runs every workflow on one event loop, so plan parsing,
+Pydantic validation, result aggregation and blocking SDK calls all share one
+GIL.  `WorkerPool` instead starts N worker processes that pull workflows from a
+lease table in a local SQLite database:
+
+- The coordinator (or any process with the database path) `submit`s a
+  command; it is stored as ``queued``.
+- A worker claims the oldest claimable row in a single ``BEGIN IMMEDIATE``
+  transaction, which sets it ``running``, records the worker id and a lease
+  expiry, and counts the attempt.
+- While the orchestrator runs, a heartbeat thread renews the lease every
+  `heartbeat_interval` seconds, so a workflow blocking its event loop does not
+  lose the lease.  If a renewal finds the lease taken over, the run is
+  cancelled.
+- A row whose lease expired (the worker died or hung) becomes claimable again,
+  until `max_attempts` is reached, after which it is marked ``failed``.
+
+Each worker runs one event loop for its whole life, so process-wide async
+singletons (the sandbox pool, cached SDK clients) stay bound to a live loop
+across workflows.  SQLite in WAL mode is enough for a single host and needs
+no broker.  The
+orchestrator class is given as an import path (``"package.module:attr"``) so
+worker processes, which are spawned rather than forked, can import it.
+
+Run a pool from the command line with::
+
+    python -m src.sentient_core.orchestrator.worker_pool --workers 4 "Build a landing page"
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORCHESTRATOR = "src.sentient_core.orchestrator.main_orchestrator:MainOrchestrator"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_leases (
+    workflow_id      TEXT PRIMARY KEY,
+    command          TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    worker_id        TEXT,
+    lease_expires_at REAL,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    result           TEXT,
+    error            TEXT,
+    created_at       REAL NOT NULL,
+    updated_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workflow_leases_claim_idx ON workflow_leases (status, created_at);
+"""
+
+
+@dataclass
+class WorkflowLease:
+    """A row of the lease table."""
+
+    workflow_id: str
+    command: str
+    status: str
+    worker_id: Optional[str]
+    lease_expires_at: Optional[float]
+    attempts: int
+    result: Optional[str]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+
+def _serialized(method):
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    wrapper.__name__, wrapper.__doc__ = method.__name__, method.__doc__
+    return wrapper
+
+
+class LeaseStore:
+    """Workflow lease table in a SQLite database shared by the pool's processes.
+
+    Each process opens its own store on the same path.  Within a process the
+    store may be used from several threads; its calls are serialized.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @_serialized
+    def close(self) -> None:
+        self._conn.close()
+
+    @_serialized
+    def enqueue(self, command: str) -> str:
+        workflow_id = str(uuid.uuid4())
+        now = self.clock()
+        self._conn.execute(
+            "INSERT INTO workflow_leases (workflow_id, command, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (workflow_id, command, QUEUED, now, now),
+        )
+        return workflow_id
+
+    @_serialized
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[WorkflowLease]:
+        """Lease the oldest queued or expired workflow to `worker_id`, if any."""
+        now = self.clock()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts will never be claimed.
+            self._conn.execute(
+                "UPDATE workflow_leases SET status = ?, error = ?, worker_id = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (FAILED, f"Lease expired after {self.max_attempts} attempts", now, RUNNING, now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "SELECT workflow_id FROM workflow_leases "
+                "WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE workflow_leases SET status = ?, worker_id = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE workflow_id = ?",
+                    (RUNNING, worker_id, now + lease_seconds, now, row["workflow_id"]),
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return self.get(row["workflow_id"]) if row is not None else None
+
+    @_serialized
+    def heartbeat(self, workflow_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease; False if `worker_id` no longer holds it."""
+        now = self.clock()
+        cursor = self._conn.execute(
+            "UPDATE workflow_leases SET lease_expires_at = ?, updated_at = ? "
+            "WHERE workflow_id = ? AND worker_id = ? AND status = ?",
+            (now + lease_seconds, now, workflow_id, worker_id, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    @_serialized
+    def finish(self, workflow_id: str, worker_id: str, status: str,
+               result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """Record the outcome; ignored (False) if the lease was lost meanwhile."""
+        cursor = self._conn.execute(
+            "UPDATE workflow_leases SET status = ?, result = ?, error = ?, lease_expires_at = NULL, updated_at = ? "
+            "WHERE workflow_id = ? AND worker_id = ? AND status = ?",
+            (status, result, error, self.clock(), workflow_id, worker_id, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    @_serialized
+    def get(self, workflow_id: str) -> Optional[WorkflowLease]:
+        row = self._conn.execute("SELECT * FROM workflow_leases WHERE workflow_id = ?", (workflow_id,)).fetchone()
+        return WorkflowLease(**dict(row)) if row is not None else None
+
+    @_serialized
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM workflow_leases GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+def load_factory(path: str) -> Callable:
+    """Import ``"package.module:attr"``."""
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+async def run_leased_workflow(store: LeaseStore, lease: WorkflowLease, worker_id: str, factory: Callable,
+                              lease_seconds: float, heartbeat_interval: float) -> None:
+    """Run one claimed workflow, renewing its lease from a thread until it finishes."""
+    loop = asyncio.get_running_loop()
+    # The lease's id is the one the workflow was submitted (and is queried) under.
+    run = asyncio.create_task(factory(lease.command, workflow_id=lease.workflow_id).run())
+    finished = threading.Event()
+
+    def keep_lease():
+        while not finished.wait(heartbeat_interval):
+            if not store.heartbeat(lease.workflow_id, worker_id, lease_seconds):
+                logger.warning(f"Worker {worker_id} lost the lease on workflow {lease.workflow_id}; cancelling.")
+                loop.call_soon_threadsafe(run.cancel)
+                return
+
+    heartbeat = threading.Thread(target=keep_lease, name=f"{worker_id}-heartbeat", daemon=True)
+    heartbeat.start()
+    try:
+        state = await run
+        if getattr(state, "workflow_status", None) == FAILED:
+            await asyncio.to_thread(store.finish, lease.workflow_id, worker_id, FAILED,
+                                    result=state.final_result, error=state.error)
+        else:
+            await asyncio.to_thread(store.finish, lease.workflow_id, worker_id, COMPLETED,
+                                    result=getattr(state, "final_result", None))
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.exception(f"Workflow {lease.workflow_id} failed in worker {worker_id}")
+        await asyncio.to_thread(store.finish, lease.workflow_id, worker_id, FAILED, error=str(e))
+    finally:
+        finished.set()
+        await asyncio.to_thread(heartbeat.join)
+
+
+async def _worker_loop(store: LeaseStore, worker_id: str, factory: Callable, stop_event,
+                       lease_seconds: float, heartbeat_interval: float, poll_interval: float) -> None:
+    while not stop_event.is_set():
+        lease = await asyncio.to_thread(store.claim, worker_id, lease_seconds)
+        if lease is None:
+            await asyncio.to_thread(stop_event.wait, poll_interval)
+            continue
+        logger.info(f"Worker {worker_id} claimed workflow {lease.workflow_id} (attempt {lease.attempts}).")
+        await run_leased_workflow(store, lease, worker_id, factory, lease_seconds, heartbeat_interval)
+
+
+def worker_main(db_path: str, worker_id: str, factory_path: str, stop_event, lease_seconds: float = 30.0,
+                heartbeat_interval: float = 10.0, poll_interval: float = 0.5, max_attempts: int = 3) -> None:
+    """Entry point of a worker process: claim, run and report workflows until `stop_event` is set.
+
+    All workflows of the process run on one event loop.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    factory = load_factory(factory_path)
+    store = LeaseStore(db_path, max_attempts=max_attempts)
+    try:
+        asyncio.run(_worker_loop(store, worker_id, factory, stop_event,
+                                 lease_seconds, heartbeat_interval, poll_interval))
+    finally:
+        store.close()
+
+
+class WorkerPool:
+    """Coordinator that owns the lease table and N worker processes."""
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: Optional[int] = None,
+        orchestrator_factory: str = DEFAULT_ORCHESTRATOR,
+        lease_seconds: float = 30.0,
+        heartbeat_interval: float = 10.0,
+        poll_interval: float = 0.5,
+        max_attempts: int = 3,
+    ):
+        """
+        Args:
+            db_path: SQLite file holding the lease table; created if missing.
+            workers: Worker processes to run; defaults to the CPU count.
+            orchestrator_factory: ``"module:attr"`` building an orchestrator as
+                ``factory(command, workflow_id=...)``, with an ``async run()``
+                returning an `OrchestratorState`.
+            lease_seconds: How long a claim lasts without a heartbeat.
+            heartbeat_interval: How often a busy worker renews its lease.
+            poll_interval: How long an idle worker waits before polling again.
+            max_attempts: Claims allowed per workflow before it is marked failed.
+        """
+        if heartbeat_interval >= lease_seconds:
+            raise ValueError("heartbeat_interval must be shorter than lease_seconds")
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.orchestrator_factory = orchestrator_factory
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self.store = LeaseStore(db_path, max_attempts=max_attempts)
+        # Spawned, not forked: the coordinator may be running an event loop and
+        # holding open connections that must not be shared with children.
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: Dict[str, multiprocessing.process.BaseProcess] = {}
+
+    def submit(self, command: str) -> str:
+        return self.store.enqueue(command)
+
+    def get(self, workflow_id: str) -> Optional[WorkflowLease]:
+        return self.store.get(workflow_id)
+
+    def wait(self, workflow_ids: List[str], timeout: Optional[float] = None) -> List[WorkflowLease]:
+        """Block until every workflow in `workflow_ids` is done; raises TimeoutError otherwise."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            leases = [self.store.get(workflow_id) for workflow_id in workflow_ids]
+            if all(lease is not None and lease.done for lease in leases):
+                return leases
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{sum(not lease.done for lease in leases)} workflows still pending")
+            self.supervise()
+            time.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        self._stop.clear()
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(f"Worker pool started with {self.workers} processes on {self.db_path}.")
+
+    def supervise(self) -> None:
+        """Replace worker processes that exited unexpectedly.
+
+        Their workflows are picked up again once the lease expires.
+        """
+        if self._stop.is_set():
+            return
+        for worker_id, process in list(self._processes.items()):
+            if not process.is_alive():
+                logger.warning(f"Worker {worker_id} exited with code {process.exitcode}; restarting.")
+                del self._processes[worker_id]
+                self._spawn()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask workers to exit after their current workflow, then terminate stragglers."""
+        self._stop.set()
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes.clear()
+
+    def _spawn(self) -> None:
+        worker_id = f"worker-{uuid.uuid4().hex[:8]}"
+        process = self._context.Process(
+            target=worker_main,
+            name=worker_id,
+            args=(self.db_path, worker_id, self.orchestrator_factory, self._stop),
+            kwargs={
+                "lease_seconds": self.lease_seconds,
+                "heartbeat_interval": self.heartbeat_interval,
+                "poll_interval": self.poll_interval,
+                "max_attempts": self.max_attempts,
+            },
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run orchestrator workflows on a pool of worker processes.")
+    parser.add_argument("commands", nargs="+", help="Commands to orchestrate, one workflow each.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKER_POOL_SIZE", "0")) or None)
+    parser.add_argument("--db", default=os.getenv("WORKER_POOL_DB", "data/workflow_leases.db"))
+    parser.add_argument("--lease-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    pool = WorkerPool(args.db, workers=args.workers, lease_seconds=args.lease_seconds)
+    workflow_ids = [pool.submit(command) for command in args.commands]
+    pool.start()
+    try:
+        for lease in pool.wait(workflow_ids):
+            print(f"{lease.workflow_id}  {lease.status:9s}  {lease.result or lease.error or ''}")
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
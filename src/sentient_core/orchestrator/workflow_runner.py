@@ -0,0 +1,188 @@
+"""Runs `MainOrchestrator` workflows as background tasks on the API's event loop.
+
+`submit()` registers a workflow and returns it at once; the orchestration runs
+in an asyncio task, at most `max_concurrent` at a time, with the rest QUEUED.
+Progress callbacks from the orchestrator are appended to the workflow's event
+log.  `events()` replays that log from any position and then follows it live,
+so SSE clients that reconnect with `Last-Event-ID` miss nothing.
+
+State is in memory and per process.  The newest `max_finished` finished
+workflows are kept so late subscribers can still read their full history.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.api.models.core_models import WorkflowRunStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowEvent:
+    """One entry of a workflow's event log; `seq` starts at 1 and is the SSE id."""
+
+    seq: int
+    type: str
+    data: Dict[str, Any]
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class WorkflowRun:
+    """Status and event log of one submitted workflow."""
+
+    def __init__(self, workflow_id: str, command: str):
+        self.workflow_id = workflow_id
+        self.command = command
+        self.status = WorkflowRunStatus.QUEUED
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.events: List[WorkflowEvent] = []
+        # Replaced on every emit; subscribers wait on the one current when they
+        # ran out of events, so no wake-up is lost.
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (WorkflowRunStatus.COMPLETED, WorkflowRunStatus.FAILED)
+
+    @property
+    def event_count(self) -> int:
+        return len(self.events)
+
+    def emit(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append(WorkflowEvent(seq=len(self.events) + 1, type=event_type, data=data or {}))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def start(self) -> None:
+        self.status = WorkflowRunStatus.RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        self.emit("workflow_started")
+
+    def finish(self, status: WorkflowRunStatus, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+        self.result = result
+        self.error = error
+        event_type = "workflow_completed" if status == WorkflowRunStatus.COMPLETED else "workflow_failed"
+        self.emit(event_type, {"result": result, "error": error})
+
+
+class WorkflowRunner:
+    """Schedules workflows with bounded concurrency and keeps their event logs."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        orchestrator_factory: Optional[Callable[..., Any]] = None,
+        max_finished: int = 1000,
+    ):
+        """
+        Args:
+            max_concurrent: Workflows executing at once; later submissions wait QUEUED.
+            orchestrator_factory: Builds the orchestrator, as
+                ``factory(command, workflow_id=...)``, so that its events are
+                published under the run's id; it must
+                provide `async run(on_event)` returning a state with
+                `workflow_status`, `final_result` and `error`.  Defaults to
+                `MainOrchestrator`.
+            max_finished: Finished workflows retained for status and replay.
+        """
+        if orchestrator_factory is None:
+            # Imported here so mounting the API router does not load the planner,
+            # executor graph and sandbox tools.
+            from .main_orchestrator import MainOrchestrator
+            orchestrator_factory = MainOrchestrator
+        self.max_concurrent = max_concurrent
+        self.orchestrator_factory = orchestrator_factory
+        self.max_finished = max_finished
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._runs: "OrderedDict[str, WorkflowRun]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, command: str) -> WorkflowRun:
+        run = WorkflowRun(str(uuid.uuid4()), command)
+        self._runs[run.workflow_id] = run
+        run.emit("workflow_queued", {"command": command})
+        self._tasks[run.workflow_id] = asyncio.create_task(self._execute(run), name=f"workflow-{run.workflow_id}")
+        self._evict_finished()
+        return run
+
+    def get(self, workflow_id: str) -> Optional[WorkflowRun]:
+        return self._runs.get(str(workflow_id))
+
+    async def events(
+        self, workflow_id: str, after: int = 0, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[WorkflowEvent]]:
+        """Yield events with `seq > after`, then live ones until the workflow ends.
+
+        With `heartbeat`, None is yielded whenever that many seconds pass without
+        an event, so the caller can keep an idle connection alive.
+        """
+        run = self._runs[str(workflow_id)]
+        position = max(after, 0)
+        while True:
+            while position < len(run.events):
+                yield run.events[position]
+                position += 1
+            if run.done:
+                return
+            changed = run._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def shutdown(self) -> None:
+        """Cancel running and queued workflows; they finish as FAILED."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, run: WorkflowRun) -> None:
+        try:
+            async with self._semaphore:
+                run.start()
+                orchestrator = self.orchestrator_factory(run.command, workflow_id=run.workflow_id)
+                state = await orchestrator.run(on_event=run.emit)
+                if getattr(state, "workflow_status", None) == "failed":
+                    run.finish(WorkflowRunStatus.FAILED, result=state.final_result, error=state.error)
+                else:
+                    run.finish(WorkflowRunStatus.COMPLETED, result=getattr(state, "final_result", None))
+        except asyncio.CancelledError:
+            run.finish(WorkflowRunStatus.FAILED, error="Cancelled")
+            raise
+        except Exception as e:
+            logger.exception(f"Workflow {run.workflow_id} failed")
+            run.finish(WorkflowRunStatus.FAILED, error=str(e))
+        finally:
+            self._tasks.pop(run.workflow_id, None)
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        finished = [workflow_id for workflow_id, run in self._runs.items() if run.done]
+        for workflow_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._runs[workflow_id]
+
+
+_workflow_runner: Optional[WorkflowRunner] = None
+
+
+def get_workflow_runner() -> WorkflowRunner:
+    """Process-wide runner used by the API, sized from the environment."""
+    global _workflow_runner
+    if _workflow_runner is None:
+        _workflow_runner = WorkflowRunner(max_concurrent=int(os.getenv("WORKFLOW_MAX_CONCURRENCY", "4")))
+    return _workflow_runner
@@ -8,7 +8,19 @@ from .integration_agent import IntegrationAgent
 from .deployment_agent import DeploymentAgent
 from .bridge_agent import BridgeAgent
 
+# Specialized agent class per plan department.
+AGENTS_BY_DEPARTMENT = {
+    "Research": ResearchAgent,
+    "Data": DataAgent,
+    "BackendDevelopment": BackendDeveloperAgent,
+    "FrontendDevelopment": FrontendDeveloperAgent,
+    "Bridge": BridgeAgent,
+    "Integration": IntegrationAgent,
+    "Deployment": DeploymentAgent,
+}
+
 __all__ = [
+    "AGENTS_BY_DEPARTMENT",
     "ResearchAgent",
     "DataAgent",
     "BackendDeveloperAgent",
@@ -23,10 +23,11 @@ class BackendDeveloperAgent(BaseAgent):
         script_to_run = task.description
 
         # Use the E2BSandboxTool
-        tool_input = E2BSandboxToolInput(language="python", script=script_to_run)
+        # Runs in one workflow share a sandbox, so repeat runs only upload changes.
+        tool_input = E2BSandboxToolInput(language="python", script=script_to_run, session_id=workflow_id)
         await self.log(workflow_id, task.id, "Running script in E2B sandbox...")
 
-        sandbox_result = await self.sandbox_tool.run(tool_input)
+        sandbox_result = await self.run_sandbox_tool(workflow_id, task.id, tool_input)
 
         await self.log(workflow_id, task.id, "E2B sandbox execution finished.")
 
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import json
+from typing import Any, Dict, List, Optional
 
 from ..agents.base_agent import BaseAgent
 from ..state.state_models import TaskState
 from api.models.memory_models import EdgeType, MemoryEdge, MemoryNode, NodeType
+from api.persistence.hybrid_retriever import get_memory_retriever
 from api.persistence.surrealdb_persistence import create_edge, create_node
 
 
@@ -15,7 +17,7 @@ class DataAgent(BaseAgent):
         super().__init__(name="DataAgent", sandbox_tool=sandbox_tool)
 
     async def _execute_task_impl(self, workflow_id: str, task: TaskState) -> Dict[str, Any]:
-        """Handles creation of memory nodes and edges."""
+        """Handles creation of memory nodes and edges, and searching memory."""
         action = task.description.lower()
         input_data = task.input_data
 
@@ -63,5 +65,40 @@ class DataAgent(BaseAgent):
                 "message": f"Successfully created edge {created_edge.id} from {source_id} to {target_id}.",
             }
 
+        elif "search memory" in action:
+            query = input_data.get("query")
+            if not query:
+                raise ValueError("Missing 'query' for search memory task.")
+
+            node_types = _as_list(input_data.get("node_types"))
+            hits = await get_memory_retriever().search(
+                query,
+                top_k=int(input_data.get("top_k", 10)),
+                expand=_as_bool(input_data.get("expand", False)),
+                node_types=[NodeType[t.upper()] for t in node_types] if node_types else None,
+            )
+            return {
+                "hits": [hit.model_dump(mode="json") for hit in hits],
+                "message": f"Found {len(hits)} memory nodes for '{query}'.",
+            }
+
         else:
             raise NotImplementedError(f"DataAgent does not support action: {action}")
+
+
+# TaskState.input_data holds strings only, so structured values arrive encoded.
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def _as_list(value: Any) -> Optional[List[str]]:
+    """A list given as a list, a JSON array or a comma-separated string."""
+    if value is None or isinstance(value, list):
+        return value
+    value = value.strip()
+    if value.startswith("["):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(",") if item.strip()]
@@ -35,9 +35,9 @@ class FrontendDeveloperAgent(BaseAgent):
         file_tree: Dict[str, Any] = {"index.html": html_content}
 
         # Prepare input for WebContainerTool
-        tool_input = WebContainerToolInput(files=file_tree, commands=["serve"])
+        tool_input = WebContainerToolInput(files=file_tree, commands=["serve"], session_id=workflow_id)
         await self.log(workflow_id, task.id, "Running file tree in WebContainer sandbox...")
-        sandbox_result = await self.sandbox_tool.run(tool_input)
+        sandbox_result = await self.run_sandbox_tool(workflow_id, task.id, tool_input)
         await self.log(workflow_id, task.id, "WebContainer sandbox execution finished.")
 
         url = sandbox_result.get("url")
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
+import json
 from typing import Any, Dict, Optional
 
 from ..agents.base_agent import BaseAgent
@@ -9,13 +12,31 @@ from ..state.state_models import TaskState
 class ResearchAgent(BaseAgent):
     """Agent responsible for research tasks such as web searching and summarisation (mock)."""
 
-    def __init__(self, sandbox_tool: Optional[Any] = None):
+    def __init__(self, sandbox_tool: Optional[Any] = None, vector_index: Optional[Any] = None):
         super().__init__(name="ResearchAgent", sandbox_tool=sandbox_tool)
+        # Anything exposing `match_document_embeddings`: the async or sync Supabase
+        # persistence module, or a `LocalVectorIndex` for fully in-process retrieval.
+        self.vector_index = vector_index
 
     async def _execute_task_impl(self, workflow_id: str, task: TaskState) -> Dict[str, Any]:
         await self.log(workflow_id, task.id, f"Performing research task: {task.description}")
         # Placeholder: actual research logic would integrate search_web / retrieval tools.
         summary = f"Dummy summary for task: {task.description}"
-        return {
+        result: Dict[str, Any] = {
             "summary": summary,
         }
+
+        query_embedding = task.input_data.get("query_embedding")
+        # input_data holds strings only; a vector arrives JSON-encoded.
+        if isinstance(query_embedding, str):
+            query_embedding = json.loads(query_embedding)
+        if self.vector_index is not None and query_embedding:
+            match = self.vector_index.match_document_embeddings
+            match_count = int(task.input_data.get("match_count", 5))
+            if inspect.iscoroutinefunction(match):
+                matches = await match(query_embedding, match_count=match_count)
+            else:
+                # The sync Supabase RPC and a local index scan would block the event loop.
+                matches = await asyncio.to_thread(match, query_embedding, match_count=match_count)
+            result["sources"] = [match.model_dump() for match in matches]
+        return result
@@ -1,10 +1,12 @@
 # Expose tool classes at the package level
 
 from .e2b_sandbox_tool import E2BSandboxTool
+from .local_sandbox_tool import LocalSandboxTool
 from .webcontainer_tool import WebContainerTool
 
 __all__ = [
     "E2BSandboxTool",
+    "LocalSandboxTool",
     "WebContainerTool",
 ]
 
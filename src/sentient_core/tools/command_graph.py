@@ -0,0 +1,154 @@
+"""Running a sandbox's commands as a dependency graph.
+
+Commands are given as plain strings or `CommandSpec`s:
+
+- A plain string runs after the entry before it, so a list of strings still
+  runs in order.
+- A `CommandSpec` runs after exactly the commands named in its `depends_on`.
+  Commands with no unfinished dependencies run concurrently, up to a limit.
+- A command is skipped if any command it depends on did not succeed.
+- `background` commands (dev servers; detected from the command for plain
+  strings) are left running.  Their dependents start once the command
+  reports ready rather than when it exits.
+
+`CommandGraph.run` executes the graph with a tool-supplied function that runs
+one command and returns its `CommandResult`.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field
+
+# Commands that start a long-running dev server.
+DEV_SERVER_COMMANDS = (
+    "npm run dev", "npm start", "yarn dev", "yarn start", "pnpm dev", "pnpm start",
+    "next dev", "vite", "serve",
+)
+
+
+def is_dev_server_command(command: str) -> bool:
+    command = command.strip()
+    return any(command == prefix or command.startswith(prefix + " ") for prefix in DEV_SERVER_COMMANDS)
+
+
+class CommandSpec(BaseModel):
+    """A command in a command graph"""
+    command: str = Field(..., description="Shell command to run")
+    name: Optional[str] = Field(
+        None,
+        description="Name used in other commands' depends_on; defaults to the command itself"
+    )
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="Names of the commands that must succeed before this one starts"
+    )
+    background: bool = Field(
+        False,
+        description="Leave the command running (e.g. a dev server) and wait for its ports instead of its exit"
+    )
+    ready_ports: List[int] = Field(
+        default_factory=list,
+        description="Ports a background command must accept connections on to be ready; "
+                    "defaults to the tool input's exposed ports"
+    )
+
+
+class CommandResult(BaseModel):
+    """Outcome of one command in a graph"""
+    name: str
+    command: str
+    status: Literal["success", "error", "skipped", "running"]
+    exit_code: Optional[int] = None
+    duration_seconds: float = 0.0
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None
+    metadata: Dict[str, object] = Field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Whether dependents may run: the command exited 0, or is a background command that became ready."""
+        return self.status in ("success", "running")
+
+
+RunCommand = Callable[[CommandSpec], Awaitable[CommandResult]]
+
+
+class CommandGraph:
+    """Validated commands with their dependencies."""
+
+    def __init__(self, commands: Sequence[Union[str, CommandSpec]]):
+        self.specs: List[CommandSpec] = []
+        previous: Optional[str] = None
+        for entry in commands:
+            if isinstance(entry, str):
+                spec = CommandSpec(
+                    command=entry,
+                    depends_on=[previous] if previous else [],
+                    background=is_dev_server_command(entry),
+                )
+            else:
+                spec = entry.model_copy()
+            spec.name = spec.name or spec.command
+            self.specs.append(spec)
+            previous = spec.name
+
+        names = [spec.name for spec in self.specs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate command names: {', '.join(duplicates)}; give them distinct `name`s")
+        for spec in self.specs:
+            unknown = [dep for dep in spec.depends_on if dep not in names]
+            if unknown:
+                raise ValueError(f"Command {spec.name!r} depends on unknown commands: {', '.join(unknown)}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[CommandSpec]:
+        by_name = {spec.name: spec for spec in self.specs}
+        order: List[CommandSpec] = []
+        state: Dict[str, str] = {}
+
+        def visit(spec: CommandSpec, path: List[str]):
+            if state.get(spec.name) == "done":
+                return
+            if state.get(spec.name) == "visiting":
+                cycle = path[path.index(spec.name):] + [spec.name]
+                raise ValueError(f"Command dependencies form a cycle: {' -> '.join(cycle)}")
+            state[spec.name] = "visiting"
+            for dep in spec.depends_on:
+                visit(by_name[dep], path + [spec.name])
+            state[spec.name] = "done"
+            order.append(spec)
+
+        for spec in self.specs:
+            visit(spec, [])
+        return order
+
+    async def run(self, run_command: RunCommand, max_parallel: int = 4) -> List[CommandResult]:
+        """Run every command as soon as its dependencies succeed; results are in input order."""
+        semaphore = asyncio.Semaphore(max_parallel)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_one(spec: CommandSpec) -> CommandResult:
+            deps = [await tasks[dep] for dep in spec.depends_on]
+            failed = [dep.name for dep in deps if not dep.ok]
+            if failed:
+                return CommandResult(
+                    name=spec.name, command=spec.command, status="skipped",
+                    error=f"Skipped because {', '.join(failed)} did not succeed",
+                )
+            async with semaphore:
+                return await run_command(spec)
+
+        # Dependencies come first in `order`, so their tasks exist when awaited.
+        for spec in self.order:
+            tasks[spec.name] = asyncio.create_task(run_one(spec))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return [tasks[spec.name].result() for spec in self.specs]
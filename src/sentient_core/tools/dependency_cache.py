@@ -0,0 +1,150 @@
+"""Installed dependencies, cached by the hash of the manifests they came from.
+
+A project's dependency layer (``node_modules``, or the ``pip install --user``
+tree under ``.local``) only changes when ``package.json``, its lockfile or
+``requirements.txt`` change.  `dependency_layers` derives a key from those
+files (and the sandbox template, since images differ in runtime versions);
+`DependencyCache` keeps a tar.gz snapshot of each layer on local disk, so a
+sandbox with the same key unpacks the snapshot instead of installing again.
+
+Snapshots are evicted least-recently-used once the cache exceeds `max_bytes`.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+NODE_LOCKFILES = {
+    "package-lock.json": "npm ci",
+    "npm-shrinkwrap.json": "npm ci",
+    "yarn.lock": "yarn install --frozen-lockfile",
+    "pnpm-lock.yaml": "pnpm install --frozen-lockfile",
+}
+NODE_MANIFESTS = ("package.json", *NODE_LOCKFILES)
+PYTHON_MANIFESTS = ("requirements.txt",)
+DEPENDENCY_MANIFESTS = NODE_MANIFESTS + PYTHON_MANIFESTS
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DependencyLayer:
+    """One ecosystem's dependencies for a project."""
+
+    ecosystem: str
+    key: str
+    install_command: str
+    # Directories, relative to the project root, that the install produces.
+    paths: Tuple[str, ...]
+
+
+def _layer_key(ecosystem: str, template: str, manifests: Mapping[str, str], names) -> str:
+    digest = hashlib.sha256(f"{ecosystem}\0{template}".encode())
+    for name in names:
+        if name in manifests:
+            content = manifests[name]
+            digest.update(f"\0{name}\0".encode())
+            digest.update(content if isinstance(content, bytes) else content.encode())
+    return f"{ecosystem}-{digest.hexdigest()}"
+
+
+def dependency_layers(manifests: Mapping[str, str], template: str = "") -> List[DependencyLayer]:
+    """Layers to install for a project, given its manifest files by name."""
+    layers = []
+    if "package.json" in manifests:
+        lockfile = next((name for name in NODE_LOCKFILES if name in manifests), None)
+        layers.append(DependencyLayer(
+            ecosystem="node",
+            key=_layer_key("node", template, manifests, NODE_MANIFESTS),
+            install_command=NODE_LOCKFILES[lockfile] if lockfile else "npm install",
+            paths=("node_modules",),
+        ))
+    if "requirements.txt" in manifests:
+        layers.append(DependencyLayer(
+            ecosystem="python",
+            key=_layer_key("python", template, manifests, PYTHON_MANIFESTS),
+            install_command="pip install --user -r requirements.txt",
+            paths=(".local",),
+        ))
+    return layers
+
+
+class DependencyCache:
+    """Snapshots of dependency layers, one ``<key>.tar.gz`` per layer under `root`.
+
+    Methods do blocking file I/O; call them from a worker thread.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.tar.gz")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        # Reads refresh the entry for LRU eviction.
+        os.utime(path)
+        with self._lock:
+            self._counters["hits"] += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> bool:
+        """Store a snapshot; returns False if it is larger than the whole cache."""
+        if len(data) > self.max_bytes:
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._counters["stored"] += 1
+            self._evict(keep=path)
+        return True
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".tar.gz"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self, keep: str) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self._counters["evicted"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries()
+        with self._lock:
+            return {**self._counters, "entries": len(entries), "bytes": sum(size for _, size, _ in entries)}
@@ -1,9 +1,34 @@
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional, Literal, Union
+import asyncio
+import inspect
+import logging
 import os
 import json
+import posixpath
+import shlex
+import tempfile
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
 from enum import Enum
 
+from .dependency_cache import DEFAULT_MAX_BYTES, DEPENDENCY_MANIFESTS, DependencyCache, DependencyLayer, dependency_layers
+from .file_transfer import bundle_files, should_bundle, write_concurrently
+from .output_stream import OutputCallback, OutputStream, collect_output, new_outputs
+from .sandbox_pool import PooledSandbox, SandboxPool, close_sandbox
+from .workspace_sync import SyncPlan, WorkspaceManifest
+
+# Working directory of E2B sandboxes; relative file paths are written here.
+SANDBOX_WORKDIR = "/home/user"
+
+# Seconds a sandbox lives after boot (or after its last checkout renewed it)
+# before E2B kills it; the SDK default is 300.
+DEFAULT_SANDBOX_LIFETIME = 3600
+
+logger = logging.getLogger(__name__)
+
 class SandboxTemplate(str, Enum):
     """Supported E2B sandbox templates"""
     PYTHON = "python3"
@@ -39,7 +64,8 @@ class E2BSandboxToolInput(BaseModel):
     )
     timeout_seconds: int = Field(
         600,
-        description="Maximum execution time in seconds",
+        description="Maximum execution time in seconds, covering setup and the command; "
+                    "a command still running then is killed",
         ge=30,
         le=3600
     )
@@ -47,6 +73,11 @@ class E2BSandboxToolInput(BaseModel):
         default_factory=dict,
         description="Additional metadata to include with the sandbox"
     )
+    session_id: Optional[str] = Field(
+        None,
+        description="Keep the sandbox between runs with this id; `files` is then the "
+                    "full workspace and only changed files are uploaded"
+    )
 
 class ExecutionResult(BaseModel):
     """Model for sandbox execution results"""
@@ -58,6 +89,15 @@ class ExecutionResult(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     sandbox_id: Optional[str] = None
 
+@dataclass
+class SandboxSession:
+    """A sandbox kept checked out across the runs that share a session id."""
+    lease: PooledSandbox
+    manifest: WorkspaceManifest = field(default_factory=WorkspaceManifest)
+    # Keys of the dependency layers installed in the sandbox.
+    installed: set = field(default_factory=set)
+    last_used: float = field(default_factory=time.monotonic)
+
 class E2BSandboxTool:
     """
     A tool for executing code in a secure E2B (e2b.dev) sandbox.
@@ -67,12 +107,19 @@ class E2BSandboxTool:
     multiple programming languages and frameworks.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool: Optional[SandboxPool] = None,
+                 session_idle_timeout: float = 600.0, dependency_cache: Optional[DependencyCache] = None):
         """
         Initialize the E2B sandbox tool.
         
         Args:
             api_key: Optional E2B API key. If not provided, will be read from E2B_API_KEY environment variable.
+            pool: Warm sandbox pool to check sandboxes out of. Defaults to the
+                process-wide pool for the API key from `get_sandbox_pool`.
+            session_idle_timeout: Seconds a session's sandbox is kept without a
+                run before it is returned to the pool.
+            dependency_cache: Snapshots of installed dependencies to restore
+                instead of installing. Defaults to `get_dependency_cache()`.
         """
         self.api_key = api_key or os.getenv("E2B_API_KEY")
         if not self.api_key:
@@ -81,16 +128,35 @@ class E2BSandboxTool:
                 "Set the E2B_API_KEY environment variable or pass it to the constructor."
             )
         
-        # Lazy import to avoid dependency if not used
+        # Lazy import to avoid dependency if not used. The code interpreter
+        # sandbox adds run_code to the base e2b (2.x) AsyncSandbox.
         try:
-            from e2b import Sandbox
-            self.Sandbox = Sandbox
+            from e2b_code_interpreter import AsyncSandbox
         except ImportError:
-            raise ImportError(
-                "E2B SDK not installed. Install with: pip install e2b"
-            )
+            try:
+                from e2b import AsyncSandbox
+            except ImportError:
+                raise ImportError(
+                    "E2B SDK not installed. Install with: pip install e2b-code-interpreter"
+                )
+        self.Sandbox = AsyncSandbox
+        self.sandbox_lifetime = int(os.getenv("E2B_SANDBOX_LIFETIME_SECONDS", str(DEFAULT_SANDBOX_LIFETIME)))
         
+        self.pool = pool or get_sandbox_pool(self.api_key, self._boot_sandbox)
+        self.dependency_cache = dependency_cache or get_dependency_cache()
         self.sandbox = None
+        self._lease: Optional[PooledSandbox] = None
+        self._healthy = True
+        # Tasks waiting for streamed commands to exit.
+        self._waiters: set = set()
+        self.session_idle_timeout = session_idle_timeout
+        self._sessions: Dict[str, SandboxSession] = {}
+        # Session the current sandbox belongs to, if any.
+        self._session_id: Optional[str] = None
+        self.last_sync: Optional[SyncPlan] = None
+        # How each dependency layer of the last run was provided, by ecosystem.
+        self.last_install: Dict[str, str] = {}
+        _tools.add(self)
     
     async def initialize(self):
         """Initialize the E2B client if not already done"""
@@ -116,72 +182,304 @@ class E2BSandboxTool:
             except ValueError:
                 raise ValueError(f"Invalid template: {template}")
         
+        # Return any sandbox still held from a previous call before taking another.
+        await self.close()
         try:
-            self.sandbox = await self.Sandbox.create(template.value)
-            return self.sandbox.id
+            self._lease = await self.pool.checkout(template.value)
+            self._healthy = True
+            self.sandbox = self._lease.sandbox
+            return self.sandbox.sandbox_id
         except Exception as e:
             raise RuntimeError(f"Failed to create sandbox: {str(e)}")
     
+    async def attach_session(self, session_id: str, template: Union[SandboxTemplate, str]) -> str:
+        """
+        Make the session's sandbox current, checking one out on first use.
+        
+        Unlike `create_sandbox`, the sandbox is not returned to the pool on
+        `close()`; it keeps its files for the session's next run until
+        `end_session` is called or the session sits idle for
+        `session_idle_timeout` seconds.
+        
+        Returns:
+            str: The sandbox ID
+        """
+        template = SandboxTemplate(template)
+        await self.close()
+        await self._expire_sessions()
+        session = self._sessions.get(session_id)
+        if session is not None and session.lease.template != template.value:
+            await self.end_session(session_id)
+            session = None
+        if session is None:
+            try:
+                session = SandboxSession(lease=await self.pool.checkout(template.value))
+            except Exception as e:
+                raise RuntimeError(f"Failed to create sandbox: {str(e)}")
+            self._sessions[session_id] = session
+        else:
+            try:
+                # The session may outlive the lifetime its sandbox was booted with.
+                await self.pool.renew(session.lease)
+            except Exception as e:
+                await self.end_session(session_id, healthy=False)
+                raise RuntimeError(f"Session sandbox expired: {str(e)}")
+        self._session_id = session_id
+        self._lease = session.lease
+        self._healthy = True
+        self.sandbox = session.lease.sandbox
+        return self.sandbox.sandbox_id
+    
+    async def end_session(self, session_id: str, healthy: bool = True) -> None:
+        """Return a session's sandbox to the pool; unknown ids are ignored."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        if self._session_id == session_id:
+            self._session_id, self._lease, self.sandbox = None, None, None
+        await self.pool.checkin(session.lease, reset=self._reset_sandbox, healthy=healthy)
+    
+    async def close_sessions(self) -> None:
+        """End every session held by this tool."""
+        for session_id in list(self._sessions):
+            await self.end_session(session_id)
+    
+    async def _expire_sessions(self) -> None:
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_used > self.session_idle_timeout:
+                await self.end_session(session_id)
+    
+    async def _boot_sandbox(self, template: str):
+        """Boot a fresh sandbox; used by the pool on a cold start."""
+        return await self.Sandbox.create(template=template, api_key=self.api_key, timeout=self.sandbox_lifetime)
+    
+    @staticmethod
+    async def _reset_sandbox(sandbox) -> None:
+        """Empty the working directory so the next checkout starts clean."""
+        await _run_to_exit(sandbox, f"rm -rf {SANDBOX_WORKDIR}/* {SANDBOX_WORKDIR}/.[!.]*")
+    
     async def write_files(self, files: List[FileModel]):
         """
         Write files to the sandbox.
         
+        In a session, `files` is the whole workspace: only files that changed
+        since the session's last sync are uploaded, and files missing from
+        `files` are deleted.
+        
         Args:
             files: List of FileModel objects with path and content
         """
         if not self.sandbox:
             raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
         
-        for file in files:
+        if self._session_id is None:
+            await self._upload_files(files)
+            return
+        
+        manifest = self._sessions[self._session_id].manifest
+        plan = manifest.plan(files)
+        try:
+            if plan.deleted:
+                await self._delete_files(plan.deleted)
+            if plan.changed:
+                await self._upload_files(plan.changed)
+        except Exception:
+            # The workspace is in an unknown state; resend everything next time.
+            manifest.clear()
+            raise
+        manifest.commit(plan)
+        self.last_sync = plan
+    
+    async def _upload_files(self, files: List[FileModel]):
+        if should_bundle(files):
             try:
-                await self.sandbox.files.write(file.path, file.content)
+                await self._upload_bundle(files)
+                return
             except Exception as e:
-                raise RuntimeError(f"Failed to write file {file.path}: {str(e)}")
+                logger.warning(f"Bundled upload of {len(files)} files failed, writing them one by one: {e}")
+        await write_concurrently(self.sandbox.files.write, files)
+    
+    async def _upload_bundle(self, files: List[FileModel]):
+        """Upload files as one tar.gz and unpack it inside the sandbox."""
+        bundle = await asyncio.to_thread(bundle_files, files, SANDBOX_WORKDIR)
+        await self._extract_archive(bundle, "/")
+    
+    async def _extract_archive(self, archive_bytes: bytes, destination: str):
+        archive = f"/tmp/upload-{uuid.uuid4().hex}.tar.gz"
+        await self.sandbox.files.write(archive, archive_bytes)
+        await self._run_checked(f"tar -xzf {archive} -C {destination} && rm -f {archive}")
+    
+    async def _run_checked(self, command: str):
+        """Run a housekeeping command to completion, raising if it exits non-zero."""
+        exit_code = await _run_to_exit(self.sandbox, command)
+        if exit_code:
+            raise RuntimeError(f"`{command.split()[0]}` exited with code {exit_code}")
     
-    async def install_dependencies(self):
-        """Install dependencies based on the template"""
+    async def _delete_files(self, paths: List[str]):
+        """Remove files from the sandbox; relative paths are resolved against the working directory."""
+        targets = " ".join(shlex.quote(posixpath.join(SANDBOX_WORKDIR, path)) for path in paths)
+        await self._run_checked(f"rm -f -- {targets}")
+    
+    async def install_dependencies(self, files: Optional[List[FileModel]] = None):
+        """
+        Install the dependencies declared by package.json or requirements.txt.
+        
+        A layer already installed in this session's sandbox is skipped, and one
+        with a cached snapshot is restored from it; otherwise it is installed
+        and then snapshotted into the cache.
+        
+        Args:
+            files: The files written for this run, to find the manifests in.
+                If omitted, the manifests are read from the sandbox.
+        """
         if not self.sandbox:
             raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
         
-        # This is a simplified example - in practice, you'd want to detect
-        # the package manager and dependencies based on the template
         try:
-            # Check for package.json (Node.js) or requirements.txt (Python)
-            if await self.sandbox.files.exists("package.json"):
-                await self.sandbox.process.start("npm install")
-            elif await self.sandbox.files.exists("requirements.txt"):
-                await self.sandbox.process.start("pip install -r requirements.txt")
+            manifests = await self._read_manifests(files)
+            template = self._lease.template if self._lease is not None else ""
+            for layer in dependency_layers(manifests, template):
+                self.last_install[layer.ecosystem] = await self._provide_layer(layer)
         except Exception as e:
             raise RuntimeError(f"Failed to install dependencies: {str(e)}")
     
-    async def execute_command(self, command: str) -> ExecutionResult:
+    async def _read_manifests(self, files: Optional[List[FileModel]]) -> Dict[str, str]:
+        if files is not None:
+            by_path = {posixpath.normpath(f.path): f.content for f in files}
+            return {name: by_path[name] for name in DEPENDENCY_MANIFESTS if name in by_path}
+        manifests = {}
+        for name in DEPENDENCY_MANIFESTS:
+            path = posixpath.join(SANDBOX_WORKDIR, name)
+            if await self.sandbox.files.exists(path):
+                manifests[name] = await self.sandbox.files.read(path)
+        return manifests
+    
+    async def _provide_layer(self, layer: DependencyLayer) -> str:
+        """Make `layer` present in the sandbox; returns "skipped", "restored" or "installed"."""
+        session = self._sessions.get(self._session_id) if self._session_id else None
+        if session is not None and layer.key in session.installed:
+            return "skipped"
+        
+        snapshot = await asyncio.to_thread(self.dependency_cache.get, layer.key)
+        how = "restored"
+        if snapshot is not None:
+            try:
+                await self._extract_archive(snapshot, SANDBOX_WORKDIR)
+            except Exception as e:
+                logger.warning(f"Restoring cached {layer.ecosystem} dependencies failed, installing: {e}")
+                snapshot = None
+        if snapshot is None:
+            await self._run_checked(f"cd {SANDBOX_WORKDIR} && {layer.install_command}")
+            await self._snapshot_layer(layer)
+            how = "installed"
+        if session is not None:
+            session.installed.add(layer.key)
+        return how
+    
+    async def _snapshot_layer(self, layer: DependencyLayer):
+        """Cache a tar.gz of the layer's directories; failures only cost the cache entry."""
+        archive = f"/tmp/deps-{uuid.uuid4().hex}.tar.gz"
+        try:
+            await self._run_checked(f"cd {SANDBOX_WORKDIR} && tar -czf {archive} {' '.join(layer.paths)}")
+            data = await self.sandbox.files.read(archive, format="bytes")
+            await asyncio.to_thread(self.dependency_cache.put, layer.key, bytes(data))
+        except Exception as e:
+            logger.warning(f"Caching {layer.ecosystem} dependencies failed: {e}")
+        finally:
+            try:
+                await self._run_checked(f"rm -f {archive}")
+            except Exception:
+                pass
+    
+    async def stream_command(self, command: str) -> OutputStream:
+        """
+        Start a command in the sandbox and return its output as it is produced.
+        
+        Args:
+            command: Command to execute
+            
+        Returns:
+            OutputStream yielding stdout/stderr chunks; it ends when the command
+            exits and then holds the exit code in `returncode`.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+        
+        _, stream = await self._start_process(command)
+        return stream
+    
+    async def _start_process(self, command: str):
+        """Start `command` with its output fed into an OutputStream; returns (process, stream)."""
+        stream = OutputStream()
+        process = await _start_command(
+            self.sandbox,
+            command,
+            on_stdout=lambda message: stream.feed("stdout", _message_text(message)),
+            on_stderr=lambda message: stream.feed("stderr", _message_text(message)),
+        )
+        
+        async def wait():
+            try:
+                stream.close(returncode=await _exit_code(process))
+            except Exception as e:
+                stream.close(error=e)
+        
+        waiter = asyncio.create_task(wait())
+        self._waiters.add(waiter)
+        waiter.add_done_callback(self._waiters.discard)
+        return process, stream
+    
+    async def execute_command(self, command: str, on_output: Optional[OutputCallback] = None,
+                              timeout: Optional[float] = None) -> ExecutionResult:
         """
         Execute a command in the sandbox.
         
         Args:
             command: Command to execute
+            on_output: Called with each output chunk while the command runs
+            timeout: Seconds after which the command is killed; the result then
+                has the output up to that point and `timed_out` in its metadata
             
         Returns:
-            ExecutionResult with the command output
+            ExecutionResult with the command output; output beyond the memory
+            cap is spooled to a file named in the metadata
         """
         if not self.sandbox:
             raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
         
         try:
-            process = await self.sandbox.process.start(command)
-            await process.wait()
+            process, stream = await self._start_process(command)
+            outputs = new_outputs()
+            stdout, stderr = outputs["stdout"], outputs["stderr"]
+            try:
+                await asyncio.wait_for(collect_output(stream, on_output, outputs=outputs), timeout)
+            except asyncio.TimeoutError:
+                await _kill_process(process)
+                return ExecutionResult(
+                    status="error",
+                    stdout=stdout.getvalue(),
+                    stderr=stderr.getvalue(),
+                    error=f"Command timed out after {timeout:g}s and was killed",
+                    sandbox_id=self.sandbox.sandbox_id,
+                    metadata={"timed_out": True, **stdout.metadata(), **stderr.metadata()},
+                )
+            except asyncio.CancelledError:
+                await _kill_process(process)
+                raise
             
             return ExecutionResult(
-                status="success",
-                stdout=process.stdout,
-                stderr=process.stderr,
-                sandbox_id=self.sandbox.id
+                status="error" if stream.returncode else "success",
+                stdout=stdout.getvalue(),
+                stderr=stderr.getvalue(),
+                sandbox_id=self.sandbox.sandbox_id,
+                metadata={"exit_code": stream.returncode, **stdout.metadata(), **stderr.metadata()},
             )
         except Exception as e:
             return ExecutionResult(
                 status="error",
                 error=str(e),
-                sandbox_id=self.sandbox.id
+                sandbox_id=self.sandbox.sandbox_id
             )
     
     async def run_code(self, code: str, language: str = "python") -> ExecutionResult:
@@ -200,12 +498,15 @@ class E2BSandboxTool:
         
         try:
             result = await self.sandbox.run_code(code, language=language)
+            # An Execution: output in logs.stdout / logs.stderr, and `error` if the code raised.
+            error = getattr(result, "error", None)
             return ExecutionResult(
-                status="success",
-                stdout=result.stdout,
-                stderr=result.stderr,
+                status="error" if error else "success",
+                stdout="".join(result.logs.stdout),
+                stderr="".join(result.logs.stderr),
+                error=f"{error.name}: {error.value}" if error else None,
                 results=getattr(result, "results", []),
-                sandbox_id=self.sandbox.id,
+                sandbox_id=self.sandbox.sandbox_id,
                 metadata={
                     "execution_time_ms": getattr(result, "execution_time_ms", None),
                     "memory_usage_mb": getattr(result, "memory_usage_mb", None)
@@ -215,14 +516,28 @@ class E2BSandboxTool:
             return ExecutionResult(
                 status="error",
                 error=str(e),
-                sandbox_id=self.sandbox.id
+                sandbox_id=self.sandbox.sandbox_id
             )
     
     async def close(self):
-        """Close the sandbox and release resources"""
-        if self.sandbox:
-            await self.sandbox.close()
-            self.sandbox = None
+        """Return the sandbox to the pool (or close it if it was not pooled)
+        
+        A session's sandbox stays checked out for the next run, unless the
+        run broke it.
+        """
+        if self._session_id is not None:
+            session_id, self._session_id = self._session_id, None
+            self._lease = None
+            if self._healthy:
+                self._sessions[session_id].last_used = time.monotonic()
+            else:
+                await self.end_session(session_id, healthy=False)
+        elif self._lease is not None:
+            lease, self._lease = self._lease, None
+            await self.pool.checkin(lease, reset=self._reset_sandbox, healthy=self._healthy)
+        elif self.sandbox:
+            await close_sandbox(self.sandbox)
+        self.sandbox = None
     
     async def __aenter__(self):
         await self.initialize()
@@ -231,16 +546,32 @@ class E2BSandboxTool:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
     
-    async def run(self, inputs: E2BSandboxToolInput) -> Dict[str, Any]:
+    async def run(self, inputs: E2BSandboxToolInput, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
         """
         Execute a task in the E2B sandbox.
         
         This is the main entry point for the tool that implements the standard
-        tool interface expected by the agent framework.
+        tool interface expected by the agent framework. `on_output` receives the
+        command's output chunks as they arrive.
+        
+        Everything, from checkout to the command's exit, must finish within
+        `inputs.timeout_seconds`. A command still running then is killed and
+        its output so far returned; a sandbox that timed out or was cancelled
+        is not reused.
         """
-        try:
-            # Create sandbox
-            sandbox_id = await self.create_sandbox(inputs.template)
+        self.last_sync = None
+        self.last_install = {}
+        deadline = time.monotonic() + inputs.timeout_seconds
+        
+        def remaining() -> float:
+            return max(deadline - time.monotonic(), 0)
+        
+        async def prepare() -> str:
+            # Create sandbox, or continue the session's one
+            if inputs.session_id:
+                sandbox_id = await self.attach_session(inputs.session_id, inputs.template)
+            else:
+                sandbox_id = await self.create_sandbox(inputs.template)
             
             # Write files if any
             if inputs.files:
@@ -248,16 +579,31 @@ class E2BSandboxTool:
             
             # Install dependencies if needed
             if inputs.install_dependencies:
-                await self.install_dependencies()
+                await self.install_dependencies(inputs.files)
+            return sandbox_id
+        
+        try:
+            try:
+                sandbox_id = await asyncio.wait_for(prepare(), remaining())
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out after {inputs.timeout_seconds}s preparing the sandbox")
             
             # Execute command if provided
             if inputs.command:
-                result = await self.execute_command(inputs.command)
+                result = await self.execute_command(inputs.command, on_output=on_output, timeout=remaining())
             else:
                 # Default to running a Python script if no command is specified
                 main_script = next((f for f in inputs.files if f.path.endswith('.py')), None)
                 if main_script:
-                    result = await self.run_code(main_script.content, "python")
+                    try:
+                        result = await asyncio.wait_for(self.run_code(main_script.content, "python"), remaining())
+                    except asyncio.TimeoutError:
+                        result = ExecutionResult(
+                            status="error",
+                            error=f"Script timed out after {inputs.timeout_seconds}s",
+                            sandbox_id=sandbox_id,
+                            metadata={"timed_out": True},
+                        )
                 else:
                     return {
                         "status": "error",
@@ -267,11 +613,122 @@ class E2BSandboxTool:
             # Convert result to dict for JSON serialization
             result_dict = result.dict()
             result_dict["sandbox_id"] = sandbox_id
+            if self.last_sync is not None:
+                result_dict["metadata"]["sync"] = self.last_sync.summary()
+            if self.last_install:
+                result_dict["metadata"]["dependencies"] = dict(self.last_install)
+            # A sandbox whose command failed may be in any state; don't hand it
+            # to anyone else. A session keeps it: the next run picks up from there.
+            # After a timeout, whatever the command started may still be running.
+            self._healthy = ((result.status == "success" or inputs.session_id is not None)
+                             and not result.metadata.get("timed_out"))
             return result_dict
             
+        except asyncio.CancelledError:
+            self._healthy = False
+            raise
         except Exception as e:
+            self._healthy = False
             return {
                 "status": "error",
                 "error": str(e),
-                "sandbox_id": getattr(self.sandbox, "id", None) if hasattr(self, 'sandbox') else None
+                "sandbox_id": getattr(self.sandbox, "id", None) if hasattr(self, 'sandbox') else None,
+                **({"timed_out": True} if isinstance(e, TimeoutError) else {}),
             }
+        finally:
+            await self.close()
+
+
+async def _start_command(sandbox, command: str, **callbacks):
+    """Start `command` in the background and return its command handle.
+
+    timeout=0 lifts the SDK's 60s connection limit; the tool enforces its own.
+    """
+    return await sandbox.commands.run(command, background=True, timeout=0, **callbacks)
+
+
+async def _exit_code(handle) -> Optional[int]:
+    """Wait for a command; the SDK raises CommandExitException for non-zero exit codes."""
+    try:
+        result = await handle.wait()
+    except Exception as e:
+        if getattr(e, "exit_code", None) is None:
+            raise
+        return e.exit_code
+    return getattr(result, "exit_code", None)
+
+
+async def _run_to_exit(sandbox, command: str) -> Optional[int]:
+    return await _exit_code(await _start_command(sandbox, command))
+
+
+async def _kill_process(process) -> None:
+    """Kill a sandbox process; failures are logged, as the sandbox is discarded anyway."""
+    try:
+        result = process.kill()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.warning(f"Killing a sandbox process failed: {e}")
+
+
+def _message_text(message) -> str:
+    """Text of an SDK output callback argument (a message object or a plain string)."""
+    line = getattr(message, "line", None)
+    return f"{line}\n" if line is not None else str(message)
+
+
+async def _extend_sandbox(sandbox, seconds: float) -> None:
+    """Push back the time E2B kills the sandbox to `seconds` from now."""
+    await sandbox.set_timeout(int(seconds))
+
+
+# Process-wide pools by API key, and every live tool, for `close_sandbox_pools`.
+_sandbox_pools: Dict[str, SandboxPool] = {}
+_tools: "weakref.WeakSet[E2BSandboxTool]" = weakref.WeakSet()
+
+
+def get_sandbox_pool(api_key: str, create) -> SandboxPool:
+    """Process-wide warm pool shared by the `E2BSandboxTool`s using `api_key`, sized from the environment.
+
+    `create` boots a sandbox for a template with that key; the first caller's is used.
+    """
+    if api_key not in _sandbox_pools:
+        _sandbox_pools[api_key] = SandboxPool(
+            create,
+            lifetime=float(os.getenv("E2B_SANDBOX_LIFETIME_SECONDS", str(DEFAULT_SANDBOX_LIFETIME))),
+            extend=_extend_sandbox,
+            size=int(os.getenv("E2B_POOL_SIZE", "2")),
+            max_size=int(os.getenv("E2B_POOL_MAX_SIZE", "8")),
+            max_uses=int(os.getenv("E2B_POOL_MAX_USES", "20")),
+            idle_timeout=float(os.getenv("E2B_POOL_IDLE_SECONDS", "300")),
+        )
+    return _sandbox_pools[api_key]
+
+
+async def close_sandbox_pools() -> None:
+    """End every tool's sessions and destroy the process-wide pools' sandboxes; for shutdown.
+
+    Pools only expire idle sandboxes at checkout, so without this they live
+    until E2B's lifetime runs out.
+    """
+    for tool in list(_tools):
+        await tool.close_sessions()
+    pools = list(_sandbox_pools.values())
+    _sandbox_pools.clear()
+    for pool in pools:
+        await pool.close()
+
+
+_dependency_cache: Optional[DependencyCache] = None
+
+
+def get_dependency_cache() -> DependencyCache:
+    """Process-wide dependency snapshot cache, located and sized from the environment."""
+    global _dependency_cache
+    if _dependency_cache is None:
+        _dependency_cache = DependencyCache(
+            os.getenv("E2B_DEPS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "sentient-deps-cache"),
+            max_bytes=int(os.getenv("E2B_DEPS_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+        )
+    return _dependency_cache
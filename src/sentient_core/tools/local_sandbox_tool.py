@@ -0,0 +1,572 @@
+"""A sandbox backend that runs code as local subprocesses, without a remote service.
+
+`LocalSandboxTool` offers the `E2BSandboxTool` surface (`run`,
+`write_files`, `execute_command`, `run_code`, sessions) for tests,
+benchmarks and trusted on-prem workloads:
+
+- every sandbox is a fresh temporary directory, which is also `HOME`, so
+  ``pip install --user`` lands inside it; file paths cannot escape it;
+- commands run in their own process group, so a timeout or cancellation
+  kills everything they started;
+- `ResourceLimits` are applied as rlimits, and with ``network=False``
+  commands run in a new network namespace (via ``unshare``) with only a
+  loopback interface.
+
+This is process isolation, not a security boundary: use E2B for untrusted code.
+"""
+
+import asyncio
+import codecs
+import functools
+import os
+import posixpath
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from .dependency_cache import DEPENDENCY_MANIFESTS, dependency_layers
+from .e2b_sandbox_tool import E2BSandboxToolInput, ExecutionResult, FileModel
+from .file_transfer import delete_local_files, write_local_files
+from .output_stream import OutputCallback, OutputStream, collect_output, new_outputs
+from .process_limits import ResourceLimits, preexec_for
+from .workspace_sync import SyncPlan, WorkspaceManifest
+
+# Bytes read from a command's pipe at a time while streaming its output.
+_READ_CHUNK_BYTES = 64 * 1024
+
+# Prefix running a command in new user and network namespaces, unprivileged.
+_NO_NETWORK_PREFIX = ["unshare", "--user", "--map-root-user", "--net", "--"]
+
+# Variables passed through from the tool's environment; everything else is dropped.
+_INHERITED_ENV = ("PATH", "LANG", "LC_ALL", "TZ")
+
+# Interpreters used by `run_code`, with the file suffix the code is saved under.
+_INTERPRETERS = {
+    "python": (sys.executable, ".py"),
+    "node": ("node", ".js"),
+    "javascript": ("node", ".js"),
+    "bash": ("bash", ".sh"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def network_namespaces_available() -> bool:
+    """Whether this host can run `_NO_NETWORK_PREFIX` commands; probed once per process.
+
+    Needs ``unshare`` on PATH and unprivileged user namespaces enabled.
+    """
+    if shutil.which("unshare") is None:
+        return False
+    try:
+        probe = subprocess.run(_NO_NETWORK_PREFIX + ["true"], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return probe.returncode == 0
+
+
+def _require_network_namespaces():
+    if not network_namespaces_available():
+        raise RuntimeError(
+            "Disabling the network needs `unshare` (util-linux) and unprivileged user namespaces"
+        )
+
+
+class LocalSandboxToolInput(BaseModel):
+    """Input model for the LocalSandboxTool."""
+    files: List[FileModel] = Field(
+        default_factory=list,
+        description="Files to write to the sandbox directory before execution"
+    )
+    command: Optional[str] = Field(
+        None,
+        description="Command to execute in the sandbox directory"
+    )
+    install_dependencies: bool = Field(
+        True,
+        description="Whether to install dependencies before execution"
+    )
+    timeout_seconds: int = Field(
+        600,
+        description="Maximum execution time in seconds, covering setup and the command; "
+                    "a command still running then is killed",
+        ge=1,
+        le=3600
+    )
+    resource_limits: Optional[ResourceLimits] = Field(
+        None,
+        description="CPU, memory and file caps applied to every command"
+    )
+    network: Optional[bool] = Field(
+        None,
+        description="Whether commands may use the network; without it they run in an "
+                    "empty network namespace. Defaults to the tool's setting"
+    )
+    env_vars: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Environment variables to set for the commands"
+    )
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Additional metadata to include with the sandbox"
+    )
+    session_id: Optional[str] = Field(
+        None,
+        description="Keep the sandbox directory between runs with this id; `files` is "
+                    "then the full workspace and only changed files are written"
+    )
+
+
+@dataclass
+class LocalSession:
+    """A sandbox directory kept across the runs that share a session id."""
+    root: str
+    manifest: WorkspaceManifest = field(default_factory=WorkspaceManifest)
+    # Keys of the dependency layers installed in the directory.
+    installed: set = field(default_factory=set)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class LocalSandboxTool:
+    """
+    A tool for executing code in a local process sandbox.
+
+    Drop-in for `E2BSandboxTool` where no E2B API key or network is
+    available. Each sandbox is a temporary directory removed on `close()`,
+    unless it belongs to a session.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, limits: Optional[ResourceLimits] = None,
+                 network: bool = True, session_idle_timeout: float = 600.0):
+        """
+        Initialize the local sandbox tool.
+
+        Args:
+            base_dir: Directory the sandbox directories are created in.
+                Defaults to LOCAL_SANDBOX_DIR, then the system temp directory.
+            limits: Resource caps for commands whose input sets none.
+            network: Whether commands may use the network by default. False
+                raises RuntimeError if the host cannot create network namespaces.
+            session_idle_timeout: Seconds a session's directory is kept without
+                a run before it is deleted.
+        """
+        self.base_dir = base_dir or os.getenv("LOCAL_SANDBOX_DIR") or None
+        self.limits = limits
+        if not network:
+            _require_network_namespaces()
+        self.network = network
+        self.session_idle_timeout = session_idle_timeout
+        self.sandbox_id: Optional[str] = None
+        self.root: Optional[str] = None
+        # Tasks pumping the output of streamed commands.
+        self._waiters: set = set()
+        self._sessions: Dict[str, LocalSession] = {}
+        # Session the current sandbox belongs to, if any.
+        self._session_id: Optional[str] = None
+        self.last_sync: Optional[SyncPlan] = None
+        # How each dependency layer of the last run was provided, by ecosystem.
+        self.last_install: Dict[str, str] = {}
+
+    async def initialize(self):
+        """Initialize the tool if not already done"""
+        if not hasattr(self, '_initialized'):
+            if self.base_dir:
+                os.makedirs(self.base_dir, exist_ok=True)
+            self._initialized = True
+
+    async def create_sandbox(self) -> str:
+        """
+        Create a new, empty sandbox directory.
+
+        Returns:
+            str: The sandbox ID
+        """
+        await self.initialize()
+        await self.close()
+        self.root = await asyncio.to_thread(tempfile.mkdtemp, prefix="sentient-sandbox-", dir=self.base_dir)
+        self.sandbox_id = f"local-{os.path.basename(self.root)}"
+        return self.sandbox_id
+
+    async def attach_session(self, session_id: str) -> str:
+        """
+        Make the session's sandbox directory current, creating it on first use.
+
+        The directory keeps its files until `end_session` is called or the
+        session sits idle for `session_idle_timeout` seconds.
+
+        Returns:
+            str: The sandbox ID
+        """
+        await self.close()
+        await self._expire_sessions()
+        session = self._sessions.get(session_id)
+        if session is None:
+            await self.create_sandbox()
+            session = self._sessions[session_id] = LocalSession(root=self.root)
+        else:
+            self.root = session.root
+            self.sandbox_id = f"local-{os.path.basename(session.root)}"
+        self._session_id = session_id
+        return self.sandbox_id
+
+    async def end_session(self, session_id: str) -> None:
+        """Delete a session's sandbox directory; unknown ids are ignored."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        if self._session_id == session_id:
+            self._session_id, self.root, self.sandbox_id = None, None, None
+        await asyncio.to_thread(shutil.rmtree, session.root, True)
+
+    async def close_sessions(self) -> None:
+        """End every session held by this tool."""
+        for session_id in list(self._sessions):
+            await self.end_session(session_id)
+
+    async def _expire_sessions(self) -> None:
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_used > self.session_idle_timeout:
+                await self.end_session(session_id)
+
+    def _resolve(self, path: str) -> str:
+        """`path` relative to the sandbox directory; raises ValueError if it points outside."""
+        relative = posixpath.normpath(path.lstrip("/"))
+        if relative == ".." or relative.startswith("../"):
+            raise ValueError(f"Path escapes the sandbox: {path}")
+        return relative
+
+    async def write_files(self, files: List[FileModel]):
+        """
+        Write files to the sandbox directory.
+
+        Absolute paths are taken relative to the sandbox directory. In a
+        session, `files` is the whole workspace: only files that changed
+        since the session's last sync are written, and files missing from
+        `files` are deleted.
+
+        Args:
+            files: List of FileModel objects with path and content
+        """
+        if not self.root:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+
+        files = [FileModel(path=self._resolve(f.path), content=f.content) for f in files]
+        if self._session_id is None:
+            await write_local_files(files, root=self.root)
+            return
+
+        manifest = self._sessions[self._session_id].manifest
+        plan = manifest.plan(files)
+        try:
+            if plan.deleted:
+                await delete_local_files(plan.deleted, root=self.root)
+            if plan.changed:
+                await write_local_files(plan.changed, root=self.root)
+        except Exception:
+            manifest.clear()
+            raise
+        manifest.commit(plan)
+        self.last_sync = plan
+
+    async def install_dependencies(self, limits: Optional[ResourceLimits] = None):
+        """
+        Install the dependencies declared by package.json or requirements.txt.
+
+        A layer already installed in this session's directory is skipped.
+        Installs need the network, so they run even when commands don't.
+        """
+        if not self.root:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+
+        manifests = await asyncio.to_thread(self._read_manifests)
+
+        session = self._sessions.get(self._session_id) if self._session_id else None
+        for layer in dependency_layers(manifests, "local"):
+            if session is not None and layer.key in session.installed:
+                self.last_install[layer.ecosystem] = "skipped"
+                continue
+            result = await self.execute_command(layer.install_command, limits=limits, network=True)
+            if result.status != "success":
+                raise RuntimeError(f"Failed to install dependencies: {result.error or result.stderr}")
+            if session is not None:
+                session.installed.add(layer.key)
+            self.last_install[layer.ecosystem] = "installed"
+
+    def _read_manifests(self) -> Dict[str, str]:
+        manifests = {}
+        for name in DEPENDENCY_MANIFESTS:
+            path = os.path.join(self.root, name)
+            if os.path.exists(path):
+                with open(path) as f:
+                    manifests[name] = f.read()
+        return manifests
+
+    def _environment(self, env: Optional[Dict[str, str]]) -> Dict[str, str]:
+        base = {name: os.environ[name] for name in _INHERITED_ENV if name in os.environ}
+        tmp = os.path.join(self.root, ".tmp")
+        os.makedirs(tmp, exist_ok=True)
+        return {**base, "HOME": self.root, "TMPDIR": tmp, **(env or {})}
+
+    async def _spawn(self, command: str, env: Optional[Dict[str, str]] = None,
+                     limits: Optional[ResourceLimits] = None, network: Optional[bool] = None):
+        """Start `command` in its own process group with its output pumped into an OutputStream.
+
+        Returns (process, stream).
+        """
+        argv = ["/bin/sh", "-c", command]
+        if not (self.network if network is None else network):
+            _require_network_namespaces()
+            argv = _NO_NETWORK_PREFIX + argv
+        stream = OutputStream()
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.root,
+            env=self._environment(env),
+            start_new_session=True,
+            preexec_fn=preexec_for(limits or self.limits)
+        )
+
+        async def pump(reader: asyncio.StreamReader, name: str):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while chunk := await reader.read(_READ_CHUNK_BYTES):
+                stream.feed(name, decoder.decode(chunk))
+            stream.feed(name, decoder.decode(b"", final=True))
+
+        async def wait():
+            try:
+                await asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"))
+                stream.close(returncode=await proc.wait())
+            except Exception as e:
+                stream.close(error=e)
+            except asyncio.CancelledError:
+                _kill_group(proc)
+                stream.close(error=RuntimeError(f"Command cancelled: {command}"))
+                raise
+
+        waiter = asyncio.create_task(wait())
+        self._waiters.add(waiter)
+        waiter.add_done_callback(self._waiters.discard)
+        return proc, stream
+
+    async def stream_command(self, command: str, env: Optional[Dict[str, str]] = None) -> OutputStream:
+        """
+        Start a command in the sandbox and return its output as it is produced.
+
+        Returns:
+            OutputStream yielding stdout/stderr chunks; it ends when the command
+            exits and then holds the exit code in `returncode`.
+        """
+        if not self.root:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+
+        _, stream = await self._spawn(command, env=env)
+        return stream
+
+    async def execute_command(self, command: str, on_output: Optional[OutputCallback] = None,
+                              timeout: Optional[float] = None, env: Optional[Dict[str, str]] = None,
+                              limits: Optional[ResourceLimits] = None,
+                              network: Optional[bool] = None) -> ExecutionResult:
+        """
+        Execute a command in the sandbox.
+
+        Args:
+            command: Shell command to execute
+            on_output: Called with each output chunk while the command runs
+            timeout: Seconds after which the command's process group is killed;
+                the result then has the output up to that point and `timed_out`
+                in its metadata
+            env: Environment variables added for the command
+            limits: Resource caps, overriding the tool's
+            network: Whether the command may use the network, overriding the tool's
+
+        Returns:
+            ExecutionResult with the command output; output beyond the memory
+            cap is spooled to a file named in the metadata
+        """
+        if not self.root:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+
+        started = time.monotonic()
+        try:
+            proc, stream = await self._spawn(command, env=env, limits=limits, network=network)
+            outputs = new_outputs()
+            stdout, stderr = outputs["stdout"], outputs["stderr"]
+            try:
+                await asyncio.wait_for(collect_output(stream, on_output, outputs=outputs), timeout)
+            except asyncio.TimeoutError:
+                _kill_group(proc)
+                return ExecutionResult(
+                    status="error",
+                    stdout=stdout.getvalue(),
+                    stderr=stderr.getvalue(),
+                    error=f"Command timed out after {timeout:g}s and was killed",
+                    sandbox_id=self.sandbox_id,
+                    metadata={"timed_out": True, **stdout.metadata(), **stderr.metadata()},
+                )
+            except asyncio.CancelledError:
+                _kill_group(proc)
+                raise
+
+            return ExecutionResult(
+                status="error" if stream.returncode else "success",
+                stdout=stdout.getvalue(),
+                stderr=stderr.getvalue(),
+                sandbox_id=self.sandbox_id,
+                metadata={
+                    "exit_code": stream.returncode,
+                    "duration_seconds": time.monotonic() - started,
+                    **stdout.metadata(),
+                    **stderr.metadata(),
+                },
+            )
+        except Exception as e:
+            return ExecutionResult(
+                status="error",
+                error=str(e),
+                sandbox_id=self.sandbox_id
+            )
+
+    async def run_code(self, code: str, language: str = "python", **kwargs) -> ExecutionResult:
+        """
+        Run code in the sandbox by saving it to a file and running its interpreter.
+
+        Args:
+            code: Code to execute
+            language: python, node, javascript or bash
+            **kwargs: Passed on to `execute_command`
+        """
+        if not self.root:
+            raise RuntimeError("Sandbox not initialized. Call create_sandbox first.")
+        if language not in _INTERPRETERS:
+            return ExecutionResult(status="error", error=f"Unsupported language: {language}",
+                                   sandbox_id=self.sandbox_id)
+
+        interpreter, suffix = _INTERPRETERS[language]
+        script = f".run-{uuid.uuid4().hex}{suffix}"
+        await write_local_files([FileModel(path=script, content=code)], root=self.root)
+        try:
+            return await self.execute_command(f"{shlex.quote(interpreter)} {script}", **kwargs)
+        finally:
+            await delete_local_files([script], root=self.root)
+
+    async def close(self):
+        """Delete the sandbox directory, unless it belongs to a session"""
+        root, self.root = self.root, None
+        self.sandbox_id = None
+        if self._session_id is not None:
+            session_id, self._session_id = self._session_id, None
+            if session_id in self._sessions:
+                self._sessions[session_id].last_used = time.monotonic()
+        elif root:
+            await asyncio.to_thread(shutil.rmtree, root, True)
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def run(self, inputs: Union[LocalSandboxToolInput, E2BSandboxToolInput],
+                  on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        """
+        Execute a task in a local sandbox directory.
+
+        This is the main entry point for the tool that implements the standard
+        tool interface expected by the agent framework. An `E2BSandboxToolInput`
+        is accepted too (its template is ignored), so agents written for E2B
+        run unchanged. `on_output` receives the command's output chunks as
+        they arrive.
+
+        Everything, from file writes to the command's exit, must finish within
+        `inputs.timeout_seconds`; a command still running then is killed and
+        its output so far returned.
+        """
+        if not isinstance(inputs, LocalSandboxToolInput):
+            inputs = LocalSandboxToolInput.model_validate(inputs.model_dump(exclude={"template"}))
+        self.last_sync = None
+        self.last_install = {}
+        deadline = time.monotonic() + inputs.timeout_seconds
+
+        def remaining() -> float:
+            return max(deadline - time.monotonic(), 0)
+
+        async def prepare() -> str:
+            # Create a sandbox directory, or continue the session's one
+            if inputs.session_id:
+                sandbox_id = await self.attach_session(inputs.session_id)
+            else:
+                sandbox_id = await self.create_sandbox()
+
+            if inputs.files:
+                await self.write_files(inputs.files)
+
+            if inputs.install_dependencies:
+                await self.install_dependencies(inputs.resource_limits)
+            return sandbox_id
+
+        options = {
+            "on_output": on_output,
+            "env": inputs.env_vars,
+            "limits": inputs.resource_limits,
+            "network": inputs.network,
+        }
+        try:
+            try:
+                sandbox_id = await asyncio.wait_for(prepare(), remaining())
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out after {inputs.timeout_seconds}s preparing the sandbox")
+
+            if inputs.command:
+                result = await self.execute_command(inputs.command, timeout=remaining(), **options)
+            else:
+                # Default to running a Python script if no command is specified
+                main_script = next((f for f in inputs.files if f.path.endswith('.py')), None)
+                if main_script is None:
+                    return {
+                        "status": "error",
+                        "error": "No command or Python script provided"
+                    }
+                result = await self.execute_command(
+                    f"{shlex.quote(sys.executable)} {shlex.quote(self._resolve(main_script.path))}",
+                    timeout=remaining(), **options
+                )
+
+            result_dict = result.model_dump()
+            result_dict["sandbox_id"] = sandbox_id
+            if self.last_sync is not None:
+                result_dict["metadata"]["sync"] = self.last_sync.summary()
+            if self.last_install:
+                result_dict["metadata"]["dependencies"] = dict(self.last_install)
+            return result_dict
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "sandbox_id": self.sandbox_id,
+                **({"timed_out": True} if isinstance(e, TimeoutError) else {}),
+            }
+        finally:
+            await self.close()
+
+
+def _kill_group(proc) -> None:
+    """SIGKILL a command and everything it started."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,293 @@
+"""Incremental stdout/stderr from sandbox commands.
+
+- `OutputStream` is an async iterator of `OutputChunk`s that a sandbox tool
+  feeds while a command runs; it ends when the command exits, with the exit
+  code in `returncode`.
+- `SpooledOutput` accumulates one stream's text.  Past `max_memory_bytes` it
+  moves to a file in `spool_dir` and only the tail stays in memory, so a giant
+  build log cannot exhaust memory.  The file outlives the command (results
+  point to it); only the newest `retain` spool files are kept, and
+  `discard()` deletes one early.
+- `ProgressForwarder` turns chunks into progress events, at most one per
+  stream every `min_interval` seconds, for agents to publish as
+  `TASK_PROGRESS`.  Held-back output goes out once the interval has passed,
+  even if no further output arrives.
+- `LogTail` keeps the last lines of a long-running command (a dev server)
+  so they can be reported while it is still running.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+# Bytes of a stream kept in memory before it is spooled to disk.
+DEFAULT_MAX_MEMORY_BYTES = 1024 * 1024
+
+# Where spooled output goes, and how many spool files are kept there.
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "sandbox-output")
+DEFAULT_SPOOL_RETAIN = 50
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutputChunk:
+    """A piece of command output; `stream` is "stdout" or "stderr"."""
+
+    stream: str
+    text: str
+
+
+OutputCallback = Callable[[OutputChunk], Union[None, Awaitable[None]]]
+
+
+async def emit_chunk(callback: Optional[OutputCallback], chunk: OutputChunk) -> None:
+    """Call a sync or async output callback."""
+    if callback is None:
+        return
+    result = callback(chunk)
+    if inspect.isawaitable(result):
+        await result
+
+
+class OutputStream:
+    """Chunks of a running command's output, in arrival order."""
+
+    _END = object()
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.returncode: Optional[int] = None
+        self.error: Optional[BaseException] = None
+
+    def feed(self, stream: str, text: str) -> None:
+        if text:
+            self._queue.put_nowait(OutputChunk(stream, text))
+
+    def close(self, returncode: Optional[int] = None, error: Optional[BaseException] = None) -> None:
+        """Mark the command finished; iteration re-raises `error` if given."""
+        self.returncode = returncode
+        self.error = error
+        self._queue.put_nowait(self._END)
+
+    def __aiter__(self) -> "OutputStream":
+        return self
+
+    async def __anext__(self) -> OutputChunk:
+        item = await self._queue.get()
+        if item is self._END:
+            # Keep the end marker for any later iteration.
+            self._queue.put_nowait(item)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        return item
+
+
+class SpooledOutput:
+    """One stream's output, in memory up to a cap and on disk beyond it."""
+
+    def __init__(
+        self,
+        name: str = "stdout",
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        spool_dir: str = DEFAULT_SPOOL_DIR,
+        retain: int = DEFAULT_SPOOL_RETAIN,
+    ):
+        self.name = name
+        self.max_memory_bytes = max_memory_bytes
+        self.spool_dir = spool_dir
+        self.retain = retain
+        self.size = 0
+        self.path: Optional[str] = None
+        self._parts: List[str] = []
+        self._file = None
+        self._tail = bytearray()
+
+    @property
+    def spooled(self) -> bool:
+        return self.path is not None
+
+    def write(self, text: str) -> None:
+        data = text.encode()
+        self.size += len(data)
+        if self._file is None and self.size > self.max_memory_bytes:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._file = tempfile.NamedTemporaryFile(
+                mode="wb", prefix=f"sandbox-{self.name}-", suffix=".log", dir=self.spool_dir, delete=False)
+            self.path = self._file.name
+            prune_spool_dir(self.spool_dir, self.retain)
+            buffered = "".join(self._parts).encode()
+            self._file.write(buffered)
+            self._tail = bytearray(buffered[-self.max_memory_bytes:])
+            self._parts = []
+        if self._file is not None:
+            self._file.write(data)
+            self._tail += data
+            del self._tail[:-self.max_memory_bytes]
+        else:
+            self._parts.append(text)
+
+    def getvalue(self) -> str:
+        """The full output, or once spooled, a note with the file path followed by the tail."""
+        if self._file is None:
+            return "".join(self._parts)
+        if not self._file.closed:
+            self._file.flush()
+        omitted = self.size - len(self._tail)
+        return f"[{omitted} bytes omitted; full output in {self.path}]\n" + self._tail.decode(errors="replace")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the spool file, for owners that no longer need the full output."""
+        self.close()
+        if self.path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    def metadata(self) -> Dict[str, object]:
+        """Size and, when spooled, file path of this stream, for result metadata."""
+        info: Dict[str, object] = {f"{self.name}_bytes": self.size}
+        if self.path:
+            info[f"{self.name}_path"] = self.path
+        return info
+
+
+def prune_spool_dir(spool_dir: str, retain: int) -> None:
+    """Delete all but the `retain` most recently modified spool files in `spool_dir`."""
+    try:
+        paths = [entry.path for entry in os.scandir(spool_dir) if entry.name.endswith(".log")]
+    except FileNotFoundError:
+        return
+    if len(paths) <= retain:
+        return
+
+    def mtime(path: str) -> float:
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    for path in sorted(paths, key=mtime, reverse=True)[retain:]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Removing spooled output {path} failed: {e}")
+
+
+def new_outputs(max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES) -> Dict[str, SpooledOutput]:
+    return {name: SpooledOutput(name, max_memory_bytes) for name in ("stdout", "stderr")}
+
+
+async def collect_output(
+    stream: OutputStream,
+    on_output: Optional[OutputCallback] = None,
+    max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+    outputs: Optional[Dict[str, SpooledOutput]] = None,
+) -> Dict[str, SpooledOutput]:
+    """Drain `stream` into a `SpooledOutput` per stream name, passing chunks to `on_output`.
+
+    Pass `outputs` (from `new_outputs()`) to keep the partial output if the
+    collection is cancelled, e.g. by a timeout.
+    """
+    if outputs is None:
+        outputs = new_outputs(max_memory_bytes)
+    try:
+        async for chunk in stream:
+            outputs.setdefault(chunk.stream, SpooledOutput(chunk.stream, max_memory_bytes)).write(chunk.text)
+            await emit_chunk(on_output, chunk)
+    finally:
+        for output in outputs.values():
+            output.close()
+    return outputs
+
+
+class ProgressForwarder:
+    """Output callback that batches chunks into rate-limited progress payloads.
+
+    `publish` receives ``{"level", "stream", "message"}`` dicts.  Output
+    arriving within `min_interval` of the previous publish is held back and
+    sent once the interval is up, together with anything that arrived
+    meanwhile; only the last `max_chars` characters of a batch are kept.
+    Call `flush()` when the command finishes.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Dict[str, str]], Awaitable[None]],
+        min_interval: float = 1.0,
+        max_chars: int = 4000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.publish = publish
+        self.min_interval = min_interval
+        self.max_chars = max_chars
+        self.clock = clock
+        self._pending: Dict[str, List[str]] = {}
+        self._last_publish: Optional[float] = None
+        # Publishes held-back output when the interval is up.
+        self._timer: Optional[asyncio.Task] = None
+
+    async def __call__(self, chunk: OutputChunk) -> None:
+        self._pending.setdefault(chunk.stream, []).append(chunk.text)
+        now = self.clock()
+        if self._last_publish is None or now - self._last_publish >= self.min_interval:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after(self._last_publish + self.min_interval - now))
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for stream, parts in pending.items():
+            text = "".join(parts)
+            if len(text) > self.max_chars:
+                text = f"[{len(text) - self.max_chars} chars omitted]\n" + text[-self.max_chars:]
+            await self.publish({
+                "level": "error" if stream == "stderr" else "info",
+                "stream": stream,
+                "message": text,
+            })
+        if pending:
+            self._last_publish = self.clock()
+
+
+class LogTail:
+    """Output callback keeping the last `max_lines` lines of both streams, interleaved.
+
+    Chunks are passed on to `forward`, if given.
+    """
+
+    def __init__(self, max_lines: int = 200, forward: Optional[OutputCallback] = None):
+        self.forward = forward
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._partial: Dict[str, str] = {}
+
+    async def __call__(self, chunk: OutputChunk) -> None:
+        lines = (self._partial.pop(chunk.stream, "") + chunk.text).split("\n")
+        if lines[-1]:
+            self._partial[chunk.stream] = lines[-1]
+        self._lines.extend(line + "\n" for line in lines[:-1])
+        await emit_chunk(self.forward, chunk)
+
+    def text(self) -> str:
+        return "".join(self._lines) + "".join(self._partial.values())
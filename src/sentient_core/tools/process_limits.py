@@ -0,0 +1,71 @@
+"""Resource caps for sandbox commands run as local subprocesses.
+
+`ResourceLimits` is set on a tool input; `preexec_for(limits)` turns it into a
+`preexec_fn` that applies the matching rlimits in the child before it execs,
+so they also bind everything the command starts.  POSIX only.
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class ResourceLimits(BaseModel):
+    """Per-process caps applied to local sandbox commands"""
+    cpu_seconds: Optional[int] = Field(
+        None,
+        description="CPU time a process may use before it is killed (RLIMIT_CPU)",
+        ge=1
+    )
+    memory_mb: Optional[int] = Field(
+        None,
+        description="Virtual memory a process may map (RLIMIT_AS)",
+        ge=16
+    )
+    file_size_mb: Optional[int] = Field(
+        None,
+        description="Largest file a process may write (RLIMIT_FSIZE)",
+        ge=1
+    )
+    open_files: Optional[int] = Field(
+        None,
+        description="File descriptors a process may hold (RLIMIT_NOFILE)",
+        ge=16
+    )
+
+
+def _rlimits(limits: ResourceLimits) -> List[Tuple[int, int]]:
+    mib = 1024 * 1024
+    pairs = [
+        ("RLIMIT_CPU", limits.cpu_seconds),
+        ("RLIMIT_AS", limits.memory_mb * mib if limits.memory_mb else None),
+        ("RLIMIT_FSIZE", limits.file_size_mb * mib if limits.file_size_mb else None),
+        ("RLIMIT_NOFILE", limits.open_files),
+    ]
+    return [(getattr(resource, name), value) for name, value in pairs if value is not None]
+
+
+def preexec_for(limits: Optional[ResourceLimits]) -> Optional[Callable[[], None]]:
+    """A `preexec_fn` applying `limits`, or None when there is nothing to apply."""
+    if limits is None:
+        return None
+    if resource is None:
+        raise RuntimeError("Resource limits need the POSIX `resource` module")
+    rlimits = _rlimits(limits)
+    if not rlimits:
+        return None
+
+    def apply():
+        for which, value in rlimits:
+            _, hard = resource.getrlimit(which)
+            # An unprivileged process cannot raise its hard limit.
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(which, (value, value if hard == resource.RLIM_INFINITY else hard))
+
+    return apply
@@ -0,0 +1,265 @@
+"""Warm pool of sandboxes, keyed by template, for `E2BSandboxTool`.
+
+Booting a sandbox dominates the latency of short backend tasks, so sandboxes
+are created ahead of time and reused:
+
+- The first checkout of a template boots it and, in the background, fills
+  the pool up to `size` idle sandboxes.  `warm()` does that up front.
+- `checkout()` returns an idle sandbox if there is one.  Otherwise it boots a
+  new one while the template has fewer than `max_size`, or waits for one to
+  be checked in.
+- `checkin()` resets the sandbox (by default nothing; the tool passes a reset
+  that empties the working directory) and returns it to the pool.  After
+  `max_uses` checkouts, a failed reset or a failed task, the sandbox is
+  destroyed and a fresh one booted in its place.
+- Sandboxes idle for longer than `idle_timeout` are destroyed rather than
+  handed out.
+- With a `lifetime` the provider kills a sandbox that long after it was
+  booted.  If `extend` is given, every checkout pushes that deadline back by
+  a full `lifetime` (`renew()` does it for sandboxes held across tasks);
+  otherwise sandboxes close to their deadline are destroyed instead of being
+  handed out.
+
+`stats()` reports checkouts, cold starts, recycles and checkout wait times.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Checkout wait samples kept for the percentiles in `stats()`.
+_WAIT_SAMPLES = 1000
+
+# How often a checkout waiting for a busy template re-checks for free capacity.
+_WAIT_RECHECK_SECONDS = 1.0
+
+# Remaining lifetime below which a sandbox that cannot be extended is not handed out.
+_LIFETIME_MARGIN_SECONDS = 60.0
+
+
+@dataclass
+class PooledSandbox:
+    """A sandbox owned by the pool, with its usage bookkeeping."""
+
+    sandbox: Any
+    template: str
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    # When the provider kills the sandbox (pool clock); infinite without a lifetime.
+    expires_at: float = float("inf")
+
+
+async def close_sandbox(sandbox: Any) -> None:
+    """Shut a sandbox down with whichever method this SDK version provides."""
+    closer = getattr(sandbox, "kill", None) or getattr(sandbox, "close")
+    await closer()
+
+
+class SandboxPool:
+    """Pre-booted sandboxes per template, with bounded reuse."""
+
+    def __init__(
+        self,
+        create: Callable[[str], Awaitable[Any]],
+        size: int = 2,
+        max_size: int = 8,
+        max_uses: int = 20,
+        idle_timeout: float = 300.0,
+        lifetime: Optional[float] = None,
+        extend: Optional[Callable[[Any, float], Awaitable[None]]] = None,
+        destroy: Callable[[Any], Awaitable[None]] = close_sandbox,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            create: Boots a sandbox for a template name.
+            size: Idle sandboxes kept ready per template.
+            max_size: Sandboxes per template, idle or checked out.
+            max_uses: Checkouts after which a sandbox is replaced.
+            idle_timeout: Seconds an idle sandbox may wait before it is destroyed.
+            lifetime: Seconds after boot (or after the last extension) at which
+                the provider kills a sandbox; None if it never does.
+            extend: Moves a sandbox's deadline to the given seconds from now.
+            destroy: Shuts a sandbox down.
+        """
+        self.create = create
+        self.size = size
+        self.max_size = max(max_size, size, 1)
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.lifetime = lifetime
+        self.extend = extend
+        self.destroy = destroy
+        self.clock = clock
+
+        self._idle: Dict[str, "asyncio.Queue[PooledSandbox]"] = {}
+        # Templates that have been requested, and so are kept warm.
+        self._templates: Set[str] = set()
+        self._total: Dict[str, int] = defaultdict(int)
+        self._background: Set[asyncio.Task] = set()
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._counters: Dict[str, int] = defaultdict(int)
+
+    # ------------------------------------------------------------------
+    # Checkout / checkin
+    # ------------------------------------------------------------------
+    async def checkout(self, template: str) -> PooledSandbox:
+        started = self.clock()
+        queue = self._queue(template)
+        first_use = template not in self._templates
+        self._templates.add(template)
+        while True:
+            try:
+                pooled = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                if self._total[template] < self.max_size:
+                    pooled = await self._boot(template)
+                    self._counters["cold_starts"] += 1
+                else:
+                    try:
+                        # Re-checked periodically: a discarded sandbox frees capacity
+                        # without anything being put back on the queue.
+                        pooled = await asyncio.wait_for(queue.get(), timeout=_WAIT_RECHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        continue
+            now = self.clock()
+            if now - pooled.last_used > self.idle_timeout or now >= pooled.expires_at:
+                await self._discard(pooled, "expired")
+                continue
+            try:
+                await self.renew(pooled)
+            except Exception as e:
+                logger.warning(f"A {template} sandbox reached the end of its lifetime: {e}")
+                await self._discard(pooled, "expired")
+                continue
+            break
+        if first_use:
+            self._fill(template)
+        pooled.uses += 1
+        self._counters["checkouts"] += 1
+        self._waits.append(self.clock() - started)
+        return pooled
+
+    async def checkin(self, pooled: PooledSandbox, reset: Optional[Callable[[Any], Awaitable[None]]] = None,
+                      healthy: bool = True) -> None:
+        """Return a sandbox, resetting it with `reset` unless it is due for replacement."""
+        pooled.last_used = self.clock()
+        if healthy and pooled.uses < self.max_uses:
+            try:
+                if reset is not None:
+                    await reset(pooled.sandbox)
+                self._queue(pooled.template).put_nowait(pooled)
+                return
+            except Exception as e:
+                logger.warning(f"Resetting a {pooled.template} sandbox failed, replacing it: {e}")
+        await self._discard(pooled, "recycled")
+        self._fill(pooled.template)
+
+    async def renew(self, pooled: PooledSandbox) -> None:
+        """Give a sandbox a full `lifetime` from now, or raise if it is about to be killed."""
+        if self.lifetime is None:
+            return
+        now = self.clock()
+        if self.extend is not None:
+            await self.extend(pooled.sandbox, self.lifetime)
+            pooled.expires_at = now + self.lifetime
+        elif pooled.expires_at - now < min(_LIFETIME_MARGIN_SECONDS, self.lifetime / 2):
+            raise RuntimeError("lifetime elapsed")
+
+    @asynccontextmanager
+    async def lease(self, template: str, reset: Optional[Callable[[Any], Awaitable[None]]] = None) -> AsyncIterator[Any]:
+        """Check a sandbox out for the duration of the block; errors mark it unhealthy."""
+        pooled = await self.checkout(template)
+        healthy = False
+        try:
+            yield pooled.sandbox
+            healthy = True
+        finally:
+            await self.checkin(pooled, reset=reset, healthy=healthy)
+
+    # ------------------------------------------------------------------
+    # Pool management
+    # ------------------------------------------------------------------
+    async def warm(self, *templates: str) -> None:
+        """Boot sandboxes until each template has `size` idle ones."""
+        for template in templates:
+            self._templates.add(template)
+        await asyncio.gather(*(self._fill_to_size(template) for template in templates))
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> float:
+            return waits[min(int(p * len(waits)), len(waits) - 1)] if waits else 0.0
+
+        return {
+            **{key: self._counters[key] for key in ("checkouts", "cold_starts", "recycled", "expired")},
+            "idle": {template: queue.qsize() for template, queue in self._idle.items()},
+            "total": dict(self._total),
+            "wait_p50_seconds": percentile(0.5),
+            "wait_p95_seconds": percentile(0.95),
+            "wait_max_seconds": waits[-1] if waits else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Destroy every idle sandbox and stop background boots."""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        for queue in self._idle.values():
+            while not queue.empty():
+                pooled = queue.get_nowait()
+                self._total[pooled.template] -= 1
+                await self._destroy(pooled)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _queue(self, template: str) -> "asyncio.Queue[PooledSandbox]":
+        if template not in self._idle:
+            self._idle[template] = asyncio.Queue()
+        return self._idle[template]
+
+    async def _boot(self, template: str) -> PooledSandbox:
+        self._total[template] += 1
+        try:
+            sandbox = await self.create(template)
+        except BaseException:
+            self._total[template] -= 1
+            raise
+        now = self.clock()
+        expires_at = now + self.lifetime if self.lifetime is not None else float("inf")
+        return PooledSandbox(sandbox=sandbox, template=template, created_at=now, last_used=now, expires_at=expires_at)
+
+    async def _fill_to_size(self, template: str) -> None:
+        queue = self._queue(template)
+        while queue.qsize() < self.size and self._total[template] < self.max_size:
+            try:
+                pooled = await self._boot(template)
+            except Exception as e:
+                logger.warning(f"Pre-booting a {template} sandbox failed: {e}")
+                return
+            queue.put_nowait(pooled)
+
+    def _fill(self, template: str) -> None:
+        task = asyncio.create_task(self._fill_to_size(template))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _discard(self, pooled: PooledSandbox, reason: str) -> None:
+        self._total[pooled.template] -= 1
+        self._counters[reason] += 1
+        await self._destroy(pooled)
+
+    async def _destroy(self, pooled: PooledSandbox) -> None:
+        try:
+            await self.destroy(pooled.sandbox)
+        except Exception as e:
+            logger.warning(f"Closing a {pooled.template} sandbox failed: {e}")
@@ -1,11 +1,33 @@
 from pydantic import BaseModel, Field, HttpUrl
-from typing import List, Dict, Any, Optional, Union, Literal
+from typing import List, Dict, Any, Optional, Sequence, Union, Literal
 from enum import Enum
 import os
 import json
+import signal
 import asyncio
+import codecs
+import datetime
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from .command_graph import CommandGraph, CommandResult, CommandSpec
+from .file_transfer import delete_local_files, write_local_files
+from .output_stream import LogTail, OutputCallback, OutputStream, collect_output, new_outputs
+from .process_limits import ResourceLimits, preexec_for
+from .workspace_sync import SyncPlan, WorkspaceManifest
+
+# Bytes read from a command's pipe at a time while streaming its output.
+_READ_CHUNK_BYTES = 64 * 1024
+
+# A background command's ports are probed for readiness at intervals growing
+# from the first to the second value.
+_READY_POLL_INITIAL_SECONDS = 0.05
+_READY_POLL_MAX_SECONDS = 1.0
+
+# Seconds a stopped background command gets to exit after SIGTERM before SIGKILL.
+_STOP_GRACE_SECONDS = 5.0
+
 class FileModel(BaseModel):
     """Model for file operations in the WebContainer"""
     path: str
@@ -18,9 +40,16 @@ class WebContainerToolInput(BaseModel):
         default_factory=list,
         description="Files to write to the WebContainer"
     )
-    commands: List[str] = Field(
+    commands: List[Union[str, CommandSpec]] = Field(
         default_factory=list,
-        description="Commands to execute in the WebContainer"
+        description="Commands to execute in the WebContainer. Plain strings run in order; "
+                    "CommandSpecs run as soon as the commands in their depends_on succeed"
+    )
+    max_parallel_commands: int = Field(
+        4,
+        description="Maximum number of independent commands running at once",
+        ge=1,
+        le=32
     )
     working_dir: str = Field(
         "/app",
@@ -44,10 +73,20 @@ class WebContainerToolInput(BaseModel):
     )
     timeout_seconds: int = Field(
         300,
-        description="Maximum execution time in seconds",
+        description="Maximum execution time in seconds for all commands; a command still "
+                    "running then is killed",
         ge=30,
         le=1800
     )
+    resource_limits: Optional[ResourceLimits] = Field(
+        None,
+        description="CPU, memory and file caps applied to every command"
+    )
+    session_id: Optional[str] = Field(
+        None,
+        description="Resume the session with this id; `files` is then the full "
+                    "workspace and only changed files are written"
+    )
 
 class WebContainerOutput(BaseModel):
     """Output model for WebContainer execution results"""
@@ -58,6 +97,39 @@ class WebContainerOutput(BaseModel):
     preview_url: Optional[HttpUrl] = None
     port: Optional[int] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    commands: List[CommandResult] = Field(default_factory=list)
+
+@dataclass
+class BackgroundProcess:
+    """A command the tool leaves running, such as a dev server"""
+    command: str
+    proc: Any
+    stream: OutputStream
+    collector: asyncio.Task
+    log: LogTail
+    ports: List[int]
+    started_at: datetime.datetime = field(default_factory=datetime.datetime.now)
+    # Why the command never became ready, if it didn't.
+    error: Optional[str] = None
+    timed_out: bool = False
+    
+    @property
+    def ready(self) -> bool:
+        return self.error is None
+    
+    def output(self, name: str) -> str:
+        """Full stdout or stderr, once the command has exited."""
+        if self.collector.done() and not self.collector.cancelled() and self.collector.exception() is None:
+            return self.collector.result()[name].getvalue()
+        return ""
+    
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "pid": self.proc.pid,
+            "ports": self.ports,
+            "started_at": self.started_at.isoformat(),
+            "log_tail": self.log.text(),
+        }
 
 class WebContainerTool:
     """
@@ -78,6 +150,13 @@ class WebContainerTool:
         """
         self.api_url = api_url or os.getenv("WEBCONTAINER_API_URL", "http://localhost:3000/api/webcontainer")
         self.session_id = None
+        # Tasks pumping the output of streamed commands.
+        self._waiters: set = set()
+        # Files synced to each named session, so resumed sessions get deltas.
+        self._manifests: Dict[str, WorkspaceManifest] = {}
+        self.last_sync: Optional[SyncPlan] = None
+        # Background commands (dev servers), stopped on close().
+        self._background: List[BackgroundProcess] = []
     
     async def initialize(self):
         """Initialize the WebContainer session"""
@@ -86,22 +165,38 @@ class WebContainerTool:
             # or create a new WebContainer instance
             self._initialized = True
     
-    async def create_session(self) -> str:
+    async def create_session(self, session_id: Optional[str] = None) -> str:
         """
         Create a new WebContainer session.
         
+        Args:
+            session_id: Name for the session. Creating a session with the name
+                of an earlier one resumes it, along with its synced files.
+        
         Returns:
             str: The session ID
         """
         await self.initialize()
+        if session_id is not None:
+            self._manifests.setdefault(session_id, WorkspaceManifest())
+            self.session_id = session_id
+            return self.session_id
         # In a real implementation, this would make an API call to create a session
         self.session_id = f"wc-{os.urandom(8).hex()}"
         return self.session_id
     
+    def end_session(self, session_id: str) -> None:
+        """Forget a named session's synced files; the next run with that name writes everything."""
+        self._manifests.pop(session_id, None)
+    
     async def write_files(self, files: List[FileModel]):
         """
         Write files to the WebContainer.
         
+        In a named session, `files` is the whole workspace: only files that
+        changed since the session's last sync are written, and files missing
+        from `files` are deleted.
+        
         Args:
             files: List of FileModel objects with path and content
         """
@@ -109,15 +204,24 @@ class WebContainerTool:
             raise RuntimeError("Session not initialized. Call create_session first.")
         
         # In a real implementation, this would send files to the WebContainer
-        # via WebSocket or API call
-        for file in files:
-            dir_path = os.path.dirname(file.path)
-            if dir_path and not os.path.exists(dir_path):
-                os.makedirs(dir_path, exist_ok=True)
-            
-            mode = 'wb' if file.is_binary else 'w'
-            with open(file.path, mode) as f:
-                f.write(file.content)
+        # via WebSocket or API call. Written from worker threads so a large
+        # tree does not block the event loop.
+        manifest = self._manifests.get(self.session_id)
+        if manifest is None:
+            await write_local_files(files)
+            return
+        
+        plan = manifest.plan(files)
+        try:
+            if plan.deleted:
+                await delete_local_files(plan.deleted)
+            if plan.changed:
+                await write_local_files(plan.changed)
+        except Exception:
+            manifest.clear()
+            raise
+        manifest.commit(plan)
+        self.last_sync = plan
     
     async def install_dependencies(self):
         """Install dependencies in the WebContainer"""
@@ -130,76 +234,292 @@ class WebContainerTool:
             # This is a placeholder - in reality, this would be handled client-side
             pass
     
-    async def execute_commands(self, commands: List[str], working_dir: str = "/app") -> WebContainerOutput:
+    async def stream_command(self, command: str, working_dir: str = "/app") -> OutputStream:
         """
-        Execute commands in the WebContainer.
+        Start a command in the WebContainer and return its output as it is produced.
         
         Args:
-            commands: List of commands to execute
-            working_dir: Working directory for the commands
+            command: Command to execute
+            working_dir: Working directory for the command
             
         Returns:
-            WebContainerOutput with the command results
+            OutputStream yielding stdout/stderr chunks; it ends when the command
+            exits and then holds the exit code in `returncode`.
         """
         if not self.session_id:
             raise RuntimeError("Session not initialized. Call create_session first.")
         
-        # In a real implementation, this would execute commands via WebSocket
-        # and stream the output back
-        results = []
-        for cmd in commands:
-            proc = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=working_dir
-            )
-            
-            stdout, stderr = await proc.communicate()
+        _, stream = await self._spawn(command, working_dir)
+        return stream
+    
+    async def _spawn(self, command: str, working_dir: str, new_group: bool = False,
+                     env: Optional[Dict[str, str]] = None, limits: Optional[ResourceLimits] = None):
+        """Start `command` with its output pumped into an OutputStream; returns (process, stream).
+        
+        With `new_group`, the command gets its own process group, so
+        `_signal_group` also reaches the processes it spawns. `env` is added
+        to the tool's own environment; `limits` are applied as rlimits.
+        """
+        stream = OutputStream()
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=working_dir,
+            start_new_session=new_group,
+            env={**os.environ, **env} if env else None,
+            preexec_fn=preexec_for(limits)
+        )
+        
+        async def pump(reader: asyncio.StreamReader, name: str):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while chunk := await reader.read(_READ_CHUNK_BYTES):
+                stream.feed(name, decoder.decode(chunk))
+            stream.feed(name, decoder.decode(b"", final=True))
+        
+        async def wait():
+            try:
+                await asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"))
+                stream.close(returncode=await proc.wait())
+            except Exception as e:
+                stream.close(error=e)
+            except asyncio.CancelledError:
+                proc.kill()
+                stream.close(error=RuntimeError(f"Command cancelled: {command}"))
+                raise
+        
+        waiter = asyncio.create_task(wait())
+        self._waiters.add(waiter)
+        waiter.add_done_callback(self._waiters.discard)
+        return proc, stream
+    
+    async def execute_commands(self, commands: List[Union[str, CommandSpec]], working_dir: str = "/app",
+                               on_output: Optional[OutputCallback] = None, max_parallel: int = 4,
+                               ready_ports: Sequence[int] = (), ready_timeout: float = 300.0,
+                               timeout: Optional[float] = None,
+                               limits: Optional[ResourceLimits] = None) -> WebContainerOutput:
+        """
+        Execute commands in the WebContainer as a dependency graph.
+        
+        Plain-string commands run one after another; `CommandSpec`s run as
+        soon as their dependencies succeed, up to `max_parallel` at a time.
+        Background commands such as dev servers are left running once they
+        accept connections: on every port their spec names, or otherwise on
+        any one of `ready_ports`.
+        
+        Args:
+            commands: Commands to execute
+            working_dir: Working directory for the commands
+            on_output: Called with each output chunk while the commands run
+            max_parallel: Maximum number of commands running at once
+            ready_ports: Ports a background command may serve on; the first
+                to accept connections makes it ready. A spec's own
+                `ready_ports` must all accept instead
+            ready_timeout: Seconds a background command has to become ready
+            timeout: Seconds all commands together may take. A command still
+                running then is killed, with its output so far kept, and commands
+                not yet started are skipped
+            limits: Resource caps applied to every command
             
-            results.append({
-                "command": cmd,
-                "exit_code": proc.returncode,
-                "stdout": stdout.decode(),
-                "stderr": stderr.decode()
-            })
+        Returns:
+            WebContainerOutput with a result per command in `commands`, and the
+            last command's output in `stdout`/`stderr`; output beyond the
+            memory cap is spooled to a file named in the metadata. The status is
+            "timeout" if the time limit cut any command short.
+        """
+        if not self.session_id:
+            raise RuntimeError("Session not initialized. Call create_session first.")
+        
+        graph = CommandGraph(commands)
+        deadline = time.monotonic() + timeout if timeout is not None else None
         
-        # For demo purposes, just return the last command's output
-        last_result = results[-1] if results else {}
+        async def run_command(spec: CommandSpec) -> CommandResult:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return CommandResult(name=spec.name, command=spec.command, status="skipped",
+                                     error=f"The {timeout:g}s time limit ran out before it started")
+            if spec.background:
+                return await self._launch_background(
+                    spec, working_dir, on_output, spec.ready_ports or list(ready_ports),
+                    ready_timeout if remaining is None else min(ready_timeout, remaining), limits,
+                    any_port=not spec.ready_ports,
+                )
+            return await self._run_to_exit(spec, working_dir, on_output, remaining, limits)
+        
+        results = await graph.run(run_command, max_parallel=max_parallel)
+        last = results[-1] if results else CommandResult(name="", command="", status="success")
+        server = next((r for r in results if r.status == "running" and r.metadata.get("ports")), None)
+        port = server.metadata["ports"][0] if server else None
+        if any(r.metadata.get("timed_out") for r in results):
+            status = "timeout"
+        else:
+            status = "success" if all(r.ok for r in results) else "error"
         return WebContainerOutput(
-            status="success" if not last_result.get('stderr') else "error",
-            stdout=last_result.get('stdout', ''),
-            stderr=last_result.get('stderr', '')
+            status=status,
+            stdout=last.stdout,
+            stderr=last.stderr,
+            error=next((f"{r.name}: {r.error}" for r in results if r.error and r.status == "error"), None),
+            preview_url=f"http://localhost:{port}" if port else None,
+            port=port,
+            metadata=last.metadata,
+            commands=results,
         )
     
-    async def start_dev_server(self, port: int = 3000, script: str = "dev") -> WebContainerOutput:
+    async def _run_to_exit(self, spec: CommandSpec, working_dir: str, on_output: Optional[OutputCallback],
+                           timeout: Optional[float] = None,
+                           limits: Optional[ResourceLimits] = None) -> CommandResult:
+        """Run a command to completion, killing its process group after `timeout` seconds."""
+        started = time.monotonic()
+        outputs = new_outputs()
+        timed_out = False
+        try:
+            proc, stream = await self._spawn(spec.command, working_dir, new_group=True, limits=limits)
+            try:
+                await asyncio.wait_for(collect_output(stream, on_output, outputs=outputs), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                _signal_group(proc, signal.SIGKILL)
+            except asyncio.CancelledError:
+                _signal_group(proc, signal.SIGKILL)
+                raise
+        except Exception as e:
+            return CommandResult(name=spec.name, command=spec.command, status="error", error=str(e),
+                                 duration_seconds=time.monotonic() - started)
+        metadata = {**outputs["stdout"].metadata(), **outputs["stderr"].metadata()}
+        if timed_out:
+            metadata["timed_out"] = True
+        return CommandResult(
+            name=spec.name,
+            command=spec.command,
+            status="success" if stream.returncode == 0 and not timed_out else "error",
+            exit_code=stream.returncode,
+            duration_seconds=time.monotonic() - started,
+            stdout=outputs["stdout"].getvalue(),
+            stderr=outputs["stderr"].getvalue(),
+            error=f"Killed after {time.monotonic() - started:.1f}s: time limit reached" if timed_out else None,
+            metadata=metadata,
+        )
+    
+    async def _launch_background(self, spec: CommandSpec, working_dir: str, on_output: Optional[OutputCallback],
+                                 ports: List[int], timeout: float,
+                                 limits: Optional[ResourceLimits] = None, any_port: bool = False) -> CommandResult:
+        started = time.monotonic()
+        try:
+            server = await self._start_background(spec.command, working_dir, ports, timeout, on_output,
+                                                  limits=limits, any_port=any_port)
+        except Exception as e:
+            return CommandResult(name=spec.name, command=spec.command, status="error", error=str(e))
+        return CommandResult(
+            name=spec.name,
+            command=spec.command,
+            status="running" if server.ready else "error",
+            exit_code=server.stream.returncode,
+            duration_seconds=time.monotonic() - started,
+            stdout=server.output("stdout"),
+            stderr=server.output("stderr"),
+            error=server.error,
+            metadata={**server.metadata(), **({"timed_out": True} if server.timed_out else {})},
+        )
+    
+    async def _start_background(self, command: str, working_dir: str, ports: List[int], timeout: float,
+                                on_output: Optional[OutputCallback] = None,
+                                env: Optional[Dict[str, str]] = None,
+                                limits: Optional[ResourceLimits] = None,
+                                any_port: bool = False) -> BackgroundProcess:
+        """
+        Start a long-running command and wait until it accepts connections on `ports`.
+        
+        With `any_port`, one of `ports` accepting is enough, and the process's
+        `ports` becomes that port. If it exits first, or is not ready within
+        `timeout` seconds (it is then stopped), the returned process has
+        `error` set.
+        """
+        log = LogTail(forward=on_output)
+        proc, stream = await self._spawn(command, working_dir, new_group=True, env=env, limits=limits)
+        server = BackgroundProcess(
+            command=command,
+            proc=proc,
+            stream=stream,
+            collector=asyncio.create_task(collect_output(stream, log)),
+            log=log,
+            ports=list(ports),
+        )
+        self._background.append(server)
+        try:
+            ready = await wait_for_ports(server.ports, timeout, exited=server.collector, any_port=any_port)
+            if ready:
+                server.ports = ready
+        except TimeoutError as e:
+            server.error, server.timed_out = str(e), True
+            await self._stop(server)
+        if server.error is None and server.collector.done():
+            server.error = f"Exited with code {stream.returncode} before accepting connections"
+        return server
+    
+    async def _stop(self, server: BackgroundProcess):
+        """SIGTERM the command's process group, and SIGKILL whatever is left after a grace period."""
+        _signal_group(server.proc, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(server.proc.wait(), _STOP_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        # Also reaches children that outlived the shell.
+        _signal_group(server.proc, signal.SIGKILL)
+        await asyncio.wait({server.collector}, timeout=_STOP_GRACE_SECONDS)
+        server.collector.cancel()
+    
+    async def start_dev_server(self, port: int = 3000, script: str = "dev", working_dir: str = "/app",
+                               timeout: float = 300.0, on_output: Optional[OutputCallback] = None) -> WebContainerOutput:
         """
         Start a development server in the WebContainer.
         
+        Runs `npm run <script>` in the background with PORT set, and returns
+        once the server accepts connections on `port`. The server keeps
+        running until `close()`.
+        
         Args:
             port: Port to expose
             script: NPM script to run (e.g., 'dev', 'start')
+            working_dir: Directory holding package.json
+            timeout: Seconds the server has to become ready
+            on_output: Called with the server's output chunks
             
         Returns:
-            WebContainerOutput with the server details
+            WebContainerOutput with the preview URL, and the pid, start time and
+            recent log lines in its metadata. If the server exits or is not ready
+            within `timeout` (it is then stopped), the status is "error" or
+            "timeout" and the log explains why.
         """
         if not self.session_id:
             raise RuntimeError("Session not initialized. Call create_session first.")
         
-        # In a real implementation, this would start the dev server
-        # and return the preview URL
+        try:
+            server = await self._start_background(f"npm run {script}", working_dir, [port], timeout,
+                                                  on_output=on_output, env={"PORT": str(port)})
+        except Exception as e:
+            return WebContainerOutput(status="error", error=f"Failed to start dev server: {str(e)}", port=port)
+        
+        if server.ready:
+            return WebContainerOutput(
+                status="success",
+                preview_url=f"http://localhost:{port}",
+                port=port,
+                metadata=server.metadata(),
+            )
         return WebContainerOutput(
-            status="success",
-            preview_url=f"http://localhost:{port}",
+            status="timeout" if server.timed_out else "error",
+            stdout=server.output("stdout"),
+            stderr=server.output("stderr"),
+            error=server.error,
             port=port,
-            metadata={
-                "pid": os.getpid(),
-                "started_at": str(datetime.datetime.now())
-            }
+            metadata=server.metadata(),
         )
     
     async def close(self):
-        """Close the WebContainer session"""
+        """Close the WebContainer session, stopping its background commands"""
+        background, self._background = self._background, []
+        await asyncio.gather(*(self._stop(server) for server in background if server.proc.returncode is None),
+                             return_exceptions=True)
         if hasattr(self, 'session_id') and self.session_id:
             # In a real implementation, this would clean up the WebContainer
             self.session_id = None
@@ -212,16 +532,18 @@ class WebContainerTool:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
     
-    async def run(self, inputs: WebContainerToolInput) -> Dict[str, Any]:
+    async def run(self, inputs: WebContainerToolInput, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
         """
         Execute a task in the WebContainer.
         
         This is the main entry point for the tool that implements the standard
-        tool interface expected by the agent framework.
+        tool interface expected by the agent framework. `on_output` receives the
+        commands' output chunks as they arrive.
         """
+        self.last_sync = None
         try:
-            # Create a new session
-            session_id = await self.create_session()
+            # Create a new session, or resume the named one
+            session_id = await self.create_session(inputs.session_id)
             
             # Write files to the container
             if inputs.files:
@@ -231,32 +553,37 @@ class WebContainerTool:
             if inputs.install_dependencies:
                 await self.install_dependencies()
             
-            # Execute commands
+            # Execute commands; dev servers among them are left running
             command_results = []
+            result = None
             if inputs.commands:
                 result = await self.execute_commands(
                     inputs.commands,
-                    working_dir=inputs.working_dir
+                    working_dir=inputs.working_dir,
+                    on_output=on_output,
+                    max_parallel=inputs.max_parallel_commands,
+                    ready_ports=inputs.expose_ports,
+                    ready_timeout=inputs.timeout_seconds,
+                    timeout=inputs.timeout_seconds,
+                    limits=inputs.resource_limits,
                 )
-                command_results.append(result.dict())
-            
-            # Start dev server if a start command was provided
-            server_result = None
-            if any(cmd.startswith(('npm run dev', 'yarn dev', 'pnpm dev')) for cmd in inputs.commands):
-                server_result = await self.start_dev_server(inputs.expose_ports[0] if inputs.expose_ports else 3000)
+                command_results = [r.model_dump() for r in result.commands]
             
             # Combine results
             output = {
-                "status": "success",
+                "status": result.status if result else "success",
                 "session_id": session_id,
                 "command_results": command_results,
             }
+            if self.last_sync is not None:
+                output["sync"] = self.last_sync.summary()
             
-            if server_result:
+            if result is not None and result.port:
+                server = next(r for r in result.commands if r.status == "running" and r.metadata.get("ports"))
                 output.update({
-                    "preview_url": str(server_result.preview_url) if server_result.preview_url else None,
-                    "port": server_result.port,
-                    "server_metadata": server_result.metadata
+                    "preview_url": str(result.preview_url),
+                    "port": result.port,
+                    "server_metadata": server.metadata
                 })
             
             return output
@@ -267,3 +594,56 @@ class WebContainerTool:
                 "error": str(e),
                 "session_id": getattr(self, 'session_id', None)
             }
+
+
+def _signal_group(proc, sig: int) -> None:
+    """Signal a background command and everything it started (a shell, npm, node...)."""
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+async def wait_for_ports(ports: List[int], timeout: float, host: str = "127.0.0.1",
+                         exited: Optional[asyncio.Future] = None, any_port: bool = False) -> List[int]:
+    """Wait until every port, or with `any_port` one of them, accepts TCP connections.
+    
+    Returns the ports found accepting. Probes back off exponentially. Returns
+    early, without raising, once `exited` (the task draining the server's
+    output) is done; raises TimeoutError after `timeout` seconds.
+    
+    A probe only sees that something accepts on the port, so a port another
+    process already listens on counts as ready too.
+    """
+    deadline = time.monotonic() + timeout
+    delay = _READY_POLL_INITIAL_SECONDS
+    pending = list(ports)
+    ready: List[int] = []
+    while pending:
+        if exited is not None and exited.done():
+            return ready
+        probed = pending if any_port else pending[:1]
+        accepted = [port for port in probed if await _accepts(host, port)]
+        if accepted:
+            if any_port:
+                return accepted[:1]
+            ready.append(pending.pop(0))
+            continue
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if any_port:
+                raise TimeoutError(f"Not accepting connections on any of ports "
+                                   f"{', '.join(map(str, probed))} after {timeout:g}s")
+            raise TimeoutError(f"Not accepting connections on port {probed[0]} after {timeout:g}s")
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, _READY_POLL_MAX_SECONDS)
+    return ready
+
+
+async def _accepts(host: str, port: int) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), _READY_POLL_MAX_SECONDS)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
@@ -0,0 +1,76 @@
+"""Incremental file sync for sandbox workspaces that live across runs.
+
+A `WorkspaceManifest` remembers the content hash of every file a sandbox
+holds.  Given the next run's full file set, `plan()` returns only the files
+whose content changed and the paths that are no longer part of the set; the
+tool uploads and deletes those, then calls `commit()`.  If a sync fails
+half-way the tool calls `clear()`, and the next run uploads everything again.
+"""
+
+import hashlib
+import posixpath
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from .file_transfer import file_bytes
+
+
+def content_hash(file: Any) -> str:
+    return hashlib.sha256(file_bytes(file)).hexdigest()
+
+
+def normalize_path(path: str) -> str:
+    """Key for a file path, so ``./src/app.py`` and ``src/app.py`` are the same file."""
+    return posixpath.normpath(path)
+
+
+@dataclass
+class SyncPlan:
+    """What a sync has to transfer to bring a workspace up to date."""
+
+    changed: List[Any] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    # Content hashes of the changed files, recorded by `WorkspaceManifest.commit`.
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, int]:
+        return {"uploaded": len(self.changed), "deleted": len(self.deleted), "unchanged": self.unchanged}
+
+
+class WorkspaceManifest:
+    """Path -> content hash of the files last synced to one workspace."""
+
+    def __init__(self):
+        self._hashes: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, path: str) -> bool:
+        return normalize_path(path) in self._hashes
+
+    def plan(self, files: Sequence[Any]) -> SyncPlan:
+        """Diff `files`, the complete desired workspace, against the manifest."""
+        plan = SyncPlan()
+        wanted = set()
+        for file in files:
+            path = normalize_path(file.path)
+            wanted.add(path)
+            digest = content_hash(file)
+            if self._hashes.get(path) == digest:
+                plan.unchanged += 1
+            else:
+                plan.changed.append(file)
+                plan.hashes[path] = digest
+        plan.deleted = sorted(path for path in self._hashes if path not in wanted)
+        return plan
+
+    def commit(self, plan: SyncPlan) -> None:
+        """Record a plan as applied to the workspace."""
+        for path in plan.deleted:
+            self._hashes.pop(path, None)
+        self._hashes.update(plan.hashes)
+
+    def clear(self) -> None:
+        self._hashes.clear()
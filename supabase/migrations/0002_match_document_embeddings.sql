@@ -0,0 +1,27 @@
+-- Similarity search over document_embeddings.
+-- Mirrored in-process by src/api/persistence/local_vector_index.py; keep the
+-- returned columns in sync with the DocumentMatch model.
+create or replace function match_document_embeddings(
+  query_embedding vector(1536),
+  match_count int default 10,
+  filter jsonb default '{}'::jsonb
+)
+returns table (
+  id uuid,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+language sql stable
+as $$
+  select
+    d.id,
+    d.content,
+    d.metadata,
+    1 - (d.embedding <=> query_embedding) as similarity
+  from document_embeddings d
+  where d.metadata @> filter
+  order by d.embedding <=> query_embedding
+  limit match_count;
+$$;
+comment on function match_document_embeddings is 'Top-k cosine similarity search over document_embeddings with a JSONB metadata filter.';
@@ -0,0 +1,75 @@
+-- Agents and tasks as used by src/api/persistence/supabase_persistence.py,
+-- with timestamp bookkeeping moved into the database so every mutation is a
+-- single returning statement (no read-before-write from the API).
+
+create table if not exists agents (
+  agent_id uuid primary key default uuid_generate_v4(),
+  name text not null,
+  description text,
+  capabilities jsonb not null default '[]'::jsonb,
+  config jsonb,
+  status text not null default 'INACTIVE' check (status in ('INACTIVE', 'ACTIVE', 'PROVISIONING', 'ERROR')),
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now()
+);
+comment on table agents is 'Registered agents exposed through /api/v1/agents.';
+
+create table if not exists tasks (
+  task_id uuid primary key default uuid_generate_v4(),
+  name text not null,
+  description text,
+  agent_id uuid references agents(agent_id) on delete set null,
+  input_data jsonb,
+  output_data jsonb,
+  status text not null default 'PENDING' check (status in ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED')),
+  priority int not null default 0,
+  dependencies jsonb not null default '[]'::jsonb,
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now(),
+  started_at timestamptz,
+  completed_at timestamptz
+);
+comment on table tasks is 'Tasks exposed through /api/v1/tasks.';
+
+-- updated_at is always the time of the last write.
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+-- started_at / completed_at follow status transitions unless the caller set
+-- them explicitly; existing values are never overwritten.
+create or replace function set_task_status_timestamps()
+returns trigger
+language plpgsql
+as $$
+begin
+  if new.status = 'RUNNING' then
+    new.started_at := coalesce(new.started_at, now());
+  elsif new.status in ('COMPLETED', 'FAILED') then
+    new.started_at := coalesce(new.started_at, now());
+    new.completed_at := coalesce(new.completed_at, now());
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists agents_set_updated_at on agents;
+create trigger agents_set_updated_at
+  before update on agents
+  for each row execute function set_updated_at();
+
+drop trigger if exists tasks_set_updated_at on tasks;
+create trigger tasks_set_updated_at
+  before update on tasks
+  for each row execute function set_updated_at();
+
+drop trigger if exists tasks_set_status_timestamps on tasks;
+create trigger tasks_set_status_timestamps
+  before insert or update of status on tasks
+  for each row execute function set_task_status_timestamps();
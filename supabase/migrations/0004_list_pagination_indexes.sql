@@ -0,0 +1,14 @@
+-- Composite indexes for keyset pagination in get_agents / get_tasks.
+-- Lists are ordered by (created_at, <id>) and resumed with
+-- `created_at > $ts or (created_at = $ts and <id> > $id)`, so each page is an
+-- index range scan of `limit` rows regardless of how deep it is.
+
+create index if not exists agents_created_at_agent_id_idx
+  on agents (created_at, agent_id);
+
+create index if not exists tasks_created_at_task_id_idx
+  on tasks (created_at, task_id);
+
+-- Per-agent task listings (`?agent_id=`) filter on agent_id first.
+create index if not exists tasks_agent_id_created_at_idx
+  on tasks (agent_id, created_at, task_id);
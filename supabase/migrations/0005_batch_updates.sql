@@ -0,0 +1,46 @@
+-- Partial multi-row updates for PATCH /agents:batch and /tasks:batch.
+-- `updates` is a JSON array of objects holding the row id plus only the
+-- columns to change (AgentUpdate / TaskUpdate dumped with exclude_unset), so
+-- absent keys keep the current value while explicit nulls clear it.  One
+-- UPDATE ... FROM covers the whole batch; the updated_at / status timestamp
+-- triggers from 0003 still fire per row.  Ids with no matching row are simply
+-- not returned.
+--
+-- A PostgREST upsert is not used here: its INSERT arm checks NOT NULL columns
+-- (name) before ON CONFLICT applies, and it would create rows for unknown ids.
+
+create or replace function batch_update_agents(updates jsonb)
+returns setof agents
+language sql
+as $$
+  update agents a set
+    name = case when u.item ? 'name' then u.item->>'name' else a.name end,
+    description = case when u.item ? 'description' then u.item->>'description' else a.description end,
+    capabilities = case when u.item ? 'capabilities' then coalesce(nullif(u.item->'capabilities', 'null'::jsonb), '[]'::jsonb) else a.capabilities end,
+    status = case when u.item ? 'status' then u.item->>'status' else a.status end,
+    config = case when u.item ? 'config' then nullif(u.item->'config', 'null'::jsonb) else a.config end
+  from jsonb_array_elements(updates) as u(item)
+  where a.agent_id = (u.item->>'agent_id')::uuid
+  returning a.*;
+$$;
+comment on function batch_update_agents is 'Apply a JSON array of partial agent updates in one statement.';
+
+create or replace function batch_update_tasks(updates jsonb)
+returns setof tasks
+language sql
+as $$
+  update tasks t set
+    name = case when u.item ? 'name' then u.item->>'name' else t.name end,
+    description = case when u.item ? 'description' then u.item->>'description' else t.description end,
+    agent_id = case when u.item ? 'agent_id' then (u.item->>'agent_id')::uuid else t.agent_id end,
+    input_data = case when u.item ? 'input_data' then nullif(u.item->'input_data', 'null'::jsonb) else t.input_data end,
+    output_data = case when u.item ? 'output_data' then nullif(u.item->'output_data', 'null'::jsonb) else t.output_data end,
+    status = case when u.item ? 'status' then u.item->>'status' else t.status end,
+    priority = case when u.item ? 'priority' then (u.item->>'priority')::int else t.priority end,
+    dependencies = case when u.item ? 'dependencies' then coalesce(nullif(u.item->'dependencies', 'null'::jsonb), '[]'::jsonb) else t.dependencies end,
+    started_at = case when u.item ? 'started_at' then (u.item->>'started_at')::timestamptz else t.started_at end
+  from jsonb_array_elements(updates) as u(item)
+  where t.task_id = (u.item->>'task_id')::uuid
+  returning t.*;
+$$;
+comment on function batch_update_tasks is 'Apply a JSON array of partial task updates in one statement.';
@@ -0,0 +1,8 @@
+-- Streaming export of a workflow's event history pages agent_events by
+-- (created_at, id) within one workflow_id; this index serves the filter and
+-- the order so each page is a range scan.  It supersedes idx_events_workflow.
+
+create index if not exists idx_events_workflow_created_at
+  on agent_events (workflow_id, created_at, id);
+
+drop index if exists idx_events_workflow;
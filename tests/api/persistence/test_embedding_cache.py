@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.api.persistence import embedding_cache
+from src.api.persistence.embedding_cache import EmbeddingCache, content_hash, get_memory_embedding_cache
+
+
+class FakeEmbedder:
+    """Deterministic embedder that records every batch it receives."""
+
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0, float(i)] for i, t in enumerate(texts)]
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
+
+
+@pytest.mark.asyncio
+async def test_dedups_within_batch_and_across_calls(tmp_path, embedder):
+    """Verify identical texts are embedded once, both inside a batch and on later calls."""
+    cache = EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder)
+
+    first = await cache.embed(["plan step", "code", "plan step"])
+    second = await cache.embed(["code", "plan step"])
+
+    assert embedder.calls == [["plan step", "code"]]
+    assert first.shape == (3, 4)
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(second[0], first[1])
+    assert cache.misses == 2
+    assert cache.hits == 3
+
+
+@pytest.mark.asyncio
+async def test_misses_are_sent_in_batches(tmp_path, embedder):
+    """Verify only the delta is embedded, split into batch_size chunks."""
+    cache = EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder, batch_size=2)
+    await cache.embed(["a", "b"])
+    embedder.calls.clear()
+
+    await cache.embed(["a", "b", "c", "d", "e"])
+
+    assert embedder.calls == [["c", "d"], ["e"]]
+
+
+@pytest.mark.asyncio
+async def test_persists_across_reopen_and_grows(tmp_path, embedder, monkeypatch):
+    """Verify vectors survive a reopen and the memory map grows past its initial capacity."""
+    monkeypatch.setattr("src.api.persistence.embedding_cache._INITIAL_CAPACITY", 2)
+    cache = EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder)
+    original = await cache.embed([f"text {i}" for i in range(5)])
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder)
+    embedder.calls.clear()
+    again = await reopened.embed([f"text {i}" for i in range(5)])
+
+    assert embedder.calls == []
+    assert len(reopened) == 5
+    assert "text 3" in reopened
+    np.testing.assert_array_equal(original, again)
+    np.testing.assert_array_equal(reopened.get("text 4"), original[4])
+
+
+@pytest.mark.asyncio
+async def test_async_embed_fn_and_concurrent_callers(tmp_path):
+    """Verify an async embed_fn works and concurrent callers share in-flight work."""
+    calls = []
+
+    async def slow_embed(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0.01)
+        return [[1.0, 2.0, 3.0, 4.0] for _ in texts]
+
+    cache = EmbeddingCache(str(tmp_path), dim=4, embed_fn=slow_embed)
+    a, b = await asyncio.gather(cache.embed(["shared"]), cache.embed(["shared"]))
+
+    assert calls == [["shared"]]
+    np.testing.assert_array_equal(a, b)
+    # The second caller waited for the first one's work; nothing was cached yet.
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_sync_embed_fn_runs_off_the_event_loop(tmp_path):
+    """Verify a blocking embed_fn is called from a worker thread."""
+    threads = []
+
+    def blocking_embed(texts):
+        threads.append(threading.get_ident())
+        return [[1.0, 2.0, 3.0, 4.0] for _ in texts]
+
+    cache = EmbeddingCache(str(tmp_path), dim=4, embed_fn=blocking_embed)
+    await cache.embed(["text"])
+
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_rejects_mismatched_model(tmp_path, embedder):
+    """Verify reopening a cache with a different model or dimension fails loudly."""
+    EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder, model="m1").close()
+
+    with pytest.raises(ValueError):
+        EmbeddingCache(str(tmp_path), dim=4, embed_fn=embedder, model="m2")
+
+
+def test_content_hash_includes_model():
+    """Verify the cache key changes with the model name."""
+    assert content_hash("x", "a") != content_hash("x", "b")
+    assert content_hash("x", "a") == content_hash("x", "a")
+
+
+def embed_lengths(texts):
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_memory_embedding_cache_is_configured_from_the_environment(tmp_path, monkeypatch):
+    """Verify no cache exists without MEMORY_EMBED_FN, and one wrapping the named function with it."""
+    monkeypatch.setattr(embedding_cache, "_memory_embedding_cache", None)
+    monkeypatch.delenv("MEMORY_EMBED_FN", raising=False)
+    assert get_memory_embedding_cache() is None
+
+    monkeypatch.setenv("MEMORY_EMBED_FN", f"{__name__}:embed_lengths")
+    monkeypatch.setenv("MEMORY_EMBED_DIM", "2")
+    monkeypatch.setenv("MEMORY_EMBEDDING_CACHE_DIR", str(tmp_path))
+    cache = get_memory_embedding_cache()
+
+    assert cache is get_memory_embedding_cache()
+    assert (await cache.embed(["abc"])).tolist() == [[3.0, 1.0]]
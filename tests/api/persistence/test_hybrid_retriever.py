@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.api.models.memory_models import EdgeType, MemoryEdge, MemoryNode, NodeType
+from src.api.persistence import hybrid_retriever
+from src.api.persistence.embedding_cache import EmbeddingCache
+from src.api.persistence.hybrid_retriever import BM25Index, HybridRetriever
+from src.api.persistence.surrealdb_persistence import create_node
+
+VOCAB = ["database", "migration", "schema", "frontend", "button", "color", "deploy", "docker"]
+
+
+def bag_of_words(texts):
+    """Embedder whose vectors are vocabulary counts, so similar wording means similar vectors."""
+    return [[float(text.lower().count(word)) + 0.01 for word in VOCAB] for text in texts]
+
+
+def _node(node_id: str, content: str, node_type: NodeType = NodeType.CONCEPT) -> MemoryNode:
+    return MemoryNode(id=node_id, node_type=node_type, content=content)
+
+
+@pytest.fixture
+async def retriever(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=len(VOCAB), embed_fn=bag_of_words)
+    r = HybridRetriever(embedding_cache=cache)
+    await r.index_nodes([
+        _node("memory_node:1", "Write the database migration for the schema change"),
+        _node("memory_node:2", "Frontend button color should match the brand"),
+        _node("memory_node:3", "Deploy the service with docker compose"),
+        _node("memory_node:4", "Schema review notes", NodeType.PLAN_STEP),
+    ])
+    return r
+
+
+def test_bm25_ranks_rarer_terms_higher_and_supports_replace():
+    """Verify BM25 favours documents matching rarer terms and re-adding replaces a document."""
+    index = BM25Index()
+    index.add("a", "python script python")
+    index.add("b", "python deploy")
+    index.add("c", "bash script")
+
+    assert index.search("deploy python")[0][0] == "b"
+
+    index.add("b", "nothing relevant")
+    assert "b" not in {doc_id for doc_id, _ in index.search("deploy")}
+    assert len(index) == 3
+
+
+@pytest.mark.asyncio
+async def test_search_fuses_lexical_and_vector_rankings(retriever):
+    """Verify hits carry both ranks and the best lexical+vector match comes first."""
+    hits = await retriever.search("database schema migration", top_k=2)
+
+    assert hits[0].node.id == "memory_node:1"
+    assert hits[0].lexical_rank == 1
+    assert hits[0].vector_rank == 1
+    assert hits[0].score > hits[1].score
+
+
+@pytest.mark.asyncio
+async def test_lexical_only_without_embedding_cache():
+    """Verify the retriever works with BM25 alone when no embeddings are configured."""
+    r = HybridRetriever()
+    await r.index_node(_node("memory_node:1", "docker deploy"))
+
+    hits = await r.search("docker")
+    assert [hit.node.id for hit in hits] == ["memory_node:1"]
+    assert hits[0].vector_rank is None
+
+
+@pytest.mark.asyncio
+async def test_removed_nodes_leave_no_vector_rows(retriever):
+    """Verify remove_node drops the node's vector row too."""
+    retriever.remove_node("memory_node:1")
+
+    assert len(retriever.vector_index) == 3
+    hits = await retriever.search("database schema migration")
+    assert "memory_node:1" not in {hit.node.id for hit in hits}
+
+
+@pytest.mark.asyncio
+async def test_node_type_filter(retriever):
+    """Verify node_types restricts results."""
+    hits = await retriever.search("schema", node_types=[NodeType.PLAN_STEP])
+    assert [hit.node.id for hit in hits] == ["memory_node:4"]
+
+
+@pytest.mark.asyncio
+async def test_one_hop_expansion_follows_only_selected_edges():
+    """Verify expansion adds RELATES_TO / CLARIFIES neighbours but not other edge types."""
+    r = HybridRetriever()
+    await r.index_nodes([
+        _node("memory_node:q", "login bug"),
+        _node("memory_node:related", "session cookie handling"),
+        _node("memory_node:fix", "patch for auth"),
+    ])
+    r.index_edge(MemoryEdge(source_node_id="memory_node:q", target_node_id="memory_node:related", edge_type=EdgeType.CLARIFIES))
+    r.index_edge(MemoryEdge(source_node_id="memory_node:fix", target_node_id="memory_node:q", edge_type=EdgeType.FIXES))
+
+    plain = await r.search("login bug")
+    expanded = await r.search("login bug", expand=True)
+
+    assert [hit.node.id for hit in plain] == ["memory_node:q"]
+    assert [hit.node.id for hit in expanded] == ["memory_node:q", "memory_node:related"]
+    assert expanded[1].expanded_from == "memory_node:q"
+    assert expanded[1].score < expanded[0].score
+
+
+@pytest.mark.asyncio
+@patch('src.api.persistence.surrealdb_persistence.get_surrealdb_client')
+async def test_create_node_indexes_for_search(mock_get_client, monkeypatch):
+    """Verify create_node feeds the shared retriever so new content is searchable immediately."""
+    monkeypatch.setattr(hybrid_retriever, "_memory_retriever", HybridRetriever())
+    mock_db = AsyncMock()
+    mock_db.create.return_value = [{"id": "memory_node:new", "node_type": "CONCEPT", "content": "vector quantization notes"}]
+    mock_get_client.return_value = mock_db
+
+    await create_node(MemoryNode(node_type=NodeType.CONCEPT, content="vector quantization notes"))
+
+    hits = await hybrid_retriever.get_memory_retriever().search("quantization")
+    assert [hit.node.id for hit in hits] == ["memory_node:new"]
+
+
+def test_memory_search_endpoint(monkeypatch):
+    """Verify POST /memory/search returns ranked hits."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api.routers import memory_router
+
+    app = FastAPI()
+    app.include_router(memory_router.router)
+
+    r = HybridRetriever()
+    asyncio.run(r.index_node(_node("memory_node:1", "docker deploy")))
+    monkeypatch.setattr(hybrid_retriever, "_memory_retriever", r)
+
+    response = TestClient(app).post("/memory/search", json={"query": "docker", "top_k": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body[0]["node"]["id"] == "memory_node:1"
+    assert body[0]["lexical_rank"] == 1
@@ -0,0 +1,179 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from src.api.models.memory_models import DocumentMatch
+from src.api.persistence.local_vector_index import LocalVectorIndex
+from src.sentient_core.specialized_agents.research_agent import ResearchAgent
+from src.sentient_core.state.state_models import TaskState
+
+
+def _random_corpus(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def _exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int):
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores)[:k])
+
+
+@pytest.fixture
+def corpus():
+    return _random_corpus(500, 32)
+
+
+@pytest.fixture
+def index(corpus):
+    idx = LocalVectorIndex(dim=32)
+    idx.add(
+        ids=[f"doc-{i}" for i in range(len(corpus))],
+        embeddings=corpus,
+        contents=[f"content {i}" for i in range(len(corpus))],
+        metadata=[{"parity": "even" if i % 2 == 0 else "odd"} for i in range(len(corpus))],
+    )
+    return idx
+
+
+def test_brute_force_matches_exact_ranking(index, corpus):
+    """Verify brute-force search returns the exact cosine top-k, best first."""
+    query = corpus[7] + 0.01
+    hits = index.search(query, top_k=5)
+
+    expected = [f"doc-{i}" for i in _exact_top_k(corpus, query, 5)]
+    assert [doc_id for doc_id, _ in hits] == expected
+    assert hits[0][0] == "doc-7"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_match_document_embeddings_returns_document_matches(index, corpus):
+    """Verify the pgvector-compatible method returns DocumentMatch rows with filters applied."""
+    matches = index.match_document_embeddings(corpus[3], match_count=3, filter={"parity": "odd"})
+
+    assert len(matches) == 3
+    assert all(isinstance(m, DocumentMatch) for m in matches)
+    assert matches[0].id == "doc-3"
+    assert matches[0].content == "content 3"
+    assert all(m.metadata["parity"] == "odd" for m in matches)
+    assert matches[0].similarity >= matches[1].similarity >= matches[2].similarity
+
+
+def test_add_replaces_existing_ids(index, corpus):
+    """Verify re-adding an id overwrites the row instead of duplicating it."""
+    index.add(["doc-0"], corpus[1], contents=["replaced"])
+
+    assert len(index) == len(corpus)
+    top = index.match_document_embeddings(corpus[1], match_count=2)
+    assert {m.id for m in top} == {"doc-0", "doc-1"}
+    assert next(m for m in top if m.id == "doc-0").content == "replaced"
+
+
+def test_ivf_recall_on_clustered_data():
+    """Verify IVF probing keeps recall high on clustered data and scans the unindexed tail."""
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((20, 16)).astype(np.float32) * 5
+    vectors = np.concatenate([c + rng.standard_normal((100, 16)).astype(np.float32) for c in centers])
+    idx = LocalVectorIndex(dim=16, n_probe=4)
+    idx.add([str(i) for i in range(len(vectors))], vectors)
+    idx.train_ivf(n_lists=20)
+    assert idx.is_trained
+
+    recalls = []
+    for q in rng.choice(len(vectors), 20, replace=False):
+        expected = {str(i) for i in _exact_top_k(vectors, vectors[q], 10)}
+        got = {doc_id for doc_id, _ in idx.search(vectors[q], top_k=10)}
+        recalls.append(len(expected & got) / 10)
+    assert np.mean(recalls) >= 0.9
+
+    idx.add(["late"], centers[0] * 10)
+    assert idx.search(centers[0], top_k=1)[0][0] == "late"
+
+
+def test_remove_drops_rows_and_keeps_ivf_lists_valid(index, corpus):
+    """Verify removed ids are never returned and the other rows stay findable after IVF training."""
+    index.train_ivf(n_lists=8)
+    index.add(["tail"], corpus[5] + 0.01)
+    index.remove(["doc-7", "tail", "missing"])
+
+    assert len(index) == len(corpus) - 1
+    assert index.search(corpus[7], top_k=1)[0][0] != "doc-7"
+    assert index.search(corpus[5], top_k=1)[0][0] == "doc-5"
+    assert all(index.search(corpus[i], top_k=1, n_probe=8)[0][0] == f"doc-{i}" for i in (0, 100, 499))
+
+
+def test_save_and_load_memory_mapped(tmp_path, index, corpus):
+    """Verify an index round-trips through disk and stays searchable when memory-mapped."""
+    index.train_ivf(n_lists=8)
+    index.save(str(tmp_path))
+
+    loaded = LocalVectorIndex.load(str(tmp_path))
+    assert isinstance(loaded._vectors, np.memmap)
+    assert len(loaded) == len(index)
+    assert loaded.search(corpus[42], top_k=3) == index.search(corpus[42], top_k=3)
+
+    # Adding to a read-only mapped index materialises it instead of failing.
+    loaded.add(["new"], corpus[0])
+    assert len(loaded) == len(index) + 1
+
+
+def test_float16_storage(corpus):
+    """Verify float16 storage halves memory and keeps the same nearest neighbour."""
+    idx = LocalVectorIndex(dim=32, dtype=np.float16)
+    idx.add([str(i) for i in range(len(corpus))], corpus)
+
+    assert idx._vectors.dtype == np.float16
+    assert idx.search(corpus[11], top_k=1)[0][0] == "11"
+
+
+def test_rejects_wrong_dimension():
+    """Verify mismatched embedding shapes are rejected."""
+    idx = LocalVectorIndex(dim=8)
+    with pytest.raises(ValueError):
+        idx.add(["a"], np.ones(4))
+
+
+@pytest.mark.asyncio
+async def test_research_agent_retrieves_from_local_index(index, corpus):
+    """Verify ResearchAgent attaches local retrieval results when a query embedding is given."""
+    agent = ResearchAgent(vector_index=index)
+    agent.log = AsyncMock()
+    task = TaskState(
+        id="task-1",
+        department="Research",
+        description="find related docs",
+        input_data={"query_embedding": json.dumps(corpus[5].tolist()), "match_count": "2"},
+    )
+
+    result = await agent._execute_task_impl("wf-1", task)
+
+    assert [source["id"] for source in result["sources"]][0] == "doc-5"
+    assert len(result["sources"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_research_agent_awaits_async_persistence_and_threads_sync_lookups(index, corpus):
+    """Verify the async Supabase lookup is awaited and a sync one runs off the event loop."""
+    match = DocumentMatch(id="doc-1", content="c", metadata={}, similarity=0.9)
+    async_db = AsyncMock()
+    async_db.match_document_embeddings.return_value = [match]
+    threads = []
+
+    class SyncDB:
+        def match_document_embeddings(self, query_embedding, match_count=10, filter=None):
+            threads.append(threading.get_ident())
+            return [match]
+
+    task = TaskState(id="task-1", department="Research", description="find",
+                     input_data={"query_embedding": json.dumps([1.0, 0.0])})
+    for db in (async_db, SyncDB()):
+        agent = ResearchAgent(vector_index=db)
+        agent.log = AsyncMock()
+        result = await agent._execute_task_impl("wf-1", task)
+        assert [source["id"] for source in result["sources"]] == ["doc-1"]
+
+    async_db.match_document_embeddings.assert_awaited_once_with([1.0, 0.0], match_count=5)
+    assert threads and threads[0] != threading.get_ident()
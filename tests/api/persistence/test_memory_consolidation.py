@@ -0,0 +1,187 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.models.memory_models import EdgeType, MemoryEdge, MemoryNode, NodeType
+from src.api.persistence import hybrid_retriever
+from src.api.persistence.hybrid_retriever import HybridRetriever
+from src.api.persistence.memory_consolidation import MemoryConsolidator, _jaccard, _jaccard_matrix
+
+OLD = datetime(2024, 1, 1)
+
+
+def _node(node_id, content, node_type=NodeType.AGENT_ACTION):
+    return MemoryNode(id=node_id, node_type=node_type, content=content, created_at=OLD)
+
+
+def _edge(edge_id, source, target, edge_type=EdgeType.RELATES_TO):
+    return MemoryEdge(id=edge_id, source_node_id=source, target_node_id=target, edge_type=edge_type)
+
+
+@pytest.mark.asyncio
+async def test_cluster_groups_near_duplicates_per_type():
+    """Verify similar content clusters together, but never across node types."""
+    consolidator = MemoryConsolidator(similarity_threshold=0.5, edge_weight=0.0)
+    nodes = [
+        _node("memory_node:a1", "ran pytest in sandbox for workflow alpha"),
+        _node("memory_node:a2", "ran pytest in sandbox for workflow beta"),
+        _node("memory_node:e1", "ran pytest in sandbox for workflow alpha", NodeType.ERROR),
+        _node("memory_node:x", "uploaded frontend bundle"),
+    ]
+
+    clusters = await consolidator.cluster(nodes, {})
+
+    assert sorted(sorted(n.id for n in c) for c in clusters) == [
+        ["memory_node:a1", "memory_node:a2"],
+        ["memory_node:e1"],
+        ["memory_node:x"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_shared_neighbours_tip_borderline_pairs_into_a_cluster():
+    """Verify edge overlap is blended into the similarity score."""
+    nodes = [_node("memory_node:1", "fix import error"), _node("memory_node:2", "fix typing error")]
+    neighbours = {"memory_node:1": {"memory_node:file"}, "memory_node:2": {"memory_node:file"}}
+
+    content_only = MemoryConsolidator(similarity_threshold=0.6, edge_weight=0.0)
+    with_edges = MemoryConsolidator(similarity_threshold=0.6, edge_weight=0.5)
+
+    assert len(await content_only.cluster(nodes, neighbours)) == 2
+    assert len(await with_edges.cluster(nodes, neighbours)) == 1
+
+
+@pytest.mark.asyncio
+async def test_different_neighbours_never_keep_duplicates_apart():
+    """Verify identical content clusters at the default threshold whatever the neighbours."""
+    nodes = [_node("memory_node:1", "ran pytest in sandbox"), _node("memory_node:2", "ran pytest in sandbox")]
+    neighbours = {"memory_node:1": {"memory_node:wf-a"}, "memory_node:2": {"memory_node:wf-b"}}
+
+    assert len(await MemoryConsolidator().cluster(nodes, neighbours)) == 1
+
+
+def test_rewire_moves_external_edges_and_drops_internal_ones():
+    """Verify edges are re-pointed at summaries, internal edges vanish and duplicates merge."""
+    summary_for = {"memory_node:a1": "memory_node:s", "memory_node:a2": "memory_node:s"}
+    edges = [
+        _edge("RELATES_TO:1", "memory_node:a1", "memory_node:a2"),
+        _edge("RELATES_TO:2", "memory_node:a1", "memory_node:file"),
+        _edge("RELATES_TO:3", "memory_node:a2", "memory_node:file"),
+        _edge("FIXES:4", "memory_node:patch", "memory_node:a2", EdgeType.FIXES),
+    ]
+
+    rewired = MemoryConsolidator.rewire(edges, summary_for)
+
+    assert {(e.source_node_id, e.target_node_id, e.edge_type, e.weight) for e in rewired} == {
+        ("memory_node:s", "memory_node:file", EdgeType.RELATES_TO, 2.0),
+        ("memory_node:patch", "memory_node:s", EdgeType.FIXES, 1.0),
+    }
+
+
+@pytest.mark.asyncio
+@patch("src.api.persistence.memory_consolidation.create_edges", new_callable=AsyncMock)
+@patch("src.api.persistence.memory_consolidation.create_node", new_callable=AsyncMock)
+@patch("src.api.persistence.memory_consolidation.get_surrealdb_client")
+async def test_run_once_archives_merges_and_deletes(mock_get_client, mock_create_node, mock_create_edges, tmp_path, monkeypatch):
+    """Verify a pass writes the archive, creates a summary, rewires edges and deletes originals."""
+    retriever = HybridRetriever()
+    monkeypatch.setattr(hybrid_retriever, "_memory_retriever", retriever)
+    nodes = [
+        _node("memory_node:a1", "ran pytest in sandbox"),
+        _node("memory_node:a2", "ran pytest in sandbox"),
+        _node("memory_node:x", "deployed preview"),
+    ]
+    await retriever.index_nodes(nodes)
+    edges = [_edge("RELATES_TO:1", "memory_node:a1", "memory_node:file")]
+
+    db = AsyncMock()
+    db.query.side_effect = [
+        [{"result": [n.model_dump(mode="json") for n in nodes]}],
+        [{"result": [e.model_dump(mode="json", by_alias=True) for e in edges]}] + [{"result": []}] * (len(EdgeType) - 1),
+        [],
+    ]
+    mock_get_client.return_value = db
+    mock_create_node.side_effect = lambda node: node.model_copy(update={"id": "memory_node:summary"})
+    mock_create_edges.side_effect = lambda new_edges: new_edges
+
+    consolidator = MemoryConsolidator(archive_dir=str(tmp_path), similarity_threshold=0.9)
+    report = await consolidator.run_once(now=OLD + timedelta(days=30))
+
+    assert report.scanned == 3
+    assert report.archived == 2
+    assert report.kept == 1
+    assert report.summaries == ["memory_node:summary"]
+    assert report.edges_rewired == 1
+
+    summary = mock_create_node.call_args.args[0]
+    assert summary.node_type == NodeType.CONCEPT
+    assert summary.metadata["consolidated_from"] == ["memory_node:a1", "memory_node:a2"]
+    rewired = mock_create_edges.call_args.args[0]
+    assert [(e.source_node_id, e.target_node_id) for e in rewired] == [("memory_node:summary", "memory_node:file")]
+
+    with gzip.open(report.archive_file, "rt") as f:
+        archived = [json.loads(line) for line in f]
+    assert [r["id"] for r in archived] == ["memory_node:a1", "memory_node:a2", "RELATES_TO:1"]
+
+    delete_query, delete_vars = db.query.call_args_list[2].args
+    assert "DELETE memory_node" in delete_query
+    assert delete_vars == {"ids": ["memory_node:a1", "memory_node:a2"]}
+    # The unclustered node is left eligible for later runs.
+    assert db.query.call_count == 3
+
+    hits = await retriever.search("pytest sandbox")
+    assert [hit.node.id for hit in hits] == []
+    db.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("src.api.persistence.memory_consolidation.get_surrealdb_client")
+async def test_run_once_without_database_returns_none(mock_get_client, tmp_path):
+    """Verify the job is a no-op when SurrealDB is unavailable."""
+    mock_get_client.return_value = None
+    assert await MemoryConsolidator(archive_dir=str(tmp_path)).run_once() is None
+
+
+def test_jaccard_matrix_matches_pairwise_jaccard():
+    """Verify the vectorized similarity matrix equals per-pair token Jaccard."""
+    token_sets = [{"a", "b", "c"}, {"b", "c", "d"}, set(), {"a"}]
+    matrix = _jaccard_matrix(token_sets)
+    for i, a in enumerate(token_sets):
+        for j, b in enumerate(token_sets):
+            assert matrix[i, j] == pytest.approx(_jaccard(a, b))
+
+
+@pytest.mark.asyncio
+@patch("src.api.persistence.memory_consolidation.create_edges", new_callable=AsyncMock)
+@patch("src.api.persistence.memory_consolidation.create_node", new_callable=AsyncMock)
+@patch("src.api.persistence.memory_consolidation.get_surrealdb_client")
+async def test_run_once_keeps_originals_when_edges_are_not_all_rewired(mock_get_client, mock_create_node, mock_create_edges, tmp_path):
+    """Verify a partial edge rewire rolls back the summary and deletes no original."""
+    nodes = [_node("memory_node:a1", "ran pytest in sandbox"), _node("memory_node:a2", "ran pytest in sandbox")]
+    edges = [
+        _edge("RELATES_TO:1", "memory_node:a1", "memory_node:file"),
+        _edge("RELATES_TO:2", "memory_node:a2", "memory_node:other"),
+    ]
+
+    db = AsyncMock()
+    db.query.side_effect = [
+        [{"result": [n.model_dump(mode="json") for n in nodes]}],
+        [{"result": [e.model_dump(mode="json", by_alias=True) for e in edges]}] + [{"result": []}] * (len(EdgeType) - 1),
+        [],
+    ]
+    mock_get_client.return_value = db
+    mock_create_node.side_effect = lambda node: node.model_copy(update={"id": "memory_node:summary"})
+    mock_create_edges.side_effect = lambda new_edges: new_edges[:1]
+
+    report = await MemoryConsolidator(archive_dir=str(tmp_path), similarity_threshold=0.9).run_once(
+        now=OLD + timedelta(days=30)
+    )
+
+    assert report is None
+    assert db.query.call_count == 3
+    cleanup_query, cleanup_vars = db.query.call_args_list[2].args
+    assert cleanup_vars == {"ids": ["memory_node:summary"]}
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,99 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.api.models.core_models import AgentRead
+from src.api.persistence.record_cache import RecordCache, etag_matches, record_etag
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _agent(agent_id=None, updated_at=NOW, name="Agent"):
+    return AgentRead(agent_id=agent_id or uuid.uuid4(), name=name, created_at=NOW, updated_at=updated_at)
+
+
+def test_entries_expire_after_ttl():
+    """Verify entries are served until `ttl` elapses and then count as misses."""
+    clock = FakeClock()
+    cache = RecordCache(ttl=5, clock=clock)
+    agent = _agent()
+    cache.put("agents", agent.agent_id, agent)
+
+    assert cache.get("agents", str(agent.agent_id)) == agent
+    clock.now = 5
+    assert cache.get("agents", agent.agent_id) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_and_invalidate():
+    """Verify the least recently used entry is evicted and invalidate drops an id."""
+    cache = RecordCache(ttl=60, max_entries=2)
+    a, b, c = _agent(), _agent(), _agent()
+    cache.put("agents", a.agent_id, a)
+    cache.put("agents", b.agent_id, b)
+    cache.get("agents", a.agent_id)
+    cache.put("agents", c.agent_id, c)
+
+    assert cache.get("agents", b.agent_id) is None
+    cache.invalidate("agents", a.agent_id)
+    assert cache.get("agents", a.agent_id) is None
+    assert cache.get("agents", c.agent_id) == c
+
+
+def test_older_row_does_not_replace_newer():
+    """Verify a slow read cannot overwrite a newer written-through row."""
+    cache = RecordCache(ttl=60)
+    agent_id = uuid.uuid4()
+    cache.put("agents", agent_id, _agent(agent_id, NOW + timedelta(seconds=1), name="new"))
+    cache.put("agents", agent_id, _agent(agent_id, NOW, name="old"))
+
+    assert cache.get("agents", agent_id).name == "new"
+
+
+def test_read_racing_an_invalidation_is_not_cached():
+    """Verify a read that started before a delete cannot re-cache the deleted row."""
+    cache = RecordCache(ttl=60)
+    agent = _agent()
+    generation = cache.generation()
+    cache.invalidate("agents", agent.agent_id)
+    cache.put("agents", agent.agent_id, agent, generation=generation)
+
+    assert cache.get("agents", agent.agent_id) is None
+    cache.put("agents", agent.agent_id, agent, generation=cache.generation())
+    assert cache.get("agents", agent.agent_id) == agent
+
+
+def test_evicted_tombstones_and_clear_still_block_older_reads():
+    """Verify reads older than a forgotten tombstone or a clear() are not cached."""
+    cache = RecordCache(ttl=60, max_entries=1)
+    a, b = _agent(), _agent()
+    generation = cache.generation()
+    cache.invalidate("agents", a.agent_id)
+    cache.invalidate("agents", b.agent_id)  # evicts a's tombstone
+    cache.put("agents", a.agent_id, a, generation=generation)
+    assert cache.get("agents", a.agent_id) is None
+
+    generation = cache.generation()
+    cache.clear()
+    cache.put("agents", a.agent_id, a, generation=generation)
+    assert cache.get("agents", a.agent_id) is None
+
+
+def test_etags_follow_updated_at():
+    """Verify ETags change with updated_at and If-None-Match parsing."""
+    agent_id = uuid.uuid4()
+    etag = record_etag(agent_id, NOW)
+
+    assert etag == record_etag(agent_id, NOW)
+    assert etag != record_etag(agent_id, NOW + timedelta(microseconds=1))
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
@@ -0,0 +1,202 @@
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.api.models.core_models import AgentBatchUpdate, AgentStatus, AgentUpdate, TaskCreate, TaskStatus, TaskUpdate
+from src.api.persistence import async_supabase_persistence, supabase_persistence, supabase_queries
+from tests.conftest import AsyncQueryMock
+
+NOW = datetime.now(timezone.utc).isoformat()
+AGENT_ROW = {
+    "agent_id": str(uuid.uuid4()), "name": "Agent", "description": None, "capabilities": [], "config": {},
+    "status": AgentStatus.ACTIVE.value, "created_at": NOW, "updated_at": NOW,
+}
+TASK_ROW = {
+    "task_id": str(uuid.uuid4()), "name": "Task", "description": None, "agent_id": None, "input_data": {},
+    "output_data": None, "status": TaskStatus.RUNNING.value, "priority": 0, "dependencies": [],
+    "created_at": NOW, "updated_at": NOW, "started_at": NOW, "completed_at": None,
+}
+
+CASES = [
+    ("update_agent", (uuid.uuid4(), AgentUpdate(status=AgentStatus.ACTIVE)), "update", AGENT_ROW),
+    ("delete_agent", (uuid.uuid4(),), "delete", AGENT_ROW),
+    ("update_task", (uuid.uuid4(), TaskUpdate(status=TaskStatus.RUNNING)), "update", TASK_ROW),
+    ("delete_task", (uuid.uuid4(),), "delete", TASK_ROW),
+]
+
+
+def _response(data):
+    response = MagicMock()
+    response.data = data
+    return response
+
+
+@pytest.mark.parametrize("function, args, verb, row", CASES)
+def test_sync_mutations_make_a_single_request(function, args, verb, row):
+    """Verify update/delete return the affected row from one PostgREST request."""
+    client = MagicMock()
+    execute = getattr(client.table.return_value, verb).return_value.eq.return_value.execute
+    execute.return_value = _response([row])
+
+    with patch.object(supabase_persistence, "supabase_client", client):
+        result = getattr(supabase_persistence, function)(*args)
+
+    assert result is not None
+    assert client.table.call_count == 1
+    execute.assert_called_once()
+    client.table.return_value.select.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("function, args, verb, row", CASES)
+async def test_async_mutations_make_a_single_request(function, args, verb, row):
+    """Verify the async layer keeps the same one-request-per-mutation behaviour."""
+    client = AsyncQueryMock()
+    execute = getattr(client.table.return_value, verb).return_value.eq.return_value.execute
+    execute.return_value = _response([row])
+
+    async def get_client():
+        return client
+
+    with patch.object(async_supabase_persistence, "get_async_supabase_client", get_client):
+        result = await getattr(async_supabase_persistence, function)(*args)
+
+    assert result is not None
+    assert client.table.call_count == 1
+    execute.assert_awaited_once()
+    client.table.return_value.select.assert_not_called()
+
+
+def test_missing_row_returns_none():
+    """Verify an empty RETURNING result maps to None (404 in the routers)."""
+    client = MagicMock()
+    client.table.return_value.delete.return_value.eq.return_value.execute.return_value = _response([])
+
+    with patch.object(supabase_persistence, "supabase_client", client):
+        assert supabase_persistence.delete_task(uuid.uuid4()) is None
+
+
+def test_empty_update_fetches_the_row_instead_of_patching():
+    """Verify a PUT with no fields returns the existing row rather than a 404."""
+    client = MagicMock()
+    execute = client.table.return_value.select.return_value.eq.return_value.single.return_value.execute
+    execute.return_value = _response(AGENT_ROW)
+
+    with patch.object(supabase_persistence, "supabase_client", client), \
+            patch.object(supabase_persistence.record_cache, "get", return_value=None):
+        agent = supabase_persistence.update_agent(uuid.UUID(AGENT_ROW["agent_id"]), AgentUpdate())
+
+    assert agent is not None and str(agent.agent_id) == AGENT_ROW["agent_id"]
+    client.table.return_value.update.assert_not_called()
+
+
+def test_task_update_payload_leaves_timestamps_to_the_database():
+    """Verify status changes no longer compute started_at/completed_at client-side."""
+    payload = supabase_queries.task_update_payload(TaskUpdate(status=TaskStatus.COMPLETED))
+
+    assert payload == {"status": "COMPLETED"}
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    """Verify cursors encode (created_at, id) and invalid ones raise ValueError."""
+    cursor = supabase_queries.encode_cursor(TASK_ROW, "task_id")
+
+    assert supabase_queries.decode_cursor(cursor) == [NOW, TASK_ROW["task_id"]]
+    with pytest.raises(ValueError):
+        supabase_queries.decode_cursor("not-a-cursor")
+
+
+def test_get_tasks_with_cursor_uses_keyset_filter():
+    """Verify a cursor adds the (created_at, task_id) filter and starts at offset 0."""
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.eq.return_value
+    query.or_.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = _response([TASK_ROW])
+    cursor = supabase_queries.encode_cursor(TASK_ROW, "task_id")
+
+    with patch.object(supabase_persistence, "supabase_client", client):
+        tasks = supabase_persistence.get_tasks(agent_id=uuid.uuid4(), skip=50, limit=10, cursor=cursor)
+
+    assert [t.name for t in tasks] == ["Task"]
+    query.or_.assert_called_once_with(
+        f'created_at.gt."{NOW}",and(created_at.eq."{NOW}",task_id.gt.{TASK_ROW["task_id"]})'
+    )
+    query.or_.return_value.order.return_value.order.return_value.range.assert_called_once_with(0, 9)
+
+
+def test_get_tasks_with_fields_projects_columns():
+    """Verify `fields` narrows the select list (keeping cursor columns) and returns dicts."""
+    client = MagicMock()
+    row = {"task_id": TASK_ROW["task_id"], "created_at": NOW, "name": "Task"}
+    client.table.return_value.select.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = _response([row])
+
+    with patch.object(supabase_persistence, "supabase_client", client):
+        tasks = supabase_persistence.get_tasks(fields=["name"])
+
+    client.table.return_value.select.assert_called_once_with("task_id,created_at,name")
+    assert tasks == [row]
+    with pytest.raises(ValueError):
+        supabase_queries.select_columns(["nope"], supabase_persistence.TaskRead, "task_id")
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_falls_back_to_per_row_inserts():
+    """Verify a failed multi-row insert is retried row by row with per-index errors."""
+    client = AsyncQueryMock()
+    insert = client.table.return_value.insert
+    insert.return_value.execute.side_effect = [Exception("batch rejected"), _response([TASK_ROW]), Exception("bad agent_id")]
+
+    async def get_client():
+        return client
+
+    with patch.object(async_supabase_persistence, "get_async_supabase_client", get_client):
+        result = await async_supabase_persistence.create_tasks([TaskCreate(name="ok"), TaskCreate(name="bad", agent_id=uuid.uuid4())])
+
+    assert [t.name for t in result.items] == ["Task"]
+    assert [(e.index, e.error) for e in result.errors] == [(1, "bad agent_id")]
+    assert insert.call_count == 3
+    assert isinstance(insert.call_args_list[0].args[0], list)
+
+
+@pytest.mark.asyncio
+async def test_async_update_agents_uses_one_rpc():
+    """Verify batch updates are a single batch_update_agents call."""
+    client = AsyncQueryMock()
+    client.rpc.return_value.execute.return_value = _response([AGENT_ROW])
+
+    async def get_client():
+        return client
+
+    with patch.object(async_supabase_persistence, "get_async_supabase_client", get_client):
+        result = await async_supabase_persistence.update_agents([
+            AgentBatchUpdate(agent_id=AGENT_ROW["agent_id"], status=AgentStatus.ACTIVE),
+        ])
+
+    assert [str(a.agent_id) for a in result.items] == [AGENT_ROW["agent_id"]]
+    assert result.errors == []
+    client.rpc.assert_called_once_with("batch_update_agents", {"updates": [{"agent_id": AGENT_ROW["agent_id"], "status": "ACTIVE"}]})
+    client.table.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_iter_tasks_pages_by_keyset():
+    """Verify exports fetch page after page, resuming after the last row of each."""
+    rows = [{**TASK_ROW, "task_id": str(uuid.uuid4())} for _ in range(3)]
+    client = AsyncQueryMock()
+    select = client.table.return_value.select.return_value
+    select.order.return_value.order.return_value.range.return_value.execute.return_value = _response(rows[:2])
+    select.or_.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = _response(rows[2:])
+
+    async def get_client():
+        return client
+
+    with patch.object(async_supabase_persistence, "get_async_supabase_client", get_client):
+        exported = [row async for row in async_supabase_persistence.iter_tasks(page_size=2)]
+
+    assert exported == rows
+    select.or_.assert_called_once_with(
+        f'created_at.gt."{NOW}",and(created_at.eq."{NOW}",task_id.gt.{rows[1]["task_id"]})'
+    )
+    with pytest.raises(ValueError):
+        async_supabase_persistence.iter_tasks(fields=["bogus"])
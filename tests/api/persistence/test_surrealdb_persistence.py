@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 
 from src.api.models.memory_models import MemoryNode, MemoryEdge, NodeType, EdgeType, SurrealID
-from src.api.persistence.surrealdb_persistence import create_node, get_node, create_edge
+from src.api.persistence.surrealdb_persistence import create_node, get_node, create_edge, create_edges, RELATE_TEMPLATES
 
 @pytest.fixture
 def mock_surreal_client():
@@ -95,3 +95,64 @@ async def test_create_edge_success(mock_get_client, mock_surreal_client):
     assert created_edge.target_node_id == target_id
     mock_surreal_client.query.assert_called_once()
     mock_surreal_client.close.assert_called_once()
+
+@pytest.mark.asyncio
+@patch('src.api.persistence.surrealdb_persistence.get_surrealdb_client')
+async def test_create_edge_binds_values_instead_of_interpolating(mock_get_client, mock_surreal_client):
+    """Verify ids and content travel as query variables, so quotes cannot break the statement."""
+    # Arrange
+    mock_get_client.return_value = mock_surreal_client
+    edge_to_create = MemoryEdge(
+        source_node_id=SurrealID("memory_node:source"),
+        target_node_id=SurrealID("memory_node:⟨target⟩"),
+        edge_type=EdgeType.CLARIFIES,
+        metadata={"note": "it's \"quoted\"; DELETE memory_node;"},
+    )
+    mock_surreal_client.query.return_value = [
+        {'result': None, 'status': 'OK'},
+        {'result': None, 'status': 'OK'},
+        {'result': [{'id': 'CLARIFIES:e1', 'in': 'memory_node:source', 'out': 'memory_node:target', 'edge_type': 'CLARIFIES'}], 'status': 'OK'},
+    ]
+
+    # Act
+    created_edge = await create_edge(edge_to_create.source_node_id, edge_to_create.target_node_id, edge_to_create)
+
+    # Assert
+    assert created_edge.id == "CLARIFIES:e1"
+    query, variables = mock_surreal_client.query.call_args.args
+    assert query == RELATE_TEMPLATES[EdgeType.CLARIFIES]
+    assert "memory_node" not in query and "quoted" not in query
+    assert variables["src_tb"] == "memory_node" and variables["src_id"] == "source"
+    assert variables["dst_id"] == "target"
+    assert variables["content"]["metadata"]["note"] == "it's \"quoted\"; DELETE memory_node;"
+
+@pytest.mark.asyncio
+@patch('src.api.persistence.surrealdb_persistence.get_surrealdb_client')
+async def test_create_edges_batches_relates_into_one_query(mock_get_client, mock_surreal_client):
+    """Verify create_edges sends several RELATE statements in a single round trip."""
+    # Arrange
+    mock_get_client.return_value = mock_surreal_client
+    edges = [
+        MemoryEdge(source_node_id=f"memory_node:{i}", target_node_id=f"memory_node:{i + 1}", edge_type=edge_type)
+        for i, edge_type in enumerate([EdgeType.RELATES_TO, EdgeType.DEPENDS_ON, EdgeType.RELATES_TO])
+    ]
+    mock_surreal_client.query.return_value = [
+        entry
+        for i, edge in enumerate(edges)
+        for entry in (
+            {'result': None}, {'result': None},
+            {'result': [{'id': f'{edge.edge_type.value}:{i}', 'in': edge.source_node_id, 'out': edge.target_node_id, 'edge_type': edge.edge_type.value}]},
+        )
+    ]
+
+    # Act
+    created = await create_edges(edges)
+
+    # Assert
+    mock_surreal_client.query.assert_called_once()
+    query, variables = mock_surreal_client.query.call_args.args
+    assert query.count("RELATE $") == 3
+    assert "->DEPENDS_ON->" in query
+    assert variables["src_id_2"] == "2"
+    assert [edge.id for edge in created] == ["RELATES_TO:0", "DEPENDS_ON:1", "RELATES_TO:2"]
+    mock_surreal_client.close.assert_called_once()
@@ -1,12 +1,12 @@
 import pytest
 import uuid
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timezone, timedelta
 
 from src.main import app # app instance from src/main.py
 from src.api.models.core_models import AgentCreate, AgentRead, AgentUpdate, AgentStatus
-# We will patch the supabase_client within the persistence module directly in tests
+# Persistence is mocked through the `mock_supabase_client` fixture in tests/conftest.py
 
 client = TestClient(app)
 
@@ -17,7 +17,6 @@ def test_read_api_v1_root():
     assert response.status_code == 200
     assert response.json() == {"status": "ok", "message": "Welcome to the Sentient Core API v1!"}
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_create_agent(mock_supabase_client):
     agent_data = AgentCreate(
         name="Test Agent Alpha",
@@ -57,7 +56,6 @@ def test_create_agent(mock_supabase_client):
     # For this mock, they are set to the same 'now' value, so they should match after parsing
     assert datetime.fromisoformat(created_agent_response_data["created_at"]) == datetime.fromisoformat(created_agent_response_data["updated_at"])
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_get_specific_agent(mock_supabase_client):
     agent_id_str = str(uuid.uuid4())
     now = datetime.now(timezone.utc)
@@ -81,7 +79,6 @@ def test_get_specific_agent(mock_supabase_client):
     assert str(retrieved_agent.agent_id) == agent_id_str
     assert retrieved_agent.name == expected_agent_data["name"]
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_get_nonexistent_agent(mock_supabase_client):
     non_existent_uuid = str(uuid.uuid4())
     mock_response = MagicMock()
@@ -95,7 +92,6 @@ def test_get_nonexistent_agent(mock_supabase_client):
     assert response.status_code == 404
     assert response.json()["detail"] == "Agent not found"
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_list_agents(mock_supabase_client):
     now = datetime.now(timezone.utc)
     agents_data = [
@@ -104,7 +100,7 @@ def test_list_agents(mock_supabase_client):
     ]
     mock_response = MagicMock()
     mock_response.data = agents_data
-    mock_supabase_client.table().select().range().execute.return_value = mock_response
+    mock_supabase_client.table().select().order().order().range().execute.return_value = mock_response
 
     response = client.get("/api/v1/agents/")
     assert response.status_code == 200
@@ -114,7 +110,6 @@ def test_list_agents(mock_supabase_client):
     assert agents_list_response[0]["name"] == "Agent One"
     assert agents_list_response[1]["name"] == "Agent Two"
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_update_agent(mock_supabase_client):
     agent_id_str = str(uuid.uuid4())
     original_created_at_dt = datetime.now(timezone.utc) - timedelta(days=1)
@@ -135,8 +130,8 @@ def test_update_agent(mock_supabase_client):
         "updated_at": datetime.now(timezone.utc).isoformat() # Should be new
     }
     mock_update_response = MagicMock()
-    mock_update_response.data = updated_agent_data_from_db
-    mock_supabase_client.table().update().eq().select().single().execute.return_value = mock_update_response
+    mock_update_response.data = [updated_agent_data_from_db] # PATCH ... RETURNING returns the updated rows
+    mock_supabase_client.table().update().eq().execute.return_value = mock_update_response
 
     response = client.put(f"/api/v1/agents/{agent_id_str}", json=update_payload.model_dump(exclude_unset=True))
     assert response.status_code == 200
@@ -149,19 +144,17 @@ def test_update_agent(mock_supabase_client):
     assert datetime.fromisoformat(updated_agent_response["created_at"]) == original_created_at_dt
     assert datetime.fromisoformat(updated_agent_response["updated_at"]) > original_created_at_dt
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_update_nonexistent_agent(mock_supabase_client):
     non_existent_uuid_str = str(uuid.uuid4())
     update_payload = AgentUpdate(name="Doesn't Matter")
     
     mock_update_response = MagicMock()
-    mock_update_response.data = None # Simulate agent not found for update
-    mock_supabase_client.table().update().eq().select().single().execute.return_value = mock_update_response
+    mock_update_response.data = [] # No row matched the update
+    mock_supabase_client.table().update().eq().execute.return_value = mock_update_response
 
     response = client.put(f"/api/v1/agents/{non_existent_uuid_str}", json=update_payload.model_dump(exclude_unset=True))
     assert response.status_code == 404
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_delete_agent(mock_supabase_client):
     agent_id_str = str(uuid.uuid4())
     now = datetime.now(timezone.utc)
@@ -175,17 +168,9 @@ def test_delete_agent(mock_supabase_client):
         "updated_at": now.isoformat()
     }
 
-    # Mock for the get_agent call inside delete_agent
-    mock_get_response = MagicMock()
-    mock_get_response.data = agent_to_delete_data
-    
-    # Mock for the delete call
+    # DELETE ... RETURNING returns the deleted row; no prior fetch is made
     mock_delete_response = MagicMock()
-    mock_delete_response.data = [agent_to_delete_data] # Supabase delete might return the deleted record(s)
-    # Or if it doesn't return data but a status: mock_delete_response.status_code = 200 (or 204)
-
-    # Chain the mocks: first for get, then for delete
-    mock_supabase_client.table().select().eq().single().execute.return_value = mock_get_response
+    mock_delete_response.data = [agent_to_delete_data]
     mock_supabase_client.table().delete().eq().execute.return_value = mock_delete_response
 
     response = client.delete(f"/api/v1/agents/{agent_id_str}")
@@ -201,16 +186,73 @@ def test_delete_agent(mock_supabase_client):
     get_response = client.get(f"/api/v1/agents/{agent_id_str}")
     assert get_response.status_code == 404
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_delete_nonexistent_agent(mock_supabase_client):
     non_existent_uuid_str = str(uuid.uuid4())
     
-    # Mock for the get_agent call inside delete_agent, returning None
-    mock_get_response = MagicMock()
-    mock_get_response.data = None
-    mock_supabase_client.table().select().eq().single().execute.return_value = mock_get_response
+    # DELETE ... RETURNING matched no rows
+    mock_delete_response = MagicMock()
+    mock_delete_response.data = []
+    mock_supabase_client.table().delete().eq().execute.return_value = mock_delete_response
 
     response = client.delete(f"/api/v1/agents/{non_existent_uuid_str}")
     assert response.status_code == 404
 
 
+
+
+def test_get_agent_etag_and_cache(mock_supabase_client):
+    agent_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    row = {"agent_id": agent_id, "name": "Cached", "status": AgentStatus.ACTIVE.value, "created_at": now, "updated_at": now, "description": None, "capabilities": [], "config": {}}
+    mock_response = MagicMock()
+    mock_response.data = row
+    get_execute = mock_supabase_client.table().select().eq().single().execute
+    get_execute.return_value = mock_response
+
+    response = client.get(f"/api/v1/agents/{agent_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Served from the row cache: no second PostgREST request.
+    response = client.get(f"/api/v1/agents/{agent_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert get_execute.await_count == 1
+
+    # An update writes the new row through, so the old ETag no longer matches.
+    later = (datetime.now(timezone.utc) + timedelta(seconds=1)).isoformat()
+    mock_update_response = MagicMock()
+    mock_update_response.data = [{**row, "name": "Renamed", "updated_at": later}]
+    mock_supabase_client.table().update().eq().execute.return_value = mock_update_response
+    response = client.put(f"/api/v1/agents/{agent_id}", json={"name": "Renamed"})
+    assert response.headers["ETag"] != etag
+
+    response = client.get(f"/api/v1/agents/{agent_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert get_execute.await_count == 1
+
+
+def test_create_task_for_agent_enqueues(mock_supabase_client):
+    agent_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    agent_response = MagicMock()
+    agent_response.data = {"agent_id": agent_id, "name": "Worker", "status": AgentStatus.ACTIVE.value, "created_at": now, "updated_at": now, "description": None, "capabilities": ["Research"], "config": {}}
+    mock_supabase_client.table().select().eq().single().execute.return_value = agent_response
+    task_response = MagicMock()
+    task_response.data = [{
+        "task_id": str(uuid.uuid4()), "name": "Look into queues", "agent_id": agent_id, "status": "PENDING",
+        "priority": 3, "created_at": now, "updated_at": now, "description": None, "input_data": {},
+        "output_data": None, "started_at": None, "completed_at": None, "dependencies": [],
+    }]
+    mock_supabase_client.table().insert().execute.return_value = task_response
+
+    queue = MagicMock()
+    queue.enqueue = AsyncMock()
+    with patch("src.api.routers.agent_router.get_task_queue", return_value=queue):
+        response = client.post(f"/api/v1/agents/{agent_id}/tasks", json={"name": "Look into queues", "priority": 3})
+
+    assert response.status_code == 202, response.text
+    assert response.json()["status"] == "PENDING"
+    assert mock_supabase_client.table().insert.call_args.args[0]["agent_id"] == agent_id
+    queue.enqueue.assert_awaited_once_with(uuid.UUID(response.json()["task_id"]), agent_id=uuid.UUID(agent_id), priority=3)
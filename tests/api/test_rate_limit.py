@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.rate_limit import (
+    AdmissionController, RateLimiter, RateLimitMiddleware, RoutePolicy, TokenBucket, default_policies,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+    clock.now += 10  # refill is capped at the burst size
+    assert [bucket.try_acquire() for _ in range(4)][-1] > 0
+
+
+def test_route_policy_matches_templates():
+    policy = RoutePolicy(name="p", routes=["POST /api/v1/agents/{agent_id}/tasks", "POST /api/v1/workflows"])
+    assert policy.matches("POST", "/api/v1/agents/123/tasks")
+    assert policy.matches("POST", "/api/v1/workflows/")
+    assert not policy.matches("GET", "/api/v1/agents/123/tasks")
+    assert not policy.matches("POST", "/api/v1/agents/123/tasks/extra")
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_then_sheds():
+    """Verify requests beyond the limit wait in a bounded queue and are shed when it is full or times out."""
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    assert await admission.acquire()
+
+    waiting = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+    assert not await admission.acquire()  # queue full
+
+    admission.release()  # hands the slot to the waiter
+    assert await waiting
+    assert admission.in_flight == 1
+
+    assert not await admission.acquire()  # waits, then times out
+    admission.release()
+    assert admission.in_flight == 0 and admission.queued == 0
+
+
+def make_client(policy: RoutePolicy, clock=None):
+    app = FastAPI()
+
+    @app.post("/run")
+    async def run():
+        return {"ok": True}
+
+    @app.get("/free")
+    async def free():
+        return {"ok": True}
+
+    limiter = RateLimiter([policy], clock=clock or FakeClock())
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(app), limiter
+
+
+def test_middleware_rate_limits_per_api_key():
+    client, limiter = make_client(RoutePolicy(name="run", routes=["POST /run"], rate=0.5, burst=2))
+
+    responses = [client.post("/run", headers={"X-API-Key": "a"}) for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[-1].headers["Retry-After"] == "2"
+
+    # Another key has its own bucket; unmatched routes are never limited.
+    assert client.post("/run", headers={"X-API-Key": "b"}).status_code == 200
+    assert all(client.get("/free").status_code == 200 for _ in range(5))
+
+    assert limiter.stats()["run"]["allowed"] == 3
+    assert limiter.stats()["run"]["rate_limited"] == 1
+
+
+def test_middleware_sheds_when_at_capacity():
+    client, limiter = make_client(RoutePolicy(name="run", routes=["POST /run"], max_concurrent=0))
+    response = client.post("/run")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert limiter.stats()["run"]["shed"] == 1
+
+
+def test_default_policies_cover_the_batch_and_create_routes():
+    limiter = RateLimiter(default_policies())
+    for method, path in [
+        ("POST", "/api/v1/tasks:batch"), ("PATCH", "/api/v1/tasks:batch"),
+        ("POST", "/api/v1/agents:batch"), ("PATCH", "/api/v1/agents:batch"),
+        ("POST", "/api/v1/agents"), ("POST", "/api/v1/agents/"),
+    ]:
+        assert limiter.policy_for(method, path).name == "create", (method, path)
+
+
+def test_batch_requests_cost_one_token_per_item():
+    """Verify a batch drains the bucket by its size and the route still receives the full body."""
+    app = FastAPI()
+
+    @app.post("/api/v1/tasks:batch")
+    async def create_tasks_batch(items: List[Dict[str, Any]]):
+        return {"received": len(items)}
+
+    clock = FakeClock()
+    policy = RoutePolicy(name="create", routes=[], batch_routes=["POST /api/v1/tasks:batch"], rate=1, burst=5)
+    limiter = RateLimiter([policy], clock=clock)
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    client = TestClient(app)
+
+    first = client.post("/api/v1/tasks:batch", json=[{"name": str(i)} for i in range(4)])
+    assert first.status_code == 200 and first.json() == {"received": 4}
+    assert client.post("/api/v1/tasks:batch", json=[{}, {}]).status_code == 429
+
+    # A batch above the burst needs a full bucket, then leaves the client in debt.
+    clock.now += 10
+    assert client.post("/api/v1/tasks:batch", json=[{}] * 8).status_code == 200
+    response = client.post("/api/v1/tasks:batch", json=[{}])
+    assert response.status_code == 429 and response.headers["Retry-After"] == "4"
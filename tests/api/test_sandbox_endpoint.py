@@ -1,6 +1,13 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import patch
 
+from src.api.routers import sandbox_router
+from src.api.sandbox_jobs import SandboxJobs
 from src.main import app
 
 client = TestClient(app)
@@ -11,7 +18,7 @@ def test_sandbox_run_endpoint():
 
     mock_output = "Hello from sandbox"
 
-    with patch("src.api.routers.sandbox_router.run_in_e2b_sandbox", return_value=mock_output):
+    with patch("src.api.routers.sandbox_router.run_in_e2b_sandbox_async", new=AsyncMock(return_value=mock_output)):
         response = client.post(
             "/api/v1/sandbox/run",
             json={"script": "print('hi')", "language": "python"},
@@ -19,3 +26,63 @@ def test_sandbox_run_endpoint():
 
     assert response.status_code == 200
     assert response.json() == {"output": mock_output}
+
+
+class DisconnectingRequest:
+    def __init__(self):
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > 1
+
+
+@pytest.mark.asyncio
+async def test_run_is_cancelled_when_client_disconnects():
+    cancelled = asyncio.Event()
+
+    async def slow_run():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(HTTPException) as exc_info:
+        await sandbox_router.run_until_disconnected(DisconnectingRequest(), slow_run(), poll_interval=0.01)
+    assert exc_info.value.status_code == sandbox_router.CLIENT_CLOSED_REQUEST
+    assert cancelled.is_set()
+
+
+def test_sandbox_job_lifecycle():
+    """Start a job, poll it to completion, and cancel a second, long-running one."""
+    release = asyncio.Event()
+
+    async def fake_runner(input_data):
+        if input_data.script == "wait":
+            await release.wait()
+        return f"ran {input_data.script}"
+
+    jobs = SandboxJobs(runner=fake_runner, max_concurrent=2)
+    # Background jobs need one event loop across requests: bare app in a client context.
+    bare_app = FastAPI()
+    bare_app.include_router(sandbox_router.router, prefix="/api/v1")
+    with patch.object(sandbox_router, "get_sandbox_jobs", return_value=jobs), TestClient(bare_app) as job_client:
+        response = job_client.post("/api/v1/sandbox/jobs", json={"script": "quick"})
+        assert response.status_code == 202, response.text
+        job_id = response.json()["job_id"]
+        for _ in range(50):
+            job = job_client.get(f"/api/v1/sandbox/jobs/{job_id}").json()
+            if job["status"] == "COMPLETED":
+                break
+        assert job["output"] == "ran quick"
+
+        long_id = job_client.post("/api/v1/sandbox/jobs", json={"script": "wait"}).json()["job_id"]
+        assert job_client.delete(f"/api/v1/sandbox/jobs/{long_id}").status_code == 202
+        for _ in range(50):
+            job = job_client.get(f"/api/v1/sandbox/jobs/{long_id}").json()
+            if job["status"] == "CANCELLED":
+                break
+        assert job["status"] == "CANCELLED"
+
+        assert job_client.get(f"/api/v1/sandbox/jobs/{uuid.uuid4()}").status_code == 404
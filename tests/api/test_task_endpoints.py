@@ -1,4 +1,5 @@
 import pytest
+import json
 import uuid
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
@@ -25,7 +26,6 @@ def prerequisite_agent() -> AgentRead:
         updated_at=now
     )
 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_get_nonexistent_task(mock_supabase_client):
     non_existent_task_id = str(uuid.uuid4())
     mock_response = MagicMock()
@@ -37,7 +37,6 @@ def test_get_nonexistent_task(mock_supabase_client):
     assert response.json()["detail"] == "Task not found"
 # 
 # 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_create_task(mock_supabase_client, prerequisite_agent: AgentRead):
     task_create_payload = TaskCreate(
         name="Test Task - Create",
@@ -89,7 +88,6 @@ def test_create_task(mock_supabase_client, prerequisite_agent: AgentRead):
     assert created_task_json["dependencies"] == []
 # 
 # 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_create_task_without_agent(mock_supabase_client):
     task_create_payload = TaskCreate(
         name="Test Task - No Agent",
@@ -128,7 +126,6 @@ def test_create_task_without_agent(mock_supabase_client):
     assert created_task_json["name"] == task_create_payload.name
 # 
 # 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_get_task(mock_supabase_client, prerequisite_agent: AgentRead):
     task_id_str = str(uuid.uuid4())
     agent_id_str = str(prerequisite_agent.agent_id)
@@ -167,7 +164,6 @@ def test_get_task(mock_supabase_client, prerequisite_agent: AgentRead):
 #     assert datetime.fromisoformat(retrieved_task_json["updated_at"])
 # 
 # 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_get_all_tasks(mock_supabase_client, prerequisite_agent: AgentRead):
     now = datetime.now(timezone.utc)
     agent_id_str = str(prerequisite_agent.agent_id)
@@ -188,9 +184,8 @@ def test_get_all_tasks(mock_supabase_client, prerequisite_agent: AgentRead):
     ]
     mock_get_all_response = MagicMock()
     mock_get_all_response.data = tasks_db_data
-    # Assuming the actual call in supabase_persistence uses range() for pagination, even if not explicitly tested here.
-    # If it's just .select().execute() for all, adjust mock accordingly.
-    mock_supabase_client.table().select().range().execute.return_value = mock_get_all_response 
+    # Lists are ordered by (created_at, task_id) for keyset pagination before range() is applied.
+    mock_supabase_client.table().select().order().order().range().execute.return_value = mock_get_all_response 
 
     response = client.get("/api/v1/tasks/")
     assert response.status_code == 200, response.text
@@ -213,7 +208,6 @@ def test_get_all_tasks(mock_supabase_client, prerequisite_agent: AgentRead):
 #     assert tasks_list_json[1]["output_data"] == {"result": "done"}
 # 
 # 
-@patch('src.api.persistence.supabase_persistence.supabase_client')
 def test_update_task(mock_supabase_client, prerequisite_agent: AgentRead):
     task_id_str = str(uuid.uuid4())
     agent_id_str = str(prerequisite_agent.agent_id)
@@ -248,8 +242,8 @@ def test_update_task(mock_supabase_client, prerequisite_agent: AgentRead):
         updated_task_from_db["started_at"] = current_time_iso
 
     mock_update_response = MagicMock()
-    mock_update_response.data = updated_task_from_db 
-    mock_supabase_client.table().update().eq().select().single().execute.return_value = mock_update_response
+    mock_update_response.data = [updated_task_from_db] # PATCH ... RETURNING returns the updated rows
+    mock_supabase_client.table().update().eq().execute.return_value = mock_update_response
     
     update_response = client.put(f"/api/v1/tasks/{task_id_str}", json=update_data_payload.model_dump(mode='json', exclude_unset=True))
     assert update_response.status_code == 200, update_response.text
@@ -323,3 +317,88 @@ def test_update_task(mock_supabase_client, prerequisite_agent: AgentRead):
 #     # Attempt to get the task after deletion
 #     get_response_after_actual_delete = client.get(f"/api/v1/tasks/{task_id_str}")
 #     assert get_response_after_actual_delete.status_code == 404, get_response_after_actual_delete.text
+
+
+def test_list_tasks_cursor_header_and_fields(mock_supabase_client):
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [{"task_id": str(uuid.uuid4()), "created_at": now, "name": f"Task {i}"} for i in range(2)]
+    mock_response = MagicMock()
+    mock_response.data = rows
+    mock_supabase_client.table().select().order().order().range().execute.return_value = mock_response
+
+    response = client.get("/api/v1/tasks/", params={"limit": 2, "fields": "name"})
+    assert response.status_code == 200, response.text
+    assert response.json() == rows
+    assert response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/v1/tasks/", params={"fields": "name,bogus"})
+    assert response.status_code == 400
+    response = client.get("/api/v1/tasks/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_create_tasks_batch(mock_supabase_client):
+    now = datetime.now(timezone.utc).isoformat()
+    row = {
+        "task_id": str(uuid.uuid4()), "name": "Batch task", "agent_id": None, "status": TaskStatus.PENDING.value,
+        "priority": 0, "created_at": now, "updated_at": now, "description": None, "input_data": {},
+        "output_data": None, "started_at": None, "completed_at": None, "dependencies": [],
+    }
+    mock_response = MagicMock()
+    mock_response.data = [row]
+    mock_supabase_client.table().insert().execute.return_value = mock_response
+    mock_supabase_client.table().insert.reset_mock()
+
+    response = client.post("/api/v1/tasks:batch", json=[{"name": "Batch task"}, {"priority": "high"}])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [task["name"] for task in body["items"]] == ["Batch task"]
+    assert [error["index"] for error in body["errors"]] == [1]
+    # The valid item went out as one multi-row insert.
+    mock_supabase_client.table().insert.assert_called_once()
+    assert len(mock_supabase_client.table().insert.call_args.args[0]) == 1
+
+
+def test_update_tasks_batch(mock_supabase_client):
+    now = datetime.now(timezone.utc).isoformat()
+    found, missing = str(uuid.uuid4()), str(uuid.uuid4())
+    row = {
+        "task_id": found, "name": "Renamed", "agent_id": None, "status": TaskStatus.RUNNING.value,
+        "priority": 0, "created_at": now, "updated_at": now, "description": None, "input_data": {},
+        "output_data": None, "started_at": now, "completed_at": None, "dependencies": [],
+    }
+    mock_response = MagicMock()
+    mock_response.data = [row]
+    mock_supabase_client.rpc().execute.return_value = mock_response
+
+    response = client.patch("/api/v1/tasks:batch", json=[
+        {"task_id": found, "name": "Renamed", "status": "RUNNING"},
+        {"task_id": found, "name": "Twice"},
+        {"task_id": missing, "name": "Ghost"},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [task["task_id"] for task in body["items"]] == [found]
+    assert body["errors"] == [
+        {"index": 1, "error": f"Duplicate task_id {found} in batch"},
+        {"index": 2, "error": "Task not found"},
+    ]
+    mock_supabase_client.rpc.assert_called_with("batch_update_tasks", {"updates": [
+        {"name": "Renamed", "status": "RUNNING", "task_id": found},
+        {"name": "Ghost", "task_id": missing},
+    ]})
+
+
+def test_export_tasks_ndjson(mock_supabase_client):
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [{"task_id": str(uuid.uuid4()), "created_at": now, "name": f"Task {i}"} for i in range(3)]
+    mock_response = MagicMock()
+    mock_response.data = rows
+    mock_supabase_client.table().select().order().order().range().execute.return_value = mock_response
+
+    response = client.get("/api/v1/tasks/export", params={"fields": "name"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == rows
+
+    assert client.get("/api/v1/tasks/export", params={"fields": "bogus"}).status_code == 400
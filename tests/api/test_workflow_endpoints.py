@@ -0,0 +1,81 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routers import workflow_router
+from src.main import app
+from src.sentient_core.orchestrator.shared_state import OrchestratorState
+from src.sentient_core.orchestrator.workflow_runner import WorkflowRunner
+
+client = TestClient(app)
+
+
+def test_export_workflow_events(mock_supabase_client):
+    workflow_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    events = [
+        {"id": str(uuid.uuid4()), "event_type": "TASK_STARTED", "source_agent": "planner",
+         "workflow_id": workflow_id, "task_id": None, "payload": {"step": i}, "created_at": now}
+        for i in range(2)
+    ]
+    mock_response = MagicMock()
+    mock_response.data = events
+    mock_supabase_client.table().select().eq().order().order().range().execute.return_value = mock_response
+
+    response = client.get(f"/api/v1/workflows/{workflow_id}/events/export")
+    assert response.status_code == 200, response.text
+    assert [json.loads(line) for line in response.text.splitlines()] == events
+    mock_supabase_client.table.assert_called_with("agent_events")
+    mock_supabase_client.table().select().eq.assert_called_with("workflow_id", workflow_id)
+
+
+class StubOrchestrator:
+    def __init__(self, command, workflow_id=None):
+        self.command = command
+
+    async def run(self, on_event=None):
+        on_event("plan_created", {"project_name": self.command, "tasks": []})
+        return OrchestratorState(workflow_status="completed", final_result="Orchestration successful.")
+
+
+def parse_sse(body):
+    frames = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        frames.append({"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])})
+    return frames
+
+
+def test_start_workflow_and_stream_events():
+    # The runner's tasks need one event loop across requests, so use a bare app
+    # in a client context rather than the module client.
+    runner = WorkflowRunner(orchestrator_factory=StubOrchestrator)
+    bare_app = FastAPI()
+    bare_app.include_router(workflow_router.router, prefix="/api/v1")
+    with patch.object(workflow_router, "get_workflow_runner", return_value=runner), TestClient(bare_app) as sse_client:
+        response = sse_client.post("/api/v1/workflows/", json={"command": "landing page"})
+        assert response.status_code == 202, response.text
+        workflow_id = response.json()["workflow_id"]
+
+        response = sse_client.get(f"/api/v1/workflows/{workflow_id}/events")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = parse_sse(response.text)
+        assert [f["event"] for f in frames] == ["workflow_queued", "workflow_started", "plan_created", "workflow_completed"]
+        assert [f["id"] for f in frames] == [1, 2, 3, 4]
+
+        response = sse_client.get(f"/api/v1/workflows/{workflow_id}/events", headers={"Last-Event-ID": "2"})
+        assert [f["id"] for f in parse_sse(response.text)] == [3, 4]
+
+        response = sse_client.get(f"/api/v1/workflows/{workflow_id}")
+        assert response.json()["status"] == "COMPLETED"
+        assert response.json()["result"] == "Orchestration successful."
+
+
+def test_unknown_workflow_returns_404():
+    response = client.get(f"/api/v1/workflows/{uuid.uuid4()}/events")
+    assert response.status_code == 404
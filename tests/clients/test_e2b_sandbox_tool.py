@@ -1,7 +1,8 @@
+import asyncio
 import os
 import pytest
 from unittest.mock import patch, MagicMock
-from src.clients.e2b_sandbox_tool import run_in_e2b_sandbox, E2BSandboxToolInput
+from src.clients.e2b_sandbox_tool import run_in_e2b_sandbox, run_in_e2b_sandbox_async, E2BSandboxToolInput
 
 # --- Mocks for E2B SDK ---
 
@@ -72,3 +73,37 @@ def test_execution_with_error(mock_e2b_sandbox):
 
     with pytest.raises(Exception, match="E2B execution failed: RuntimeError: Something went wrong"):
         run_in_e2b_sandbox(input_data)
+
+
+class MockAsyncSandbox:
+    killed = 0
+
+    @classmethod
+    async def create(cls, api_key):
+        return cls()
+
+    async def run_code(self, script, language=None, on_stdout=None, on_stderr=None, timeout=None):
+        if "sleep" in script:
+            await asyncio.sleep(10)
+        return MockSandbox.run_code(self, script, language)
+
+    async def kill(self):
+        MockAsyncSandbox.killed += 1
+        return True
+
+
+@pytest.mark.asyncio
+@patch.dict(os.environ, {"E2B_API_KEY": "YOUR_E2B_API_KEY_HERE"})
+async def test_async_run_kills_sandbox_when_cancelled():
+    """Tests the async runner returns output and tears the sandbox down, also on cancellation."""
+    MockAsyncSandbox.killed = 0
+    with patch('src.clients.e2b_sandbox_tool.AsyncSandbox', new=MockAsyncSandbox):
+        assert await run_in_e2b_sandbox_async(E2BSandboxToolInput(script='print("hi")')) == "Hello from E2B"
+
+        task = asyncio.create_task(run_in_e2b_sandbox_async(E2BSandboxToolInput(script="sleep")))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert MockAsyncSandbox.killed == 2
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.clients import supabase_client
+
+
+@pytest.fixture(autouse=True)
+def reset_async_client(monkeypatch):
+    monkeypatch.setattr(supabase_client, "_async_client", None)
+    monkeypatch.setattr(supabase_client, "_ASYNC_CLIENT_LOCK", asyncio.Lock())
+
+
+@pytest.mark.asyncio
+async def test_async_client_is_created_once(mocker, monkeypatch):
+    """Concurrent callers share one AsyncClient (and so one connection pool)."""
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:8000")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    fake_client = MagicMock()
+    create = mocker.patch.object(supabase_client, "create_async_client", new_callable=AsyncMock, return_value=fake_client)
+
+    clients = await asyncio.gather(*(supabase_client.get_async_supabase_client() for _ in range(10)))
+
+    assert all(c is fake_client for c in clients)
+    create.assert_awaited_once_with("http://localhost:8000", "anon")
+
+
+@pytest.mark.asyncio
+async def test_async_client_missing_env_returns_none(monkeypatch):
+    """Without credentials the getter returns None instead of raising."""
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.delenv("SUPABASE_ANON_KEY", raising=False)
+
+    assert await supabase_client.get_async_supabase_client() is None
@@ -1,7 +1,7 @@
 """Pytest configuration and fixtures for all tests."""
 import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.sentient_core.state.db import _db_instance
 
@@ -44,3 +44,22 @@ def mock_state_manager():
     """Mock the StateManager for testing."""
     with patch('src.sentient_core.state.state_manager.StateManager', autospec=True) as mock:
         yield mock
+
+class AsyncQueryMock(MagicMock):
+    """MagicMock whose `execute` children are awaitable, like postgrest's async builders."""
+
+    def _get_child_mock(self, **kw):
+        if kw.get("name") == "execute":
+            return AsyncMock(**kw)
+        return AsyncQueryMock(**kw)
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock the shared async Supabase client used by the API routers."""
+    from src.api.persistence.record_cache import record_cache
+
+    record_cache.clear()
+    client = AsyncQueryMock()
+    with patch('src.api.persistence.async_supabase_persistence.get_async_supabase_client',
+               new_callable=AsyncMock, return_value=client):
+        yield client
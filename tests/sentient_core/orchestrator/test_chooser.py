@@ -1,8 +1,10 @@
 import pytest
 from sentient_core.orchestrator.chooser import (
     choose_sandbox,
+    Chooser,
     SandboxTaskRequirements,
     SANDBOX_TYPE_E2B,
+    SANDBOX_TYPE_LOCAL,
     SANDBOX_TYPE_WEB_CONTAINER,
 )
 
@@ -55,3 +57,25 @@ def test_priority_of_e2b_for_sensitive_data_over_ui_feedback():
         language="node", requires_ui_feedback=True, is_data_sensitive=True
     )
     assert choose_sandbox(requirements) == SANDBOX_TYPE_E2B
+
+
+def test_choose_sandbox_for_trusted_python_returns_local():
+    """Test that trusted code without UI or sensitive data runs in the local sandbox."""
+    requirements = SandboxTaskRequirements(language="python", is_trusted=True)
+    assert choose_sandbox(requirements) == SANDBOX_TYPE_LOCAL
+
+
+def test_trusted_sensitive_or_ui_tasks_keep_their_sandbox():
+    """Test that trust does not move sensitive-data or UI tasks off their sandbox."""
+    sensitive = SandboxTaskRequirements(language="python", is_trusted=True, is_data_sensitive=True)
+    ui = SandboxTaskRequirements(language="node", is_trusted=True, requires_ui_feedback=True)
+    assert choose_sandbox(sensitive) == SANDBOX_TYPE_E2B
+    assert choose_sandbox(ui) == SANDBOX_TYPE_WEB_CONTAINER
+
+
+def test_chooser_reads_sandbox_backend_from_environment(monkeypatch):
+    """Test that SANDBOX_BACKEND=local routes non-UI tasks to the local sandbox."""
+    monkeypatch.setenv("SANDBOX_BACKEND", "local")
+    assert Chooser().choose_sandbox("Compute statistics in Python") == SANDBOX_TYPE_LOCAL
+    assert Chooser().choose_sandbox("Build a React frontend") == SANDBOX_TYPE_WEB_CONTAINER
+    assert Chooser(trusted=False).choose_sandbox("Compute statistics in Python") == SANDBOX_TYPE_E2B
@@ -10,7 +10,8 @@ from src.api.models.memory_models import MemoryNode, NodeType, SurrealID
 @pytest.fixture
 def executor():
     """Provides an instance of the DepartmentalExecutor."""
-    with patch('src.sentient_core.tools.E2BSandboxTool'), patch('src.sentient_core.tools.WebContainerTool'):
+    with patch('src.sentient_core.orchestrator.departmental_executors.E2BSandboxTool'), \
+            patch('src.sentient_core.orchestrator.departmental_executors.WebContainerTool'):
         yield DepartmentalExecutor()
 
 @pytest.mark.asyncio
@@ -48,3 +49,37 @@ async def test_executor_handles_data_agent_task(mock_create_node, executor):
     assert isinstance(call_args, MemoryNode)
     assert call_args.node_type == NodeType.CONCEPT
     assert call_args.content == "Test concept from executor"
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_tasks_under_the_workflow_id_and_ends_its_sessions(executor):
+    """Verify agents get the real workflow id and its sandbox sessions are released afterwards."""
+    seen = []
+    ended = []
+
+    class RecordingAgent:
+        def __init__(self, sandbox_tool=None):
+            pass
+
+        async def execute_task(self, workflow_id=None, task=None):
+            seen.append(workflow_id)
+            return {"status": "completed"}
+
+    class SessionTool:
+        async def end_session(self, session_id):
+            ended.append(session_id)
+
+    class SessionlessTool:
+        pass
+
+    executor.agent_mapping["Data"] = RecordingAgent
+    executor.e2b_tool = executor.local_tool = SessionTool()
+    executor.webcontainer_tool = SessionTool()
+    executor.local_tool = SessionlessTool()
+    tasks = [Task(department="Data", task=f"step {i}") for i in range(2)]
+
+    result = await executor.execute_plan(tasks, workflow_id="wf-42")
+
+    assert result["status"] == "success"
+    assert seen == ["wf-42", "wf-42"]
+    assert ended == ["wf-42", "wf-42"]  # one shared e2b/local tool, one webcontainer tool
@@ -0,0 +1,194 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.api.models.core_models import AgentRead, TaskRead, TaskStatus
+from src.sentient_core.orchestrator.task_queue import AgentTaskRunner, QueueJob, TaskQueue
+
+NOW = datetime.now(timezone.utc)
+
+
+class RecordingRunner:
+    """Runner that sleeps briefly and records peak concurrency overall and per agent."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.per_agent = {}
+        self.per_agent_peak = {}
+        self.order = []
+
+    async def __call__(self, job: QueueJob):
+        self.order.append(job.task_id)
+        self.active += 1
+        self.per_agent[job.agent_id] = self.per_agent.get(job.agent_id, 0) + 1
+        self.peak = max(self.peak, self.active)
+        self.per_agent_peak[job.agent_id] = max(self.per_agent_peak.get(job.agent_id, 0), self.per_agent[job.agent_id])
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.per_agent[job.agent_id] -= 1
+
+
+@pytest.mark.asyncio
+async def test_queue_respects_global_and_per_agent_limits():
+    """Verify no more than `concurrency` jobs run, and at most `per_agent_limit` per agent."""
+    runner = RecordingRunner()
+    queue = TaskQueue(runner, concurrency=4, per_agent_limit=1)
+    busy, other = uuid.uuid4(), uuid.uuid4()
+    for _ in range(6):
+        await queue.enqueue(uuid.uuid4(), agent_id=busy)
+    for _ in range(3):
+        await queue.enqueue(uuid.uuid4(), agent_id=other)
+
+    queue.start()
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    assert queue.processed == 9
+    assert runner.per_agent_peak == {busy: 1, other: 1}
+    # The busy agent's backlog must not starve the other agent's jobs.
+    assert runner.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_higher_priority_first_and_survives_errors():
+    """Verify priority ordering and that a failing job is counted without killing the worker."""
+    order = []
+
+    async def runner(job):
+        order.append(job.priority)
+        if job.priority == 5:
+            raise RuntimeError("boom")
+
+    queue = TaskQueue(runner, concurrency=1)
+    for priority in (0, 5, 1, 9):
+        await queue.enqueue(uuid.uuid4(), priority=priority)
+
+    queue.start()
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    assert order == [9, 5, 1, 0]
+    assert (queue.processed, queue.failed) == (3, 1)
+
+
+def _task(agent_id, **overrides):
+    data = dict(task_id=uuid.uuid4(), name="Summarise", agent_id=agent_id, input_data={"topic": "queues", "depth": 2},
+                status=TaskStatus.RUNNING, created_at=NOW, updated_at=NOW)
+    return TaskRead(**{**data, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_agent_task_runner_records_progress_and_output():
+    """Verify the runner moves the task RUNNING -> COMPLETED with the agent's output."""
+    agent = AgentRead(agent_id=uuid.uuid4(), name="Researcher", capabilities=["Research"], created_at=NOW, updated_at=NOW)
+    task = _task(agent.agent_id)
+    db = AsyncMock()
+    db.update_task.return_value = task
+    db.get_agent.return_value = agent
+
+    seen = {}
+
+    class FakeResearchAgent:
+        def __init__(self, sandbox_tool=None):
+            pass
+
+        async def execute_task(self, workflow_id=None, task=None):
+            seen["task"] = task
+            return {"summary": "done"}
+
+    runner = AgentTaskRunner(persistence=db, agent_classes={"Research": FakeResearchAgent})
+    await runner(QueueJob(task_id=task.task_id, agent_id=agent.agent_id))
+
+    statuses = [call.args[1].status for call in db.update_task.await_args_list]
+    assert statuses == [TaskStatus.RUNNING, TaskStatus.COMPLETED]
+    assert db.update_task.await_args_list[-1].args[1].output_data == {"summary": "done"}
+    assert seen["task"].department == "Research"
+    assert seen["task"].input_data == {"topic": "queues", "depth": "2"}
+
+
+@pytest.mark.asyncio
+async def test_agent_task_runner_fails_task_without_matching_agent():
+    """Verify tasks whose agent has no specialized class end FAILED with a message."""
+    agent = AgentRead(agent_id=uuid.uuid4(), name="Generalist", capabilities=["chat"], created_at=NOW, updated_at=NOW)
+    db = AsyncMock()
+    db.update_task.return_value = _task(agent.agent_id)
+    db.get_agent.return_value = agent
+
+    runner = AgentTaskRunner(persistence=db, agent_classes={"Research": object})
+    await runner(QueueJob(task_id=uuid.uuid4(), agent_id=agent.agent_id))
+
+    final = db.update_task.await_args_list[-1].args[1]
+    assert final.status == TaskStatus.FAILED
+    assert "No specialized agent" in final.output_data["message"]
+
+
+class FakeSandboxTools:
+    def __init__(self):
+        self.ended = []
+
+    def sandbox_tool_for(self, sandbox_type):
+        return f"{sandbox_type} tool"
+
+    async def end_sessions(self, workflow_id):
+        self.ended.append(workflow_id)
+
+
+@pytest.mark.asyncio
+async def test_agent_task_runner_gives_agents_their_sandbox_under_the_workflow_id():
+    """Verify agents get their department's sandbox tool, run under the task's workflow, and its sessions end."""
+    agent = AgentRead(agent_id=uuid.uuid4(), name="Builder", capabilities=["BackendDevelopment"], created_at=NOW, updated_at=NOW)
+    task = _task(agent.agent_id, input_data={"workflow_id": "wf-7"})
+    db = AsyncMock()
+    db.update_task.return_value = task
+    db.get_agent.return_value = agent
+    seen = {}
+
+    class FakeBackendAgent:
+        def __init__(self, sandbox_tool=None):
+            seen["tool"] = sandbox_tool
+
+        async def execute_task(self, workflow_id=None, task=None):
+            seen["workflow_id"] = workflow_id
+            return {"status": "completed"}
+
+    tools = FakeSandboxTools()
+    runner = AgentTaskRunner(persistence=db, agent_classes={"BackendDevelopment": FakeBackendAgent}, sandbox_tools=tools)
+    await runner(QueueJob(task_id=task.task_id, agent_id=agent.agent_id))
+
+    assert seen == {"tool": "e2b tool", "workflow_id": "wf-7"}
+    assert tools.ended == ["wf-7"]
+    assert db.update_task.await_args_list[-1].args[1].status == TaskStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_stopping_the_queue_fails_running_tasks():
+    """Verify a task cancelled by `stop()` is written FAILED instead of staying RUNNING."""
+    agent = AgentRead(agent_id=uuid.uuid4(), name="Researcher", capabilities=["Research"], created_at=NOW, updated_at=NOW)
+    task = _task(agent.agent_id)
+    db = AsyncMock()
+    db.update_task.return_value = task
+    db.get_agent.return_value = agent
+    started = asyncio.Event()
+
+    class StuckAgent:
+        def __init__(self, sandbox_tool=None):
+            pass
+
+        async def execute_task(self, workflow_id=None, task=None):
+            started.set()
+            await asyncio.Event().wait()
+
+    queue = TaskQueue(AgentTaskRunner(persistence=db, agent_classes={"Research": StuckAgent}), concurrency=1)
+    await queue.enqueue(task.task_id, agent_id=agent.agent_id)
+    queue.start()
+    await asyncio.wait_for(started.wait(), timeout=5)
+    await queue.stop()
+
+    final = db.update_task.await_args_list[-1].args[1]
+    assert final.status == TaskStatus.FAILED
+    assert "stopped" in final.output_data["message"]
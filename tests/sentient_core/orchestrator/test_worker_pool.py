@@ -0,0 +1,142 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from src.sentient_core.orchestrator.shared_state import OrchestratorState
+from src.sentient_core.orchestrator.worker_pool import (
+    COMPLETED, FAILED, QUEUED, RUNNING, LeaseStore, WorkerPool, run_leased_workflow,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class PoolOrchestrator:
+    """Orchestrator used by the spawned workers; imported there by path.
+
+    ``crash:<path>`` kills the worker process the first time (creating <path>)
+    and completes on the retry.
+    """
+
+    def __init__(self, command: str, workflow_id: str = None):
+        self.command = command
+        self.workflow_id = workflow_id
+
+    async def run(self):
+        if self.command.startswith("crash:"):
+            marker = self.command.split(":", 1)[1]
+            if not os.path.exists(marker):
+                open(marker, "w").close()
+                os._exit(1)
+        return OrchestratorState(workflow_status="completed", final_result=f"{self.workflow_id} by {os.getpid()}")
+
+
+def test_lease_store_claims_in_order_and_expires_leases(tmp_path):
+    """Verify claims are FIFO and exclusive, heartbeats extend leases, and expired leases are reclaimed."""
+    clock = FakeClock()
+    store = LeaseStore(str(tmp_path / "leases.db"), max_attempts=2, clock=clock)
+    first = store.enqueue("first")
+    clock.now += 1
+    second = store.enqueue("second")
+
+    lease = store.claim("w1", lease_seconds=10)
+    assert (lease.workflow_id, lease.status, lease.worker_id, lease.attempts) == (first, RUNNING, "w1", 1)
+    assert store.claim("w2", lease_seconds=10).workflow_id == second
+    assert store.claim("w3", lease_seconds=10) is None
+
+    clock.now += 8
+    assert store.heartbeat(first, "w1", lease_seconds=10)
+    clock.now += 5  # second's lease has expired, first's was renewed
+    reclaimed = store.claim("w3", lease_seconds=10)
+    assert (reclaimed.workflow_id, reclaimed.worker_id, reclaimed.attempts) == (second, "w3", 2)
+
+    # The previous holder can no longer renew or report.
+    assert not store.heartbeat(second, "w2", lease_seconds=10)
+    assert not store.finish(second, "w2", COMPLETED)
+    assert store.finish(first, "w1", COMPLETED, result="ok")
+    assert store.get(first).status == COMPLETED
+
+    clock.now += 20  # second expires again with no attempts left
+    assert store.claim("w4", lease_seconds=10) is None
+    assert store.get(second).status == FAILED
+    assert store.counts() == {COMPLETED: 1, FAILED: 1}
+    store.close()
+
+
+def test_lease_store_rejects_unheld_leases(tmp_path):
+    store = LeaseStore(str(tmp_path / "leases.db"))
+    workflow_id = store.enqueue("queued only")
+    assert not store.heartbeat(workflow_id, "w1", lease_seconds=10)
+    assert not store.finish(workflow_id, "w1", COMPLETED)
+    assert store.get(workflow_id).status == QUEUED
+    store.close()
+
+
+def test_worker_pool_runs_workflows_across_processes(tmp_path):
+    """Verify workflows run in several worker processes and a crashed worker's workflow is retried."""
+    pool = WorkerPool(
+        str(tmp_path / "leases.db"),
+        workers=2,
+        orchestrator_factory=f"{__name__}:PoolOrchestrator",
+        lease_seconds=1.0,
+        heartbeat_interval=0.2,
+        poll_interval=0.05,
+    )
+    workflow_ids = [pool.submit(f"build {i}") for i in range(6)]
+    crashed = pool.submit(f"crash:{tmp_path / 'crashed'}")
+    pool.start()
+    try:
+        leases = pool.wait(workflow_ids + [crashed], timeout=60)
+    finally:
+        pool.stop()
+
+    assert all(lease.status == COMPLETED for lease in leases)
+    assert leases[-1].attempts == 2
+    assert [lease.result.split(" ")[0] for lease in leases] == workflow_ids + [crashed]
+    pids = {int(lease.result.rsplit(" ", 1)[1]) for lease in leases}
+    assert os.getpid() not in pids
+
+
+def test_worker_pool_rejects_heartbeat_longer_than_lease(tmp_path):
+    with pytest.raises(ValueError):
+        WorkerPool(str(tmp_path / "leases.db"), lease_seconds=5, heartbeat_interval=5)
+
+
+class BlockingOrchestrator:
+    """Blocks its event loop for longer than the lease lasts."""
+
+    def __init__(self, command: str, workflow_id: str = None):
+        self.command = command
+
+    async def run(self):
+        time.sleep(1.0)
+        return OrchestratorState(workflow_status="completed", final_result="done")
+
+
+def test_heartbeat_thread_keeps_the_lease_while_the_loop_is_blocked(tmp_path):
+    """Verify a workflow blocking its loop past lease_seconds is not claimed by another worker."""
+    store = LeaseStore(str(tmp_path / "leases.db"))
+    workflow_id = store.enqueue("block")
+    lease = store.claim("w1", lease_seconds=0.4)
+    stolen = []
+
+    def try_to_steal():
+        time.sleep(0.7)
+        stolen.append(store.claim("w2", lease_seconds=0.4))
+
+    thief = threading.Thread(target=try_to_steal)
+    thief.start()
+    asyncio.run(run_leased_workflow(store, lease, "w1", BlockingOrchestrator, lease_seconds=0.4, heartbeat_interval=0.1))
+    thief.join()
+
+    assert stolen == [None]
+    assert store.get(workflow_id).status == COMPLETED
+    store.close()
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from src.api.models.core_models import WorkflowRunStatus
+from src.sentient_core.orchestrator.shared_state import OrchestratorState
+from src.sentient_core.orchestrator.workflow_runner import WorkflowRunner
+
+
+class FakeOrchestrator:
+    """Emits one event per step, sleeping between them, and tracks concurrent runs."""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, command: str, workflow_id: str = None, steps: int = 2, delay: float = 0.01):
+        self.command = command
+        self.workflow_id = workflow_id
+        self.steps = steps
+        self.delay = delay
+
+    async def run(self, on_event=None):
+        FakeOrchestrator.active += 1
+        FakeOrchestrator.peak = max(FakeOrchestrator.peak, FakeOrchestrator.active)
+        try:
+            for step in range(self.steps):
+                await asyncio.sleep(self.delay)
+                on_event("task_completed", {"step": step})
+            if self.command == "fail":
+                return OrchestratorState(workflow_status="failed", error="boom")
+            if self.command == "raise":
+                raise RuntimeError("planner unavailable")
+            return OrchestratorState(workflow_status="completed", final_result="done")
+        finally:
+            FakeOrchestrator.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_fake():
+    FakeOrchestrator.active = FakeOrchestrator.peak = 0
+
+
+@pytest.mark.asyncio
+async def test_runner_bounds_concurrent_workflows():
+    """Verify no more than `max_concurrent` workflows execute at once and all complete."""
+    runner = WorkflowRunner(max_concurrent=2, orchestrator_factory=FakeOrchestrator)
+    runs = [runner.submit(f"build {i}") for i in range(6)]
+    assert all(run.status == WorkflowRunStatus.QUEUED for run in runs)
+
+    for run in runs:
+        async for _ in runner.events(run.workflow_id):
+            pass
+
+    assert FakeOrchestrator.peak == 2
+    assert all(run.status == WorkflowRunStatus.COMPLETED for run in runs)
+    assert runs[0].result == "done"
+
+
+@pytest.mark.asyncio
+async def test_events_replay_then_follow_live():
+    """Verify a subscriber gets every event in order, and can resume after a given seq."""
+    runner = WorkflowRunner(orchestrator_factory=FakeOrchestrator)
+    run = runner.submit("build")
+
+    types = [event.type async for event in runner.events(run.workflow_id)]
+    assert types == ["workflow_queued", "workflow_started", "task_completed", "task_completed", "workflow_completed"]
+
+    resumed = [event.seq async for event in runner.events(run.workflow_id, after=3)]
+    assert resumed == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_failed_workflows_report_error():
+    """Verify failed orchestrator states and exceptions both finish as FAILED with the error."""
+    runner = WorkflowRunner(orchestrator_factory=FakeOrchestrator)
+    failed, raised = runner.submit("fail"), runner.submit("raise")
+    for run in (failed, raised):
+        events = [event async for event in runner.events(run.workflow_id)]
+        assert events[-1].type == "workflow_failed"
+
+    assert failed.status == WorkflowRunStatus.FAILED and failed.error == "boom"
+    assert raised.status == WorkflowRunStatus.FAILED and raised.error == "planner unavailable"
+
+
+@pytest.mark.asyncio
+async def test_events_send_heartbeats_while_idle():
+    """Verify None is yielded when no event arrives within the heartbeat interval."""
+    runner = WorkflowRunner(orchestrator_factory=lambda command, workflow_id: FakeOrchestrator(command, workflow_id, steps=1, delay=0.05))
+    run = runner.submit("build")
+
+    items = [item async for item in runner.events(run.workflow_id, heartbeat=0.01)]
+    assert None in items
+    assert items[-1].type == "workflow_completed"
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_under_the_workflow_id():
+    """Verify the orchestrator gets the run's id, which events are exported and streamed by."""
+    built = []
+
+    def factory(command, workflow_id):
+        built.append(FakeOrchestrator(command, workflow_id, steps=0))
+        return built[-1]
+
+    runner = WorkflowRunner(orchestrator_factory=factory)
+    run = runner.submit("build")
+    async for _ in runner.events(run.workflow_id):
+        pass
+
+    assert [o.workflow_id for o in built] == [run.workflow_id]
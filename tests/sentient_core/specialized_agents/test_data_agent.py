@@ -5,6 +5,7 @@ from uuid import uuid4
 
 from src.sentient_core.orchestrator.shared_state import Task
 from src.sentient_core.specialized_agents.data_agent import DataAgent
+from src.sentient_core.state.state_models import TaskState
 from src.api.models.memory_models import MemoryNode, MemoryEdge, NodeType, EdgeType, SurrealID
 
 @pytest.fixture
@@ -109,3 +110,28 @@ async def test_data_agent_unsupported_action(data_agent):
     # Assert
     assert result["status"] == "failed"
     assert "DataAgent does not support action" in result["message"]
+
+@pytest.mark.asyncio
+@patch('src.sentient_core.specialized_agents.data_agent.get_memory_retriever')
+async def test_data_agent_search_parses_string_inputs(mock_get_retriever, data_agent):
+    """Verify search options encoded as strings in input_data are converted before searching."""
+    retriever = MagicMock()
+
+    async def search(*args, **kwargs):
+        return []
+    retriever.search.side_effect = search
+    mock_get_retriever.return_value = retriever
+
+    task = TaskState(
+        id="task-1",
+        department="Data",
+        description="search memory",
+        input_data={"query": "hello", "top_k": "5", "expand": "false", "node_types": '["CONCEPT"]'},
+    )
+
+    result = await data_agent._execute_task_impl("wf-1", task)
+
+    assert result["hits"] == []
+    retriever.search.assert_called_once_with(
+        "hello", top_k=5, expand=False, node_types=[NodeType.CONCEPT]
+    )
@@ -0,0 +1,114 @@
+import asyncio
+import socket
+import sys
+import time
+
+import pytest
+
+from src.sentient_core.tools.command_graph import CommandGraph, CommandResult, CommandSpec
+from src.sentient_core.tools.webcontainer_tool import WebContainerTool
+
+
+def test_graph_chains_strings_and_validates_specs():
+    graph = CommandGraph(["npm install", "npm run build", "npm run dev"])
+    assert [s.depends_on for s in graph.specs] == [[], ["npm install"], ["npm run build"]]
+    assert [s.background for s in graph.specs] == [False, False, True]
+
+    with pytest.raises(ValueError, match="unknown commands: setup"):
+        CommandGraph([CommandSpec(command="make", depends_on=["setup"])])
+    with pytest.raises(ValueError, match="cycle: a -> b -> a"):
+        CommandGraph([CommandSpec(name="a", command="x", depends_on=["b"]),
+                      CommandSpec(name="b", command="y", depends_on=["a"])])
+    with pytest.raises(ValueError, match="Duplicate command names: lint"):
+        CommandGraph([CommandSpec(command="lint"), CommandSpec(command="lint")])
+
+
+@pytest.mark.asyncio
+async def test_graph_runs_independent_commands_concurrently_and_skips_dependents_of_failures():
+    running, peak = 0, 0
+
+    async def run_command(spec):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return CommandResult(name=spec.name, command=spec.command,
+                             status="error" if spec.name == "lint" else "success", exit_code=0)
+
+    graph = CommandGraph([
+        CommandSpec(name="install", command="npm ci"),
+        CommandSpec(name="lint", command="npm run lint", depends_on=["install"]),
+        CommandSpec(name="test", command="npm test", depends_on=["install"]),
+        CommandSpec(name="typecheck", command="tsc", depends_on=["install"]),
+        CommandSpec(name="deploy", command="deploy", depends_on=["lint", "test"]),
+    ])
+    results = await graph.run(run_command, max_parallel=2)
+
+    assert [r.name for r in results] == ["install", "lint", "test", "typecheck", "deploy"]
+    assert [r.status for r in results] == ["success", "error", "success", "success", "skipped"]
+    assert "lint" in results[-1].error
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_webcontainer_reports_each_command(tmp_path):
+    """Verify independent commands overlap and each result carries its own exit code, output and duration."""
+    tool = WebContainerTool()
+    await tool.create_session()
+    started = time.monotonic()
+    output = await tool.execute_commands([
+        CommandSpec(name="a", command="sleep 0.3; echo a"),
+        CommandSpec(name="b", command="sleep 0.3; echo b >&2; exit 2"),
+        CommandSpec(name="c", command="echo c", depends_on=["b"]),
+    ], working_dir=str(tmp_path))
+
+    assert time.monotonic() - started < 0.55
+    a, b, c = output.commands
+    assert (a.status, a.exit_code, a.stdout) == ("success", 0, "a\n")
+    assert (b.status, b.exit_code, b.stderr) == ("error", 2, "b\n")
+    assert a.duration_seconds >= 0.3
+    assert c.status == "skipped"
+    assert output.status == "error"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_background_server_is_left_running_until_close(tmp_path):
+    port = free_port()
+    tool = WebContainerTool()
+    await tool.create_session()
+    output = await tool.execute_commands([
+        CommandSpec(name="server", command=f"{sys.executable} -m http.server {port} --bind 127.0.0.1",
+                    background=True, ready_ports=[port]),
+        CommandSpec(name="probe", command=f"{sys.executable} -c \"import urllib.request as u; "
+                                          f"print(u.urlopen('http://127.0.0.1:{port}/').status)\"",
+                    depends_on=["server"]),
+    ], working_dir=str(tmp_path), ready_timeout=10)
+
+    server, probe = output.commands
+    assert server.status == "running" and server.metadata["ports"] == [port]
+    assert probe.stdout == "200\n"
+    assert output.port == port and str(output.preview_url) == f"http://localhost:{port}/"
+
+    await tool.close()
+    with pytest.raises(OSError):
+        await asyncio.open_connection("127.0.0.1", port)
+
+
+@pytest.mark.asyncio
+async def test_background_command_that_exits_early_is_an_error(tmp_path):
+    tool = WebContainerTool()
+    await tool.create_session()
+    output = await tool.execute_commands([
+        CommandSpec(command="echo boom >&2; exit 1", background=True, ready_ports=[free_port()]),
+    ], working_dir=str(tmp_path), ready_timeout=10)
+
+    [server] = output.commands
+    assert server.status == "error" and server.exit_code == 1
+    assert server.stderr == "boom\n"
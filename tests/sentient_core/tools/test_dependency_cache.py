@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from src.sentient_core.tools.dependency_cache import DependencyCache, dependency_layers
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, E2BSandboxToolInput, FileModel
+from src.sentient_core.tools.sandbox_pool import SandboxPool
+
+
+def test_layer_keys_follow_manifests_and_template():
+    base = {"package.json": '{"dependencies": {"next": "14"}}', "package-lock.json": "{}"}
+    [node] = dependency_layers(base, "nextjs-developer")
+    assert node.install_command == "npm ci" and node.paths == ("node_modules",)
+
+    assert dependency_layers(dict(base), "nextjs-developer")[0].key == node.key
+    assert dependency_layers({**base, "package-lock.json": '{"v": 2}'}, "nextjs-developer")[0].key != node.key
+    assert dependency_layers(base, "node16")[0].key != node.key
+
+    both = dependency_layers({"package.json": "{}", "requirements.txt": "fastapi\n"})
+    assert [(l.ecosystem, l.install_command) for l in both] == [
+        ("node", "npm install"),
+        ("python", "pip install --user -r requirements.txt"),
+    ]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = DependencyCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    os.utime(tmp_path / "a.tar.gz", (1, 1))
+    os.utime(tmp_path / "b.tar.gz", (2, 2))
+    assert cache.get("a") == b"x" * 10  # refreshes a
+    cache.put("c", b"x" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert not cache.put("huge", b"x" * 26)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evicted"] == 1
+
+
+class Output:
+    exit_code = 0
+
+
+class FakeProcess:
+    async def wait(self):
+        return Output()
+
+
+class FakeSandbox:
+    def __init__(self, sandbox_id):
+        self.sandbox_id = sandbox_id
+        self.ran = []
+        self.writes = {}
+        self.files = self
+        self.commands = self
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        self.ran.append(command)
+        return FakeProcess()
+
+    async def write(self, path, content):
+        self.writes[path] = content
+
+    async def read(self, path, format="text"):
+        return b"node_modules snapshot"
+
+    async def exists(self, path):
+        return False
+
+
+def project(lock="{}"):
+    return [
+        FileModel(path="package.json", content='{"scripts": {"build": "next build"}}'),
+        FileModel(path="package-lock.json", content=lock),
+        FileModel(path="pages/index.js", content="export default () => null"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_repeat_installs_restore_the_snapshot(tmp_path):
+    """Verify the first sandbox installs and snapshots, and a second one with the same lockfile restores it."""
+    booted = []
+
+    async def create(template):
+        booted.append(FakeSandbox(f"sbx-{len(booted)}"))
+        return booted[-1]
+
+    async def destroy(sandbox):
+        pass
+
+    cache = DependencyCache(str(tmp_path))
+    # Sandboxes are recycled after each use, so every run gets a fresh one.
+    pool = SandboxPool(create, size=0, max_uses=1, destroy=destroy)
+    tool = E2BSandboxTool(api_key="test-key", pool=pool, dependency_cache=cache)
+
+    first = await tool.run(E2BSandboxToolInput(template="node16", files=project(), command="npm run build"))
+    assert first["metadata"]["dependencies"] == {"node": "installed"}
+    assert "cd /home/user && npm ci" in booted[0].ran
+    assert cache.stats()["entries"] == 1
+
+    second = await tool.run(E2BSandboxToolInput(template="node16", files=project(), command="npm run build"))
+    assert second["metadata"]["dependencies"] == {"node": "restored"}
+    assert len(booted) == 2
+    assert not any("npm ci" in c for c in booted[1].ran)
+    assert b"node_modules snapshot" in booted[1].writes.values()
+    assert any(c.startswith("tar -xzf") and "-C /home/user" in c for c in booted[1].ran)
+
+    third = await tool.run(E2BSandboxToolInput(template="node16", files=project(lock='{"v": 3}'), command="npm run build"))
+    assert third["metadata"]["dependencies"] == {"node": "installed"}
+
+
+@pytest.mark.asyncio
+async def test_session_skips_layers_it_already_installed(tmp_path):
+    sandbox = FakeSandbox("sbx")
+
+    async def create(template):
+        return sandbox
+
+    tool = E2BSandboxTool(api_key="test-key", pool=SandboxPool(create, size=0),
+                          dependency_cache=DependencyCache(str(tmp_path)))
+    for expected in ("installed", "skipped"):
+        result = await tool.run(E2BSandboxToolInput(template="node16", files=project(), command="npm test",
+                                                    session_id="wf-1"))
+        assert result["metadata"]["dependencies"] == {"node": expected}
+    assert sandbox.ran.count("cd /home/user && npm ci") == 1
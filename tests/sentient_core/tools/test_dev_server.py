@@ -0,0 +1,97 @@
+import asyncio
+import json
+import shutil
+import socket
+import sys
+
+import pytest
+
+from src.sentient_core.tools.command_graph import CommandSpec
+from src.sentient_core.tools.output_stream import LogTail, OutputChunk
+from src.sentient_core.tools.webcontainer_tool import WebContainerTool
+
+
+def alive(pid):
+    """Whether a process exists and is not a zombie waiting to be reaped."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_log_tail_keeps_last_lines_and_forwards():
+    forwarded = []
+    tail = LogTail(max_lines=2, forward=forwarded.append)
+    await tail(OutputChunk("stdout", "one\ntwo\nthr"))
+    await tail(OutputChunk("stdout", "ee\nfour"))
+    assert tail.text() == "two\nthree\nfour"
+    assert len(forwarded) == 2
+
+
+@pytest.mark.skipif(shutil.which("npm") is None, reason="npm not installed")
+@pytest.mark.asyncio
+async def test_start_dev_server_waits_for_the_port(tmp_path):
+    """Verify the dev script gets PORT, the preview URL is returned only once it listens, and close() stops it."""
+    port = free_port()
+    server = f"import os, time; time.sleep(0.3); print('listening', flush=True); " \
+             f"os.execvp({sys.executable!r}, [{sys.executable!r}, '-m', 'http.server', os.environ['PORT']])"
+    (tmp_path / "package.json").write_text(json.dumps({"scripts": {"dev": f"{sys.executable} -c \"{server}\""}}))
+
+    tool = WebContainerTool()
+    await tool.create_session()
+    result = await tool.start_dev_server(port=port, working_dir=str(tmp_path), timeout=20)
+
+    assert result.status == "success"
+    assert str(result.preview_url) == f"http://localhost:{port}/"
+    assert "listening" in result.metadata["log_tail"]
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.close()
+
+    await tool.close()
+    with pytest.raises(OSError):
+        await asyncio.open_connection("127.0.0.1", port)
+
+
+@pytest.mark.asyncio
+async def test_server_that_never_listens_times_out_and_is_killed(tmp_path):
+    """Verify a timeout stops the whole process group and reports the log tail."""
+    pid_file = tmp_path / "child.pid"
+    tool = WebContainerTool()
+    await tool.create_session()
+    output = await tool.execute_commands([
+        CommandSpec(command=f"echo starting; sleep 30 & echo $! > {pid_file}; wait", background=True,
+                    ready_ports=[free_port()]),
+    ], working_dir=str(tmp_path), ready_timeout=0.5)
+
+    [server] = output.commands
+    assert server.status == "error" and output.status == "timeout"
+    assert server.metadata["timed_out"]
+    assert "Not accepting connections" in server.error
+    assert server.metadata["log_tail"] == "starting\n"
+    child = int(pid_file.read_text())
+    await asyncio.sleep(0.1)
+    assert not alive(child)
+
+
+@pytest.mark.asyncio
+async def test_implicit_ports_are_ready_when_any_one_accepts(tmp_path):
+    """Verify a server on one of the exposed ports is ready without the others, and is the preview port."""
+    unused, port = free_port(), free_port()
+    tool = WebContainerTool()
+    await tool.create_session()
+    output = await tool.execute_commands([
+        CommandSpec(command=f"{sys.executable} -m http.server {port} --bind 127.0.0.1", background=True),
+    ], working_dir=str(tmp_path), ready_ports=[unused, port], ready_timeout=20)
+
+    [server] = output.commands
+    assert server.status == "running"
+    assert server.metadata["ports"] == [port] and output.port == port
+    await tool.close()
@@ -0,0 +1,141 @@
+import asyncio
+import io
+import tarfile
+
+import pytest
+
+from src.sentient_core.tools.file_transfer import bundle_files, should_bundle, write_concurrently, write_local_files
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, FileModel
+from src.sentient_core.tools.webcontainer_tool import FileModel as WebContainerFile
+
+
+def make_files(count):
+    return [FileModel(path=f"src/dir{i % 5}/file{i}.ts", content=f"export const x{i} = {i};\n") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_write_concurrently_bounds_requests_in_flight():
+    """Verify all files are written with at most `limit` writes running at once."""
+    written, in_flight, peak = [], 0, 0
+
+    async def write(path, content):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        written.append(path)
+
+    files = make_files(20)
+    await write_concurrently(write, files, limit=4)
+    assert sorted(written) == sorted(f.path for f in files)
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_write_concurrently_names_the_failed_file():
+    async def write(path, content):
+        if path.endswith("file3.ts"):
+            raise IOError("disk full")
+
+    with pytest.raises(RuntimeError, match="Failed to write file src/dir3/file3.ts: disk full"):
+        await write_concurrently(write, make_files(6))
+
+
+def test_bundle_files_places_relative_paths_under_base():
+    files = make_files(3) + [FileModel(path="/etc/app.conf", content="a=1")]
+    with tarfile.open(fileobj=io.BytesIO(bundle_files(files, "/home/user")), mode="r:gz") as tar:
+        names = tar.getnames()
+        assert names == [
+            "home/user/src/dir0/file0.ts",
+            "home/user/src/dir1/file1.ts",
+            "home/user/src/dir2/file2.ts",
+            "etc/app.conf",
+        ]
+        assert tar.extractfile("etc/app.conf").read() == b"a=1"
+
+
+def test_should_bundle_thresholds():
+    assert not should_bundle(make_files(10))
+    assert should_bundle(make_files(50))
+    assert should_bundle([FileModel(path="big.bin", content="x" * (4 * 1024 * 1024))])
+
+
+@pytest.mark.asyncio
+async def test_write_local_files_writes_every_batch(tmp_path):
+    files = make_files(10) + [WebContainerFile(path="public/robots.txt", content="User-agent: *", is_binary=True)]
+    await write_local_files(files, root=str(tmp_path), batch_size=3)
+    assert (tmp_path / "src/dir4/file9.ts").read_text() == "export const x9 = 9;\n"
+    assert (tmp_path / "public/robots.txt").read_bytes() == b"User-agent: *"
+
+
+class Output:
+    def __init__(self, exit_code):
+        self.exit_code = exit_code
+
+
+class CommandExitException(Exception):
+    """Like the SDK's: wait() raises it, with the exit code, when a command fails."""
+
+    def __init__(self, exit_code):
+        super().__init__(f"exit status {exit_code}")
+        self.exit_code = exit_code
+
+
+class FakeProcess:
+    def __init__(self, exit_code):
+        self.exit_code = exit_code
+
+    async def wait(self):
+        if self.exit_code:
+            raise CommandExitException(self.exit_code)
+        return Output(self.exit_code)
+
+
+class FakeSandbox:
+    """Records writes and commands; `tar` exits with `tar_exit_code`."""
+
+    def __init__(self, tar_exit_code=0):
+        self.tar_exit_code = tar_exit_code
+        self.writes = {}
+        self.ran = []
+        self.files = self
+        self.commands = self
+
+    async def write(self, path, content):
+        self.writes[path] = content
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        self.ran.append(command)
+        return FakeProcess(self.tar_exit_code)
+
+
+@pytest.mark.asyncio
+async def test_e2b_tool_uploads_large_trees_as_one_bundle():
+    """Verify a 60-file tree is one archive upload and one tar command."""
+    tool = E2BSandboxTool(api_key="test-key")
+    tool.sandbox = FakeSandbox()
+    files = make_files(60)
+    await tool.write_files(files)
+
+    [(archive, bundle)] = tool.sandbox.writes.items()
+    assert archive.startswith("/tmp/upload-") and archive.endswith(".tar.gz")
+    assert tool.sandbox.ran == [f"tar -xzf {archive} -C / && rm -f {archive}"]
+    with tarfile.open(fileobj=io.BytesIO(bundle), mode="r:gz") as tar:
+        assert len(tar.getnames()) == 60
+        assert "home/user/src/dir0/file0.ts" in tar.getnames()
+
+
+@pytest.mark.asyncio
+async def test_e2b_tool_falls_back_to_per_file_writes():
+    """Verify a failed unpack falls back to writing each file, and small trees skip bundling."""
+    tool = E2BSandboxTool(api_key="test-key")
+    tool.sandbox = FakeSandbox(tar_exit_code=2)
+    files = make_files(60)
+    await tool.write_files(files)
+    assert {f.path for f in files} <= set(tool.sandbox.writes)
+
+    tool.sandbox = FakeSandbox()
+    await tool.write_files(make_files(3))
+    assert set(tool.sandbox.writes) == {f.path for f in make_files(3)}
+    assert tool.sandbox.ran == []
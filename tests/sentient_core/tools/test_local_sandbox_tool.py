@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxToolInput, FileModel
+from src.sentient_core.tools import local_sandbox_tool
+from src.sentient_core.tools.local_sandbox_tool import (
+    LocalSandboxTool, LocalSandboxToolInput, network_namespaces_available,
+)
+from src.sentient_core.tools.output_stream import OutputChunk
+from src.sentient_core.tools.process_limits import ResourceLimits
+
+
+def alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_run_writes_files_and_streams_output(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path))
+    chunks = []
+    result = await tool.run(
+        LocalSandboxToolInput(
+            files=[FileModel(path="src/main.py", content="import os\nprint(os.environ['GREETING'], os.getcwd() == os.environ['HOME'])\n")],
+            command=f"{sys.executable} src/main.py",
+            env_vars={"GREETING": "hello"},
+        ),
+        on_output=chunks.append,
+    )
+
+    assert result["status"] == "success"
+    assert result["stdout"] == "hello True\n"
+    assert result["sandbox_id"].startswith("local-")
+    assert chunks == [OutputChunk("stdout", "hello True\n")]
+    # The sandbox directory is removed once the run is over.
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_run_accepts_e2b_input_and_defaults_to_the_python_file(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path))
+    result = await tool.run(E2BSandboxToolInput(files=[FileModel(path="/app.py", content="print(6 * 7)")]))
+
+    assert result["status"] == "success" and result["stdout"] == "42\n"
+
+
+@pytest.mark.asyncio
+async def test_paths_cannot_escape_the_sandbox(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path / "sandboxes"))
+    result = await tool.run(LocalSandboxToolInput(
+        files=[FileModel(path="../../outside.txt", content="x")], command="true"))
+
+    assert result["status"] == "error" and "escapes the sandbox" in result["error"]
+    assert not (tmp_path / "outside.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_session_keeps_files_and_writes_only_changes(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path))
+    files = [FileModel(path="a.txt", content="a"), FileModel(path="b.txt", content="b")]
+    first = await tool.run(LocalSandboxToolInput(files=files, command="cat a.txt b.txt", session_id="wf-1"))
+    second = await tool.run(LocalSandboxToolInput(
+        files=[files[0], FileModel(path="c.txt", content="c")], command="ls", session_id="wf-1"))
+
+    assert first["stdout"] == "ab"
+    assert second["sandbox_id"] == first["sandbox_id"]
+    assert second["metadata"]["sync"] == {"uploaded": 1, "deleted": 1, "unchanged": 1}
+    assert second["stdout"].split() == ["a.txt", "c.txt"]
+
+    await tool.end_session("wf-1")
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_deleted(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path), session_idle_timeout=0.1)
+    await tool.run(LocalSandboxToolInput(files=[FileModel(path="a.txt", content="a")], command="true", session_id="wf-1"))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    await asyncio.sleep(0.2)
+    result = await tool.run(LocalSandboxToolInput(command="ls", session_id="wf-2"))
+    assert result["stdout"] == ""
+    # wf-1 sat idle past the timeout, so only wf-2's directory is left.
+    assert len(list(tmp_path.iterdir())) == 1
+    await tool.close_sessions()
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_the_process_group(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path))
+    await tool.create_sandbox()
+    started = time.monotonic()
+    result = await tool.execute_command("echo partial; sleep 30 & echo $! > pid; wait", timeout=0.5)
+
+    assert time.monotonic() - started < 5
+    assert result.status == "error" and result.metadata["timed_out"]
+    assert result.stdout == "partial\n"
+    with open(os.path.join(tool.root, "pid")) as f:
+        pid = int(f.read())
+    await asyncio.sleep(0.1)
+    assert not alive(pid)
+    await tool.close()
+
+
+@pytest.mark.asyncio
+async def test_resource_limits_apply_to_commands(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path), limits=ResourceLimits(memory_mb=256))
+    await tool.create_sandbox()
+    result = await tool.run_code("b = bytearray(512 * 1024 * 1024)")
+
+    assert result.status == "error" and "MemoryError" in result.stderr
+    await tool.close()
+
+
+@pytest.mark.skipif(not network_namespaces_available(), reason="unprivileged network namespaces unavailable")
+@pytest.mark.asyncio
+async def test_network_can_be_disabled(tmp_path):
+    tool = LocalSandboxTool(base_dir=str(tmp_path))
+    result = await tool.run(LocalSandboxToolInput(command="cat /proc/net/dev", network=False))
+
+    interfaces = [line.split(":")[0].strip() for line in result["stdout"].splitlines() if ":" in line]
+    assert result["status"] == "success"
+    assert interfaces == ["lo"]
+
+
+def test_disabling_the_network_fails_at_construction_without_namespaces(monkeypatch):
+    """Verify network=False fails when the tool is built, not on its first command."""
+    monkeypatch.setattr(local_sandbox_tool, "network_namespaces_available", lambda: False)
+
+    with pytest.raises(RuntimeError, match="unshare"):
+        LocalSandboxTool(network=False)
+    assert LocalSandboxTool().network
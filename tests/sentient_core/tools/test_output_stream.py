@@ -0,0 +1,151 @@
+import asyncio
+import os
+
+import pytest
+
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool
+from src.sentient_core.tools.output_stream import OutputChunk, ProgressForwarder, SpooledOutput
+from src.sentient_core.tools.sandbox_pool import SandboxPool
+from src.sentient_core.tools.webcontainer_tool import WebContainerTool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_spooled_output_moves_to_disk_past_the_cap():
+    output = SpooledOutput("stdout", max_memory_bytes=10)
+    output.write("12345")
+    assert output.getvalue() == "12345" and not output.spooled
+
+    output.write("6789abcdef")
+    output.close()
+    assert output.spooled
+    with open(output.path) as f:
+        assert f.read() == "123456789abcdef"
+    assert output.getvalue().endswith("\n6789abcdef")
+    assert output.metadata() == {"stdout_bytes": 15, "stdout_path": output.path}
+    os.unlink(output.path)
+
+
+def test_spool_dir_keeps_only_the_newest_files(tmp_path):
+    outputs = []
+    for i in range(3):
+        output = SpooledOutput("stdout", max_memory_bytes=1, spool_dir=str(tmp_path), retain=2)
+        output.write("xx")
+        output.close()
+        os.utime(output.path, (i, i))
+        outputs.append(output)
+
+    # Each newly spooled file prunes the directory down to the newest two.
+    outputs.append(SpooledOutput("stdout", max_memory_bytes=1, spool_dir=str(tmp_path), retain=2))
+    outputs[-1].write("xx")
+    outputs[-1].close()
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(o.path) for o in outputs[2:])
+
+    outputs[-1].discard()
+    assert os.listdir(tmp_path) == [os.path.basename(outputs[2].path)]
+
+
+@pytest.mark.asyncio
+async def test_progress_forwarder_publishes_held_back_output_when_the_interval_is_up():
+    published = []
+
+    async def publish(payload):
+        published.append(payload["message"])
+
+    forwarder = ProgressForwarder(publish, min_interval=0.05)
+    await forwarder(OutputChunk("stdout", "compiling\n"))
+    await forwarder(OutputChunk("stdout", "compiled\n"))
+    assert published == ["compiling\n"]
+
+    # No more output arrives, yet the held-back chunk goes out.
+    await asyncio.sleep(0.1)
+    assert published == ["compiling\n", "compiled\n"]
+    await forwarder.flush()
+    assert len(published) == 2
+
+
+@pytest.mark.asyncio
+async def test_progress_forwarder_rate_limits_and_flushes():
+    clock = FakeClock()
+    published = []
+
+    async def publish(payload):
+        published.append(payload)
+
+    forwarder = ProgressForwarder(publish, min_interval=1.0, max_chars=5, clock=clock)
+    await forwarder(OutputChunk("stdout", "a\n"))  # first chunk goes out at once
+    await forwarder(OutputChunk("stdout", "b\n"))
+    await forwarder(OutputChunk("stderr", "warn\n"))
+    assert len(published) == 1
+
+    clock.now += 1.0
+    await forwarder(OutputChunk("stdout", "c\n"))
+    assert [(p["stream"], p["level"]) for p in published[1:]] == [("stdout", "info"), ("stderr", "error")]
+    assert published[1]["message"] == "b\nc\n"
+    assert published[2]["message"] == "warn\n"
+
+    await forwarder(OutputChunk("stdout", "d\n" * 4))
+    await forwarder.flush()
+    assert published[-1]["message"] == "[3 chars omitted]\n\nd\nd\n"
+
+
+@pytest.mark.asyncio
+async def test_webcontainer_streams_command_output(tmp_path):
+    """Verify chunks arrive through on_output while the command runs, and the result holds both streams."""
+    tool = WebContainerTool()
+    await tool.create_session()
+    chunks = []
+
+    result = await tool.execute_commands(
+        ["echo one; sleep 0.05; echo two; echo oops >&2"], working_dir=str(tmp_path), on_output=chunks.append
+    )
+
+    assert "".join(c.text for c in chunks if c.stream == "stdout") == "one\ntwo\n"
+    assert result.stdout == "one\ntwo\n"
+    assert result.stderr == "oops\n"
+
+    stream = await tool.stream_command("exit 3", working_dir=str(tmp_path))
+    assert [chunk async for chunk in stream] == []
+    assert stream.returncode == 3
+
+
+class CallbackSandbox:
+    """Fake sandbox whose processes report output through the commands.run() callbacks."""
+
+    sandbox_id = "sbx-1"
+
+    def __init__(self):
+        self.commands = self
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        sandbox = self
+
+        class Process:
+            async def wait(self):
+                for line in ("building", "done"):
+                    await asyncio.sleep(0)
+                    on_stdout(type("Message", (), {"line": line})())
+                on_stderr("deprecated\n")
+                return type("Output", (), {"exit_code": 0})()
+
+        return Process()
+
+
+@pytest.mark.asyncio
+async def test_e2b_execute_command_streams_output():
+    tool = E2BSandboxTool(api_key="test-key", pool=SandboxPool(lambda template: None))
+    tool.sandbox = CallbackSandbox()
+    chunks = []
+
+    result = await tool.execute_command("npm run build", on_output=chunks.append)
+
+    assert [c.text for c in chunks] == ["building\n", "done\n", "deprecated\n"]
+    assert result.status == "success"
+    assert result.stdout == "building\ndone\n"
+    assert result.metadata["exit_code"] == 0
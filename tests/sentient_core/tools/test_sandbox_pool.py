@@ -0,0 +1,218 @@
+import asyncio
+
+import pytest
+
+from src.sentient_core.tools.sandbox_pool import SandboxPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFactory:
+    """Boots numbered fake sandboxes and records which were destroyed and reset."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.booted = 0
+        self.destroyed = []
+        self.reset = []
+
+    async def create(self, template):
+        await asyncio.sleep(self.delay)
+        self.booted += 1
+        return f"{template}-{self.booted}"
+
+    async def destroy(self, sandbox):
+        self.destroyed.append(sandbox)
+
+    async def reset_sandbox(self, sandbox):
+        self.reset.append(sandbox)
+
+
+async def settle():
+    # Let background pre-boots run.
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_pool_prewarms_and_reuses_sandboxes():
+    """Verify the first checkout fills the pool, and returned sandboxes are reset and reused."""
+    factory = FakeFactory()
+    pool = SandboxPool(factory.create, size=2, destroy=factory.destroy)
+
+    first = await pool.checkout("python3")
+    await settle()
+    assert pool.stats()["idle"]["python3"] == 2
+    assert pool.stats()["cold_starts"] == 1
+
+    await pool.checkin(first, reset=factory.reset_sandbox)
+    assert factory.reset == [first.sandbox]
+    leased = [await pool.checkout("python3") for _ in range(3)]
+    assert factory.booted == 3  # no new boots: all served warm
+    assert {p.sandbox for p in leased} == {"python3-1", "python3-2", "python3-3"}
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_max_uses_and_failures():
+    factory = FakeFactory()
+    pool = SandboxPool(factory.create, size=0, max_uses=2, destroy=factory.destroy)
+
+    pooled = await pool.checkout("python3")
+    await pool.checkin(pooled)
+    pooled = await pool.checkout("python3")
+    assert pooled.uses == 2
+    await pool.checkin(pooled)
+    assert factory.destroyed == ["python3-1"]
+
+    async with pool.lease("python3") as sandbox:
+        assert sandbox == "python3-2"
+    with pytest.raises(RuntimeError):
+        async with pool.lease("python3"):
+            raise RuntimeError("task failed")
+    assert factory.destroyed == ["python3-1", "python3-2"]
+    assert pool.stats()["recycled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_expires_idle_sandboxes():
+    clock = FakeClock()
+    factory = FakeFactory()
+    pool = SandboxPool(factory.create, size=0, idle_timeout=60, destroy=factory.destroy, clock=clock)
+
+    await pool.checkin(await pool.checkout("python3"))
+    clock.now += 61
+    pooled = await pool.checkout("python3")
+    assert pooled.sandbox == "python3-2"
+    assert factory.destroyed == ["python3-1"]
+    assert pool.stats()["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_extends_or_expires_sandboxes_by_lifetime():
+    """Verify the deadline counts from boot, not last use, and each checkout extends it."""
+    clock = FakeClock()
+    factory = FakeFactory()
+    pool = SandboxPool(factory.create, size=0, idle_timeout=300, lifetime=600, destroy=factory.destroy, clock=clock)
+
+    # Kept busy for the whole lifetime: idle for seconds, yet killed by the provider.
+    pooled = await pool.checkout("python3")
+    clock.now += 599
+    await pool.checkin(pooled)
+    clock.now += 2
+    assert (await pool.checkout("python3")).sandbox == "python3-2"
+    assert pool.stats()["expired"] == 1
+
+    extended = []
+
+    async def extend(sandbox, seconds):
+        extended.append((sandbox, seconds))
+
+    pool = SandboxPool(factory.create, size=0, lifetime=600, extend=extend, destroy=factory.destroy, clock=clock)
+    pooled = await pool.checkout("python3")
+    clock.now += 500
+    await pool.checkin(pooled)
+    pooled = await pool.checkout("python3")
+    assert pooled.sandbox == "python3-3"
+    assert extended == [("python3-3", 600), ("python3-3", 600)]
+    assert pooled.expires_at == clock.now + 600
+
+
+@pytest.mark.asyncio
+async def test_checkout_waits_when_template_is_at_capacity():
+    """Verify checkouts beyond max_size wait for a checkin and the wait is recorded."""
+    factory = FakeFactory()
+    pool = SandboxPool(factory.create, size=0, max_size=1, destroy=factory.destroy)
+
+    held = await pool.checkout("python3")
+    waiter = asyncio.create_task(pool.checkout("python3"))
+    await asyncio.sleep(0.02)
+    assert not waiter.done()
+
+    await pool.checkin(held)
+    assert (await waiter).sandbox == held.sandbox
+    assert factory.booted == 1
+    assert pool.stats()["wait_max_seconds"] >= 0.02
+
+
+class FakeProcess:
+    stdout = "ok"
+    stderr = ""
+
+    async def wait(self):
+        return 0
+
+
+class FakeSandbox:
+    def __init__(self, sandbox_id):
+        self.sandbox_id = sandbox_id
+        self.ran = []
+        self.commands = self
+        self.files = self
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        self.ran.append(command)
+        return FakeProcess()
+
+    async def write(self, path, content):
+        pass
+
+    async def exists(self, path):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_e2b_tool_returns_sandboxes_to_the_pool():
+    """Verify consecutive tool runs share one warm sandbox, reset in between, instead of booting each time."""
+    from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, E2BSandboxToolInput
+
+    factory = FakeFactory()
+
+    async def create(template):
+        return FakeSandbox(await factory.create(template))
+
+    pool = SandboxPool(create, size=0, destroy=factory.destroy)
+    tool = E2BSandboxTool(api_key="test-key", pool=pool)
+    for _ in range(2):
+        result = await tool.run(E2BSandboxToolInput(command="echo ok"))
+        assert result["status"] == "success"
+        assert tool.sandbox is None
+
+    assert factory.booted == 1
+    sandbox = (await pool.checkout("python3")).sandbox
+    assert sandbox.ran.count("echo ok") == 2
+    assert sandbox.ran[-1].startswith("rm -rf /home/user/*")
+
+
+@pytest.mark.asyncio
+async def test_pools_are_per_api_key_and_closed_with_their_sessions(monkeypatch):
+    """Verify tools share a pool only with the same key, and shutdown ends sessions and destroys the sandboxes."""
+    import weakref
+
+    from src.sentient_core.tools import e2b_sandbox_tool
+    from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, close_sandbox_pools
+
+    factory = FakeFactory()
+
+    async def create(template):
+        return FakeSandbox(await factory.create(template))
+
+    pool = SandboxPool(create, size=0, destroy=factory.destroy)
+    monkeypatch.setattr(e2b_sandbox_tool, "_sandbox_pools", {"key-a": pool})
+    monkeypatch.setattr(e2b_sandbox_tool, "_tools", weakref.WeakSet())
+    tool = E2BSandboxTool(api_key="key-a")
+    assert E2BSandboxTool(api_key="key-a").pool is pool
+    assert E2BSandboxTool(api_key="key-b").pool is not pool
+
+    await tool.attach_session("wf-1", "python3")
+    await close_sandbox_pools()
+
+    assert tool.sandbox is None
+    assert [sandbox.sandbox_id for sandbox in factory.destroyed] == ["python3-1"]
+    assert e2b_sandbox_tool._sandbox_pools == {}
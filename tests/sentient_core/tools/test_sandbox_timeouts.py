@@ -0,0 +1,145 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, E2BSandboxToolInput
+from src.sentient_core.tools.process_limits import ResourceLimits
+from src.sentient_core.tools.sandbox_pool import SandboxPool
+from src.sentient_core.tools.webcontainer_tool import WebContainerTool
+
+
+def alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+async def session():
+    tool = WebContainerTool()
+    await tool.create_session()
+    return tool
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_the_command_and_keeps_partial_output(tmp_path):
+    tool = await session()
+    started = time.monotonic()
+    output = await tool.execute_commands(
+        [f"echo partial; sleep 30 & echo $! > {tmp_path}/pid; wait", "echo never"],
+        working_dir=str(tmp_path), timeout=0.5,
+    )
+
+    assert time.monotonic() - started < 5
+    hung, after = output.commands
+    assert output.status == "timeout"
+    assert hung.stdout == "partial\n" and hung.metadata["timed_out"]
+    assert "time limit reached" in hung.error
+    assert after.status == "skipped"
+    await asyncio.sleep(0.1)
+    assert not alive(int((tmp_path / "pid").read_text()))
+
+
+@pytest.mark.asyncio
+async def test_resource_limits_stop_runaway_commands(tmp_path):
+    tool = await session()
+    output = await tool.execute_commands(
+        [f"{sys.executable} -c \"b = bytearray(512 * 1024 * 1024); print('allocated')\""],
+        working_dir=str(tmp_path), limits=ResourceLimits(memory_mb=256),
+    )
+    [memory] = output.commands
+    assert memory.status == "error" and "MemoryError" in memory.stderr
+
+    output = await tool.execute_commands(
+        [f"{sys.executable} -c \"while True: pass\""],
+        working_dir=str(tmp_path), timeout=20, limits=ResourceLimits(cpu_seconds=1),
+    )
+    [cpu] = output.commands
+    # Killed by SIGXCPU/SIGKILL, as reported by the wrapping shell.
+    assert cpu.status == "error" and cpu.exit_code not in (0, None)
+    assert cpu.duration_seconds < 10
+
+
+@pytest.mark.asyncio
+async def test_cancelling_execute_commands_kills_the_process_group(tmp_path):
+    tool = await session()
+    task = asyncio.create_task(tool.execute_commands(
+        [f"sleep 30 & echo $! > {tmp_path}/pid; wait"], working_dir=str(tmp_path)))
+    while not (tmp_path / "pid").exists() or not (tmp_path / "pid").read_text():
+        await asyncio.sleep(0.02)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.1)
+    assert not alive(int((tmp_path / "pid").read_text()))
+
+
+class HangingProcess:
+    def __init__(self, on_stdout):
+        self.on_stdout = on_stdout
+        self.killed = asyncio.Event()
+
+    async def wait(self):
+        self.on_stdout("compiling\n")
+        await self.killed.wait()
+        return type("Output", (), {"exit_code": 137})()
+
+    async def kill(self):
+        self.killed.set()
+
+
+class HangingSandbox:
+    sandbox_id = "sbx-1"
+
+    def __init__(self):
+        self.commands = self
+        self.files = self
+        self.started = []
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        process = HangingProcess(on_stdout or (lambda message: None))
+        self.started.append(process)
+        return process
+
+    async def exists(self, path):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_e2b_command_timeout_returns_partial_output():
+    tool = E2BSandboxTool(api_key="test-key", pool=SandboxPool(lambda template: None, size=0))
+    tool.sandbox = HangingSandbox()
+    result = await tool.execute_command("npm run build", timeout=0.2)
+
+    assert result.status == "error" and result.metadata["timed_out"]
+    assert result.stdout == "compiling\n"
+    assert tool.sandbox.started[0].killed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_e2b_run_kills_the_command_and_discards_the_sandbox():
+    """Verify cancellation propagates: the remote command is killed and the sandbox is not reused."""
+    sandbox = HangingSandbox()
+    destroyed = []
+
+    async def create(template):
+        return sandbox
+
+    async def destroy(sbx):
+        destroyed.append(sbx)
+
+    pool = SandboxPool(create, size=0, destroy=destroy)
+    tool = E2BSandboxTool(api_key="test-key", pool=pool)
+    task = asyncio.create_task(tool.run(E2BSandboxToolInput(command="npm install")))
+    while not sandbox.started:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert sandbox.started[0].killed.is_set()
+    assert destroyed == [sandbox]
+    assert pool.stats()["recycled"] == 1
@@ -0,0 +1,113 @@
+import pytest
+
+from src.sentient_core.tools.e2b_sandbox_tool import E2BSandboxTool, E2BSandboxToolInput, FileModel
+from src.sentient_core.tools.sandbox_pool import SandboxPool
+from src.sentient_core.tools.webcontainer_tool import WebContainerTool, WebContainerToolInput
+from src.sentient_core.tools.workspace_sync import WorkspaceManifest
+
+
+def files(**contents):
+    return [FileModel(path=path.replace("_", "/", 1), content=content) for path, content in contents.items()]
+
+
+def test_manifest_plans_only_changes_and_deletions():
+    manifest = WorkspaceManifest()
+    first = manifest.plan(files(src_a="1", src_b="2", src_c="3"))
+    assert len(first.changed) == 3 and first.deleted == []
+    manifest.commit(first)
+
+    second = manifest.plan([FileModel(path="./src/a", content="1"), *files(src_b="two")])
+    assert [f.path for f in second.changed] == ["src/b"]
+    assert second.deleted == ["src/c"]
+    assert second.summary() == {"uploaded": 1, "deleted": 1, "unchanged": 1}
+    manifest.commit(second)
+    assert len(manifest) == 2 and "src/c" not in manifest
+
+    # A plan that was never committed leaves the manifest as it was.
+    manifest.plan(files(src_a="changed"))
+    assert manifest.plan(files(src_a="1", src_b="two")).changed == []
+
+
+class Output:
+    exit_code = 0
+
+
+class FakeProcess:
+    async def wait(self):
+        return Output()
+
+
+class FakeSandbox:
+    def __init__(self, sandbox_id):
+        self.sandbox_id = sandbox_id
+        self.writes = []
+        self.ran = []
+        self.files = self
+        self.commands = self
+
+    async def run(self, command, background=False, timeout=60, on_stdout=None, on_stderr=None):
+        self.ran.append(command)
+        return FakeProcess()
+
+    async def write(self, path, content):
+        self.writes.append(path)
+
+    async def exists(self, path):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_e2b_session_keeps_its_sandbox_and_uploads_deltas():
+    """Verify runs sharing a session id reuse one unreset sandbox and send only changed files."""
+    booted = []
+
+    async def create(template):
+        booted.append(FakeSandbox(f"sbx-{len(booted)}"))
+        return booted[-1]
+
+    async def destroy(sandbox):
+        pass
+
+    pool = SandboxPool(create, size=0, destroy=destroy)
+    tool = E2BSandboxTool(api_key="test-key", pool=pool)
+
+    first = await tool.run(E2BSandboxToolInput(command="pytest", session_id="wf-1",
+                                               files=files(app_main="v1", app_util="u", README="r")))
+    assert first["metadata"]["sync"] == {"uploaded": 3, "deleted": 0, "unchanged": 0}
+
+    second = await tool.run(E2BSandboxToolInput(command="pytest", session_id="wf-1",
+                                                files=files(app_main="v2", app_util="u")))
+    assert second["metadata"]["sync"] == {"uploaded": 1, "deleted": 1, "unchanged": 1}
+    assert second["sandbox_id"] == first["sandbox_id"]
+
+    [sandbox] = booted
+    assert sandbox.writes == ["app/main", "app/util", "README", "app/main"]
+    assert "rm -f -- /home/user/README" in sandbox.ran
+    assert not any(c.startswith("rm -rf") for c in sandbox.ran)
+
+    await tool.end_session("wf-1")
+    assert sandbox.ran[-1].startswith("rm -rf /home/user/*")
+    assert pool.stats()["idle"] == {"python3": 1}
+
+
+@pytest.mark.asyncio
+async def test_webcontainer_session_writes_deltas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tool = WebContainerTool()
+
+    def wc_input(**contents):
+        return WebContainerToolInput(files=[f.model_dump() for f in files(**contents)], commands=[],
+                                     install_dependencies=False, session_id="wf-1")
+
+    first = await tool.run(wc_input(src_index="<h1>1</h1>", src_old="x"))
+    assert first["sync"] == {"uploaded": 2, "deleted": 0, "unchanged": 0}
+
+    second = await tool.run(wc_input(src_index="<h1>2</h1>"))
+    assert second["sync"] == {"uploaded": 1, "deleted": 1, "unchanged": 0}
+    assert (tmp_path / "src/index").read_text() == "<h1>2</h1>"
+    assert not (tmp_path / "src/old").exists()
+
+    # Anonymous sessions still write everything.
+    third = await tool.run(WebContainerToolInput(files=[{"path": "src/index", "content": "3"}], commands=[],
+                                                 install_dependencies=False))
+    assert "sync" not in third